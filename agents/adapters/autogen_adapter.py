@@ -49,7 +49,7 @@ from typing import Optional, Dict, Any, List, Union, Callable
 # Add SDK to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'python_sdk'))
 
-from clove_sdk import AgentOSClient
+from clove_sdk import AgentOSClient, CloveClientPool
 
 # Try to import AutoGen components
 try:
@@ -70,7 +70,7 @@ except ImportError:
 # AgentOS Function Tools for AutoGen
 # ============================================================================
 
-def create_agentos_functions(client: AgentOSClient) -> Dict[str, Callable]:
+def create_agentos_functions(client: Union[AgentOSClient, CloveClientPool]) -> Dict[str, Callable]:
     """
     Create function definitions for AutoGen agents.
 
@@ -401,6 +401,7 @@ class AgentOSAssistant(AssistantAgent if AUTOGEN_AVAILABLE else object):
         llm_config: Optional[Dict] = None,
         permission_level: str = "standard",
         system_message: Optional[str] = None,
+        max_connections: int = 1,
         **kwargs
     ):
         """
@@ -411,16 +412,17 @@ class AgentOSAssistant(AssistantAgent if AUTOGEN_AVAILABLE else object):
             llm_config: LLM configuration for AutoGen
             permission_level: AgentOS permission level
             system_message: Optional system message (default provides AgentOS context)
+            max_connections: Kernel connections shared by the agent's functions
             **kwargs: Additional AutoGen arguments
         """
         if not AUTOGEN_AVAILABLE:
             raise ImportError("AutoGen is not installed. Install with: pip install pyautogen")
 
         # Connect to AgentOS
-        self._agentos_client = AgentOSClient()
-        if not self._agentos_client.connect():
-            raise ConnectionError("Failed to connect to AgentOS kernel")
-        self._agentos_client.set_permissions(level=permission_level)
+        self._agentos_client = CloveClientPool(
+            max_size=max_connections,
+            on_connect=lambda c: c.set_permissions(level=permission_level),
+        )
 
         # Create function tools
         self._agentos_functions = create_agentos_functions(self._agentos_client)
@@ -453,14 +455,14 @@ Use these tools to complete tasks. All operations go through AgentOS's permissio
             **kwargs
         )
 
-    def get_agentos_client(self) -> AgentOSClient:
-        """Get the underlying AgentOS client"""
+    def get_agentos_client(self) -> CloveClientPool:
+        """Get the underlying AgentOS connection pool"""
         return self._agentos_client
 
     def disconnect(self):
         """Disconnect from AgentOS"""
         if self._agentos_client:
-            self._agentos_client.disconnect()
+            self._agentos_client.close()
 
 
 class AgentOSUserProxy(UserProxyAgent if AUTOGEN_AVAILABLE else object):
@@ -478,6 +480,7 @@ class AgentOSUserProxy(UserProxyAgent if AUTOGEN_AVAILABLE else object):
         human_input_mode: str = "TERMINATE",
         max_consecutive_auto_reply: int = 10,
         code_execution_config: Optional[Dict] = None,
+        max_connections: int = 1,
         **kwargs
     ):
         """
@@ -489,16 +492,17 @@ class AgentOSUserProxy(UserProxyAgent if AUTOGEN_AVAILABLE else object):
             human_input_mode: When to ask for human input
             max_consecutive_auto_reply: Max auto replies
             code_execution_config: Code execution config (AgentOS handles execution)
+            max_connections: Kernel connections shared by the agent's functions
             **kwargs: Additional AutoGen arguments
         """
         if not AUTOGEN_AVAILABLE:
             raise ImportError("AutoGen is not installed. Install with: pip install pyautogen")
 
         # Connect to AgentOS
-        self._agentos_client = AgentOSClient()
-        if not self._agentos_client.connect():
-            raise ConnectionError("Failed to connect to AgentOS kernel")
-        self._agentos_client.set_permissions(level=permission_level)
+        self._agentos_client = CloveClientPool(
+            max_size=max_connections,
+            on_connect=lambda c: c.set_permissions(level=permission_level),
+        )
 
         # Create function tools
         self._agentos_functions = create_agentos_functions(self._agentos_client)
@@ -557,14 +561,14 @@ class AgentOSUserProxy(UserProxyAgent if AUTOGEN_AVAILABLE else object):
             return exit_code, output
         return 0, ""
 
-    def get_agentos_client(self) -> AgentOSClient:
-        """Get the underlying AgentOS client"""
+    def get_agentos_client(self) -> CloveClientPool:
+        """Get the underlying AgentOS connection pool"""
         return self._agentos_client
 
     def disconnect(self):
         """Disconnect from AgentOS"""
         if self._agentos_client:
-            self._agentos_client.disconnect()
+            self._agentos_client.close()
 
 
 # ============================================================================
@@ -52,7 +52,7 @@ from typing import Optional, Any, List, Callable
 # Add SDK to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'python_sdk'))
 
-from clove_sdk import AgentOSClient
+from clove_sdk import AgentOSClient, CloveClientPool
 
 # Try to import CrewAI components
 try:
@@ -237,23 +237,26 @@ class AgentOSCrewTools:
         )
     """
 
-    def __init__(self, permission_level: str = "standard"):
+    def __init__(self, permission_level: str = "standard", max_connections: int = 1):
         """
         Initialize the tool collection.
 
         Args:
             permission_level: AgentOS permission level
+            max_connections: Kernel connections shared by the tools. Raise it
+                when tools are called from several threads at once.
         """
         if not CREWAI_AVAILABLE:
             raise ImportError(
                 "CrewAI is not installed. Install with: pip install crewai"
             )
 
-        self.client = AgentOSClient()
-        if not self.client.connect():
-            raise ConnectionError("Failed to connect to AgentOS kernel")
-
-        self.client.set_permissions(level=permission_level)
+        # Each pooled connection is its own kernel agent, so permissions are
+        # applied per connection
+        self.client = CloveClientPool(
+            max_size=max_connections,
+            on_connect=lambda c: c.set_permissions(level=permission_level),
+        )
         self.permission_level = permission_level
 
     def get_tools(self) -> list:
@@ -286,7 +289,7 @@ class AgentOSCrewTools:
     def disconnect(self):
         """Disconnect from AgentOS"""
         if self.client:
-            self.client.disconnect()
+            self.client.close()
 
 
 # ============================================================================
@@ -41,12 +41,15 @@ All operations go through AgentOS's permission system.
 
 import os
 import sys
-from typing import Optional, Any, Type, List
+from typing import Optional, Any, Type, List, Union
 
 # Add SDK to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'python_sdk'))
 
-from clove_sdk import AgentOSClient
+from clove_sdk import AgentOSClient, CloveClientPool
+
+# Tools accept a single client or a pool shared across threads
+ClientLike = Union[AgentOSClient, CloveClientPool]
 
 # Try to import LangChain components
 try:
@@ -109,12 +112,12 @@ class AgentOSReadTool(BaseTool):
     name: str = "agentos_read"
     description: str = "Read a file from the filesystem through AgentOS. Input should be an absolute file path."
 
-    client: Optional[AgentOSClient] = None
+    client: Optional[ClientLike] = None
 
     class Config:
         arbitrary_types_allowed = True
 
-    def __init__(self, client: AgentOSClient, **kwargs):
+    def __init__(self, client: ClientLike, **kwargs):
         super().__init__(**kwargs)
         self.client = client
 
@@ -137,12 +140,12 @@ class AgentOSWriteTool(BaseTool):
     name: str = "agentos_write"
     description: str = "Write content to a file through AgentOS. Provide path and content."
 
-    client: Optional[AgentOSClient] = None
+    client: Optional[ClientLike] = None
 
     class Config:
         arbitrary_types_allowed = True
 
-    def __init__(self, client: AgentOSClient, **kwargs):
+    def __init__(self, client: ClientLike, **kwargs):
         super().__init__(**kwargs)
         self.client = client
 
@@ -164,12 +167,12 @@ class AgentOSExecTool(BaseTool):
     name: str = "agentos_exec"
     description: str = "Execute a shell command through AgentOS. Input should be the command string."
 
-    client: Optional[AgentOSClient] = None
+    client: Optional[ClientLike] = None
 
     class Config:
         arbitrary_types_allowed = True
 
-    def __init__(self, client: AgentOSClient, **kwargs):
+    def __init__(self, client: ClientLike, **kwargs):
         super().__init__(**kwargs)
         self.client = client
 
@@ -194,12 +197,12 @@ class AgentOSThinkTool(BaseTool):
     name: str = "agentos_think"
     description: str = "Query the LLM through AgentOS for reasoning tasks. Input should be the prompt."
 
-    client: Optional[AgentOSClient] = None
+    client: Optional[ClientLike] = None
 
     class Config:
         arbitrary_types_allowed = True
 
-    def __init__(self, client: AgentOSClient, **kwargs):
+    def __init__(self, client: ClientLike, **kwargs):
         super().__init__(**kwargs)
         self.client = client
 
@@ -221,12 +224,12 @@ class AgentOSSpawnTool(BaseTool):
     name: str = "agentos_spawn"
     description: str = "Spawn a new agent process through AgentOS. Provide agent name and script path."
 
-    client: Optional[AgentOSClient] = None
+    client: Optional[ClientLike] = None
 
     class Config:
         arbitrary_types_allowed = True
 
-    def __init__(self, client: AgentOSClient, **kwargs):
+    def __init__(self, client: ClientLike, **kwargs):
         super().__init__(**kwargs)
         self.client = client
 
@@ -248,12 +251,12 @@ class AgentOSHTTPTool(BaseTool):
     name: str = "agentos_http"
     description: str = "Make an HTTP request through AgentOS. Provide URL and optionally method, headers, body."
 
-    client: Optional[AgentOSClient] = None
+    client: Optional[ClientLike] = None
 
     class Config:
         arbitrary_types_allowed = True
 
-    def __init__(self, client: AgentOSClient, **kwargs):
+    def __init__(self, client: ClientLike, **kwargs):
         super().__init__(**kwargs)
         self.client = client
 
@@ -297,23 +300,26 @@ class AgentOSToolkit:
         agent = create_react_agent(llm, tools, prompt)
     """
 
-    def __init__(self, permission_level: str = "standard"):
+    def __init__(self, permission_level: str = "standard", max_connections: int = 1):
         """
         Initialize the toolkit.
 
         Args:
             permission_level: AgentOS permission level (unrestricted, standard, sandboxed, readonly, minimal)
+            max_connections: Kernel connections shared by the tools. Raise it
+                when tools are called from several threads at once.
         """
         if not LANGCHAIN_AVAILABLE:
             raise ImportError(
                 "LangChain is not installed. Install with: pip install langchain langchain-core pydantic"
             )
 
-        self.client = AgentOSClient()
-        if not self.client.connect():
-            raise ConnectionError("Failed to connect to AgentOS kernel")
-
-        self.client.set_permissions(level=permission_level)
+        # Each pooled connection is its own kernel agent, so permissions are
+        # applied per connection
+        self.client = CloveClientPool(
+            max_size=max_connections,
+            on_connect=lambda c: c.set_permissions(level=permission_level),
+        )
         self.permission_level = permission_level
 
     def get_tools(self) -> List[BaseTool]:
@@ -343,7 +349,7 @@ class AgentOSToolkit:
     def disconnect(self):
         """Disconnect from AgentOS"""
         if self.client:
-            self.client.disconnect()
+            self.client.close()
 
 
 # ============================================================================
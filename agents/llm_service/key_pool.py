@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""API key pool for the LLM service
+
+Spreads provider calls over several API keys:
+- Round-robin selection among keys that are ready
+- Token-bucket rate limit per key
+- Cooldown with exponential backoff when a key gets 429 / RESOURCE_EXHAUSTED
+- Health tracking: keys that keep failing (or are rejected as invalid) are
+  benched and retried after a recovery period; the last healthy key is never
+  benched, so its errors reach the caller instead of an empty pool
+- Retry with jittered exponential backoff on rate limits and transient errors
+
+Environment Variables:
+    GEMINI_API_KEYS: Comma-separated keys
+    GEMINI_API_KEY_<n> / GOOGLE_API_KEY_<n>: Numbered keys
+    GEMINI_API_KEY / GOOGLE_API_KEY: Single key
+    CLOVE_LLM_KEY_RPM: Requests per minute per key, 0 for no limit (default: 0)
+    CLOVE_LLM_KEY_BURST: Requests a key may send back to back (default: 5)
+    CLOVE_LLM_RETRIES: Attempts per request (default: 3)
+    CLOVE_LLM_BACKOFF: Base retry backoff in seconds (default: 1.0)
+    CLOVE_LLM_ACQUIRE_TIMEOUT: Longest wait for a usable key in seconds (default: 60)
+"""
+
+import os
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, List
+
+# Used when the exception carries no HTTP status code
+RATE_LIMIT_MARKERS = ("RESOURCE_EXHAUSTED", "Too Many Requests", "rate limit")
+TRANSIENT_MARKERS = ("UNAVAILABLE", "DEADLINE_EXCEEDED", "INTERNAL", "timed out", "Connection")
+BAD_KEY_MARKERS = ("API_KEY_INVALID", "API key not valid", "PERMISSION_DENIED", "UNAUTHENTICATED")
+
+RATE_LIMITED, BAD_KEY, TRANSIENT, FATAL = "rate_limited", "bad_key", "transient", "fatal"
+
+
+class PoolExhausted(Exception):
+    """No key became usable before the acquire timeout"""
+
+
+def load_api_keys() -> List[str]:
+    """API keys from the environment, in order, without duplicates"""
+    keys = []
+    for name in ("GEMINI_API_KEYS", "GOOGLE_API_KEYS"):
+        keys.extend(k.strip() for k in os.environ.get(name, "").split(","))
+
+    numbered = []
+    for name, value in os.environ.items():
+        match = re.fullmatch(r"(?:GEMINI|GOOGLE)_API_KEY_(\d+)", name)
+        if match:
+            numbered.append((int(match.group(1)), value.strip()))
+    keys.extend(value for _, value in sorted(numbered))
+
+    keys.append(os.environ.get("GEMINI_API_KEY", "").strip())
+    keys.append(os.environ.get("GOOGLE_API_KEY", "").strip())
+    return list(dict.fromkeys(k for k in keys if k))
+
+
+def classify_error(error: Exception) -> str:
+    """RATE_LIMITED, BAD_KEY, TRANSIENT or FATAL (a request the provider will never accept)"""
+    code = getattr(error, "code", None)
+    if isinstance(code, int):
+        if code == 429:
+            return RATE_LIMITED
+        if code in (401, 403):
+            return BAD_KEY
+        if code == 408 or code >= 500:
+            return TRANSIENT
+        return FATAL
+
+    message = str(error)
+    if any(m in message for m in RATE_LIMIT_MARKERS):
+        return RATE_LIMITED
+    if any(m in message for m in BAD_KEY_MARKERS):
+        return BAD_KEY
+    if isinstance(error, (TimeoutError, ConnectionError)) or any(m in message for m in TRANSIENT_MARKERS):
+        return TRANSIENT
+    return FATAL
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+class TokenBucket:
+    """Refills at rate tokens/second up to capacity; rate 0 means unlimited"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until a token is available (0 if one is available now)"""
+        if self.rate <= 0:
+            return 0.0
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self, now: float):
+        if self.rate > 0:
+            self._refill(now)
+            self.tokens -= 1
+
+
+@dataclass
+class KeyState:
+    """One API key, its client, limiter and health counters"""
+    key_id: int
+    client: Any
+    bucket: TokenBucket
+    requests: int = 0
+    successes: int = 0
+    failures: int = 0
+    rate_limited: int = 0
+    consecutive_failures: int = 0
+    consecutive_rate_limits: int = 0
+    cooldown_until: float = 0
+    unhealthy_since: float = 0
+    last_error: str = ""
+    in_flight: int = 0
+
+    def to_dict(self, now: float) -> dict:
+        return {
+            "key_id": self.key_id,
+            "healthy": not self.unhealthy_since,
+            "requests": self.requests,
+            "successes": self.successes,
+            "failures": self.failures,
+            "rate_limited": self.rate_limited,
+            "in_flight": self.in_flight,
+            "cooldown_remaining": round(max(0.0, self.cooldown_until - now), 1),
+            "last_error": self.last_error[:200],
+        }
+
+
+class APIKeyPool:
+    """Thread-safe pool of provider clients, one per API key"""
+
+    def __init__(self, keys: List[str], make_client: Callable[[str], Any],
+                 rpm: float = 0, burst: float = 5, retries: int = 3,
+                 backoff: float = 1.0, acquire_timeout: float = 60,
+                 cooldown: float = 10, max_cooldown: float = 120,
+                 unhealthy_after: int = 5, recovery: float = 60):
+        if not keys:
+            raise ValueError("No API key found. Set GEMINI_API_KEY or GOOGLE_API_KEY in environment or .env file.")
+        self.rpm = rpm
+        self.retries = max(1, retries)
+        self.backoff = backoff
+        self.acquire_timeout = acquire_timeout
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.unhealthy_after = unhealthy_after
+        self.recovery = recovery
+        self.keys = [KeyState(i, make_client(key), TokenBucket(rpm / 60.0, burst))
+                     for i, key in enumerate(keys)]
+        self._next = 0
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.retried = 0
+        self.exhausted = 0
+        self.last_error = ""
+
+    @classmethod
+    def from_env(cls, make_client: Callable[[str], Any]) -> 'APIKeyPool':
+        return cls(
+            load_api_keys(), make_client,
+            rpm=_env_float("CLOVE_LLM_KEY_RPM", 0),
+            burst=_env_float("CLOVE_LLM_KEY_BURST", 5),
+            retries=int(_env_float("CLOVE_LLM_RETRIES", 3)),
+            backoff=_env_float("CLOVE_LLM_BACKOFF", 1.0),
+            acquire_timeout=_env_float("CLOVE_LLM_ACQUIRE_TIMEOUT", 60),
+        )
+
+    def _ready_in(self, key: KeyState, now: float) -> float:
+        """Seconds until key may be used (0 = now)"""
+        if key.unhealthy_since:
+            if now - key.unhealthy_since < self.recovery:
+                return self.recovery - (now - key.unhealthy_since)
+            key.unhealthy_since = 0  # Give it another chance
+            key.consecutive_failures = 0
+        if now < key.cooldown_until:
+            return key.cooldown_until - now
+        return key.bucket.wait_time(now)
+
+    def acquire(self) -> KeyState:
+        """Next usable key in round-robin order, waiting for one if necessary"""
+        deadline = time.monotonic() + self.acquire_timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                soonest = None
+                for offset in range(len(self.keys)):
+                    key = self.keys[(self._next + offset) % len(self.keys)]
+                    wait = self._ready_in(key, now)
+                    if wait <= 0:
+                        self._next = (key.key_id + 1) % len(self.keys)
+                        key.bucket.take(now)
+                        key.requests += 1
+                        key.in_flight += 1
+                        return key
+                    soonest = wait if soonest is None else min(soonest, wait)
+
+            # Fail now rather than sleep through a wait that cannot succeed
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or (soonest or 0) > remaining:
+                with self._lock:
+                    self.exhausted += 1
+                    detail = f" (last error: {self.last_error[:200]})" if self.last_error else ""
+                raise PoolExhausted(f"All {len(self.keys)} API keys rate limited or unhealthy, "
+                                    f"none usable for {soonest:.0f}s{detail}")
+            time.sleep(min(soonest or 0.1, remaining))
+
+    def report_success(self, key: KeyState):
+        with self._lock:
+            key.in_flight -= 1
+            key.successes += 1
+            key.consecutive_failures = 0
+            key.consecutive_rate_limits = 0
+
+    def report_failure(self, key: KeyState, error: Exception) -> bool:
+        """Record a failed call; returns True if it is worth retrying"""
+        kind = classify_error(error)
+        with self._lock:
+            key.in_flight -= 1
+            key.failures += 1
+            key.last_error = str(error)
+            self.last_error = key.last_error
+            now = time.monotonic()
+            # Benching the only healthy key would turn every request into a
+            # long wait for PoolExhausted; keep it and let its error through
+            others_healthy = any(not k.unhealthy_since for k in self.keys if k is not key)
+
+            if kind == RATE_LIMITED:
+                key.rate_limited += 1
+                key.consecutive_rate_limits += 1
+                # Exponential cooldown: 10s, 20s, 40s... capped
+                cooldown = min(self.cooldown * 2 ** (key.consecutive_rate_limits - 1), self.max_cooldown)
+                key.cooldown_until = now + cooldown
+                return True
+
+            if kind == BAD_KEY:
+                if not others_healthy:
+                    return False
+                key.unhealthy_since = now
+                return True  # another key may work
+
+            if kind == TRANSIENT:
+                key.consecutive_failures += 1
+                if key.consecutive_failures >= self.unhealthy_after and others_healthy:
+                    key.unhealthy_since = now
+                return True
+            return False
+
+    def call(self, fn: Callable[[Any], Any], can_retry: Callable[[], bool] = None) -> Any:
+        """Run fn(client) on a pooled client, retrying on another key with jittered backoff.
+
+        can_retry, if given, is consulted before each retry (e.g. a stream that
+        has already emitted output must not be replayed).
+        """
+        for attempt in range(self.retries):
+            key = self.acquire()
+            try:
+                result = fn(key.client)
+            except Exception as e:
+                retryable = self.report_failure(key, e)
+                last_attempt = attempt == self.retries - 1
+                if not retryable or last_attempt or (can_retry and not can_retry()):
+                    raise
+                with self._lock:
+                    self.retried += 1
+                # Full jitter: spreads retries from many workers hitting the same limit
+                time.sleep(random.uniform(0, self.backoff * 2 ** attempt))
+                continue
+            self.report_success(key)
+            return result
+
+    def summary(self) -> dict:
+        """Compact pool state, attached to responses and sent with SYS_LLM_REPORT"""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "keys": len(self.keys),
+                "healthy_keys": sum(1 for k in self.keys if not k.unhealthy_since),
+                "keys_in_cooldown": sum(1 for k in self.keys if now < k.cooldown_until),
+                "requests": sum(k.requests for k in self.keys),
+                "failures": sum(k.failures for k in self.keys),
+                "rate_limited": sum(k.rate_limited for k in self.keys),
+                "retries": self.retried,
+                "exhausted": self.exhausted,
+            }
+
+    def stats(self) -> dict:
+        """summary() plus per-key detail"""
+        result = self.summary()
+        now = time.monotonic()
+        with self._lock:
+            result["rpm_per_key"] = self.rpm
+            result["per_key"] = [k.to_dict(now) for k in self.keys]
+        return result
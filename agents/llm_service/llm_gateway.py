@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""LLM Gateway - one shared LLM service for every agent on a host
+
+Long-lived daemon that speaks the llm_service.py JSON-lines protocol on a Unix
+socket. Agents connect to it instead of each spawning their own llm_service.py,
+so the host runs one interpreter and one set of provider clients (one per API
+key, see key_pool.py) no matter how many agents call think().
+
+Usage:
+    python3 llm_gateway.py
+    python3 llm_gateway.py --socket /tmp/clove_llm.sock --concurrency 32 --agent-rpm 60
+
+Environment Variables:
+    CLOVE_LLM_GATEWAY: Socket path (default: /tmp/clove_llm.sock)
+    CLOVE_LLM_CONCURRENCY: Provider calls in flight across all agents (default: 16)
+    CLOVE_LLM_AGENT_CONCURRENCY: Provider calls in flight per agent (default: 4)
+    CLOVE_LLM_AGENT_RPM: Requests per minute per agent, 0 for no limit (default: 0)
+
+Quotas are keyed on the connecting process's credentials (SO_PEERCRED uid and
+pid), so an agent cannot dodge its limits by claiming another name.
+
+Protocol additions over llm_service.py:
+    "agent": display name for the caller in stats (the SDK sends CLOVE_AGENT_NAME or pid-<pid>)
+    {"op": "stats"}: returns gateway, per-agent, cache and API key pool counters
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import signal
+import socket
+import struct
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Deque, Dict, Optional
+
+from llm_service import CACHE, get_pool, handle_request, handle_stream
+
+DEFAULT_SOCKET = "/tmp/clove_llm.sock"
+MAX_LINE_BYTES = 64 * 1024 * 1024  # requests may carry base64 images
+MAX_IDLE_AGENTS = 1024
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s [%(levelname)s] %(name)s: %(message)s'
+)
+logger = logging.getLogger("llm_gateway")
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+class AgentQuota:
+    """Per-agent concurrency slots, request-rate window and usage counters"""
+
+    def __init__(self, concurrency: int, rpm: int):
+        self.name = ""
+        self.slots = asyncio.Semaphore(concurrency)
+        self.rpm = rpm
+        self.recent: Deque[float] = deque()
+        self.requests = 0
+        self.rejected = 0
+        self.tokens = 0
+        self.in_flight = 0
+
+    def admit(self) -> bool:
+        """Record a request against the per-minute limit; False if over it"""
+        if self.rpm <= 0:
+            return True
+        now = time.monotonic()
+        while self.recent and now - self.recent[0] >= 60:
+            self.recent.popleft()
+        if len(self.recent) >= self.rpm:
+            return False
+        self.recent.append(now)
+        return True
+
+    def idle(self) -> bool:
+        return self.in_flight == 0 and not self.recent
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "requests": self.requests,
+            "rejected": self.rejected,
+            "tokens": self.tokens,
+            "in_flight": self.in_flight,
+        }
+
+
+class LLMGateway:
+    """Unix socket server multiplexing all agents onto one LLM client"""
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET, concurrency: int = 16,
+                 agent_concurrency: int = 4, agent_rpm: int = 0):
+        self.socket_path = socket_path
+        self.concurrency = max(1, concurrency)
+        self.agent_concurrency = max(1, agent_concurrency)
+        self.agent_rpm = max(0, agent_rpm)
+        self.connections = 0
+        self.in_flight = 0
+        self.started_at = time.time()
+        self._agents: Dict[str, AgentQuota] = {}
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency,
+                                            thread_name_prefix="llm-gateway")
+        self._pool = None
+        self._init_error = ""
+
+    def _quota(self, peer: str) -> AgentQuota:
+        quota = self._agents.get(peer)
+        if quota is None:
+            if len(self._agents) >= MAX_IDLE_AGENTS:
+                for key in [k for k, q in self._agents.items() if q.idle()]:
+                    del self._agents[key]
+            quota = AgentQuota(self.agent_concurrency, self.agent_rpm)
+            self._agents[peer] = quota
+        return quota
+
+    @staticmethod
+    def _peer(writer: asyncio.StreamWriter) -> str:
+        """Quota key for a connection: the peer's uid and pid from SO_PEERCRED"""
+        sock = writer.get_extra_info("socket")
+        try:
+            creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED,
+                                    struct.calcsize("3i"))
+        except (AttributeError, OSError):
+            # No peer credentials on this platform: each connection is its own caller
+            return f"conn-{id(writer)}"
+        pid, uid, _gid = struct.unpack("3i", creds)
+        return f"uid-{uid}/pid-{pid}"
+
+    def stats(self) -> dict:
+        return {
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "connections": self.connections,
+            "in_flight": self.in_flight,
+            "concurrency": self.concurrency,
+            "agents": {name: q.to_dict() for name, q in self._agents.items()},
+            "cache": CACHE.stats() if CACHE else None,
+            "key_pool": self._pool.stats() if self._pool else None,
+        }
+
+    def _generate(self, request: dict, emit: Optional[Callable[[str], None]]) -> dict:
+        if self._pool is None:
+            return {"success": False, "error": self._init_error, "content": ""}
+        if emit is not None and request.get("stream"):
+            response = handle_stream(self._pool, request, emit)
+        else:
+            response = handle_request(self._pool, request)
+        if CACHE is not None:
+            CACHE.put(request, response)
+        return response
+
+    async def _process(self, request: dict, peer: str,
+                       emit: Optional[Callable[[str], None]] = None) -> dict:
+        """Answer one request from peer (see _peer); emit (callable from
+        worker threads) receives stream chunks"""
+        if request.get("op") == "stats":
+            return {"success": True, **self.stats()}
+
+        loop = asyncio.get_running_loop()
+        name = str(request.pop("agent", None) or "anonymous")
+        if CACHE is not None:
+            # Cache hits cost the provider nothing, so they skip the quotas
+            cached = CACHE.get(request)
+            if cached is not None:
+                if emit is not None and request.get("stream") and cached.get("content"):
+                    await loop.run_in_executor(None, emit, cached["content"])
+                return cached
+
+        quota = self._quota(peer)
+        quota.name = name
+        if not quota.admit():
+            quota.rejected += 1
+            return {"success": False, "content": "",
+                    "error": f"Agent '{name}' ({peer}) exceeded {quota.rpm} LLM requests per minute"}
+
+        quota.requests += 1
+        async with quota.slots, self._slots:
+            quota.in_flight += 1
+            self.in_flight += 1
+            try:
+                response = await loop.run_in_executor(self._executor, self._generate,
+                                                      request, emit)
+            except Exception as e:
+                response = {"success": False, "error": str(e), "content": ""}
+            finally:
+                quota.in_flight -= 1
+                self.in_flight -= 1
+
+        if response.get("success"):
+            quota.tokens += int(response.get("tokens", 0) or 0)
+        return response
+
+    async def _handle_connection(self, reader: asyncio.StreamReader,
+                                 writer: asyncio.StreamWriter):
+        self.connections += 1
+        peer = self._peer(writer)
+        write_lock = asyncio.Lock()
+        tasks = set()
+
+        async def reply(response: dict):
+            async with write_lock:
+                writer.write((json.dumps(response) + "\n").encode())
+                await writer.drain()
+
+        async def run_tagged(request: dict):
+            request_id = request["request_id"]
+            loop = asyncio.get_running_loop()
+
+            def emit(text: str):
+                # Runs on a worker thread; waiting for the write keeps chunks
+                # ordered and lets a slow reader throttle the provider stream
+                chunk = {"request_id": request_id, "chunk": text, "done": False}
+                asyncio.run_coroutine_threadsafe(reply(chunk), loop).result()
+
+            response = await self._process(request, peer, emit)
+            response["request_id"] = request_id
+            try:
+                await reply(response)
+            except ConnectionError:
+                pass
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                line = line.strip()
+                if not line:
+                    continue
+
+                try:
+                    request = json.loads(line)
+                except json.JSONDecodeError as e:
+                    await reply({"success": False, "error": f"Invalid JSON: {e}", "content": ""})
+                    continue
+                if not isinstance(request, dict):
+                    await reply({"success": False, "error": "Request must be a JSON object", "content": ""})
+                    continue
+
+                if request.get("request_id") is not None:
+                    task = asyncio.create_task(run_tagged(request))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                else:
+                    await reply(await self._process(request, peer))
+        except (ConnectionError, ValueError) as e:
+            logger.debug(f"Connection dropped: {e}")
+        finally:
+            for task in tasks:
+                task.cancel()
+            self.connections -= 1
+            writer.close()
+
+    def _remove_stale_socket(self):
+        if not os.path.exists(self.socket_path):
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.socket_path)
+        except OSError:
+            os.unlink(self.socket_path)
+        else:
+            raise RuntimeError(f"An LLM gateway is already listening on {self.socket_path}")
+        finally:
+            probe.close()
+
+    async def serve(self):
+        try:
+            self._pool = get_pool()
+        except Exception as e:
+            self._init_error = str(e)
+            logger.error(f"LLM client unavailable, requests will fail: {e}")
+
+        self._slots = asyncio.Semaphore(self.concurrency)
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+        self._remove_stale_socket()
+        server = await asyncio.start_unix_server(self._handle_connection,
+                                                 path=self.socket_path,
+                                                 limit=MAX_LINE_BYTES)
+        logger.info(f"LLM gateway listening on {self.socket_path} "
+                    f"(concurrency={self.concurrency}, per-agent={self.agent_concurrency}, "
+                    f"rpm={self.agent_rpm or 'unlimited'})")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self._executor.shutdown(wait=False)
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared LLM gateway for Clove agents")
+    parser.add_argument("--socket", default=os.environ.get("CLOVE_LLM_GATEWAY", DEFAULT_SOCKET),
+                        help="Unix socket path to listen on")
+    parser.add_argument("--concurrency", type=int,
+                        default=_env_int("CLOVE_LLM_CONCURRENCY", 16),
+                        help="Provider calls in flight across all agents")
+    parser.add_argument("--agent-concurrency", type=int,
+                        default=_env_int("CLOVE_LLM_AGENT_CONCURRENCY", 4),
+                        help="Provider calls in flight per agent")
+    parser.add_argument("--agent-rpm", type=int,
+                        default=_env_int("CLOVE_LLM_AGENT_RPM", 0),
+                        help="Requests per minute per agent (0 = unlimited)")
+    args = parser.parse_args()
+
+    gateway = LLMGateway(args.socket, args.concurrency, args.agent_concurrency, args.agent_rpm)
+    try:
+        asyncio.run(gateway.serve())
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -3,12 +3,24 @@
 
 This subprocess receives JSON requests on stdin and outputs JSON responses on stdout.
 It uses the official google-genai SDK for accessing Gemini models.
+
+Requests carrying a "request_id" are handled concurrently on a worker pool
+(CLOVE_LLM_CONCURRENCY workers) and their responses echo the id, possibly out of
+order. Requests without one are answered inline, in order.
+
+A tagged request with "stream": true is answered with chunk lines
+{"request_id", "chunk", "done": false} as text arrives, then the usual final
+response.
+
+With CLOVE_LLM_CACHE set, successful responses are cached (clove_sdk.llm_cache).
 """
 
 import sys
 import json
 import base64
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Load .env file before anything else
@@ -40,13 +52,23 @@ load_dotenv()
 from google import genai
 from google.genai import types
 
-# Initialize client (uses GOOGLE_API_KEY or GEMINI_API_KEY from environment)
-def get_client():
-    """Get configured genai client"""
-    api_key = os.environ.get("GEMINI_API_KEY") or os.environ.get("GOOGLE_API_KEY")
-    if not api_key:
-        raise ValueError("No API key found. Set GEMINI_API_KEY or GOOGLE_API_KEY in environment or .env file.")
-    return genai.Client(api_key=api_key)
+from key_pool import APIKeyPool
+
+try:
+    from clove_sdk.llm_cache import LLMCache
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "python_sdk"))
+    try:
+        from clove_sdk.llm_cache import LLMCache
+    except ImportError:
+        LLMCache = None
+
+CACHE = LLMCache.from_env() if LLMCache else None
+
+# Initialize clients (GEMINI_API_KEYS, GEMINI_API_KEY_<n>, GEMINI_API_KEY or GOOGLE_API_KEY)
+def get_pool() -> APIKeyPool:
+    """Get a pool of genai clients, one per configured API key"""
+    return APIKeyPool.from_env(lambda api_key: genai.Client(api_key=api_key))
 
 
 def convert_tools_to_gemini(tools: list) -> list:
@@ -97,114 +119,186 @@ def convert_tools_to_gemini(tools: list) -> list:
     return declarations
 
 
-def handle_request(client, request: dict) -> dict:
-    """Process a single LLM request"""
-    try:
-        model = request.get("model", "gemini-2.0-flash")
-        prompt = request.get("prompt", "")
-
-        # Build contents (multimodal support)
-        contents = []
-        if prompt:
-            contents.append(prompt)
-
-        # Handle image if present (base64 encoded)
-        if "image" in request:
-            image_data = base64.b64decode(request["image"]["data"])
-            mime_type = request["image"].get("mime_type", "image/jpeg")
-            contents.append(types.Part.from_bytes(data=image_data, mime_type=mime_type))
-
-        # Build generation config
-        gen_config_args = {}
-
-        if "temperature" in request:
-            gen_config_args["temperature"] = request["temperature"]
-
-        if "max_tokens" in request:
-            gen_config_args["max_output_tokens"] = request["max_tokens"]
-
-        # Build thinking config if specified
-        thinking_config = None
-        if "thinking_level" in request:
-            level = request["thinking_level"].upper()
-            thinking_config = types.ThinkingConfig(
-                thinking_budget={"LOW": 1024, "MEDIUM": 4096, "HIGH": 8192}.get(level, 4096)
-            )
+def build_generate_args(request: dict) -> tuple:
+    """Translate a service request into (model, contents, config) for the genai SDK"""
+    model = request.get("model", "gemini-2.0-flash")
+    prompt = request.get("prompt", "")
 
-        # Build final config
-        config_args = {}
-        if gen_config_args:
-            config_args.update(gen_config_args)
+    # Build contents (multimodal support)
+    contents = []
+    if prompt:
+        contents.append(prompt)
 
-        if "system_instruction" in request:
-            config_args["system_instruction"] = request["system_instruction"]
+    # Handle image if present (base64 encoded)
+    if "image" in request:
+        image_data = base64.b64decode(request["image"]["data"])
+        mime_type = request["image"].get("mime_type", "image/jpeg")
+        contents.append(types.Part.from_bytes(data=image_data, mime_type=mime_type))
 
-        if thinking_config:
-            config_args["thinking_config"] = thinking_config
+    # Build generation config
+    gen_config_args = {}
 
-        # Handle tools/function calling
-        tools_config = None
-        if "tools" in request and request["tools"]:
-            try:
-                tool_declarations = convert_tools_to_gemini(request["tools"])
-                if tool_declarations:
-                    tools_config = [types.Tool(function_declarations=tool_declarations)]
-                    config_args["tools"] = tools_config
-            except Exception as tool_error:
-                # Log but don't fail - proceed without tools
-                pass
-
-        # Create config object if we have any config
-        config = types.GenerateContentConfig(**config_args) if config_args else None
-
-        # Call Gemini
-        response = client.models.generate_content(
+    if "temperature" in request:
+        gen_config_args["temperature"] = request["temperature"]
+
+    if "max_tokens" in request:
+        gen_config_args["max_output_tokens"] = request["max_tokens"]
+
+    # Build thinking config if specified
+    thinking_config = None
+    if "thinking_level" in request:
+        level = request["thinking_level"].upper()
+        thinking_config = types.ThinkingConfig(
+            thinking_budget={"LOW": 1024, "MEDIUM": 4096, "HIGH": 8192}.get(level, 4096)
+        )
+
+    # Build final config
+    config_args = {}
+    if gen_config_args:
+        config_args.update(gen_config_args)
+
+    if "system_instruction" in request:
+        config_args["system_instruction"] = request["system_instruction"]
+
+    if thinking_config:
+        config_args["thinking_config"] = thinking_config
+
+    # Handle tools/function calling
+    tools_config = None
+    if "tools" in request and request["tools"]:
+        try:
+            tool_declarations = convert_tools_to_gemini(request["tools"])
+            if tool_declarations:
+                tools_config = [types.Tool(function_declarations=tool_declarations)]
+                config_args["tools"] = tools_config
+        except Exception as tool_error:
+            # Log but don't fail - proceed without tools
+            pass
+
+    # Create config object if we have any config
+    config = types.GenerateContentConfig(**config_args) if config_args else None
+
+    return model, contents, config
+
+
+def extract_function_calls(response) -> list:
+    """Function calls in a response (or streamed chunk)"""
+    function_calls = []
+    if hasattr(response, 'candidates') and response.candidates:
+        for candidate in response.candidates:
+            if hasattr(candidate, 'content') and candidate.content:
+                parts = getattr(candidate.content, 'parts', None)
+                if parts:
+                    for part in parts:
+                        if hasattr(part, 'function_call') and part.function_call:
+                            fc = part.function_call
+                            function_calls.append({
+                                "name": fc.name,
+                                "arguments": dict(fc.args) if fc.args else {}
+                            })
+    return function_calls
+
+
+def extract_text(response) -> str:
+    """Text of a response (or streamed chunk), tolerating non-text parts"""
+    content_text = ""
+    try:
+        if hasattr(response, 'text') and response.text:
+            content_text = response.text
+    except Exception:
+        # If text extraction fails, try to extract from parts
+        if hasattr(response, 'candidates') and response.candidates:
+            for candidate in response.candidates:
+                if hasattr(candidate, 'content') and candidate.content:
+                    parts = getattr(candidate.content, 'parts', None)
+                    if parts:
+                        for part in parts:
+                            if hasattr(part, 'text') and part.text:
+                                content_text = part.text
+                                break
+    return content_text
+
+
+def handle_request(pool: APIKeyPool, request: dict) -> dict:
+    """Process a single LLM request"""
+    try:
+        model, contents, config = build_generate_args(request)
+
+        # Call Gemini on the next available key, retrying on rate limits
+        response = pool.call(lambda client: client.models.generate_content(
             model=model,
             contents=contents,
             config=config
-        )
+        ))
 
         # Extract token count
         tokens = 0
         if hasattr(response, 'usage_metadata') and response.usage_metadata:
             tokens = getattr(response.usage_metadata, 'total_token_count', 0)
 
-        # Check for function calls in response
+        function_calls = extract_function_calls(response)
+
+        result = {
+            "success": True,
+            "content": extract_text(response),
+            "tokens": tokens,
+            "key_pool": pool.summary()
+        }
+
+        if function_calls:
+            result["function_calls"] = function_calls
+
+        return result
+
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "content": "",
+            "key_pool": pool.summary()
+        }
+
+
+def handle_stream(pool: APIKeyPool, request: dict, emit) -> dict:
+    """Process an LLM request with the streaming API.
+
+    emit(text) is called for each text chunk as it arrives; the return value
+    is the same final result as handle_request, with the full content.
+    """
+    emitted = False
+
+    def generate(client) -> tuple:
+        nonlocal emitted
+        text_parts = []
         function_calls = []
-        if hasattr(response, 'candidates') and response.candidates:
-            for candidate in response.candidates:
-                if hasattr(candidate, 'content') and candidate.content:
-                    parts = getattr(candidate.content, 'parts', None)
-                    if parts:
-                        for part in parts:
-                            if hasattr(part, 'function_call') and part.function_call:
-                                fc = part.function_call
-                                function_calls.append({
-                                    "name": fc.name,
-                                    "arguments": dict(fc.args) if fc.args else {}
-                                })
-
-        # Extract text content safely
-        content_text = ""
-        try:
-            if hasattr(response, 'text') and response.text:
-                content_text = response.text
-        except Exception:
-            # If text extraction fails, try to extract from parts
-            if hasattr(response, 'candidates') and response.candidates:
-                for candidate in response.candidates:
-                    if hasattr(candidate, 'content') and candidate.content:
-                        parts = getattr(candidate.content, 'parts', None)
-                        if parts:
-                            for part in parts:
-                                if hasattr(part, 'text') and part.text:
-                                    content_text = part.text
-                                    break
+        tokens = 0
+        for chunk in client.models.generate_content_stream(
+            model=model,
+            contents=contents,
+            config=config
+        ):
+            text = extract_text(chunk)
+            if text:
+                text_parts.append(text)
+                emitted = True
+                emit(text)
+            function_calls.extend(extract_function_calls(chunk))
+            # Usage is cumulative; the last chunk carries the total
+            if getattr(chunk, 'usage_metadata', None):
+                tokens = getattr(chunk.usage_metadata, 'total_token_count', 0) or tokens
+        return text_parts, function_calls, tokens
+
+    try:
+        model, contents, config = build_generate_args(request)
+
+        # Output already sent can't be taken back, so only retry before the first chunk
+        text_parts, function_calls, tokens = pool.call(generate, can_retry=lambda: not emitted)
 
         result = {
             "success": True,
-            "content": content_text,
-            "tokens": tokens
+            "content": "".join(text_parts),
+            "tokens": tokens,
+            "key_pool": pool.summary()
         }
 
         if function_calls:
@@ -216,38 +310,92 @@ def handle_request(client, request: dict) -> dict:
         return {
             "success": False,
             "error": str(e),
-            "content": ""
+            "content": "",
+            "key_pool": pool.summary()
         }
 
 
+def handle_cached(pool: APIKeyPool, request: dict, emit=None) -> dict:
+    """Run a request (streamed if it asks and emit is given) behind the response cache"""
+    stream = emit is not None and bool(request.get("stream"))
+
+    def run() -> dict:
+        if stream:
+            return handle_stream(pool, request, emit)
+        return handle_request(pool, request)
+
+    if CACHE is None or not CACHE.cacheable(request):
+        return run()
+    cached = CACHE.get(request)
+    if cached is not None:
+        if stream and cached.get("content"):
+            emit(cached["content"])
+        return cached
+    response = run()
+    CACHE.put(request, response)
+    return response
+
+
+def get_concurrency() -> int:
+    """Number of requests handled in parallel (CLOVE_LLM_CONCURRENCY, default 4)"""
+    try:
+        return max(1, int(os.environ.get("CLOVE_LLM_CONCURRENCY", "4")))
+    except ValueError:
+        return 4
+
+
 def main():
     """Main loop - read JSON requests from stdin, write responses to stdout"""
-    # Initialize client once at startup
+    # Initialize clients once at startup
     try:
-        client = get_client()
+        pool = get_pool()
     except Exception as e:
         # If we can't initialize, report error for each request
-        client = None
+        pool = None
         init_error = str(e)
 
-    for line in sys.stdin:
-        line = line.strip()
-        if not line:
-            continue
+    write_lock = threading.Lock()
+
+    def respond(response: dict):
+        line = json.dumps(response)
+        with write_lock:
+            print(line, flush=True)
+
+    def process(request: dict, emit=None) -> dict:
+        if pool is None:
+            return {"success": False, "error": init_error, "content": ""}
+        return handle_cached(pool, request, emit)
+
+    def process_tagged(request: dict):
+        request_id = request["request_id"]
+
+        def emit(text: str):
+            respond({"request_id": request_id, "chunk": text, "done": False})
 
         try:
-            request = json.loads(line)
-        except json.JSONDecodeError as e:
-            response = {"success": False, "error": f"Invalid JSON: {e}", "content": ""}
-            print(json.dumps(response), flush=True)
-            continue
-
-        if client is None:
-            response = {"success": False, "error": init_error, "content": ""}
-        else:
-            response = handle_request(client, request)
-
-        print(json.dumps(response), flush=True)
+            response = process(request, emit)
+        except Exception as e:
+            response = {"success": False, "error": str(e), "content": ""}
+        response["request_id"] = request_id
+        respond(response)
+
+    with ThreadPoolExecutor(max_workers=get_concurrency(),
+                            thread_name_prefix="llm-worker") as workers:
+        for line in sys.stdin:
+            line = line.strip()
+            if not line:
+                continue
+
+            try:
+                request = json.loads(line)
+            except json.JSONDecodeError as e:
+                respond({"success": False, "error": f"Invalid JSON: {e}", "content": ""})
+                continue
+
+            if isinstance(request, dict) and request.get("request_id") is not None:
+                workers.submit(process_tagged, request)
+            else:
+                respond(process(request))
 
 
 if __name__ == "__main__":
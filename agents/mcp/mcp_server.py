@@ -54,7 +54,7 @@ from typing import Any, Optional
 # Add SDK to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'python_sdk'))
 
-from clove_sdk import AgentOSClient
+from clove_sdk import CloveClientPool
 
 # Configure logging to stderr (stdout is for MCP protocol)
 logging.basicConfig(
@@ -67,20 +67,22 @@ logger = logging.getLogger(__name__)
 # MCP Protocol version
 MCP_VERSION = "2024-11-05"
 
-# AgentOS client (global for this server)
-client: Optional[AgentOSClient] = None
+# AgentOS connection pool (global for this server). Dead connections are
+# dropped and replaced on the next call instead of failing every later tool call.
+client: Optional[CloveClientPool] = None
 
 
-def get_client() -> AgentOSClient:
-    """Get or create the AgentOS client"""
+def _on_connect(conn):
+    # Each pooled connection is its own agent; give it standard permissions
+    conn.set_permissions(level="standard")
+    logger.info("Connected to AgentOS kernel")
+
+
+def get_client() -> CloveClientPool:
+    """Get or create the AgentOS connection pool"""
     global client
-    if client is None or client._sock is None:
-        client = AgentOSClient()
-        if not client.connect():
-            raise ConnectionError("Failed to connect to AgentOS kernel")
-        # Set unrestricted permissions for MCP (user trusts Claude Desktop)
-        client.set_permissions(level="standard")
-        logger.info("Connected to AgentOS kernel")
+    if client is None:
+        client = CloveClientPool(max_size=4, on_connect=_on_connect)
     return client
 
 
@@ -457,8 +459,8 @@ def main():
         logger.info("Shutting down...")
 
     finally:
-        if client and client._sock:
-            client.disconnect()
+        if client:
+            client.close()
             logger.info("Disconnected from AgentOS")
 
 
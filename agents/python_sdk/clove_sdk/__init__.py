@@ -1,4 +1,11 @@
 from .client import CloveClient, SyscallOp, AgentOSClient, Message, connect
 from .agentic import AgenticLoop, Tool, run_task
+from .pipeline import Pipeline
+from .async_client import AsyncCloveClient, connect_async
+from .pool import CloveClientPool
+from .futures import gather, as_completed
+from .llm_cache import LLMCache
+from .llm_service import LLMStream
 
-__all__ = ['CloveClient', 'SyscallOp', 'AgenticLoop', 'Tool', 'run_task', 'AgentOSClient', 'Message', 'connect']
+__all__ = ['CloveClient', 'SyscallOp', 'AgenticLoop', 'Tool', 'run_task', 'AgentOSClient', 'Message', 'connect', 'Pipeline',
+           'AsyncCloveClient', 'connect_async', 'CloveClientPool', 'gather', 'as_completed', 'LLMCache', 'LLMStream']
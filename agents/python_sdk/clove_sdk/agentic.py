@@ -8,11 +8,14 @@ and reason iteratively - similar to Claude Code.
 
 import json
 import re
-from typing import Optional, Callable
+from typing import Optional, Callable, Iterable, Iterator
 from dataclasses import dataclass, field
 
 from .client import CloveClient
 
+TOOL_CALL_OPEN = '<tool_call>'
+TOOL_CALL_PATTERN = re.compile(r'<tool_call>\s*(.*?)\s*</tool_call>', re.DOTALL)
+
 
 @dataclass
 class Tool:
@@ -37,6 +40,7 @@ class AgentResult:
     result: str
     iterations: int
     error: Optional[str] = None
+    tool_results: list = field(default_factory=list)  # Tools that ran before a stream failed
 
 
 class AgenticLoop:
@@ -48,13 +52,19 @@ class AgenticLoop:
     4. Executes tools via kernel syscalls
     5. Returns results to the LLM
     6. Loops until 'done' tool is called or max iterations reached
+
+    With stream=True the response is read through think_stream() and each
+    tool call runs as soon as its </tool_call> arrives, while the rest of the
+    response is still being generated.
     """
 
     def __init__(self, client: CloveClient, max_iterations: int = 20,
-                 system_prompt: str = None, verbose: bool = True):
+                 system_prompt: str = None, verbose: bool = True,
+                 stream: bool = False):
         self.client = client
         self.max_iterations = max_iterations
         self.verbose = verbose
+        self.stream = stream
         self.system_prompt = system_prompt or self._default_system_prompt()
         self.conversation_history = []
         self.tools = self._create_default_tools()
@@ -173,25 +183,67 @@ Always respond with your reasoning, then tool calls in this format:
             "result": arguments.get("result", "Task completed")
         }
 
+    def _parse_tool_call(self, block: str) -> Optional[ToolCall]:
+        try:
+            data = json.loads(block)
+            return ToolCall(
+                name=data.get("name", ""),
+                arguments=data.get("arguments", {})
+            )
+        except json.JSONDecodeError:
+            if self.verbose:
+                print(f"[AgenticLoop] Failed to parse tool call: {block}")
+            return None
+
     def _parse_tool_calls(self, response: str) -> list[ToolCall]:
         """Parse tool calls from LLM response"""
         tool_calls = []
-        pattern = r'<tool_call>\s*(.*?)\s*</tool_call>'
-        matches = re.findall(pattern, response, re.DOTALL)
-
-        for match in matches:
-            try:
-                data = json.loads(match)
-                tool_calls.append(ToolCall(
-                    name=data.get("name", ""),
-                    arguments=data.get("arguments", {})
-                ))
-            except json.JSONDecodeError:
-                if self.verbose:
-                    print(f"[AgenticLoop] Failed to parse tool call: {match}")
-
+        for match in TOOL_CALL_PATTERN.findall(response):
+            tool_call = self._parse_tool_call(match)
+            if tool_call:
+                tool_calls.append(tool_call)
         return tool_calls
 
+    def _stream_tool_calls(self, chunks: Iterable[str]) -> Iterator[ToolCall]:
+        """Yield tool calls from a streamed response as each block completes"""
+        buffer = ""
+        pos = 0
+        for chunk in chunks:
+            buffer += chunk
+            while True:
+                match = TOOL_CALL_PATTERN.search(buffer, pos)
+                if not match:
+                    break
+                pos = match.end()
+                tool_call = self._parse_tool_call(match.group(1))
+                if tool_call:
+                    yield tool_call
+            # Resume at the unfinished block, or where an opening tag could
+            # still be split across chunks, so text is not rescanned per chunk
+            start = buffer.find(TOOL_CALL_OPEN, pos)
+            pos = start if start != -1 else max(pos, len(buffer) - len(TOOL_CALL_OPEN) + 1)
+
+    def _execute_tool(self, tc: ToolCall, tool_results: list) -> Optional[str]:
+        """Run one tool call, appending to tool_results; returns the result if it was 'done'"""
+        self._log(f"[AgenticLoop] Executing tool: {tc.name}")
+
+        if tc.name not in self.tools:
+            tool_results.append({"tool": tc.name, "error": f"Unknown tool: {tc.name}"})
+            return None
+
+        tool = self.tools[tc.name]
+        try:
+            result = tool.handler(tc.arguments)
+            tool_results.append({"tool": tc.name, "result": result})
+            self._log(f"[AgenticLoop] Tool result: {json.dumps(result)[:200]}")
+
+            if tc.name == "done":
+                return result.get("result", "Task completed")
+        except Exception as e:
+            tool_results.append({"tool": tc.name, "error": str(e)})
+            self._log(f"[AgenticLoop] Tool error: {e}")
+        return None
+
     def _build_tools_description(self) -> str:
         descriptions = []
         for name, tool in self.tools.items():
@@ -230,22 +282,50 @@ Think through this step by step and use the tools to accomplish the task."""
                 for msg in self.conversation_history
             ])
 
-            response = self.client.think(
-                prompt=full_prompt,
-                system_instruction=self.system_prompt
-            )
+            tool_calls = []
+            tool_results = []
+            done_result = None
+
+            if self.stream:
+                stream = self.client.think_stream(
+                    prompt=full_prompt,
+                    system_instruction=self.system_prompt
+                )
+                for tc in self._stream_tool_calls(stream):
+                    tool_calls.append(tc)
+                    result = self._execute_tool(tc, tool_results)
+                    if result is not None:
+                        done_result = result
+                response = stream.result()
+            else:
+                response = self.client.think(
+                    prompt=full_prompt,
+                    system_instruction=self.system_prompt
+                )
 
             if not response.get("success"):
                 error = response.get("error", "Unknown LLM error")
                 self._log(f"[AgenticLoop] LLM error: {error}")
-                return AgentResult(success=False, result="", iterations=iteration, error=error)
+                if tool_results:
+                    # A stream can fail after some of its tools already ran
+                    self.conversation_history.append({
+                        "role": "user",
+                        "content": f"Tool execution results:\n{json.dumps(tool_results, indent=2)}"
+                    })
+                return AgentResult(success=False, result="", iterations=iteration, error=error,
+                                   tool_results=tool_results)
 
             llm_content = response.get("content", "")
             self._log(f"[AgenticLoop] LLM response: {llm_content[:200]}...")
 
             self.conversation_history.append({"role": "assistant", "content": llm_content})
 
-            tool_calls = self._parse_tool_calls(llm_content)
+            if not self.stream:
+                tool_calls = self._parse_tool_calls(llm_content)
+                for tc in tool_calls:
+                    result = self._execute_tool(tc, tool_results)
+                    if result is not None:
+                        done_result = result
 
             if not tool_calls:
                 self._log("[AgenticLoop] No tool calls found in response")
@@ -255,29 +335,6 @@ Think through this step by step and use the tools to accomplish the task."""
                 })
                 continue
 
-            tool_results = []
-            done_result = None
-
-            for tc in tool_calls:
-                self._log(f"[AgenticLoop] Executing tool: {tc.name}")
-
-                if tc.name not in self.tools:
-                    tool_results.append({"tool": tc.name, "error": f"Unknown tool: {tc.name}"})
-                    continue
-
-                tool = self.tools[tc.name]
-                try:
-                    result = tool.handler(tc.arguments)
-                    tool_results.append({"tool": tc.name, "result": result})
-
-                    if tc.name == "done":
-                        done_result = result.get("result", "Task completed")
-
-                    self._log(f"[AgenticLoop] Tool result: {json.dumps(result)[:200]}")
-                except Exception as e:
-                    tool_results.append({"tool": tc.name, "error": str(e)})
-                    self._log(f"[AgenticLoop] Tool error: {e}")
-
             if done_result is not None:
                 self._log(f"\n[AgenticLoop] Task completed after {iteration} iterations")
                 return AgentResult(success=True, result=done_result, iterations=iteration)
@@ -305,8 +362,10 @@ Think through this step by step and use the tools to accomplish the task."""
 
 
 def run_task(task: str, socket_path: str = "/tmp/clove.sock",
-             max_iterations: int = 20, verbose: bool = True) -> AgentResult:
+             max_iterations: int = 20, verbose: bool = True,
+             stream: bool = False) -> AgentResult:
     """Convenience function to run a single task."""
     with CloveClient(socket_path) as client:
-        loop = AgenticLoop(client, max_iterations=max_iterations, verbose=verbose)
+        loop = AgenticLoop(client, max_iterations=max_iterations, verbose=verbose,
+                           stream=stream)
         return loop.run(task)
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Clove asyncio SDK
+
+Native asyncio client for the Clove kernel. One connection carries any
+number of concurrent syscalls, so a single event loop can drive many agents
+without a thread per client.
+"""
+
+import asyncio
+import struct
+import time
+from collections import deque
+from typing import AsyncIterator, Callable, Deque, Iterable, List, Optional, Tuple
+
+from .client import (
+    HEADER_SIZE,
+    MAGIC_BYTES,
+    Message,
+    SyscallOp,
+    _PASSTHROUGH_OPCODES,
+    _SyscallMethods,
+    _UNSET,
+    _decode_response,
+    _earliest,
+    _encode_payload,
+    _llm_report,
+    _next_wait_ms,
+    _think_payload,
+)
+from .codec import JSON, get_codec
+from .futures import AsyncioResults
+
+
+class AsyncCloveClient(_SyscallMethods):
+    """
+    asyncio client for communicating with the Clove kernel.
+
+    Mirrors the CloveClient API, with every syscall method a coroutine.
+    Calls may be issued concurrently from many tasks: each request is written
+    as soon as it is made, and a single reader task resolves responses in
+    order, since the kernel answers a connection's messages sequentially.
+
+    exec() and http() with async_=True return an asyncio Future for the
+    result, resolved by a poller task (see clove_sdk.futures).
+
+    codec is negotiated on connect exactly as for CloveClient.
+
+    Example:
+        async with AsyncCloveClient() as client:
+            results = await asyncio.gather(
+                *(client.store(f"key:{i}", i) for i in range(1000)))
+    """
+
+    def __init__(self, socket_path: str = '/tmp/clove.sock', codec: str = "json"):
+        self.socket_path = socket_path
+        self._requested_codec = get_codec(codec)
+        self._codec = JSON
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._pending: Deque[asyncio.Future] = deque()
+        self._agent_id = 0
+        self._async: Optional[AsyncioResults] = None
+
+    @property
+    def agent_id(self) -> int:
+        """Get the agent ID assigned by the kernel"""
+        return self._agent_id
+
+    @property
+    def codec(self):
+        """Payload codec negotiated for this connection"""
+        return self._codec
+
+    def _codec_for(self, opcode: SyscallOp):
+        return JSON if opcode in _PASSTHROUGH_OPCODES else self._codec
+
+    async def connect(self) -> bool:
+        """Connect to the Clove kernel"""
+        try:
+            self._reader, self._writer = await asyncio.open_unix_connection(self.socket_path)
+        except Exception as e:
+            print(f"Failed to connect: {e}")
+            return False
+
+        self._reader_task = asyncio.create_task(self._read_loop())
+
+        self._codec = JSON
+        if self._requested_codec is not JSON:
+            result = await self._request(SyscallOp.SYS_HELLO, {"codecs": [self._requested_codec.name]})
+            if result.get("codec") == self._requested_codec.name:
+                self._codec = self._requested_codec
+        return True
+
+    async def disconnect(self):
+        """Disconnect from the kernel"""
+        writer, self._writer = self._writer, None
+        if writer:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+        if self._reader_task:
+            self._reader_task.cancel()
+            try:
+                await self._reader_task
+            except asyncio.CancelledError:
+                pass
+            self._reader_task = None
+
+        self._reader = None
+        self._fail_pending()
+        if self._async:
+            self._async.fail(ConnectionError("Disconnected with async calls pending"))
+
+    async def _read_message(self) -> Message:
+        header = await self._reader.readexactly(HEADER_SIZE)
+        magic, agent_id, opcode, payload_size = struct.unpack('<IIBQ', header)
+
+        if magic != MAGIC_BYTES:
+            raise ConnectionError(f"Invalid magic bytes: 0x{magic:08x}")
+
+        payload = await self._reader.readexactly(payload_size) if payload_size > 0 else b''
+        return Message(agent_id=agent_id, opcode=SyscallOp(opcode), payload=payload)
+
+    async def _read_loop(self):
+        """Resolve pending calls in order as responses arrive."""
+        try:
+            while True:
+                msg = await self._read_message()
+
+                # Update our agent ID from response
+                self._agent_id = msg.agent_id
+
+                if not self._pending:
+                    print(f"Unexpected response: {msg.opcode.name}")
+                    continue
+                future = self._pending.popleft()
+                # A cancelled caller still owns its slot in the response order
+                if not future.done():
+                    future.set_result(msg)
+        except asyncio.CancelledError:
+            raise
+        except asyncio.IncompleteReadError:
+            pass
+        except Exception as e:
+            print(f"Receive failed: {e}")
+        finally:
+            writer, self._writer = self._writer, None
+            if writer:
+                writer.close()
+            self._fail_pending()
+
+    def _fail_pending(self):
+        while self._pending:
+            future = self._pending.popleft()
+            if not future.done():
+                future.set_result(None)
+
+    def _write(self, opcode: SyscallOp, payload: bytes) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        if not self._writer:
+            future.set_result(None)
+            return future
+
+        msg = Message(agent_id=self._agent_id, opcode=opcode, payload=payload)
+        try:
+            self._writer.write(msg.serialize())
+        except Exception as e:
+            print(f"Send failed: {e}")
+            future.set_result(None)
+            return future
+
+        self._pending.append(future)
+        return future
+
+    async def _drain(self):
+        if not self._writer:
+            return
+        try:
+            await self._writer.drain()
+        except Exception as e:
+            # The reader task fails the pending calls once the socket closes
+            print(f"Send failed: {e}")
+
+    async def call(self, opcode: SyscallOp, payload: bytes | str = b'') -> Optional[Message]:
+        """Send a message and wait for response"""
+        if isinstance(payload, str):
+            payload = payload.encode('utf-8')
+
+        future = self._write(opcode, payload)
+        await self._drain()
+        return await future
+
+    async def call_many(self, requests: Iterable[Tuple[SyscallOp, bytes | str]]) -> List[Optional[Message]]:
+        """Send several messages back to back, then collect the responses in order."""
+        futures = [self._write(opcode, payload.encode('utf-8') if isinstance(payload, str) else payload)
+                   for opcode, payload in requests]
+        await self._drain()
+        return list(await asyncio.gather(*futures))
+
+    async def messages(self, max_messages: int = 10, timeout: float = None,
+                       poll_ms: int = 30000, idle_timeout: float = None) -> AsyncIterator[dict]:
+        """Yield messages from other agents as they arrive (see CloveClient.messages).
+
+        While a receive is waiting, the kernel holds later calls on this
+        connection behind it, so make other calls from a separate client.
+
+        Example:
+            async for msg in client.messages():
+                handle(msg["message"])
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        idle_deadline = None if idle_timeout is None else time.monotonic() + idle_timeout
+        while True:
+            wait_ms = _next_wait_ms(_earliest(deadline, idle_deadline), poll_ms)
+            if wait_ms is None:
+                return
+
+            started = time.monotonic()
+            result = await self.recv_messages(max_messages, wait=True, timeout_ms=wait_ms)
+            if not result.get("success"):
+                return
+
+            batch = result.get("messages", [])
+            if batch:
+                for msg in batch:
+                    yield msg
+                if idle_timeout is not None:
+                    idle_deadline = time.monotonic() + idle_timeout
+            elif time.monotonic() - started < wait_ms / 2000:
+                # Kernel without blocking receive answered at once; don't spin
+                await asyncio.sleep(0.05)
+
+    async def _request(self, opcode: SyscallOp, payload: dict | bytes | str = b'',
+                       defaults: dict = None, transform: Callable = None,
+                       raw: bool = False, error_key: str = "error", missing=_UNSET,
+                       deferred: bool = False):
+        codec = self._codec_for(opcode)
+        response = await self.call(opcode, _encode_payload(payload, codec))
+
+        def decode(message, codec=codec):
+            return _decode_response(message, defaults, transform, raw, error_key, missing, codec)
+
+        if deferred:
+            if self._async is None:
+                self._async = AsyncioResults(self)
+            return self._async.submit(response, decode)
+        return decode(response)
+
+    async def _result(self, value):
+        return value
+
+    async def think(self, prompt: str,
+                    image: bytes = None,
+                    image_mime_type: str = "image/jpeg",
+                    system_instruction: str = None,
+                    thinking_level: str = None,
+                    temperature: float = None,
+                    model: str = None) -> dict:
+        """Send a prompt to the LLM via local LLM service (not the kernel)."""
+        from .llm_service import call_llm_service
+
+        payload = _think_payload(prompt, image, image_mime_type, system_instruction,
+                                 thinking_level, temperature, model)
+        result = await asyncio.to_thread(call_llm_service, payload)
+        await self._report_llm_usage(result)
+        return result
+
+    async def think_stream(self, prompt: str,
+                           image: bytes = None,
+                           image_mime_type: str = "image/jpeg",
+                           system_instruction: str = None,
+                           thinking_level: str = None,
+                           temperature: float = None,
+                           model: str = None) -> AsyncIterator[str]:
+        """Like think(), but yields text chunks as they are generated.
+
+        Usage is reported to the kernel when the stream ends.
+        """
+        from .llm_service import stream_llm_service
+
+        payload = _think_payload(prompt, image, image_mime_type, system_instruction,
+                                 thinking_level, temperature, model)
+        stream = stream_llm_service(payload)
+        async for chunk in stream:
+            yield chunk
+        await self._report_llm_usage(stream.result())
+
+    async def _report_llm_usage(self, result: dict) -> None:
+        # Report LLM usage to kernel if connected
+        if self._writer and result.get("success") and not result.get("cached"):
+            await self._request(SyscallOp.SYS_LLM_REPORT, _llm_report(result))
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.disconnect()
+
+
+async def connect_async(socket_path: str = '/tmp/clove.sock', codec: str = "json") -> AsyncCloveClient:
+    """Create and connect an asyncio client"""
+    client = AsyncCloveClient(socket_path, codec=codec)
+    if not await client.connect():
+        raise ConnectionError(f"Failed to connect to {socket_path}")
+    return client
@@ -5,17 +5,24 @@ Clove Python SDK
 Client library for communicating with the Clove kernel via Unix domain sockets.
 """
 
+import base64
 import socket
 import struct
+import threading
+import time
 from enum import IntEnum
-from typing import Optional, Tuple
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
 from dataclasses import dataclass
 
+from .codec import JSON, get_codec
+
 
 # Protocol constants
 MAGIC_BYTES = 0x41474E54  # "AGNT" in hex
 HEADER_SIZE = 17
 MAX_PAYLOAD_SIZE = 1024 * 1024  # 1MB
+IOV_MAX = 1024  # Max buffers per sendmsg() call on Linux
+RECV_CHUNK = 256 * 1024  # Largest single recv() when reading in chunks
 
 
 class SyscallOp(IntEnum):
@@ -40,6 +47,9 @@ class SyscallOp(IntEnum):
     SYS_FETCH = 0x31      # Retrieve value by key
     SYS_DELETE = 0x32     # Delete a key
     SYS_KEYS = 0x33       # List keys with optional prefix
+    SYS_MSTORE = 0x34     # Store many key-value pairs
+    SYS_MFETCH = 0x35     # Retrieve many values by key
+    SYS_MDELETE = 0x36    # Delete many keys
     # Permissions
     SYS_GET_PERMS = 0x40  # Get own permissions
     SYS_SET_PERMS = 0x41  # Set agent permissions
@@ -88,6 +98,13 @@ class SyscallOp(IntEnum):
     SYS_EXIT = 0xFF   # Graceful shutdown
 
 
+# Payloads of these opcodes are never transcoded by a negotiated codec
+_PASSTHROUGH_OPCODES = frozenset({SyscallOp.SYS_NOOP, SyscallOp.SYS_EXIT, SyscallOp.SYS_HELLO})
+
+# Marks "no value for a missing response" (None is a valid value)
+_UNSET = object()
+
+
 @dataclass
 class Message:
     """Clove message"""
@@ -95,16 +112,19 @@ class Message:
     opcode: SyscallOp
     payload: bytes
 
-    def serialize(self) -> bytes:
-        """Serialize message to wire format"""
-        header = struct.pack(
+    def header(self) -> bytes:
+        """Pack the 17-byte wire header for this message"""
+        return struct.pack(
             '<IIBQ',  # little-endian: uint32, uint32, uint8, uint64
             MAGIC_BYTES,
             self.agent_id,
             self.opcode,
             len(self.payload)
         )
-        return header + self.payload
+
+    def serialize(self) -> bytes:
+        """Serialize message to wire format"""
+        return self.header() + self.payload
 
     @classmethod
     def deserialize(cls, data: bytes) -> Optional['Message']:
@@ -132,171 +152,138 @@ class Message:
         return self.payload.decode('utf-8', errors='replace')
 
 
-class CloveClient:
-    """Client for communicating with Clove kernel"""
+def _encode_payload(payload, codec=JSON) -> bytes:
+    """Encode a request payload: dicts with the codec, strings as UTF-8."""
+    if isinstance(payload, dict):
+        return codec.encode(payload)
+    if isinstance(payload, str):
+        payload = payload.encode('utf-8')
+    return payload
+
+
+def _decode_response(response: Optional[Message], defaults: Optional[dict] = None,
+                     transform: Optional[Callable] = None, raw: bool = False,
+                     error_key: str = "error", missing=_UNSET, codec=JSON):
+    """Turn a kernel response into the value returned by a syscall method.
+
+    Responses are decoded with the codec; a missing or undecodable response
+    becomes a failure dict carrying `defaults`, or `missing` if given for a
+    missing response. With `raw`, the Message (or None) is passed straight
+    to `transform` instead.
+    """
+    if raw:
+        return transform(response) if transform else response
+
+    if response is None:
+        if missing is not _UNSET:
+            return missing
+        result = {"success": False, **(defaults or {}), error_key: "No response from kernel"}
+    else:
+        try:
+            result = codec.decode(response.payload)
+        except ValueError:
+            result = {"success": False, **(defaults or {}), error_key: response.payload_str}
+    return transform(result) if transform else result
+
+
+def _think_payload(prompt: str, image: bytes = None, image_mime_type: str = "image/jpeg",
+                   system_instruction: str = None, thinking_level: str = None,
+                   temperature: float = None, model: str = None) -> dict:
+    """Build the request sent to the local LLM service."""
+    payload = {"prompt": prompt}
+
+    if image:
+        payload["image"] = {
+            "data": base64.b64encode(image).decode(),
+            "mime_type": image_mime_type
+        }
 
-    def __init__(self, socket_path: str = '/tmp/clove.sock'):
-        self.socket_path = socket_path
-        self._sock: Optional[socket.socket] = None
-        self._agent_id = 0
+    if system_instruction:
+        payload["system_instruction"] = system_instruction
 
-    @property
-    def agent_id(self) -> int:
-        """Get the agent ID assigned by the kernel"""
-        return self._agent_id
+    if thinking_level:
+        payload["thinking_level"] = thinking_level
 
-    def connect(self) -> bool:
-        """Connect to the Clove kernel"""
-        try:
-            self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
-            self._sock.connect(self.socket_path)
-            return True
-        except Exception as e:
-            print(f"Failed to connect: {e}")
-            return False
+    if temperature is not None:
+        payload["temperature"] = temperature
 
-    def disconnect(self):
-        """Disconnect from the kernel"""
-        if self._sock:
-            self._sock.close()
-            self._sock = None
+    if model:
+        payload["model"] = model
 
-    def send(self, opcode: SyscallOp, payload: bytes | str = b'') -> bool:
-        """Send a message to the kernel"""
-        if not self._sock:
-            return False
+    return payload
 
-        if isinstance(payload, str):
-            payload = payload.encode('utf-8')
 
-        msg = Message(agent_id=self._agent_id, opcode=opcode, payload=payload)
-        try:
-            self._sock.sendall(msg.serialize())
-            return True
-        except Exception as e:
-            print(f"Send failed: {e}")
-            return False
+def _llm_report(result: dict) -> dict:
+    """SYS_LLM_REPORT payload for a think() result."""
+    report = {"tokens": int(result.get("tokens", 0) or 0), "success": True}
+    if result.get("key_pool"):
+        report["key_pool"] = result["key_pool"]
+    return report
 
-    def recv(self) -> Optional[Message]:
-        """Receive a message from the kernel"""
-        if not self._sock:
-            return None
 
-        try:
-            # Read header first
-            header_data = self._recv_exact(HEADER_SIZE)
-            if not header_data:
-                return None
+def _earliest(*deadlines: Optional[float]) -> Optional[float]:
+    """Soonest of several deadlines, ignoring None (no deadline)"""
+    return min((d for d in deadlines if d is not None), default=None)
 
-            # Parse header to get payload size
-            magic, agent_id, opcode, payload_size = struct.unpack('<IIBQ', header_data)
 
-            if magic != MAGIC_BYTES:
-                print(f"Invalid magic bytes: 0x{magic:08x}")
-                return None
+def _next_wait_ms(deadline: Optional[float], poll_ms: int) -> Optional[int]:
+    """Long-poll duration for the next receive; None once the deadline has passed."""
+    if deadline is None:
+        return poll_ms
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        return None
+    return min(poll_ms, int(remaining * 1000))
 
-            # Read payload
-            payload = b''
-            if payload_size > 0:
-                payload = self._recv_exact(payload_size)
-                if not payload:
-                    return None
 
-            # Update our agent ID from response
-            self._agent_id = agent_id
+def _read_content(result: dict) -> str:
+    if result.get("success"):
+        return result.get("content", "")
+    raise IOError(result.get("error", "Read failed"))
 
-            return Message(agent_id=agent_id, opcode=SyscallOp(opcode), payload=payload)
-        except Exception as e:
-            print(f"Receive failed: {e}")
-            return None
 
-    def _recv_exact(self, n: int) -> Optional[bytes]:
-        """Receive exactly n bytes"""
-        data = b''
-        while len(data) < n:
-            chunk = self._sock.recv(n - len(data))
-            if not chunk:
-                return None
-            data += chunk
-        return data
+def _index_fetched(result: dict) -> dict:
+    result["values"] = {r["key"]: r.get("value") for r in result.get("results", []) if r.get("exists")}
+    return result
 
-    def call(self, opcode: SyscallOp, payload: bytes | str = b'') -> Optional[Message]:
-        """Send a message and wait for response"""
-        if not self.send(opcode, payload):
-            return None
-        return self.recv()
 
-    # Convenience methods
+class _SyscallMethods:
+    """
+    Syscall convenience methods shared by CloveClient, AsyncCloveClient and
+    Pipeline.
+
+    Each method builds its request and hands it to _request(), which the
+    concrete class implements: CloveClient returns the decoded result,
+    AsyncCloveClient returns a coroutine, and Pipeline queues the request.
+    """
+
+    def _request(self, opcode: SyscallOp, payload: dict | bytes | str = b'',
+                 defaults: dict = None, transform: Callable = None,
+                 raw: bool = False, error_key: str = "error", missing=_UNSET,
+                 deferred: bool = False):
+        raise NotImplementedError
+
+    def _result(self, value):
+        """Return a value without contacting the kernel."""
+        raise NotImplementedError
+
     def hello(self) -> dict:
         """Query kernel version and capabilities."""
-        import json
-        response = self.call(SyscallOp.SYS_HELLO, "{}")
-        if response:
-            try:
-                return json.loads(response.payload_str)
-            except json.JSONDecodeError:
-                return {"success": False, "error": response.payload_str}
-        return {"success": False, "error": "No response from kernel"}
+        return self._request(SyscallOp.SYS_HELLO, "{}")
 
     def echo(self, message: str) -> Optional[str]:
         """Echo a message (for testing)"""
-        response = self.call(SyscallOp.SYS_NOOP, message)
-        return response.payload_str if response else None
+        return self._request(SyscallOp.SYS_NOOP, message, raw=True,
+                             transform=lambda r: r.payload_str if r else None)
 
     def noop(self, message: str) -> Optional[str]:
         """Alias for echo - send a NOOP message (for testing)"""
         return self.echo(message)
 
-    def think(self, prompt: str,
-              image: bytes = None,
-              image_mime_type: str = "image/jpeg",
-              system_instruction: str = None,
-              thinking_level: str = None,
-              temperature: float = None,
-              model: str = None,
-              async_: bool = False,
-              request_id: int = None) -> dict:
-        """Send a prompt to the LLM via local LLM service (not the kernel)."""
-        import base64
-        import json
-        from .llm_service import call_llm_service
-
-        payload = {"prompt": prompt}
-
-        if image:
-            payload["image"] = {
-                "data": base64.b64encode(image).decode(),
-                "mime_type": image_mime_type
-            }
-
-        if system_instruction:
-            payload["system_instruction"] = system_instruction
-
-        if thinking_level:
-            payload["thinking_level"] = thinking_level
-
-        if temperature is not None:
-            payload["temperature"] = temperature
-
-        if model:
-            payload["model"] = model
-        if async_ or request_id is not None:
-            payload["async"] = False
-
-        result = call_llm_service(payload)
-
-        # Report LLM usage to kernel if connected
-        if self._sock and result.get("success"):
-            tokens = int(result.get("tokens", 0) or 0)
-            report = {"tokens": tokens, "success": True}
-            self.call(SyscallOp.SYS_LLM_REPORT, json.dumps(report))
-
-        return result
-
     def exit(self) -> bool:
         """Request graceful exit"""
-        response = self.call(SyscallOp.SYS_EXIT)
-        return response is not None
+        return self._request(SyscallOp.SYS_EXIT, raw=True,
+                             transform=lambda r: r is not None)
 
     def spawn(self, name: str, script: str, sandboxed: bool = True,
               network: bool = False, limits: dict = None,
@@ -304,7 +291,6 @@ class CloveClient:
               max_restarts: int = 5,
               restart_window: int = 300) -> Optional[dict]:
         """Spawn a new sandboxed agent."""
-        import json
         payload = {
             "name": name,
             "script": script,
@@ -317,74 +303,44 @@ class CloveClient:
         if limits:
             payload["limits"] = limits
 
-        response = self.call(SyscallOp.SYS_SPAWN, json.dumps(payload))
-        if response:
-            return json.loads(response.payload_str)
-        return None
+        return self._request(SyscallOp.SYS_SPAWN, payload, missing=None)
 
-    def kill(self, name: str = None, agent_id: int = None) -> bool:
-        """Kill a running agent"""
-        import json
+    def _agent_control(self, opcode: SyscallOp, result_key: str,
+                       name: str = None, agent_id: int = None):
         payload = {}
         if name:
             payload["name"] = name
         elif agent_id:
             payload["id"] = agent_id
         else:
-            return False
+            return self._result(False)
 
-        response = self.call(SyscallOp.SYS_KILL, json.dumps(payload))
-        if response:
-            result = json.loads(response.payload_str)
-            return result.get("killed", False)
-        return False
+        return self._request(opcode, payload, missing=False,
+                             transform=lambda r: r.get(result_key, False))
+
+    def kill(self, name: str = None, agent_id: int = None) -> bool:
+        """Kill a running agent"""
+        return self._agent_control(SyscallOp.SYS_KILL, "killed", name, agent_id)
 
     def pause(self, name: str = None, agent_id: int = None) -> bool:
         """Pause a running agent (SIGSTOP)"""
-        import json
-        payload = {}
-        if name:
-            payload["name"] = name
-        elif agent_id:
-            payload["id"] = agent_id
-        else:
-            return False
-
-        response = self.call(SyscallOp.SYS_PAUSE, json.dumps(payload))
-        if response:
-            result = json.loads(response.payload_str)
-            return result.get("success", False)
-        return False
+        return self._agent_control(SyscallOp.SYS_PAUSE, "success", name, agent_id)
 
     def resume(self, name: str = None, agent_id: int = None) -> bool:
         """Resume a paused agent (SIGCONT)"""
-        import json
-        payload = {}
-        if name:
-            payload["name"] = name
-        elif agent_id:
-            payload["id"] = agent_id
-        else:
-            return False
-
-        response = self.call(SyscallOp.SYS_RESUME, json.dumps(payload))
-        if response:
-            result = json.loads(response.payload_str)
-            return result.get("success", False)
-        return False
+        return self._agent_control(SyscallOp.SYS_RESUME, "success", name, agent_id)
 
     def list_agents(self) -> list:
         """List all running agents"""
-        import json
-        response = self.call(SyscallOp.SYS_LIST)
-        if response:
-            return json.loads(response.payload_str)
-        return []
+        return self._request(SyscallOp.SYS_LIST, missing=[])
 
     def exec(self, command: str, cwd: str = None, timeout: int = 30,
              async_: bool = False, request_id: int = None) -> dict:
-        """Execute a shell command."""
-        import json
+        """Execute a shell command.
+
+        With async_=True the command runs in the background and a future
+        resolving to the same result dict is returned (see clove_sdk.futures).
+        """
         payload = {
             "command": command,
             "timeout": timeout,
@@ -395,62 +351,32 @@ class CloveClient:
         if request_id is not None:
             payload["request_id"] = request_id
 
-        response = self.call(SyscallOp.SYS_EXEC, json.dumps(payload))
-        if response:
-            try:
-                return json.loads(response.payload_str)
-            except json.JSONDecodeError:
-                return {"success": False, "stdout": "", "stderr": response.payload_str, "exit_code": -1}
-        return {"success": False, "stdout": "", "stderr": "No response from kernel", "exit_code": -1}
+        return self._request(SyscallOp.SYS_EXEC, payload,
+                             defaults={"stdout": "", "exit_code": -1}, error_key="stderr",
+                             deferred=async_)
 
     def read_file(self, path: str) -> dict:
         """Read a file's contents."""
-        import json
-        payload = {"path": path}
-
-        response = self.call(SyscallOp.SYS_READ, json.dumps(payload))
-        if response:
-            try:
-                return json.loads(response.payload_str)
-            except json.JSONDecodeError:
-                return {"success": False, "content": "", "size": 0, "error": response.payload_str}
-        return {"success": False, "content": "", "size": 0, "error": "No response from kernel"}
+        return self._request(SyscallOp.SYS_READ, {"path": path},
+                             defaults={"content": "", "size": 0})
 
     def write_file(self, path: str, content: str, mode: str = "write") -> dict:
         """Write content to a file."""
-        import json
         payload = {
             "path": path,
             "content": content,
             "mode": mode
         }
-
-        response = self.call(SyscallOp.SYS_WRITE, json.dumps(payload))
-        if response:
-            try:
-                return json.loads(response.payload_str)
-            except json.JSONDecodeError:
-                return {"success": False, "bytes_written": 0, "error": response.payload_str}
-        return {"success": False, "bytes_written": 0, "error": "No response from kernel"}
+        return self._request(SyscallOp.SYS_WRITE, payload, defaults={"bytes_written": 0})
 
     # IPC - Inter-Agent Communication
 
     def register_name(self, name: str) -> dict:
         """Register this agent with a name for IPC."""
-        import json
-        payload = {"name": name}
-
-        response = self.call(SyscallOp.SYS_REGISTER, json.dumps(payload))
-        if response:
-            try:
-                return json.loads(response.payload_str)
-            except json.JSONDecodeError:
-                return {"success": False, "error": response.payload_str}
-        return {"success": False, "error": "No response from kernel"}
+        return self._request(SyscallOp.SYS_REGISTER, {"name": name})
 
     def send_message(self, message: dict, to: int = None, to_name: str = None) -> dict:
         """Send a message to another agent."""
-        import json
         payload = {"message": message}
 
         if to is not None:
@@ -458,60 +384,41 @@ class CloveClient:
         if to_name is not None:
             payload["to_name"] = to_name
 
-        response = self.call(SyscallOp.SYS_SEND, json.dumps(payload))
-        if response:
-            try:
-                return json.loads(response.payload_str)
-            except json.JSONDecodeError:
-                return {"success": False, "error": response.payload_str}
-        return {"success": False, "error": "No response from kernel"}
-
-    def recv_messages(self, max_messages: int = 10) -> dict:
-        """Receive pending messages from other agents."""
-        import json
+        return self._request(SyscallOp.SYS_SEND, payload)
+
+    def recv_messages(self, max_messages: int = 10, wait: bool = False,
+                      timeout_ms: int = None) -> dict:
+        """Receive pending messages from other agents.
+
+        With wait=True the kernel holds the call until a message arrives or
+        timeout_ms (default 30000) passes, instead of returning empty.
+        """
         payload = {"max": max_messages}
+        if wait:
+            payload["wait"] = True
+            if timeout_ms is not None:
+                payload["timeout_ms"] = timeout_ms
 
-        response = self.call(SyscallOp.SYS_RECV, json.dumps(payload))
-        if response:
-            try:
-                return json.loads(response.payload_str)
-            except json.JSONDecodeError:
-                return {"success": False, "messages": [], "count": 0, "error": response.payload_str}
-        return {"success": False, "messages": [], "count": 0, "error": "No response from kernel"}
+        return self._request(SyscallOp.SYS_RECV, payload,
+                             defaults={"messages": [], "count": 0})
 
     def broadcast(self, message: dict, include_self: bool = False) -> dict:
         """Broadcast a message to all registered agents."""
-        import json
         payload = {
             "message": message,
             "include_self": include_self
         }
-
-        response = self.call(SyscallOp.SYS_BROADCAST, json.dumps(payload))
-        if response:
-            try:
-                return json.loads(response.payload_str)
-            except json.JSONDecodeError:
-                return {"success": False, "delivered_count": 0, "error": response.payload_str}
-        return {"success": False, "delivered_count": 0, "error": "No response from kernel"}
+        return self._request(SyscallOp.SYS_BROADCAST, payload, defaults={"delivered_count": 0})
 
     # Permissions
 
     def get_permissions(self) -> dict:
         """Get this agent's permissions."""
-        import json
-        response = self.call(SyscallOp.SYS_GET_PERMS, "{}")
-        if response:
-            try:
-                return json.loads(response.payload_str)
-            except json.JSONDecodeError:
-                return {"success": False, "error": response.payload_str}
-        return {"success": False, "error": "No response from kernel"}
+        return self._request(SyscallOp.SYS_GET_PERMS, "{}")
 
     def set_permissions(self, permissions: dict = None, level: str = None,
                        agent_id: int = None) -> dict:
         """Set agent permissions."""
-        import json
         payload = {}
 
         if permissions:
@@ -521,19 +428,12 @@ class CloveClient:
         if agent_id is not None:
             payload["agent_id"] = agent_id
 
-        response = self.call(SyscallOp.SYS_SET_PERMS, json.dumps(payload))
-        if response:
-            try:
-                return json.loads(response.payload_str)
-            except json.JSONDecodeError:
-                return {"success": False, "error": response.payload_str}
-        return {"success": False, "error": "No response from kernel"}
+        return self._request(SyscallOp.SYS_SET_PERMS, payload)
 
     # State Store
 
     def store(self, key: str, value, scope: str = "global", ttl: int = None) -> dict:
         """Store a key-value pair in the shared state store."""
-        import json
         payload = {
             "key": key,
             "value": value,
@@ -542,60 +442,61 @@ class CloveClient:
         if ttl is not None:
             payload["ttl"] = ttl
 
-        response = self.call(SyscallOp.SYS_STORE, json.dumps(payload))
-        if response:
-            try:
-                return json.loads(response.payload_str)
-            except json.JSONDecodeError:
-                return {"success": False, "error": response.payload_str}
-        return {"success": False, "error": "No response from kernel"}
+        return self._request(SyscallOp.SYS_STORE, payload)
 
     def fetch(self, key: str) -> dict:
         """Fetch a value from the shared state store."""
-        import json
-        payload = {"key": key}
-
-        response = self.call(SyscallOp.SYS_FETCH, json.dumps(payload))
-        if response:
-            try:
-                return json.loads(response.payload_str)
-            except json.JSONDecodeError:
-                return {"success": False, "error": response.payload_str}
-        return {"success": False, "error": "No response from kernel"}
+        return self._request(SyscallOp.SYS_FETCH, {"key": key})
 
     def delete_key(self, key: str) -> dict:
         """Delete a key from the shared state store."""
-        import json
-        payload = {"key": key}
-
-        response = self.call(SyscallOp.SYS_DELETE, json.dumps(payload))
-        if response:
-            try:
-                return json.loads(response.payload_str)
-            except json.JSONDecodeError:
-                return {"success": False, "error": response.payload_str}
-        return {"success": False, "error": "No response from kernel"}
+        return self._request(SyscallOp.SYS_DELETE, {"key": key})
 
     def list_keys(self, prefix: str = "") -> dict:
         """List keys in the shared state store."""
-        import json
-        payload = {"prefix": prefix} if prefix else {}
+        return self._request(SyscallOp.SYS_KEYS, {"prefix": prefix} if prefix else {})
 
-        response = self.call(SyscallOp.SYS_KEYS, json.dumps(payload))
-        if response:
-            try:
-                return json.loads(response.payload_str)
-            except json.JSONDecodeError:
-                return {"success": False, "error": response.payload_str}
-        return {"success": False, "error": "No response from kernel"}
+    def store_many(self, items: dict | Iterable[Tuple[str, Any]],
+                   scope: str = "global", ttl: int = None) -> dict:
+        """Store many key-value pairs in one syscall.
+
+        items is a dict or an iterable of (key, value) pairs; scope and ttl
+        apply to every key. The response has one entry per key, in order,
+        under "results" and the number stored under "stored".
+        """
+        pairs = items.items() if isinstance(items, dict) else items
+        payload = {
+            "items": [{"key": key, "value": value} for key, value in pairs],
+            "scope": scope
+        }
+        if ttl is not None:
+            payload["ttl"] = ttl
+
+        return self._request(SyscallOp.SYS_MSTORE, payload, defaults={"results": []})
+
+    def fetch_many(self, keys: Iterable[str]) -> dict:
+        """Fetch many values in one syscall.
+
+        Each entry of "results" mirrors a fetch() response plus its "key";
+        "values" maps every existing key to its value.
+        """
+        return self._request(SyscallOp.SYS_MFETCH, {"keys": list(keys)},
+                             defaults={"results": []}, transform=_index_fetched)
+
+    def delete_many(self, keys: Iterable[str]) -> dict:
+        """Delete many keys in one syscall."""
+        return self._request(SyscallOp.SYS_MDELETE, {"keys": list(keys)},
+                             defaults={"results": []})
 
     # HTTP
 
     def http(self, url: str, method: str = "GET", headers: dict = None,
              body: str = None, timeout: int = 30,
              async_: bool = False, request_id: int = None) -> dict:
-        """Make an HTTP request."""
-        import json
+        """Make an HTTP request.
+
+        With async_=True a future resolving to the result dict is returned.
+        """
         payload = {
             "url": url,
             "method": method,
@@ -610,273 +511,136 @@ class CloveClient:
         if request_id is not None:
             payload["request_id"] = request_id
 
-        response = self.call(SyscallOp.SYS_HTTP, json.dumps(payload))
-        if response:
-            try:
-                return json.loads(response.payload_str)
-            except json.JSONDecodeError:
-                return {"success": False, "body": "", "error": response.payload_str}
-        return {"success": False, "body": "", "error": "No response from kernel"}
+        return self._request(SyscallOp.SYS_HTTP, payload, defaults={"body": ""},
+                             deferred=async_)
 
     # Events (Pub/Sub)
 
     def subscribe(self, event_types: list) -> dict:
         """Subscribe to kernel events."""
-        import json
-        payload = {"event_types": event_types}
-
-        response = self.call(SyscallOp.SYS_SUBSCRIBE, json.dumps(payload))
-        if response:
-            try:
-                return json.loads(response.payload_str)
-            except json.JSONDecodeError:
-                return {"success": False, "error": response.payload_str}
-        return {"success": False, "error": "No response from kernel"}
+        return self._request(SyscallOp.SYS_SUBSCRIBE, {"event_types": event_types})
 
     def unsubscribe(self, event_types: list) -> dict:
         """Unsubscribe from kernel events."""
-        import json
-        payload = {"event_types": event_types}
+        return self._request(SyscallOp.SYS_UNSUBSCRIBE, {"event_types": event_types})
 
-        response = self.call(SyscallOp.SYS_UNSUBSCRIBE, json.dumps(payload))
-        if response:
-            try:
-                return json.loads(response.payload_str)
-            except json.JSONDecodeError:
-                return {"success": False, "error": response.payload_str}
-        return {"success": False, "error": "No response from kernel"}
-
-    def poll_events(self, max_events: int = 10) -> dict:
-        """Poll for pending events."""
-        import json
+    def poll_events(self, max_events: int = 10, wait: bool = False,
+                    timeout_ms: int = None) -> dict:
+        """Poll for pending events.
+
+        With wait=True the kernel holds the call until an event arrives or
+        timeout_ms (default 30000) passes, instead of returning empty.
+        """
         payload = {"max": max_events}
+        if wait:
+            payload["wait"] = True
+            if timeout_ms is not None:
+                payload["timeout_ms"] = timeout_ms
 
-        response = self.call(SyscallOp.SYS_POLL_EVENTS, json.dumps(payload))
-        if response:
-            try:
-                return json.loads(response.payload_str)
-            except json.JSONDecodeError:
-                return {"success": False, "events": [], "count": 0, "error": response.payload_str}
-        return {"success": False, "events": [], "count": 0, "error": "No response from kernel"}
+        return self._request(SyscallOp.SYS_POLL_EVENTS, payload,
+                             defaults={"events": [], "count": 0})
 
     # Async Results
 
-    def poll_async(self, max_results: int = 10) -> dict:
-        """Poll for completed async syscall results."""
-        import json
-        payload = {"max": max_results}
+    def poll_async(self, max_results: int = 10, request_ids: Iterable[int] = None) -> dict:
+        """Poll for completed async syscall results.
 
-        response = self.call(SyscallOp.SYS_ASYNC_POLL, json.dumps(payload))
-        if response:
-            try:
-                return json.loads(response.payload_str)
-            except json.JSONDecodeError:
-                return {"success": False, "results": [], "count": 0, "error": response.payload_str}
-        return {"success": False, "results": [], "count": 0, "error": "No response from kernel"}
+        With request_ids, only those calls' results are returned; others
+        stay queued for whoever polls for them.
+        """
+        payload = {"max": max_results}
+        if request_ids is not None:
+            payload["request_ids"] = list(request_ids)
+        return self._request(SyscallOp.SYS_ASYNC_POLL, payload,
+                             defaults={"results": [], "count": 0})
 
     def emit_event(self, event_type: str, data: dict = None) -> dict:
         """Emit a custom event to all subscribers."""
-        import json
         payload = {
             "event_type": event_type,
             "data": data or {}
         }
-
-        response = self.call(SyscallOp.SYS_EMIT, json.dumps(payload))
-        if response:
-            try:
-                return json.loads(response.payload_str)
-            except json.JSONDecodeError:
-                return {"success": False, "error": response.payload_str}
-        return {"success": False, "error": "No response from kernel"}
+        return self._request(SyscallOp.SYS_EMIT, payload)
 
     # World Simulation
 
     def world_create(self, name: str, config: dict = None) -> dict:
         """Create a new simulated world."""
-        import json
         payload = {
             "name": name,
             "config": config or {}
         }
-
-        response = self.call(SyscallOp.SYS_WORLD_CREATE, json.dumps(payload))
-        if response:
-            try:
-                return json.loads(response.payload_str)
-            except json.JSONDecodeError:
-                return {"success": False, "error": response.payload_str}
-        return {"success": False, "error": "No response from kernel"}
+        return self._request(SyscallOp.SYS_WORLD_CREATE, payload)
 
     def world_destroy(self, world_id: str, force: bool = False) -> dict:
         """Destroy a world."""
-        import json
-        payload = {"world_id": world_id, "force": force}
-
-        response = self.call(SyscallOp.SYS_WORLD_DESTROY, json.dumps(payload))
-        if response:
-            try:
-                return json.loads(response.payload_str)
-            except json.JSONDecodeError:
-                return {"success": False, "error": response.payload_str}
-        return {"success": False, "error": "No response from kernel"}
+        return self._request(SyscallOp.SYS_WORLD_DESTROY, {"world_id": world_id, "force": force})
 
     def world_list(self) -> dict:
         """List all active worlds."""
-        import json
-
-        response = self.call(SyscallOp.SYS_WORLD_LIST, "{}")
-        if response:
-            try:
-                return json.loads(response.payload_str)
-            except json.JSONDecodeError:
-                return {"success": False, "worlds": [], "count": 0, "error": response.payload_str}
-        return {"success": False, "worlds": [], "count": 0, "error": "No response from kernel"}
+        return self._request(SyscallOp.SYS_WORLD_LIST, "{}", defaults={"worlds": [], "count": 0})
 
     def world_join(self, world_id: str) -> dict:
         """Join a world."""
-        import json
-        payload = {"world_id": world_id}
-
-        response = self.call(SyscallOp.SYS_WORLD_JOIN, json.dumps(payload))
-        if response:
-            try:
-                return json.loads(response.payload_str)
-            except json.JSONDecodeError:
-                return {"success": False, "error": response.payload_str}
-        return {"success": False, "error": "No response from kernel"}
+        return self._request(SyscallOp.SYS_WORLD_JOIN, {"world_id": world_id})
 
     def world_leave(self) -> dict:
         """Leave the current world."""
-        import json
-
-        response = self.call(SyscallOp.SYS_WORLD_LEAVE, "{}")
-        if response:
-            try:
-                return json.loads(response.payload_str)
-            except json.JSONDecodeError:
-                return {"success": False, "error": response.payload_str}
-        return {"success": False, "error": "No response from kernel"}
+        return self._request(SyscallOp.SYS_WORLD_LEAVE, "{}")
 
     def world_event(self, world_id: str, event_type: str, params: dict = None) -> dict:
         """Inject a chaos event into a world."""
-        import json
         payload = {
             "world_id": world_id,
             "event_type": event_type,
             "params": params or {}
         }
-
-        response = self.call(SyscallOp.SYS_WORLD_EVENT, json.dumps(payload))
-        if response:
-            try:
-                return json.loads(response.payload_str)
-            except json.JSONDecodeError:
-                return {"success": False, "error": response.payload_str}
-        return {"success": False, "error": "No response from kernel"}
+        return self._request(SyscallOp.SYS_WORLD_EVENT, payload)
 
     def world_state(self, world_id: str) -> dict:
         """Get the current state and metrics of a world."""
-        import json
-        payload = {"world_id": world_id}
-
-        response = self.call(SyscallOp.SYS_WORLD_STATE, json.dumps(payload))
-        if response:
-            try:
-                return json.loads(response.payload_str)
-            except json.JSONDecodeError:
-                return {"success": False, "error": response.payload_str}
-        return {"success": False, "error": "No response from kernel"}
+        return self._request(SyscallOp.SYS_WORLD_STATE, {"world_id": world_id})
 
     def world_snapshot(self, world_id: str) -> dict:
         """Create a snapshot of a world's state."""
-        import json
-        payload = {"world_id": world_id}
-
-        response = self.call(SyscallOp.SYS_WORLD_SNAPSHOT, json.dumps(payload))
-        if response:
-            try:
-                return json.loads(response.payload_str)
-            except json.JSONDecodeError:
-                return {"success": False, "error": response.payload_str}
-        return {"success": False, "error": "No response from kernel"}
+        return self._request(SyscallOp.SYS_WORLD_SNAPSHOT, {"world_id": world_id})
 
     def world_restore(self, snapshot: dict, new_world_id: str = None) -> dict:
         """Restore a world from a snapshot."""
-        import json
         payload = {
             "snapshot": snapshot,
             "new_world_id": new_world_id or ""
         }
-
-        response = self.call(SyscallOp.SYS_WORLD_RESTORE, json.dumps(payload))
-        if response:
-            try:
-                return json.loads(response.payload_str)
-            except json.JSONDecodeError:
-                return {"success": False, "error": response.payload_str}
-        return {"success": False, "error": "No response from kernel"}
+        return self._request(SyscallOp.SYS_WORLD_RESTORE, payload)
 
     # Tunnel (Remote Connectivity)
 
     def tunnel_connect(self, relay_url: str, machine_id: str = None,
                       token: str = None) -> dict:
         """Connect the kernel to a relay server for remote agent access."""
-        import json
         payload = {"relay_url": relay_url}
         if machine_id:
             payload["machine_id"] = machine_id
         if token:
             payload["token"] = token
 
-        response = self.call(SyscallOp.SYS_TUNNEL_CONNECT, json.dumps(payload))
-        if response:
-            try:
-                return json.loads(response.payload_str)
-            except json.JSONDecodeError:
-                return {"success": False, "error": response.payload_str}
-        return {"success": False, "error": "No response from kernel"}
+        return self._request(SyscallOp.SYS_TUNNEL_CONNECT, payload)
 
     def tunnel_disconnect(self) -> dict:
         """Disconnect the kernel from the relay server."""
-        import json
-
-        response = self.call(SyscallOp.SYS_TUNNEL_DISCONNECT, "{}")
-        if response:
-            try:
-                return json.loads(response.payload_str)
-            except json.JSONDecodeError:
-                return {"success": False, "error": response.payload_str}
-        return {"success": False, "error": "No response from kernel"}
+        return self._request(SyscallOp.SYS_TUNNEL_DISCONNECT, "{}")
 
     def tunnel_status(self) -> dict:
         """Get the current tunnel connection status."""
-        import json
-
-        response = self.call(SyscallOp.SYS_TUNNEL_STATUS, "{}")
-        if response:
-            try:
-                return json.loads(response.payload_str)
-            except json.JSONDecodeError:
-                return {"success": False, "error": response.payload_str}
-        return {"success": False, "error": "No response from kernel"}
+        return self._request(SyscallOp.SYS_TUNNEL_STATUS, "{}")
 
     def tunnel_list_remotes(self) -> dict:
         """List remote agents currently connected through the tunnel."""
-        import json
-
-        response = self.call(SyscallOp.SYS_TUNNEL_LIST_REMOTES, "{}")
-        if response:
-            try:
-                return json.loads(response.payload_str)
-            except json.JSONDecodeError:
-                return {"success": False, "agents": [], "error": response.payload_str}
-        return {"success": False, "agents": [], "error": "No response from kernel"}
+        return self._request(SyscallOp.SYS_TUNNEL_LIST_REMOTES, "{}", defaults={"agents": []})
 
     def tunnel_config(self, relay_url: str = None, machine_id: str = None,
                      token: str = None, reconnect_interval: int = None) -> dict:
         """Configure tunnel settings without connecting."""
-        import json
         payload = {}
         if relay_url:
             payload["relay_url"] = relay_url
@@ -887,69 +651,33 @@ class CloveClient:
         if reconnect_interval is not None:
             payload["reconnect_interval"] = reconnect_interval
 
-        response = self.call(SyscallOp.SYS_TUNNEL_CONFIG, json.dumps(payload))
-        if response:
-            try:
-                return json.loads(response.payload_str)
-            except json.JSONDecodeError:
-                return {"success": False, "error": response.payload_str}
-        return {"success": False, "error": "No response from kernel"}
+        return self._request(SyscallOp.SYS_TUNNEL_CONFIG, payload)
 
     # Metrics
 
     def get_system_metrics(self) -> dict:
         """Get system-wide metrics (CPU, memory, disk, network)."""
-        import json
-
-        response = self.call(SyscallOp.SYS_METRICS_SYSTEM, "{}")
-        if response:
-            try:
-                return json.loads(response.payload_str)
-            except json.JSONDecodeError:
-                return {"success": False, "error": response.payload_str}
-        return {"success": False, "error": "No response from kernel"}
+        return self._request(SyscallOp.SYS_METRICS_SYSTEM, "{}")
 
     def get_agent_metrics(self, agent_id: int = None) -> dict:
         """Get metrics for a specific agent."""
-        import json
         payload = {}
         if agent_id is not None:
             payload["agent_id"] = agent_id
 
-        response = self.call(SyscallOp.SYS_METRICS_AGENT, json.dumps(payload))
-        if response:
-            try:
-                return json.loads(response.payload_str)
-            except json.JSONDecodeError:
-                return {"success": False, "error": response.payload_str}
-        return {"success": False, "error": "No response from kernel"}
+        return self._request(SyscallOp.SYS_METRICS_AGENT, payload)
 
     def get_all_agent_metrics(self) -> dict:
         """Get metrics for all running agents."""
-        import json
-
-        response = self.call(SyscallOp.SYS_METRICS_ALL_AGENTS, "{}")
-        if response:
-            try:
-                return json.loads(response.payload_str)
-            except json.JSONDecodeError:
-                return {"success": False, "agents": [], "error": response.payload_str}
-        return {"success": False, "agents": [], "error": "No response from kernel"}
+        return self._request(SyscallOp.SYS_METRICS_ALL_AGENTS, "{}", defaults={"agents": []})
 
     def get_cgroup_metrics(self, cgroup_path: str = None) -> dict:
         """Get cgroup metrics for a sandboxed process."""
-        import json
         payload = {}
         if cgroup_path:
             payload["cgroup_path"] = cgroup_path
 
-        response = self.call(SyscallOp.SYS_METRICS_CGROUP, json.dumps(payload))
-        if response:
-            try:
-                return json.loads(response.payload_str)
-            except json.JSONDecodeError:
-                return {"success": False, "error": response.payload_str}
-        return {"success": False, "error": "No response from kernel"}
+        return self._request(SyscallOp.SYS_METRICS_CGROUP, payload)
 
     # ========== Audit Logging ==========
 
@@ -966,7 +694,6 @@ class CloveClient:
         Returns:
             Dict with success, count, and entries list
         """
-        import json
         payload = {"limit": limit}
         if category:
             payload["category"] = category
@@ -975,13 +702,7 @@ class CloveClient:
         if since_id:
             payload["since_id"] = since_id
 
-        response = self.call(SyscallOp.SYS_GET_AUDIT_LOG, json.dumps(payload))
-        if response:
-            try:
-                return json.loads(response.payload_str)
-            except json.JSONDecodeError:
-                return {"success": False, "error": response.payload_str}
-        return {"success": False, "error": "No response from kernel"}
+        return self._request(SyscallOp.SYS_GET_AUDIT_LOG, payload)
 
     def set_audit_config(self, **kwargs) -> dict:
         """Configure audit logging.
@@ -1000,14 +721,7 @@ class CloveClient:
         Returns:
             Dict with success and current config
         """
-        import json
-        response = self.call(SyscallOp.SYS_SET_AUDIT_CONFIG, json.dumps(kwargs))
-        if response:
-            try:
-                return json.loads(response.payload_str)
-            except json.JSONDecodeError:
-                return {"success": False, "error": response.payload_str}
-        return {"success": False, "error": "No response from kernel"}
+        return self._request(SyscallOp.SYS_SET_AUDIT_CONFIG, kwargs)
 
     # ========== Execution Recording & Replay ==========
 
@@ -1026,7 +740,6 @@ class CloveClient:
         Returns:
             Dict with success status
         """
-        import json
         payload = {
             "include_think": include_think,
             "include_http": include_http,
@@ -1036,13 +749,7 @@ class CloveClient:
         if filter_agents:
             payload["filter_agents"] = filter_agents
 
-        response = self.call(SyscallOp.SYS_RECORD_START, json.dumps(payload))
-        if response:
-            try:
-                return json.loads(response.payload_str)
-            except json.JSONDecodeError:
-                return {"success": False, "error": response.payload_str}
-        return {"success": False, "error": "No response from kernel"}
+        return self._request(SyscallOp.SYS_RECORD_START, payload)
 
     def stop_recording(self) -> dict:
         """Stop recording syscall execution.
@@ -1050,15 +757,7 @@ class CloveClient:
         Returns:
             Dict with success status and entry count
         """
-        import json
-
-        response = self.call(SyscallOp.SYS_RECORD_STOP, "{}")
-        if response:
-            try:
-                return json.loads(response.payload_str)
-            except json.JSONDecodeError:
-                return {"success": False, "error": response.payload_str}
-        return {"success": False, "error": "No response from kernel"}
+        return self._request(SyscallOp.SYS_RECORD_STOP, "{}")
 
     def get_recording_status(self, export: bool = False) -> dict:
         """Get current recording status and optionally export the recording.
@@ -1069,16 +768,7 @@ class CloveClient:
         Returns:
             Dict with recording state, entry count, and optionally recording data
         """
-        import json
-        payload = {"export": export}
-
-        response = self.call(SyscallOp.SYS_RECORD_STATUS, json.dumps(payload))
-        if response:
-            try:
-                return json.loads(response.payload_str)
-            except json.JSONDecodeError:
-                return {"success": False, "error": response.payload_str}
-        return {"success": False, "error": "No response from kernel"}
+        return self._request(SyscallOp.SYS_RECORD_STATUS, {"export": export})
 
     def start_replay(self, recording_data: str) -> dict:
         """Start replaying a recorded execution session.
@@ -1089,16 +779,7 @@ class CloveClient:
         Returns:
             Dict with success status and total entries to replay
         """
-        import json
-        payload = {"recording": recording_data}
-
-        response = self.call(SyscallOp.SYS_REPLAY_START, json.dumps(payload))
-        if response:
-            try:
-                return json.loads(response.payload_str)
-            except json.JSONDecodeError:
-                return {"success": False, "error": response.payload_str}
-        return {"success": False, "error": "No response from kernel"}
+        return self._request(SyscallOp.SYS_REPLAY_START, {"recording": recording_data})
 
     def get_replay_status(self) -> dict:
         """Get current replay status and progress.
@@ -1106,24 +787,14 @@ class CloveClient:
         Returns:
             Dict with replay state, progress, entries replayed/skipped, and errors
         """
-        import json
-
-        response = self.call(SyscallOp.SYS_REPLAY_STATUS, "{}")
-        if response:
-            try:
-                return json.loads(response.payload_str)
-            except json.JSONDecodeError:
-                return {"success": False, "error": response.payload_str}
-        return {"success": False, "error": "No response from kernel"}
+        return self._request(SyscallOp.SYS_REPLAY_STATUS, "{}")
 
     # Convenience Aliases
 
     def read(self, path: str) -> str:
         """Alias for read_file that returns just the content string."""
-        result = self.read_file(path)
-        if result.get("success"):
-            return result.get("content", "")
-        raise IOError(result.get("error", "Read failed"))
+        return self._request(SyscallOp.SYS_READ, {"path": path},
+                             defaults={"content": "", "size": 0}, transform=_read_content)
 
     def write(self, path: str, content: str, mode: str = "write") -> dict:
         """Alias for write_file."""
@@ -1133,6 +804,348 @@ class CloveClient:
         """Alias for register_name."""
         return self.register_name(name)
 
+
+class CloveClient(_SyscallMethods):
+    """Client for communicating with Clove kernel
+
+    With zero_copy=True, frames are sent with sendmsg() scatter-gather
+    (header and payload as separate buffers, never concatenated) and
+    received with recv_into() straight into a buffer sized from the header.
+    Received payloads are then bytearrays rather than bytes.
+
+    Calls are serialized with a lock, so the background thread that resolves
+    async_=True futures can share the connection. Other than that, a client
+    belongs to one thread; use CloveClientPool to share connections.
+
+    codec selects the payload encoding ("json" or "msgpack"). A non-JSON
+    codec is negotiated with the kernel via SYS_HELLO on connect; kernels
+    without codec support keep the connection on JSON. The codec in use is
+    exposed as `codec`; raw call() payloads are never transcoded by the SDK.
+    """
+
+    def __init__(self, socket_path: str = '/tmp/clove.sock', zero_copy: bool = False,
+                 codec: str = "json"):
+        self.socket_path = socket_path
+        self.zero_copy = zero_copy
+        self._requested_codec = get_codec(codec)
+        self._codec = JSON
+        self._sock: Optional[socket.socket] = None
+        self._agent_id = 0
+        self._header_buf = bytearray(HEADER_SIZE)
+        self._call_lock = threading.RLock()
+        self._async = None  # AsyncResults, created on the first async_=True call
+
+    @property
+    def agent_id(self) -> int:
+        """Get the agent ID assigned by the kernel"""
+        return self._agent_id
+
+    @property
+    def codec(self):
+        """Payload codec negotiated for this connection"""
+        return self._codec
+
+    def _codec_for(self, opcode: SyscallOp):
+        return JSON if opcode in _PASSTHROUGH_OPCODES else self._codec
+
+    def connect(self) -> bool:
+        """Connect to the Clove kernel"""
+        try:
+            self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._sock.connect(self.socket_path)
+        except Exception as e:
+            print(f"Failed to connect: {e}")
+            return False
+
+        self._codec = JSON
+        if self._requested_codec is not JSON:
+            result = self._request(SyscallOp.SYS_HELLO, {"codecs": [self._requested_codec.name]})
+            if result.get("codec") == self._requested_codec.name:
+                self._codec = self._requested_codec
+        return True
+
+    def disconnect(self):
+        """Disconnect from the kernel"""
+        if self._sock:
+            self._sock.close()
+            self._sock = None
+        if self._async:
+            self._async.fail(ConnectionError("Disconnected with async calls pending"))
+
+    def send(self, opcode: SyscallOp, payload: bytes | str = b'') -> bool:
+        """Send a message to the kernel"""
+        if not self._sock:
+            return False
+
+        if isinstance(payload, str):
+            payload = payload.encode('utf-8')
+
+        msg = Message(agent_id=self._agent_id, opcode=opcode, payload=payload)
+        try:
+            if self.zero_copy:
+                self._sendmsg_all([msg.header(), payload])
+            else:
+                self._sock.sendall(msg.serialize())
+            return True
+        except Exception as e:
+            print(f"Send failed: {e}")
+            # A partial write leaves the stream unusable
+            self.disconnect()
+            return False
+
+    def recv(self) -> Optional[Message]:
+        """Receive a message from the kernel"""
+        if not self._sock:
+            return None
+
+        msg = self._recv_message()
+        if msg is None:
+            # Once a frame is lost the stream is out of sync; never reuse it
+            self.disconnect()
+        return msg
+
+    def _recv_message(self) -> Optional[Message]:
+        try:
+            # Read header first
+            header_data = self._recv_exact(HEADER_SIZE, self._header_buf)
+            if not header_data:
+                return None
+
+            # Parse header to get payload size
+            magic, agent_id, opcode, payload_size = struct.unpack('<IIBQ', header_data)
+
+            if magic != MAGIC_BYTES:
+                print(f"Invalid magic bytes: 0x{magic:08x}")
+                return None
+
+            # Read payload. Replies may exceed MAX_PAYLOAD_SIZE (the kernel
+            # only limits requests); zero-copy reads those in chunks rather
+            # than allocating a buffer of whatever size the header claims.
+            payload = b''
+            if payload_size > MAX_PAYLOAD_SIZE:
+                payload = self._recv_chunks(payload_size)
+                if payload is None:
+                    return None
+            elif payload_size > 0:
+                payload = self._recv_exact(payload_size)
+                if not payload:
+                    return None
+
+            # Update our agent ID from response
+            self._agent_id = agent_id
+
+            return Message(agent_id=agent_id, opcode=SyscallOp(opcode), payload=payload)
+        except Exception as e:
+            print(f"Receive failed: {e}")
+            return None
+
+    def _recv_exact(self, n: int, buf: bytearray = None) -> Optional[bytes | bytearray]:
+        """Receive exactly n bytes
+
+        In zero-copy mode the bytes land in `buf` (reused, e.g. for headers)
+        or in a fresh bytearray of exactly n bytes.
+        """
+        if self.zero_copy:
+            return self._recv_into(buf if buf is not None and len(buf) == n else bytearray(n))
+        return self._recv_chunks(n)
+
+    def _recv_chunks(self, n: int) -> Optional[bytes]:
+        """Receive exactly n bytes as they arrive, without preallocating"""
+        chunks = []
+        remaining = n
+        while remaining:
+            # recv() allocates its full size up front, so bound each read
+            chunk = self._sock.recv(min(remaining, RECV_CHUNK))
+            if not chunk:
+                return None
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        return b''.join(chunks)
+
+    def _recv_into(self, buf: bytearray) -> Optional[bytearray]:
+        """Fill buf from the socket without intermediate copies"""
+        view = memoryview(buf)
+        while view:
+            n = self._sock.recv_into(view)
+            if n == 0:
+                return None
+            view = view[n:]
+        return buf
+
+    def _sendmsg_all(self, buffers: List[bytes]):
+        """Send buffers with scatter-gather I/O, retrying partial writes"""
+        views = [memoryview(b) for b in buffers if len(b)]
+        i = 0
+        while i < len(views):
+            sent = self._sock.sendmsg(views[i:i + IOV_MAX])
+            while sent:
+                if sent >= len(views[i]):
+                    sent -= len(views[i])
+                    i += 1
+                else:
+                    views[i] = views[i][sent:]
+                    sent = 0
+
+    def call(self, opcode: SyscallOp, payload: bytes | str = b'') -> Optional[Message]:
+        """Send a message and wait for response"""
+        with self._call_lock:
+            if not self.send(opcode, payload):
+                return None
+            return self.recv()
+
+    def call_many(self, requests: Iterable[Tuple[SyscallOp, bytes | str]]) -> List[Optional[Message]]:
+        """Send several messages back to back, then collect the responses in order.
+
+        All frames go out in one write before any response is read, so the
+        batch costs a single round trip. Entries that could not be sent or
+        received are None.
+        """
+        buffers = []
+        for opcode, payload in requests:
+            if isinstance(payload, str):
+                payload = payload.encode('utf-8')
+            buffers.append(Message(agent_id=self._agent_id, opcode=opcode, payload=payload).header())
+            buffers.append(payload)
+        frames = buffers[::2]
+
+        with self._call_lock:
+            if not self._sock:
+                return [None] * len(frames)
+
+            try:
+                if self.zero_copy:
+                    self._sendmsg_all(buffers)
+                else:
+                    self._sock.sendall(b''.join(buffers))
+            except Exception as e:
+                print(f"Send failed: {e}")
+                self.disconnect()
+                return [None] * len(frames)
+
+            responses: List[Optional[Message]] = []
+            for _ in frames:
+                response = self.recv()
+                if response is None:
+                    # recv() closed the out-of-sync stream; the rest are lost
+                    break
+                responses.append(response)
+            responses.extend([None] * (len(frames) - len(responses)))
+            return responses
+
+    def pipeline(self) -> 'Pipeline':
+        """Create a pipeline that batches syscalls into a single round trip.
+
+        Example:
+            with client.pipeline() as pipe:
+                pipe.store("a", 1).store("b", 2).fetch("a")
+                stored_a, stored_b, fetched = pipe.execute()
+        """
+        from .pipeline import Pipeline
+        return Pipeline(self)
+
+    def messages(self, max_messages: int = 10, timeout: float = None,
+                 poll_ms: int = 30000, idle_timeout: float = None) -> Iterator[dict]:
+        """Yield messages from other agents as they arrive.
+
+        Each receive long-polls the kernel (recv_messages(wait=True)), so a
+        message is delivered as soon as it is sent, with no sleep interval.
+        Stops `timeout` seconds after the first call however many messages
+        arrive, after `idle_timeout` seconds without a message (None = no
+        limit for either), or when the connection fails.
+
+        Example:
+            for msg in client.messages():
+                handle(msg.get("from_name"), msg["message"])
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        idle_deadline = None if idle_timeout is None else time.monotonic() + idle_timeout
+        while True:
+            wait_ms = _next_wait_ms(_earliest(deadline, idle_deadline), poll_ms)
+            if wait_ms is None:
+                return
+
+            started = time.monotonic()
+            result = self.recv_messages(max_messages, wait=True, timeout_ms=wait_ms)
+            if not result.get("success"):
+                return
+
+            batch = result.get("messages", [])
+            if batch:
+                yield from batch
+                if idle_timeout is not None:
+                    idle_deadline = time.monotonic() + idle_timeout
+            elif time.monotonic() - started < wait_ms / 2000:
+                # Kernel without blocking receive answered at once; don't spin
+                time.sleep(0.05)
+
+    def _request(self, opcode: SyscallOp, payload: dict | bytes | str = b'',
+                 defaults: dict = None, transform: Callable = None,
+                 raw: bool = False, error_key: str = "error", missing=_UNSET,
+                 deferred: bool = False):
+        codec = self._codec_for(opcode)
+        response = self.call(opcode, _encode_payload(payload, codec))
+
+        def decode(message, codec=codec):
+            return _decode_response(message, defaults, transform, raw, error_key, missing, codec)
+
+        if deferred:
+            return self._async_results().submit(response, decode)
+        return decode(response)
+
+    def _async_results(self) -> 'AsyncResults':
+        with self._call_lock:
+            if self._async is None:
+                from .futures import AsyncResults
+                self._async = AsyncResults(self)
+            return self._async
+
+    def _result(self, value):
+        return value
+
+    def think(self, prompt: str,
+              image: bytes = None,
+              image_mime_type: str = "image/jpeg",
+              system_instruction: str = None,
+              thinking_level: str = None,
+              temperature: float = None,
+              model: str = None,
+              async_: bool = False,
+              request_id: int = None) -> dict:
+        """Send a prompt to the LLM via local LLM service (not the kernel)."""
+        from .llm_service import call_llm_service
+
+        payload = _think_payload(prompt, image, image_mime_type, system_instruction,
+                                 thinking_level, temperature, model)
+        if async_ or request_id is not None:
+            payload["async"] = False
+
+        result = call_llm_service(payload)
+        self._report_llm_usage(result)
+        return result
+
+    def think_stream(self, prompt: str,
+                     image: bytes = None,
+                     image_mime_type: str = "image/jpeg",
+                     system_instruction: str = None,
+                     thinking_level: str = None,
+                     temperature: float = None,
+                     model: str = None) -> 'LLMStream':
+        """Like think(), but returns an LLMStream that yields text as it is generated.
+
+        ``result()`` on the stream gives the dict think() would have returned.
+        Usage is reported to the kernel once the stream has been consumed.
+        """
+        from .llm_service import stream_llm_service
+
+        payload = _think_payload(prompt, image, image_mime_type, system_instruction,
+                                 thinking_level, temperature, model)
+        return stream_llm_service(payload, on_complete=self._report_llm_usage)
+
+    def _report_llm_usage(self, result: dict) -> None:
+        # Report LLM usage to kernel if connected
+        if self._sock and result.get("success") and not result.get("cached"):
+            self._request(SyscallOp.SYS_LLM_REPORT, _llm_report(result))
+
     def __enter__(self):
         self.connect()
         return self
@@ -1146,9 +1159,9 @@ AgentOSClient = CloveClient
 
 
 # Convenience function for quick testing
-def connect(socket_path: str = '/tmp/clove.sock') -> CloveClient:
+def connect(socket_path: str = '/tmp/clove.sock', codec: str = "json") -> CloveClient:
     """Create and connect a client"""
-    client = CloveClient(socket_path)
+    client = CloveClient(socket_path, codec=codec)
     if not client.connect():
         raise ConnectionError(f"Failed to connect to {socket_path}")
     return client
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Clove Payload Codecs
+
+Syscall payloads are JSON by default. A client may negotiate a binary codec
+with the kernel through SYS_HELLO; after that, structured request and
+response payloads on that connection use it. Frames for SYS_NOOP, SYS_EXIT
+and SYS_HELLO itself always pass through unchanged.
+"""
+
+import json
+from typing import Any, Dict, List
+
+
+class JsonCodec:
+    """UTF-8 JSON, understood by every kernel"""
+
+    name = "json"
+
+    def encode(self, value: Any) -> bytes:
+        return json.dumps(value).encode('utf-8')
+
+    def decode(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class MsgpackCodec:
+    """MessagePack. bytes values travel as msgpack bin, without base64."""
+
+    name = "msgpack"
+
+    def __init__(self):
+        try:
+            import msgpack
+        except ImportError:
+            raise ImportError("msgpack library required. Run: pip install clove-sdk[msgpack]")
+        self._msgpack = msgpack
+
+    def encode(self, value: Any) -> bytes:
+        return self._msgpack.packb(value, use_bin_type=True)
+
+    def decode(self, data: bytes) -> Any:
+        try:
+            return self._msgpack.unpackb(data, raw=False)
+        except ValueError:
+            raise
+        except Exception as e:
+            # OutOfData and friends are not ValueErrors
+            raise ValueError(f"Invalid msgpack payload: {e}") from e
+
+
+JSON = JsonCodec()
+
+_CODECS = {
+    "json": JsonCodec,
+    "msgpack": MsgpackCodec,
+}
+_instances: Dict[str, Any] = {"json": JSON}
+
+
+def get_codec(name: str):
+    """Return the codec registered under name"""
+    if name not in _instances:
+        if name not in _CODECS:
+            raise ValueError(f"Unknown codec: {name} (available: {', '.join(_CODECS)})")
+        _instances[name] = _CODECS[name]()
+    return _instances[name]
+
+
+def available_codecs() -> List[str]:
+    """Codec names usable in this environment"""
+    names = []
+    for name in _CODECS:
+        try:
+            get_codec(name)
+        except ImportError:
+            continue
+        names.append(name)
+    return names
@@ -8,11 +8,15 @@ Combines relay API access with agent execution.
 
 import os
 import asyncio
+import hashlib
 import aiohttp
-from typing import Optional, Dict, Any, List, Callable
+from typing import Optional, Dict, Any, List, Callable, AsyncIterator, Iterator
 from dataclasses import dataclass
 from pathlib import Path
 
+# Deploy requests run_on_all keeps in flight at once
+DEFAULT_DEPLOY_CONCURRENCY = 32
+
 
 @dataclass
 class Machine:
@@ -41,7 +45,10 @@ class Agent:
 
 class FleetClientError(Exception):
     """Fleet client error."""
-    pass
+
+    def __init__(self, message: str, status_code: int = None):
+        super().__init__(message)
+        self.status_code = status_code
 
 
 class FleetClient:
@@ -72,7 +79,7 @@ class FleetClient:
             async with session.request(method, url, json=data) as resp:
                 body = await resp.json()
                 if resp.status >= 400:
-                    raise FleetClientError(body.get("error", f"HTTP {resp.status}"))
+                    raise FleetClientError(body.get("error", f"HTTP {resp.status}"), resp.status)
                 return body
         except aiohttp.ClientError as e:
             raise FleetClientError(f"Connection error: {e}")
@@ -96,37 +103,91 @@ class FleetClient:
         data = await self._request("GET", endpoint)
         return [Agent(**a) for a in data.get("agents", [])]
 
-    async def deploy_agent(self, script_path: str, machine_id: str,
-                          args: List[str] = None) -> Dict[str, Any]:
+    @staticmethod
+    def _read_script(script_path: str) -> Dict[str, Any]:
         path = Path(script_path)
         if not path.exists():
             raise FleetClientError(f"Script not found: {script_path}")
+        content = path.read_text()
+        return {"script_content": content, "script_name": path.name,
+                "script_sha256": hashlib.sha256(content.encode()).hexdigest()}
 
-        script_content = path.read_text()
+    async def _deploy(self, endpoint: str, data: Dict, script: Dict[str, Any]) -> Dict:
+        """POST a deploy naming the script by hash; upload it only if the relay lacks it"""
+        by_hash = {k: v for k, v in script.items() if k != "script_content"}
+        try:
+            return await self._request("POST", endpoint, {**data, **by_hash})
+        except FleetClientError as e:
+            if e.status_code != 412:
+                raise
+        return await self._request("POST", endpoint, {**data, **script})
 
-        return await self._request("POST", "/api/v1/agents/deploy", {
+    async def deploy_agent(self, script_path: str, machine_id: str,
+                          args: List[str] = None) -> Dict[str, Any]:
+        return await self._deploy("/api/v1/agents/deploy", {
             "machine_id": machine_id,
-            "script_content": script_content,
-            "script_name": path.name,
             "args": args or []
-        })
+        }, self._read_script(script_path))
 
-    async def run_on_all(self, script_path: str, args: List[str] = None,
-                        filter_fn: Callable[[Machine], bool] = None) -> List[Dict]:
+    async def deploy_batch(self, script_path: str, machine_ids: List[str],
+                           args: List[str] = None) -> Dict[str, Any]:
+        """Deploy to many machines in one request; the relay fans out"""
+        return await self._deploy("/api/v1/agents/deploy/batch", {
+            "machine_ids": list(machine_ids),
+            "args": args or []
+        }, self._read_script(script_path))
+
+    async def iter_run_on_all(self, script_path: str, args: List[str] = None,
+                              filter_fn: Callable[[Machine], bool] = None,
+                              concurrency: int = DEFAULT_DEPLOY_CONCURRENCY
+                              ) -> AsyncIterator[Dict]:
+        """Deploy to every connected machine, yielding results as they finish.
+
+        The script is read once and sent by hash. The first deploy runs
+        alone so that, if the relay's script cache misses, the content is
+        uploaded once rather than by every request in the first wave. Up to
+        `concurrency` deploys are in flight at a time.
+        """
+        if not isinstance(concurrency, int) or isinstance(concurrency, bool) or concurrency < 1:
+            raise FleetClientError("concurrency must be an integer >= 1")
+        script = self._read_script(script_path)
         machines = await self.get_connected_machines()
         if filter_fn:
             machines = [m for m in machines if filter_fn(m)]
         if not machines:
             raise FleetClientError("No machines available")
 
-        results = []
-        for machine in machines:
-            try:
-                result = await self.deploy_agent(script_path, machine.machine_id, args)
-                results.append({"machine_id": machine.machine_id, "status": "deployed", **result})
-            except FleetClientError as e:
-                results.append({"machine_id": machine.machine_id, "status": "failed", "error": str(e)})
-        return results
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def deploy(machine_id: str) -> Dict:
+            async with semaphore:
+                try:
+                    result = await self._deploy("/api/v1/agents/deploy", {
+                        "machine_id": machine_id,
+                        "args": args or []
+                    }, script)
+                    return {"machine_id": machine_id, **result, "status": "deployed"}
+                except FleetClientError as e:
+                    return {"machine_id": machine_id, "status": "failed", "error": str(e)}
+
+        first = await deploy(machines[0].machine_id)
+        tasks = [asyncio.ensure_future(deploy(m.machine_id)) for m in machines[1:]]
+        try:
+            yield first
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+            # Let cancelled deploys unwind before the session can be closed
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def run_on_all(self, script_path: str, args: List[str] = None,
+                        filter_fn: Callable[[Machine], bool] = None,
+                        concurrency: int = DEFAULT_DEPLOY_CONCURRENCY) -> List[Dict]:
+        """Deploy to every connected machine concurrently; results in completion order"""
+        return [result async for result in
+                self.iter_run_on_all(script_path, args, filter_fn, concurrency)]
 
     async def stop_agent(self, machine_id: str, agent_id: int) -> bool:
         await self._request("POST", f"/api/v1/agents/{agent_id}/stop", {"machine_id": machine_id})
@@ -144,25 +205,40 @@ class FleetClient:
 
 
 class SyncFleetClient:
-    """Synchronous wrapper for FleetClient."""
+    """Synchronous wrapper for FleetClient.
+
+    Keeps one event loop and HTTP session across calls; close() (or use as
+    a context manager) to release them.
+    """
 
     def __init__(self, relay_url: str = None, api_token: str = None):
         self.relay_url = relay_url
         self.api_token = api_token
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client: Optional[FleetClient] = None
+
+    def _get_client(self) -> FleetClient:
+        if self._loop is None or self._loop.is_closed():
+            self._loop = asyncio.new_event_loop()
+            self._client = FleetClient(self.relay_url, self.api_token)
+        return self._client
 
     def _run(self, coro):
-        async def _wrapper():
-            client = FleetClient(self.relay_url, self.api_token)
-            try:
-                return await coro(client)
-            finally:
-                await client.close()
-
-        loop = asyncio.new_event_loop()
-        try:
-            return loop.run_until_complete(_wrapper())
-        finally:
-            loop.close()
+        client = self._get_client()
+        return self._loop.run_until_complete(coro(client))
+
+    def close(self):
+        if self._loop and not self._loop.is_closed():
+            self._loop.run_until_complete(self._client.close())
+            self._loop.close()
+        self._loop = None
+        self._client = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
 
     def list_machines(self) -> List[Machine]:
         return self._run(lambda c: c.list_machines())
@@ -180,8 +256,28 @@ class SyncFleetClient:
                     args: List[str] = None) -> Dict[str, Any]:
         return self._run(lambda c: c.deploy_agent(script_path, machine_id, args))
 
-    def run_on_all(self, script_path: str, args: List[str] = None) -> List[Dict]:
-        return self._run(lambda c: c.run_on_all(script_path, args))
+    def deploy_batch(self, script_path: str, machine_ids: List[str],
+                     args: List[str] = None) -> Dict[str, Any]:
+        return self._run(lambda c: c.deploy_batch(script_path, machine_ids, args))
+
+    def run_on_all(self, script_path: str, args: List[str] = None,
+                   filter_fn: Callable[[Machine], bool] = None,
+                   concurrency: int = DEFAULT_DEPLOY_CONCURRENCY) -> List[Dict]:
+        return self._run(lambda c: c.run_on_all(script_path, args, filter_fn, concurrency))
+
+    def iter_run_on_all(self, script_path: str, args: List[str] = None,
+                        filter_fn: Callable[[Machine], bool] = None,
+                        concurrency: int = DEFAULT_DEPLOY_CONCURRENCY) -> Iterator[Dict]:
+        """Yield per-machine results as deploys finish"""
+        results = self._get_client().iter_run_on_all(script_path, args, filter_fn, concurrency)
+        try:
+            while True:
+                try:
+                    yield self._loop.run_until_complete(results.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            self._loop.run_until_complete(results.aclose())
 
     def stop_agent(self, machine_id: str, agent_id: int) -> bool:
         return self._run(lambda c: c.stop_agent(machine_id, agent_id))
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Clove SDK - Async syscall futures
+
+exec() and http() with async_=True return at once: the kernel runs the call
+on a worker and queues the result for SYS_ASYNC_POLL, tagged with its
+request_id. The demultiplexers here poll those results in batches on the
+client's own connection (async results belong to the connection's agent)
+and resolve one future per request_id, so a result is never lost because
+the caller happened to be waiting on a different one. Polls name the
+request_ids the demultiplexer is waiting for, so results of calls made
+through poll_async() or a Pipeline on the same client are left to them.
+
+Example:
+    builds = [client.exec(f"make -C {d}", async_=True) for d in dirs]
+    for future in as_completed(builds):
+        print(future.result()["exit_code"])
+"""
+
+import asyncio
+import threading
+import time
+from concurrent import futures as _futures
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+
+from .client import Message, SyscallOp
+from .codec import JSON
+
+POLL_BATCH = 64            # Results fetched per SYS_ASYNC_POLL
+MIN_POLL_INTERVAL = 0.005  # Seconds; doubles while nothing completes
+MAX_POLL_INTERVAL = 0.1
+# Results nobody waits for (only kernels that ignore request_ids return them)
+UNCLAIMED_TTL = 60.0       # Seconds
+MAX_UNCLAIMED = 256
+
+# decode(response, codec=...) -> the value the synchronous call would return
+Decoder = Callable[..., Any]
+
+
+class _ResultDemux:
+    """Routes SYS_ASYNC_POLL results to futures by request_id."""
+
+    def __init__(self, client):
+        self._client = client
+        self._lock = threading.Lock()
+        self._waiting: Dict[int, Tuple[Any, Decoder]] = {}
+        # request_id -> (polled at, result) for results polled before submit()
+        # registered their future
+        self._unclaimed: Dict[int, Tuple[float, dict]] = {}
+
+    @property
+    def pending(self) -> int:
+        """Number of futures still waiting for a result"""
+        return len(self._waiting)
+
+    def _track(self, future, accepted: dict, decode: Decoder) -> bool:
+        """Register future for an accepted async call.
+
+        Returns False if the kernel did not accept the call as async (an
+        error, or a kernel that ran it synchronously).
+        """
+        request_id = accepted.get("request_id")
+        if not accepted.get("async") or request_id is None:
+            return False
+
+        with self._lock:
+            parked = self._unclaimed.pop(request_id, None)
+            if parked is None:
+                self._waiting[request_id] = (future, decode)
+                self._start_locked()
+                return True
+        self._complete(future, decode, parked[1])
+        return True
+
+    def _wanted(self) -> List[int]:
+        """request_ids to poll for"""
+        with self._lock:
+            return list(self._waiting)
+
+    def _resolve(self, entry: dict):
+        request_id = entry.get("request_id")
+        with self._lock:
+            waiter = self._waiting.pop(request_id, None)
+            if waiter is None:
+                self._park_locked(request_id, entry)
+                return
+        self._complete(*waiter, entry)
+
+    def _park_locked(self, request_id: int, entry: dict):
+        """Hold a result whose future may not be registered yet, expiring old ones"""
+        now = time.monotonic()
+        for stale in [rid for rid, (at, _) in self._unclaimed.items() if now - at > UNCLAIMED_TTL]:
+            del self._unclaimed[stale]
+        while len(self._unclaimed) >= MAX_UNCLAIMED:
+            del self._unclaimed[next(iter(self._unclaimed))]
+        self._unclaimed[request_id] = (now, entry)
+
+    def _complete(self, future, decode: Decoder, entry: dict):
+        # The queued payload is the synchronous response, always JSON text
+        response = Message(agent_id=self._client.agent_id,
+                           opcode=SyscallOp(entry.get("opcode", 0)),
+                           payload=entry.get("payload", "").encode('utf-8'))
+        self._set_result(future, decode(response, codec=JSON))
+
+    def fail(self, exc: BaseException):
+        """Fail every waiting future, e.g. when the connection is lost"""
+        with self._lock:
+            waiting, self._waiting = self._waiting, {}
+        for future, _ in waiting.values():
+            self._set_exception(future, exc)
+
+    def _next_interval(self, interval: float, got_results: bool) -> float:
+        return MIN_POLL_INTERVAL if got_results else min(interval * 2, MAX_POLL_INTERVAL)
+
+    def _start_locked(self):
+        raise NotImplementedError
+
+    def _set_result(self, future, value):
+        raise NotImplementedError
+
+    def _set_exception(self, future, exc: BaseException):
+        raise NotImplementedError
+
+
+class AsyncResults(_ResultDemux):
+    """
+    Future demultiplexer for CloveClient.
+
+    A daemon thread polls while futures are outstanding and exits when none
+    are left. It shares the client's connection, so a long blocking call on
+    the client (e.g. recv_messages(wait=True)) delays result delivery.
+    Cancelling a future does not stop the kernel-side call.
+    """
+
+    def __init__(self, client):
+        super().__init__(client)
+        self._thread = None
+
+    def submit(self, response, decode: Decoder) -> _futures.Future:
+        """Turn the kernel's response to an async call into a Future"""
+        future = _futures.Future()
+        accepted = decode(response)
+        if not self._track(future, accepted, decode):
+            future.set_result(accepted)
+        return future
+
+    def _start_locked(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="clove-async-results", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        interval = MIN_POLL_INTERVAL
+        while True:
+            with self._lock:
+                if not self._waiting:
+                    self._thread = None
+                    return
+
+            result = self._client.poll_async(POLL_BATCH, request_ids=self._wanted())
+            if not result.get("success"):
+                self.fail(ConnectionError(result.get("error") or "SYS_ASYNC_POLL failed"))
+                continue
+
+            entries = result.get("results", [])
+            for entry in entries:
+                self._resolve(entry)
+            if len(entries) >= POLL_BATCH:
+                continue  # More are queued; fetch them straight away
+
+            interval = self._next_interval(interval, bool(entries))
+            time.sleep(interval)
+
+    def _set_result(self, future, value):
+        if future.set_running_or_notify_cancel():
+            future.set_result(value)
+
+    def _set_exception(self, future, exc: BaseException):
+        if future.set_running_or_notify_cancel():
+            future.set_exception(exc)
+
+
+class AsyncioResults(_ResultDemux):
+    """
+    Future demultiplexer for AsyncCloveClient.
+
+    Same as AsyncResults, with a poller task on the client's event loop
+    resolving asyncio futures, so results compose with asyncio.gather and
+    asyncio.as_completed.
+    """
+
+    def __init__(self, client):
+        super().__init__(client)
+        self._task = None
+
+    def submit(self, response, decode: Decoder) -> asyncio.Future:
+        """Turn the kernel's response to an async call into an asyncio Future"""
+        future = asyncio.get_running_loop().create_future()
+        accepted = decode(response)
+        if not self._track(future, accepted, decode):
+            future.set_result(accepted)
+        return future
+
+    def _start_locked(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        interval = MIN_POLL_INTERVAL
+        while True:
+            with self._lock:
+                if not self._waiting:
+                    self._task = None
+                    return
+
+            result = await self._client.poll_async(POLL_BATCH, request_ids=self._wanted())
+            if not result.get("success"):
+                self.fail(ConnectionError(result.get("error") or "SYS_ASYNC_POLL failed"))
+                continue
+
+            entries = result.get("results", [])
+            for entry in entries:
+                self._resolve(entry)
+            if len(entries) >= POLL_BATCH:
+                continue
+
+            interval = self._next_interval(interval, bool(entries))
+            await asyncio.sleep(interval)
+
+    def _set_result(self, future, value):
+        if not future.done():
+            future.set_result(value)
+
+    def _set_exception(self, future, exc: BaseException):
+        if not future.done():
+            future.set_exception(exc)
+
+
+def gather(futures: Iterable[_futures.Future], timeout: float = None) -> List[Any]:
+    """Wait for every future and return their results in the given order.
+
+    Raises TimeoutError if any is still pending after `timeout` seconds.
+    """
+    futures = list(futures)
+    _, not_done = _futures.wait(futures, timeout)
+    if not_done:
+        raise TimeoutError(f"{len(not_done)} of {len(futures)} async calls still pending")
+    return [future.result() for future in futures]
+
+
+def as_completed(futures: Iterable[_futures.Future], timeout: float = None) -> Iterator[_futures.Future]:
+    """Yield futures as they complete, fastest first."""
+    return _futures.as_completed(futures, timeout)
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Prompt/response cache for think().
+
+Responses are keyed by a SHA-256 of the canonical request payload (prompt,
+image, system_instruction, model, sampling settings, tools). By default only
+deterministic requests (temperature=0) are cached. Two tiers: an in-memory
+LRU in front of an SQLite file that survives restarts and can be shared by
+every process of the same user on the host, bounded by size with
+least-recently-used eviction. Cached prompts and answers are private: the
+default directory is created 0700 and the database files are 0600.
+
+Used by the SDK wrapper (clove_sdk/llm_service.py) and by llm_service.py /
+llm_gateway.py, so a cache can sit in front of one agent or a whole host.
+A request with "cache": false bypasses it.
+
+Environment Variables:
+    CLOVE_LLM_CACHE: "1" for ~/.clove/llm_cache.sqlite, a file path, or "memory" (default: off)
+    CLOVE_LLM_CACHE_TTL: Seconds before an entry expires, 0 for never (default: 0)
+    CLOVE_LLM_CACHE_ENTRIES: In-memory LRU entries (default: 1024)
+    CLOVE_LLM_CACHE_MAX_BYTES: On-disk size limit (default: 256MB)
+    CLOVE_LLM_CACHE_ALL: Also cache requests with temperature != 0 (default: off)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+DEFAULT_CACHE_PATH = Path.home() / ".clove" / "llm_cache.sqlite"
+
+# Request fields that route or tag a call but don't change its answer
+_ROUTING_FIELDS = frozenset({"request_id", "agent", "async", "cache", "stream"})
+
+# Response fields describing the service at answer time, not the answer
+_VOLATILE_FIELDS = frozenset({"request_id", "key_pool"})
+
+
+def cache_key(payload: Dict[str, Any]) -> str:
+    """Hex SHA-256 of the canonical JSON of a request's answer-affecting fields"""
+    canonical = {k: v for k, v in payload.items() if k not in _ROUTING_FIELDS}
+    blob = json.dumps(canonical, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def _env_flag(name: str) -> bool:
+    return os.environ.get(name, "").lower() in ("1", "true", "yes", "on")
+
+
+class LLMCache:
+    """Two-tier (memory LRU + SQLite) cache of successful LLM responses"""
+
+    def __init__(self, path: Optional[str | Path] = DEFAULT_CACHE_PATH,
+                 ttl: float = 0, max_entries: int = 1024,
+                 max_bytes: int = 256 * 1024 * 1024,
+                 cache_nondeterministic: bool = False):
+        self.path = Path(path).expanduser() if path else None
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.cache_nondeterministic = cache_nondeterministic
+        self._memory: 'OrderedDict[str, Tuple[float, str]]' = OrderedDict()  # key -> (expires or 0, json)
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._disk_bytes = 0
+
+        # Metrics
+        self.hits = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+        if self.path:
+            self._open_db()
+
+    @classmethod
+    def from_env(cls) -> Optional['LLMCache']:
+        """Build the cache configured by CLOVE_LLM_CACHE*, or None if it is off"""
+        setting = os.environ.get("CLOVE_LLM_CACHE", "").strip()
+        if setting.lower() in ("", "0", "off", "false", "no"):
+            return None
+        if setting.lower() in ("1", "on", "true", "yes"):
+            path = DEFAULT_CACHE_PATH
+        elif setting.lower() == "memory":
+            path = None
+        else:
+            path = setting
+        return cls(
+            path=path,
+            ttl=float(os.environ.get("CLOVE_LLM_CACHE_TTL", "0") or 0),
+            max_entries=int(os.environ.get("CLOVE_LLM_CACHE_ENTRIES", "1024")),
+            max_bytes=int(os.environ.get("CLOVE_LLM_CACHE_MAX_BYTES", str(256 * 1024 * 1024))),
+            cache_nondeterministic=_env_flag("CLOVE_LLM_CACHE_ALL"),
+        )
+
+    def _open_db(self) -> None:
+        self.path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        # SQLite gives the -wal and -shm files the database file's mode
+        os.close(os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600))
+        for suffix in ("", "-wal", "-shm"):
+            self._make_private(Path(f"{self.path}{suffix}"))
+        db = sqlite3.connect(str(self.path), timeout=10, check_same_thread=False,
+                             isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                expires REAL NOT NULL,
+                last_used REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+        """)
+        db.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+        self._disk_bytes = db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        self._db = db
+
+    @staticmethod
+    def _make_private(path: Path) -> None:
+        """chmod 0600 a cache file this user owns (e.g. one created before)"""
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            return
+        if st.st_uid == os.getuid() and st.st_mode & 0o077:
+            path.chmod(0o600)
+
+    def cacheable(self, payload: Dict[str, Any]) -> bool:
+        if payload.get("cache") is False:
+            return False
+        if self.cache_nondeterministic:
+            return True
+        return payload.get("temperature") == 0
+
+    def get(self, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Cached response for a request (marked "cached": true), or None"""
+        if not self.cacheable(payload):
+            return None
+        key = cache_key(payload)
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires, blob = entry
+                if not expires or expires > now:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    self.memory_hits += 1
+                    return {**json.loads(blob), "cached": True}
+                del self._memory[key]
+
+            entry = self._disk_get(key, now)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._remember(key, entry)
+            blob = entry[1]
+            self.hits += 1
+            self.disk_hits += 1
+        return {**json.loads(blob), "cached": True}
+
+    def put(self, payload: Dict[str, Any], response: Dict[str, Any]) -> None:
+        """Store a successful response for a cacheable request"""
+        if not response.get("success") or response.get("cached") or not self.cacheable(payload):
+            return
+        key = cache_key(payload)
+        now = time.time()
+        blob = json.dumps({k: v for k, v in response.items() if k not in _VOLATILE_FIELDS})
+        expires = now + self.ttl if self.ttl > 0 else 0
+
+        with self._lock:
+            self._remember(key, (expires, blob))
+            self._disk_put(key, blob, expires, now)
+            self.stores += 1
+
+    def _remember(self, key: str, entry: Tuple[float, str]) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _disk_get(self, key: str, now: float) -> Optional[Tuple[float, str]]:
+        if self._db is None:
+            return None
+        try:
+            row = self._db.execute("SELECT response, expires, size FROM responses WHERE key = ?",
+                                   (key,)).fetchone()
+            if row is None:
+                return None
+            blob, expires, size = row
+            if expires and expires <= now:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._disk_bytes -= size
+                return None
+            self._db.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            return expires, blob
+        except sqlite3.Error:
+            return None
+
+    def _disk_put(self, key: str, blob: str, expires: float, now: float) -> None:
+        if self._db is None:
+            return
+        size = len(blob)
+        if size > self.max_bytes:
+            return
+        try:
+            # A replaced row's size no longer counts
+            old = self._db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, response, expires, last_used, size) "
+                "VALUES (?, ?, ?, ?, ?)", (key, blob, expires, now, size))
+            self._disk_bytes += size - (old[0] if old else 0)
+            if self._disk_bytes > self.max_bytes:
+                self._evict(now)
+        except sqlite3.Error:
+            pass
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries, then least recently used ones down to 90% of max_bytes"""
+        assert self._db is not None
+        self._db.execute("DELETE FROM responses WHERE expires > 0 AND expires <= ?", (now,))
+        # Other processes may share the file; recount rather than trusting our tally
+        self._disk_bytes = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        target = int(self.max_bytes * 0.9)
+        if self._disk_bytes <= target:
+            return
+        freed = 0
+        doomed = []
+        for key, size in self._db.execute("SELECT key, size FROM responses ORDER BY last_used"):
+            doomed.append((key,))
+            freed += size
+            if self._disk_bytes - freed <= target:
+                break
+        self._db.executemany("DELETE FROM responses WHERE key = ?", doomed)
+        self._disk_bytes -= freed
+        self.evictions += len(doomed)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._disk_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "memory_entries": len(self._memory),
+            "disk_bytes": self._disk_bytes,
+            "path": str(self.path) if self.path else None,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
@@ -2,19 +2,35 @@
 """
 Local LLM service wrapper for the SDK.
 
-Runs agents/llm_service/llm_service.py as a long-lived subprocess and returns JSON output.
+Sends requests to the shared LLM gateway (agents/llm_service/llm_gateway.py) when one
+is listening on CLOVE_LLM_GATEWAY (default /tmp/clove_llm.sock) as this user or root
+(anyone could bind a /tmp path and read the prompts), otherwise runs
+agents/llm_service/llm_service.py as a long-lived subprocess. Either way the protocol is
+JSON lines; calls from different threads run concurrently and responses are matched by
+request_id. With CLOVE_LLM_CACHE set, repeated requests are answered from LLMCache.
+stream_llm_service() returns an LLMStream that yields text chunks as the service emits them.
 """
 
 from __future__ import annotations
 
 import json
 import os
+import socket
+import stat
+import struct
 import sys
 import subprocess
 import threading
 import atexit
+import asyncio
+import queue
+from concurrent.futures import Future
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import IO, Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Union
+
+from .llm_cache import LLMCache
+
+DEFAULT_GATEWAY_SOCKET = "/tmp/clove_llm.sock"
 
 
 def _find_llm_service() -> Optional[Path]:
@@ -35,16 +51,233 @@ def _find_llm_service() -> Optional[Path]:
     return None
 
 
-class _LLMServiceProcess:
+def _gateway_socket_path() -> Optional[str]:
+    """Gateway socket to try, or None if CLOVE_LLM_GATEWAY=off."""
+    path = os.environ.get("CLOVE_LLM_GATEWAY", DEFAULT_GATEWAY_SOCKET)
+    if path.lower() in ("", "0", "off", "false", "none"):
+        return None
+    return path
+
+
+def _trusted_uid(uid: int) -> bool:
+    """A gateway may see every prompt, so it must run as this user (or root)."""
+    return uid in (os.getuid(), 0)
+
+
+def _agent_name() -> str:
+    """Name the gateway accounts this process's requests to."""
+    return os.environ.get("CLOVE_AGENT_NAME") or f"pid-{os.getpid()}"
+
+
+class LLMStream:
+    """Text chunks of a streaming LLM call, then its final response.
+
+    Iterate it (or ``async for``) to receive text as the service emits it;
+    ``result()`` blocks for the final response dict, whose ``content`` is the
+    full text. ``on_complete`` runs once, in the consuming thread, when the
+    final response is first observed.
+    """
+
+    _DONE = object()
+
+    def __init__(self, on_complete: Callable[[Dict[str, Any]], None] = None) -> None:
+        self._chunks: queue.Queue = queue.Queue()
+        self._final: Future = Future()
+        self._on_complete = on_complete
+        self._completed = False
+        self.chunks: List[str] = []
+
+    # Called by the channel's reader thread
+
+    def add_chunk(self, text: str) -> None:
+        self._chunks.put(text)
+
+    def set_result(self, response: Dict[str, Any]) -> None:
+        self._final.set_result(response)
+        self._chunks.put(self._DONE)
+
+    # Consumer side
+
+    @property
+    def text(self) -> str:
+        """Text received so far"""
+        return "".join(self.chunks)
+
+    def _next_chunk(self, timeout: Optional[float] = None) -> Any:
+        chunk = self._chunks.get(timeout=timeout)
+        if chunk is self._DONE:
+            self._chunks.put(chunk)  # stay exhausted for later iterations
+        else:
+            self.chunks.append(chunk)
+        return chunk
+
+    def _complete(self) -> Dict[str, Any]:
+        response = self._final.result()
+        if not self._completed:
+            self._completed = True
+            if self._on_complete is not None:
+                self._on_complete(response)
+        return response
+
+    def __iter__(self) -> Iterator[str]:
+        while True:
+            chunk = self._next_chunk()
+            if chunk is self._DONE:
+                self._complete()
+                return
+            yield chunk
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        while True:
+            chunk = await asyncio.to_thread(self._next_chunk)
+            if chunk is self._DONE:
+                self._complete()
+                return
+            yield chunk
+
+    def result(self, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Final response; waits for the stream to finish"""
+        self._final.result(timeout)
+        return self._complete()
+
+    def done(self) -> bool:
+        return self._final.done()
+
+    def add_done_callback(self, fn: Callable[[Dict[str, Any]], None]) -> None:
+        """Call fn(response) when the final response arrives (on the reader thread)"""
+        self._final.add_done_callback(lambda final: fn(final.result()))
+
+
+class _LLMChannel:
+    """A JSON-lines connection to an LLM service with many calls in flight.
+
+    Each call is tagged with a request_id; a reader thread matches response
+    lines back to the waiting callers, so a slow completion doesn't hold up
+    the others. Subclasses provide the underlying streams.
+    """
+
     def __init__(self) -> None:
+        self._wfile: Optional[IO[str]] = None
+        self._lock = threading.Lock()  # guards opening and writes
+        self._pending: Dict[int, Union[Future, LLMStream]] = {}
+        self._pending_lock = threading.Lock()
+        self._closed = True  # no reader running for the current connection
+        self._request_id = 0
+
+    def _open(self) -> Optional[str]:
+        """Open the streams and start the reader; return an error string on failure."""
+        raise NotImplementedError
+
+    def _alive(self) -> bool:
+        raise NotImplementedError
+
+    def _start_reader(self, rfile: IO[str], exit_error: Callable[[], str]) -> None:
+        # A fresh map per connection: the old reader may still be failing its own
+        with self._pending_lock:
+            self._pending = {}
+            self._closed = False
+        threading.Thread(target=self._read_loop, args=(rfile, self._pending, exit_error),
+                         name="clove-llm-reader", daemon=True).start()
+
+    def _is_running(self) -> bool:
+        return self._wfile is not None and not self._closed and self._alive()
+
+    def _read_loop(self, rfile: IO[str], pending: Dict[int, Union[Future, LLMStream]],
+                   exit_error: Callable[[], str]) -> None:
+        try:
+            for line in rfile:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    response = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                request_id = response.pop("request_id", None)
+                if response.get("done") is False:
+                    with self._pending_lock:
+                        stream = pending.get(request_id)
+                    if isinstance(stream, LLMStream):
+                        stream.add_chunk(response.get("chunk", ""))
+                    continue
+                with self._pending_lock:
+                    waiter = pending.pop(request_id, None)
+                if waiter is not None:
+                    waiter.set_result(response)
+        except (OSError, ValueError):
+            pass
+
+        # Stream closed: the service went away, fail whatever it still owed us
+        self._fail_pending(pending, exit_error() or "No response from LLM service")
+
+    def _fail_pending(self, pending: Dict[int, Union[Future, LLMStream]], error: str) -> None:
+        with self._pending_lock:
+            failed = list(pending.values())
+            pending.clear()
+            if pending is self._pending:
+                self._closed = True
+        for future in failed:
+            future.set_result({"success": False, "error": error, "content": ""})
+
+    def connected(self) -> bool:
+        """Return True if the channel is (or can now be) open."""
+        with self._lock:
+            return self._is_running() or self._open() is None
+
+    def submit(self, payload: Dict[str, Any], waiter: Union[Future, LLMStream] = None):
+        """Send a request and return a Future resolving to its response dict.
+
+        Pass an LLMStream as waiter (with "stream": true in the payload) to
+        receive chunks; it is returned instead of a Future.
+        """
+        future = waiter if waiter is not None else Future()
+        with self._lock:
+            if not self._is_running():
+                err = self._open()
+                if err:
+                    future.set_result({"success": False, "error": err, "content": ""})
+                    return future
+
+            assert self._wfile is not None
+
+            with self._pending_lock:
+                if self._closed:
+                    future.set_result({"success": False, "error": "LLM service exited", "content": ""})
+                    return future
+                self._request_id += 1
+                request_id = self._request_id
+                self._pending[request_id] = future
+
+            try:
+                self._wfile.write(json.dumps({**payload, "request_id": request_id}) + "\n")
+                self._wfile.flush()
+            except Exception as exc:
+                with self._pending_lock:
+                    self._pending.pop(request_id, None)
+                future.set_result({"success": False, "error": str(exc), "content": ""})
+        return future
+
+    def call(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        return self.submit(payload).result()
+
+    def shutdown(self) -> None:
+        raise NotImplementedError
+
+
+class _LLMServiceProcess(_LLMChannel):
+    """llm_service.py as a subprocess of this Python process."""
+
+    def __init__(self) -> None:
+        super().__init__()
         self._proc: Optional[subprocess.Popen[str]] = None
-        self._lock = threading.Lock()
 
-    def _start(self) -> Optional[str]:
+    def _open(self) -> Optional[str]:
         script_path = _find_llm_service()
         if not script_path:
             return "LLM service not found. Set CLOVE_LLM_SERVICE_PATH or install agents/llm_service."
 
+        if self._alive():
+            self._proc.terminate()  # stdout closed on us but it didn't exit
         self._proc = subprocess.Popen(
             [sys.executable, str(script_path)],
             stdin=subprocess.PIPE,
@@ -53,39 +286,22 @@ class _LLMServiceProcess:
             text=True,
             bufsize=1,
         )
+        assert self._proc.stdout is not None
+        self._wfile = self._proc.stdin
+        self._start_reader(self._proc.stdout, lambda proc=self._proc: self._stderr_of(proc))
         return None
 
-    def _is_running(self) -> bool:
+    def _alive(self) -> bool:
         return self._proc is not None and self._proc.poll() is None
 
-    def call(self, payload: Dict[str, Any]) -> Dict[str, Any]:
-        with self._lock:
-            if not self._is_running():
-                err = self._start()
-                if err:
-                    return {"success": False, "error": err, "content": ""}
-
-            assert self._proc is not None
-            assert self._proc.stdin is not None
-            assert self._proc.stdout is not None
-
-            try:
-                self._proc.stdin.write(json.dumps(payload) + "\n")
-                self._proc.stdin.flush()
-            except Exception as exc:
-                return {"success": False, "error": str(exc), "content": ""}
-
-            line = self._proc.stdout.readline()
-            if not line:
-                err = ""
-                if self._proc.stderr:
-                    err = self._proc.stderr.read().strip()
-                return {"success": False, "error": err or "No response from LLM service", "content": ""}
-
-            try:
-                return json.loads(line.strip())
-            except json.JSONDecodeError:
-                return {"success": False, "error": "Invalid JSON from LLM service", "content": line.strip()}
+    @staticmethod
+    def _stderr_of(proc: subprocess.Popen[str]) -> str:
+        if proc.stderr is None:
+            return ""
+        try:
+            return proc.stderr.read().strip()
+        except Exception:
+            return ""
 
     def shutdown(self) -> None:
         if self._proc and self._proc.poll() is None:
@@ -95,11 +311,129 @@ class _LLMServiceProcess:
             except Exception:
                 self._proc.kill()
         self._proc = None
+        self._wfile = None
+
+
+class _LLMGatewayClient(_LLMChannel):
+    """Connection to the host-wide LLM gateway daemon over its Unix socket."""
+
+    def __init__(self, socket_path: str) -> None:
+        super().__init__()
+        self.socket_path = socket_path
+        self._sock: Optional[socket.socket] = None
+
+    def _open(self) -> Optional[str]:
+        try:
+            st = os.stat(self.socket_path)
+        except OSError:
+            return f"LLM gateway not running at {self.socket_path}"
+        if not stat.S_ISSOCK(st.st_mode) or not _trusted_uid(st.st_uid):
+            return f"LLM gateway socket {self.socket_path} is not owned by this user"
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(self.socket_path)
+            # The path could have been swapped since stat(); check who is listening
+            if hasattr(socket, "SO_PEERCRED"):
+                creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+                _, uid, _ = struct.unpack("3i", creds)
+                if not _trusted_uid(uid):
+                    sock.close()
+                    return f"LLM gateway at {self.socket_path} runs as uid {uid}, not this user"
+        except OSError as exc:
+            sock.close()
+            return f"LLM gateway unavailable: {exc}"
+
+        self._close_socket()
+        self._sock = sock
+        self._wfile = sock.makefile("w", encoding="utf-8")
+        self._start_reader(sock.makefile("r", encoding="utf-8"),
+                           lambda: "LLM gateway closed the connection")
+        return None
+
+    def _alive(self) -> bool:
+        return self._sock is not None
+
+    def _close_socket(self) -> None:
+        if self._sock is not None:
+            try:
+                self._sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._sock.close()
+        self._sock = None
+        self._wfile = None
+
+    def submit(self, payload: Dict[str, Any], waiter: Union[Future, LLMStream] = None):
+        return super().submit({"agent": _agent_name(), **payload}, waiter)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._close_socket()
+
+
+_PROCESS = _LLMServiceProcess()
+_gateway_path = _gateway_socket_path()
+_GATEWAY: Optional[_LLMGatewayClient] = _LLMGatewayClient(_gateway_path) if _gateway_path else None
+atexit.register(_PROCESS.shutdown)
+if _GATEWAY is not None:
+    atexit.register(_GATEWAY.shutdown)
+
+
+_CACHE: Optional[LLMCache] = LLMCache.from_env()
 
 
-_CLIENT = _LLMServiceProcess()
-atexit.register(_CLIENT.shutdown)
+def configure_llm_cache(cache: Optional[LLMCache]) -> None:
+    """Set (or with None, disable) the cache used for this process's LLM calls."""
+    global _CACHE
+    _CACHE = cache
+
+
+def get_llm_cache() -> Optional[LLMCache]:
+    return _CACHE
+
+
+def _channel() -> _LLMChannel:
+    if _GATEWAY is not None and _GATEWAY.connected():
+        return _GATEWAY
+    return _PROCESS
 
 
 def call_llm_service(payload: Dict[str, Any]) -> Dict[str, Any]:
-    return _CLIENT.call(payload)
+    return submit_llm_service(payload).result()
+
+
+def submit_llm_service(payload: Dict[str, Any]) -> Future:
+    cache = _CACHE
+    if cache is None or not cache.cacheable(payload):
+        return _channel().submit(payload)
+
+    cached = cache.get(payload)
+    if cached is not None:
+        future: Future = Future()
+        future.set_result(cached)
+        return future
+
+    # Looked up here already; the service needn't consult its own cache
+    future = _channel().submit({**payload, "cache": False})
+    future.add_done_callback(lambda done: cache.put(payload, done.result()))
+    return future
+
+
+def stream_llm_service(payload: Dict[str, Any],
+                       on_complete: Callable[[Dict[str, Any]], None] = None) -> LLMStream:
+    """Send a streaming request; text chunks arrive on the returned LLMStream."""
+    stream = LLMStream(on_complete)
+    payload = {**payload, "stream": True}
+    cache = _CACHE
+    if cache is None or not cache.cacheable(payload):
+        return _channel().submit(payload, stream)
+
+    cached = cache.get(payload)
+    if cached is not None:
+        if cached.get("content"):
+            stream.add_chunk(cached["content"])
+        stream.set_result(cached)
+        return stream
+
+    stream.add_done_callback(lambda response: cache.put(payload, response))
+    return _channel().submit({**payload, "cache": False}, stream)
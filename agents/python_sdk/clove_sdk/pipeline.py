@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Clove Syscall Pipeline
+
+Buffers syscalls on the client and sends them to the kernel back to back,
+so a batch of N syscalls costs one round trip instead of N.
+"""
+
+from typing import Any, Callable, List, Optional, Tuple
+
+from .client import CloveClient, Message, SyscallOp, _SyscallMethods, _UNSET, _decode_response, _encode_payload
+
+
+class Pipeline(_SyscallMethods):
+    """
+    Queue syscalls and execute them in a single batch.
+
+    Every CloveClient syscall method is available and returns the pipeline
+    for chaining. Commands are buffered until execute() is called; all frames
+    are then written to the socket at once and the responses are read back
+    in order. The kernel processes messages from one connection sequentially,
+    so the i-th result always belongs to the i-th queued command.
+
+    Example:
+        with client.pipeline() as pipe:
+            for stage, result in results.items():
+                pipe.store(f"pipeline:{run_id}:{stage}", result)
+            replies = pipe.execute()
+    """
+
+    def __init__(self, client: CloveClient):
+        self._client = client
+        # (opcode, payload, finish); opcode None marks a result known locally
+        self._commands: List[Tuple[Optional[SyscallOp], bytes, Callable[[Optional[Message]], Any]]] = []
+
+    def __len__(self) -> int:
+        return len(self._commands)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.reset()
+
+    def reset(self):
+        """Discard all queued commands"""
+        self._commands = []
+
+    def call(self, opcode: SyscallOp, payload: bytes | str = b'') -> 'Pipeline':
+        """Queue a raw syscall. Its result is the response Message (or None)."""
+        return self._request(opcode, payload, raw=True)
+
+    def _request(self, opcode: SyscallOp, payload: dict | bytes | str = b'',
+                 defaults: dict = None, transform: Callable = None,
+                 raw: bool = False, error_key: str = "error", missing=_UNSET,
+                 deferred: bool = False) -> 'Pipeline':
+        # async_=True calls return the kernel's acceptance (with request_id),
+        # not a future
+        codec = self._client._codec_for(opcode)
+        self._commands.append((
+            opcode,
+            _encode_payload(payload, codec),
+            lambda response: _decode_response(response, defaults, transform, raw, error_key, missing, codec),
+        ))
+        return self
+
+    def _result(self, value) -> 'Pipeline':
+        self._commands.append((None, b'', lambda response: value))
+        return self
+
+    def execute(self) -> list:
+        """Send all queued commands and return their results in order."""
+        commands, self._commands = self._commands, []
+        if not commands:
+            return []
+
+        responses = iter(self._client.call_many(
+            (op, payload) for op, payload, _ in commands if op is not None))
+        return [finish(next(responses) if op is not None else None)
+                for op, _, finish in commands]
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Clove Connection Pool
+
+Thread-safe pool of CloveClient connections. A single CloveClient socket
+must not be shared between threads; the pool hands each thread its own
+connection while bounding the total number of sockets.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from .client import CloveClient, SyscallOp, _SyscallMethods, _UNSET, _llm_report, _think_payload
+
+# Calls that act on the calling agent itself; on a per-call connection they
+# would register, subscribe or drain a random pooled agent
+_PER_CONNECTION_OPCODES = frozenset({
+    SyscallOp.SYS_REGISTER, SyscallOp.SYS_RECV,
+    SyscallOp.SYS_GET_PERMS, SyscallOp.SYS_SET_PERMS,
+    SyscallOp.SYS_SUBSCRIBE, SyscallOp.SYS_UNSUBSCRIBE, SyscallOp.SYS_POLL_EVENTS,
+    SyscallOp.SYS_WORLD_JOIN, SyscallOp.SYS_WORLD_LEAVE,
+    SyscallOp.SYS_ASYNC_POLL, SyscallOp.SYS_EXIT,
+})
+
+
+class CloveClientPool(_SyscallMethods):
+    """
+    Pool of CloveClient connections shared across threads.
+
+    Every CloveClient syscall method is available on the pool itself and runs
+    on a connection checked out for that one call, so a pool can be passed
+    anywhere a client is expected. Calls that act on the calling agent
+    (register_name, recv_messages, subscribe, poll_events, set_permissions
+    without agent_id, ...) raise RuntimeError on the pool: hold one
+    connection for them with connection().
+
+    Each pooled connection is a separate agent in the kernel. Use on_connect
+    to apply per-connection setup such as set_permissions().
+
+    Args:
+        socket_path: Kernel socket path
+        min_size: Connections opened up front and never evicted for idleness
+        max_size: Upper bound on open connections
+        idle_timeout: Seconds an idle connection above min_size is kept
+        health_check_interval: Connections idle longer than this are checked
+            with hello() before being handed out
+        checkout_timeout: Seconds to wait for a free connection (None = forever)
+        on_connect: Called with each newly connected client
+        zero_copy: Passed through to CloveClient
+        codec: Passed through to CloveClient
+
+    Example:
+        pool = CloveClientPool(max_size=8)
+        with ThreadPoolExecutor(8) as ex:
+            list(ex.map(lambda p: pool.read_file(p), paths))
+
+        with pool.connection() as client:
+            client.register_name("worker")
+            client.recv_messages()
+    """
+
+    def __init__(self, socket_path: str = '/tmp/clove.sock', min_size: int = 1,
+                 max_size: int = 8, idle_timeout: float = 60.0,
+                 health_check_interval: float = 30.0,
+                 checkout_timeout: Optional[float] = None,
+                 on_connect: Callable[[CloveClient], None] = None,
+                 zero_copy: bool = False, codec: str = "json"):
+        if max_size < 1 or min_size < 0 or min_size > max_size:
+            raise ValueError("require 0 <= min_size <= max_size and max_size >= 1")
+
+        self.socket_path = socket_path
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self.checkout_timeout = checkout_timeout
+        self.on_connect = on_connect
+        self.zero_copy = zero_copy
+        self.codec = codec
+
+        self._cond = threading.Condition()
+        self._idle: List[Tuple[CloveClient, float]] = []  # oldest first
+        self._size = 0
+        self._closed = False
+
+        for _ in range(min_size):
+            client = self._open()
+            with self._cond:
+                self._size += 1
+                self._idle.append((client, time.monotonic()))
+
+    @property
+    def size(self) -> int:
+        """Number of open connections (idle + checked out)"""
+        return self._size
+
+    def stats(self) -> dict:
+        """Pool occupancy"""
+        with self._cond:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "max_size": self.max_size,
+            }
+
+    def _open(self) -> CloveClient:
+        client = CloveClient(self.socket_path, zero_copy=self.zero_copy, codec=self.codec)
+        if not client.connect():
+            raise ConnectionError(f"Failed to connect to {self.socket_path}")
+        if self.on_connect:
+            try:
+                self.on_connect(client)
+            except Exception:
+                client.disconnect()
+                raise
+        return client
+
+    def _is_healthy(self, client: CloveClient) -> bool:
+        return client._sock is not None and client.hello().get("success", False)
+
+    def _evict_idle_locked(self) -> List[CloveClient]:
+        """Pop connections idle past idle_timeout, keeping min_size open."""
+        evicted = []
+        cutoff = time.monotonic() - self.idle_timeout
+        while (self._idle and self._size > self.min_size and self._idle[0][1] < cutoff
+               and not (self._idle[0][0]._async and self._idle[0][0]._async.pending)):
+            evicted.append(self._idle.pop(0)[0])
+            self._size -= 1
+        return evicted
+
+    def acquire(self, timeout: Optional[float] = None) -> CloveClient:
+        """Check out a connection. Prefer connection() which always releases it."""
+        if timeout is None:
+            timeout = self.checkout_timeout
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            client = None
+            idle_since = 0.0
+            with self._cond:
+                evicted = self._evict_idle_locked()
+                while client is None:
+                    if self._closed:
+                        raise ConnectionError("Connection pool is closed")
+                    if self._idle:
+                        # Most recently used first: its socket is the warmest
+                        client, idle_since = self._idle.pop()
+                    elif self._size < self.max_size:
+                        self._size += 1
+                        break
+                    else:
+                        remaining = None if deadline is None else deadline - time.monotonic()
+                        if remaining is not None and remaining <= 0:
+                            raise TimeoutError("Timed out waiting for a pooled connection")
+                        self._cond.wait(remaining)
+
+            for stale in evicted:
+                stale.disconnect()
+
+            if client is None:
+                try:
+                    return self._open()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+
+            if time.monotonic() - idle_since < self.health_check_interval or self._is_healthy(client):
+                return client
+            self._discard(client)
+
+    def release(self, client: CloveClient, discard: bool = False):
+        """Return a connection to the pool"""
+        if discard or self._closed or client._sock is None:
+            self._discard(client)
+            return
+
+        with self._cond:
+            self._idle.append((client, time.monotonic()))
+            evicted = self._evict_idle_locked()
+            self._cond.notify()
+
+        for stale in evicted:
+            stale.disconnect()
+
+    def _discard(self, client: CloveClient):
+        client.disconnect()
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None) -> Iterator[CloveClient]:
+        """Check out a connection for the duration of the block"""
+        client = self.acquire(timeout)
+        try:
+            yield client
+        except OSError:
+            self.release(client, discard=True)
+            raise
+        except BaseException:
+            self.release(client)
+            raise
+        else:
+            self.release(client)
+
+    def close(self):
+        """Close idle connections; checked-out ones close when released"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._cond.notify_all()
+
+        for client, _ in idle:
+            client.disconnect()
+
+    def _request(self, opcode: SyscallOp, payload: dict | bytes | str = b'',
+                 defaults: dict = None, transform: Callable = None,
+                 raw: bool = False, error_key: str = "error", missing=_UNSET,
+                 deferred: bool = False):
+        targets_other = isinstance(payload, dict) and payload.get("agent_id") is not None
+        if opcode in _PER_CONNECTION_OPCODES and not (
+                opcode == SyscallOp.SYS_SET_PERMS and targets_other):
+            raise RuntimeError(
+                f"{opcode.name} acts on the calling agent and each pooled call may use a "
+                f"different connection; use 'with pool.connection() as client:' instead")
+        # An async_=True future stays bound to its connection's poller
+        with self.connection() as client:
+            return client._request(opcode, payload, defaults, transform, raw, error_key, missing,
+                                   deferred)
+
+    def _result(self, value):
+        return value
+
+    def think(self, prompt: str,
+              image: bytes = None,
+              image_mime_type: str = "image/jpeg",
+              system_instruction: str = None,
+              thinking_level: str = None,
+              temperature: float = None,
+              model: str = None) -> dict:
+        """Send a prompt to the LLM via local LLM service (not the kernel).
+
+        No connection is held while the LLM call runs; one is checked out
+        only to report usage afterwards.
+        """
+        from .llm_service import call_llm_service
+
+        payload = _think_payload(prompt, image, image_mime_type, system_instruction,
+                                 thinking_level, temperature, model)
+        result = call_llm_service(payload)
+        self._report_llm_usage(result)
+        return result
+
+    def think_stream(self, prompt: str,
+                     image: bytes = None,
+                     image_mime_type: str = "image/jpeg",
+                     system_instruction: str = None,
+                     thinking_level: str = None,
+                     temperature: float = None,
+                     model: str = None) -> 'LLMStream':
+        """Like think(), but returns an LLMStream that yields text as it is generated."""
+        from .llm_service import stream_llm_service
+
+        payload = _think_payload(prompt, image, image_mime_type, system_instruction,
+                                 thinking_level, temperature, model)
+        return stream_llm_service(payload, on_complete=self._report_llm_usage)
+
+    def _report_llm_usage(self, result: dict) -> None:
+        if result.get("success") and not result.get("cached"):
+            with self.connection() as client:
+                client._request(SyscallOp.SYS_LLM_REPORT, _llm_report(result))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
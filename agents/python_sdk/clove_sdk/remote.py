@@ -10,11 +10,10 @@ import base64
 import struct
 import asyncio
 import threading
-from typing import Optional, Dict, Any, Callable
+from typing import Optional, Dict, Any, Callable, Tuple
 from dataclasses import dataclass
 from enum import IntEnum
-from concurrent.futures import Future
-import queue
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
 
 try:
     import websockets
@@ -22,22 +21,36 @@ try:
 except ImportError:
     raise ImportError("websockets library required. Run: pip install clove-sdk[remote]")
 
-from .client import SyscallOp, Message, MAGIC_BYTES, HEADER_SIZE
+from .client import SyscallOp, Message, MAGIC_BYTES, HEADER_SIZE, _llm_report, _think_payload
+
+# Binary relay frames: request_id (u64) + kernel message header + payload
+ROUTE_PREFIX = struct.Struct('<Q')
+FRAME_HEADER_SIZE = ROUTE_PREFIX.size + HEADER_SIZE
 
 
 class RemoteAgentClient:
     """
     Client for connecting to a remote Clove kernel via relay server.
     API is compatible with CloveClient for easy migration.
+
+    Every syscall carries a request_id that the relay and kernel echo back,
+    so calls from many threads (or submit()) can be in flight at once over
+    one WebSocket and each response reaches the caller that made it.
+
+    With binary=True (the default) syscalls travel as binary WebSocket
+    frames, carrying the raw kernel message, if the relay agrees at auth
+    time; otherwise the client falls back to base64-in-JSON.
     """
 
     def __init__(self, relay_url: str, agent_name: str, agent_token: str,
-                 target_machine: str, reconnect: bool = True):
+                 target_machine: str, reconnect: bool = True, binary: bool = True):
         self.relay_url = relay_url
         self.agent_name = agent_name
         self.agent_token = agent_token
         self.target_machine = target_machine
         self.reconnect = reconnect
+        self.binary = binary
+        self._binary = False  # Negotiated with the relay
 
         self._ws: Optional[WebSocketClientProtocol] = None
         self._agent_id: int = 0
@@ -45,8 +58,8 @@ class RemoteAgentClient:
         self._loop: Optional[asyncio.AbstractEventLoop] = None
         self._thread: Optional[threading.Thread] = None
 
-        self._pending_responses: Dict[int, Future] = {}
-        self._response_queue = queue.Queue()
+        self._pending_responses: Dict[int, Future] = {}  # request_id -> Future[Message]
+        self._pending_lock = threading.Lock()
         self._request_id = 0
 
     def connect(self) -> bool:
@@ -73,6 +86,7 @@ class RemoteAgentClient:
             if self._thread:
                 self._thread.join(timeout=5)
         self._connected = False
+        self._fail_pending()
 
     def _run_event_loop(self):
         asyncio.set_event_loop(self._loop)
@@ -88,7 +102,8 @@ class RemoteAgentClient:
                 "type": "agent_auth",
                 "name": self.agent_name,
                 "token": self.agent_token,
-                "target_machine": self.target_machine
+                "target_machine": self.target_machine,
+                "binary": self.binary
             }
             await self._ws.send(json.dumps(auth_msg))
 
@@ -97,6 +112,7 @@ class RemoteAgentClient:
 
             if data.get("type") == "auth_ok":
                 self._agent_id = data.get("agent_id", 0)
+                self._binary = self.binary and bool(data.get("binary", False))
                 self._connected = True
                 asyncio.create_task(self._message_loop())
                 return True
@@ -129,6 +145,9 @@ class RemoteAgentClient:
                 async for message in self._ws:
                     reconnect_attempts = 0
                     try:
+                        if isinstance(message, bytes):
+                            self._handle_frame(message)
+                            continue
                         data = json.loads(message)
                         await self._handle_message(data)
                     except json.JSONDecodeError as e:
@@ -157,6 +176,7 @@ class RemoteAgentClient:
                 break
 
         self._connected = False
+        self._fail_pending()
 
     async def _handle_message(self, data: dict):
         msg_type = data.get("type")
@@ -166,7 +186,7 @@ class RemoteAgentClient:
             payload_b64 = data.get("payload", "")
             payload = base64.b64decode(payload_b64) if payload_b64 else b""
 
-            self._response_queue.put(Message(
+            self._resolve(data.get("request_id"), Message(
                 agent_id=self._agent_id,
                 opcode=SyscallOp(opcode),
                 payload=payload
@@ -174,46 +194,101 @@ class RemoteAgentClient:
         elif msg_type == "kernel_disconnected":
             self._connected = False
             print(f"Kernel disconnected: {data.get('machine_id')}")
+            self._fail_pending()
         elif msg_type == "error":
             print(f"Relay error: {data.get('error')}")
+            if "request_id" in data:
+                self._resolve(data["request_id"], None)
 
-    def call(self, opcode: SyscallOp, payload: bytes | str = b'') -> Optional[Message]:
-        """Send a syscall and wait for response"""
+    def _handle_frame(self, frame: bytes):
+        if len(frame) < FRAME_HEADER_SIZE:
+            print("Invalid frame from relay")
+            return
+        request_id, = ROUTE_PREFIX.unpack_from(frame)
+        magic, _, opcode, payload_size = struct.unpack_from('<IIBQ', frame, ROUTE_PREFIX.size)
+        if magic != MAGIC_BYTES or payload_size != len(frame) - FRAME_HEADER_SIZE:
+            print("Invalid frame from relay")
+            return
+
+        self._resolve(request_id or None, Message(
+            agent_id=self._agent_id,
+            opcode=SyscallOp(opcode),
+            payload=frame[FRAME_HEADER_SIZE:]
+        ))
+
+    def _resolve(self, request_id: Optional[int], response: Optional[Message]):
+        with self._pending_lock:
+            if request_id is None:
+                # Relay or kernel without correlation IDs: responses arrive in order
+                request_id = next(iter(self._pending_responses), None)
+            future = self._pending_responses.pop(request_id, None)
+        if future and not future.done():
+            future.set_result(response)
+
+    def _fail_pending(self):
+        with self._pending_lock:
+            pending, self._pending_responses = self._pending_responses, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_result(None)
+
+    def _submit(self, opcode: SyscallOp, payload: bytes | str) -> Tuple[int, Future]:
+        future = Future()
         if not self._connected or not self._loop:
-            return None
+            future.set_result(None)
+            return 0, future
 
         if isinstance(payload, str):
             payload = payload.encode('utf-8')
 
-        while not self._response_queue.empty():
-            try:
-                self._response_queue.get_nowait()
-            except queue.Empty:
-                break
+        with self._pending_lock:
+            self._request_id += 1
+            request_id = self._request_id
+            self._pending_responses[request_id] = future
 
-        future = asyncio.run_coroutine_threadsafe(
-            self._send_syscall(opcode, payload), self._loop
-        )
+        def on_sent(sent: Future):
+            error = None if sent.cancelled() else sent.exception()
+            if sent.cancelled() or error:
+                print(f"Failed to send syscall: {error or 'cancelled'}")
+                self._resolve(request_id, None)
 
-        try:
-            future.result(timeout=5)
-        except Exception as e:
-            print(f"Failed to send syscall: {e}")
-            return None
+        asyncio.run_coroutine_threadsafe(
+            self._send_syscall(opcode, payload, request_id), self._loop
+        ).add_done_callback(on_sent)
+        return request_id, future
+
+    def submit(self, opcode: SyscallOp, payload: bytes | str = b'') -> Future:
+        """Send a syscall without waiting.
+
+        Returns a Future resolving to the response Message (None on failure).
+        """
+        return self._submit(opcode, payload)[1]
 
+    def call(self, opcode: SyscallOp, payload: bytes | str = b'',
+             timeout: float = 60) -> Optional[Message]:
+        """Send a syscall and wait for response"""
+        request_id, future = self._submit(opcode, payload)
         try:
-            response = self._response_queue.get(timeout=60)
-            return response
-        except queue.Empty:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
             print("Timeout waiting for response")
+            with self._pending_lock:
+                self._pending_responses.pop(request_id, None)
             return None
 
-    async def _send_syscall(self, opcode: SyscallOp, payload: bytes):
+    async def _send_syscall(self, opcode: SyscallOp, payload: bytes, request_id: int):
         if not self._ws:
+            raise ConnectionError("Not connected to relay")
+
+        if self._binary:
+            # The relay fills in our agent ID
+            header = Message(agent_id=self._agent_id, opcode=opcode, payload=payload).header()
+            await self._ws.send(ROUTE_PREFIX.pack(request_id) + header + payload)
             return
 
         msg = {
             "type": "syscall",
+            "request_id": request_id,
             "opcode": int(opcode),
             "payload": base64.b64encode(payload).decode() if payload else ""
         }
@@ -253,14 +328,25 @@ class RemoteAgentClient:
         if model:
             payload["model"] = model
         result = call_llm_service(payload)
-
-        if self._connected and result.get("success"):
-            tokens = int(result.get("tokens", 0) or 0)
-            report = {"tokens": tokens, "success": True}
-            self.call(SyscallOp.SYS_LLM_REPORT, json.dumps(report))
-
+        self._report_llm_usage(result)
         return result
 
+    def think_stream(self, prompt: str, image: bytes = None,
+                     image_mime_type: str = "image/jpeg",
+                     system_instruction: str = None,
+                     thinking_level: str = None,
+                     temperature: float = None,
+                     model: str = None) -> 'LLMStream':
+        """Like think(), but returns an LLMStream that yields text as it is generated."""
+        from .llm_service import stream_llm_service
+        payload = _think_payload(prompt, image, image_mime_type, system_instruction,
+                                 thinking_level, temperature, model)
+        return stream_llm_service(payload, on_complete=self._report_llm_usage)
+
+    def _report_llm_usage(self, result: dict):
+        if self._connected and result.get("success") and not result.get("cached"):
+            self.call(SyscallOp.SYS_LLM_REPORT, json.dumps(_llm_report(result)))
+
     def exec(self, command: str, cwd: str = None, timeout: int = 30) -> dict:
         payload = {"command": command, "timeout": timeout, "async": False}
         if cwd:
@@ -229,20 +229,17 @@ class CloveRunner:
         """Memory/state operations through Clove"""
         try:
             key_count = params.get("key_count", 10)
+            keys = [f"bench_key_{i}" for i in range(key_count)]
 
-            # Store items
-            for i in range(key_count):
-                self.clove_client.state_set(f"bench_key_{i}", f"value_{i}")
+            # Store, retrieve and clean up with one syscall each
+            result = self.clove_client.store_many({key: f"value_{i}" for i, key in enumerate(keys)})
+            if not result.get("success"):
+                return {"success": False, "error": result.get("error")}
 
-            # Retrieve items
-            for i in range(key_count):
-                self.clove_client.state_get(f"bench_key_{i}")
+            self.clove_client.fetch_many(keys)
+            self.clove_client.delete_many(keys)
 
-            # Cleanup
-            for i in range(key_count):
-                self.clove_client.state_delete(f"bench_key_{i}")
-
-            return {"success": True, "stored": key_count}
+            return {"success": True, "stored": result.get("stored", 0)}
         except Exception as e:
             return {"success": False, "error": str(e)}
 
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+SDK Codec Microbenchmark
+
+Measures the SDK-side payload cost of one syscall (encode the request,
+decode the response) for each available codec. Binary values are base64
+strings under JSON and raw bytes under msgpack, as an agent would send them.
+
+No kernel is needed: only the client's serialization work is timed.
+
+Usage:
+    python benchmarks/sdk_codec.py [--iterations N]
+"""
+
+import argparse
+import base64
+import os
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'agents', 'python_sdk'))
+
+from clove_sdk.client import Message, SyscallOp, _decode_response, _encode_payload
+from clove_sdk.codec import available_codecs, get_codec
+
+
+def _state(n: int) -> dict:
+    return {f"field_{i}": {"value": i, "score": i * 0.5, "tags": ["a", "b", "c"]} for i in range(n)}
+
+
+def _image(size: int, binary: bool):
+    data = os.urandom(size)
+    return data if binary else base64.b64encode(data).decode()
+
+
+# name -> (request builder, response builder); builders take binary=bool
+CASES: Dict[str, Tuple[Callable[[bool], dict], Callable[[bool], dict]]] = {
+    "store small": (
+        lambda b: {"key": "agent:state", "value": {"step": 3, "status": "ok"}, "scope": "global"},
+        lambda b: {"success": True, "key": "agent:state"},
+    ),
+    "fetch 100 fields": (
+        lambda b: {"key": "agent:state"},
+        lambda b: {"success": True, "exists": True, "value": _state(100), "scope": "global"},
+    ),
+    "store 64KB image": (
+        lambda b: {"key": "frame", "value": {"mime": "image/jpeg", "data": _image(64 * 1024, b)}},
+        lambda b: {"success": True, "key": "frame"},
+    ),
+    "fetch 256KB image": (
+        lambda b: {"key": "frame"},
+        lambda b: {"success": True, "exists": True,
+                   "value": {"mime": "image/jpeg", "data": _image(256 * 1024, b)}},
+    ),
+}
+
+
+def bench(codec_name: str, request: dict, response: dict, iterations: int) -> List[float]:
+    """Return per-syscall encode+decode times in microseconds"""
+    codec = get_codec(codec_name)
+    reply = Message(agent_id=1, opcode=SyscallOp.SYS_FETCH, payload=codec.encode(response))
+    samples = []
+    for i in range(iterations + 5):
+        start = time.perf_counter()
+        _encode_payload(request, codec)
+        _decode_response(reply, codec=codec)
+        elapsed = (time.perf_counter() - start) * 1e6
+        if i >= 5:  # warmup
+            samples.append(elapsed)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CloveClient payload codec microbenchmark")
+    parser.add_argument("--iterations", type=int, default=500, help="Syscalls per case")
+    args = parser.parse_args()
+
+    codecs = available_codecs()
+    print(f"\n{'='*70}")
+    print(f"  SDK CODECS: {', '.join(codecs)} ({args.iterations} syscalls per case)")
+    print(f"{'='*70}\n")
+    if len(codecs) == 1:
+        print("  msgpack not installed (pip install clove-sdk[msgpack]); JSON only\n")
+
+    print(f"{'Case':<20}{'Codec':<10}{'Mean us':>12}{'Median us':>12}{'Req B':>10}{'Resp B':>10}")
+    print("-" * 74)
+
+    for name, (make_request, make_response) in CASES.items():
+        means = {}
+        for codec_name in codecs:
+            binary = codec_name != "json"
+            request, response = make_request(binary), make_response(binary)
+            samples = bench(codec_name, request, response, args.iterations)
+            codec = get_codec(codec_name)
+            means[codec_name] = statistics.mean(samples)
+            print(f"{name:<20}{codec_name:<10}{means[codec_name]:>12.1f}"
+                  f"{statistics.median(samples):>12.1f}"
+                  f"{len(codec.encode(request)):>10}{len(codec.encode(response)):>10}")
+
+        for codec_name in codecs[1:]:
+            print(f"{'':<20}{'speedup':<10}{means['json'] / means[codec_name]:>11.2f}x")
+        print()
+
+
+if __name__ == "__main__":
+    main()
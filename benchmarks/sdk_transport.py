@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+SDK Transport Microbenchmark
+
+Measures CloveClient framing cost per round trip for 1KB, 64KB and 1MB
+payloads, comparing the default send/recv path with zero_copy mode
+(sendmsg scatter-gather + recv_into).
+
+By default the client talks to an in-process echo peer over a socketpair,
+so only SDK overhead is measured. Pass --kernel to echo through a running
+kernel via SYS_NOOP instead.
+
+Usage:
+    python benchmarks/sdk_transport.py [--iterations N] [--kernel]
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import struct
+import sys
+import threading
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'agents', 'python_sdk'))
+
+from clove_sdk.client import CloveClient, SyscallOp, HEADER_SIZE, MAX_PAYLOAD_SIZE
+
+
+PAYLOAD_SIZES = {
+    "1KB": 1024,
+    "64KB": 64 * 1024,
+    "1MB": MAX_PAYLOAD_SIZE,
+}
+
+
+def _echo_peer(sock: socket.socket):
+    """Echo every frame back unchanged, like the kernel's SYS_NOOP"""
+    buf = bytearray(HEADER_SIZE + MAX_PAYLOAD_SIZE)
+    view = memoryview(buf)
+    try:
+        while True:
+            got = 0
+            while got < HEADER_SIZE:
+                n = sock.recv_into(view[got:HEADER_SIZE])
+                if n == 0:
+                    return
+                got += n
+            size = struct.unpack_from('<Q', buf, 9)[0]
+            total = HEADER_SIZE + size
+            while got < total:
+                n = sock.recv_into(view[got:total])
+                if n == 0:
+                    return
+                got += n
+            sock.sendall(view[:total])
+    except OSError:
+        return
+    finally:
+        sock.close()
+
+
+def _make_client(zero_copy: bool, use_kernel: bool) -> CloveClient:
+    client = CloveClient(zero_copy=zero_copy)
+    if use_kernel:
+        if not client.connect():
+            raise ConnectionError("Failed to connect to Clove kernel")
+        return client
+
+    client_sock, peer_sock = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+    threading.Thread(target=_echo_peer, args=(peer_sock,), daemon=True).start()
+    client._sock = client_sock
+    return client
+
+
+def bench(size: int, zero_copy: bool, iterations: int, use_kernel: bool) -> List[float]:
+    """Return per-round-trip latencies in microseconds"""
+    client = _make_client(zero_copy, use_kernel)
+    payload = b"x" * size
+    samples = []
+    try:
+        for i in range(iterations + 5):
+            start = time.perf_counter()
+            response = client.call(SyscallOp.SYS_NOOP, payload)
+            elapsed = (time.perf_counter() - start) * 1e6
+            if response is None or len(response.payload) != size:
+                raise RuntimeError(f"Bad echo for {size} byte payload")
+            if i >= 5:  # warmup
+                samples.append(elapsed)
+    finally:
+        client.disconnect()
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CloveClient transport microbenchmark")
+    parser.add_argument("--iterations", type=int, default=200, help="Round trips per case")
+    parser.add_argument("--kernel", action="store_true", help="Echo through a running kernel")
+    args = parser.parse_args()
+
+    print(f"\n{'='*64}")
+    print(f"  SDK TRANSPORT: {'kernel SYS_NOOP' if args.kernel else 'socketpair echo'}"
+          f" ({args.iterations} round trips)")
+    print(f"{'='*64}\n")
+    print(f"{'Payload':<10}{'Mode':<12}{'Mean us':>12}{'Median us':>12}{'P95 us':>12}")
+    print("-" * 58)
+
+    results: Dict[str, Dict[str, float]] = {}
+    for label, size in PAYLOAD_SIZES.items():
+        for zero_copy in (False, True):
+            samples = bench(size, zero_copy, args.iterations, args.kernel)
+            mode = "zero_copy" if zero_copy else "default"
+            p95 = sorted(samples)[int(len(samples) * 0.95) - 1]
+            results[f"{label}/{mode}"] = {"mean": statistics.mean(samples)}
+            print(f"{label:<10}{mode:<12}{statistics.mean(samples):>12.1f}"
+                  f"{statistics.median(samples):>12.1f}{p95:>12.1f}")
+
+        base = results[f"{label}/default"]["mean"]
+        fast = results[f"{label}/zero_copy"]["mean"]
+        print(f"{'':<10}{'speedup':<12}{base / fast:>11.2f}x\n")
+
+
+if __name__ == "__main__":
+    main()
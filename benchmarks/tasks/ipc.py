@@ -42,7 +42,8 @@ with CloveClient() as client:
     # Echo messages for 10 seconds
     end_time = time.time() + 10
     while time.time() < end_time:
-        result = client.recv_messages()
+        remaining_ms = max(1, int((end_time - time.time()) * 1000))
+        result = client.recv_messages(wait=True, timeout_ms=remaining_ms)
         if result.get("success"):
             for msg in result.get("messages", []):
                 # Echo back
@@ -50,7 +51,6 @@ with CloveClient() as client:
                     {{"echo": msg.get("data"), "from": "{name}"}},
                     to=msg.get("from_agent_id")
                 )
-        time.sleep(0.01)
 ''')
         return script_path
 
@@ -88,13 +88,9 @@ with CloveClient() as client:
 
         # Wait for response
         response = None
-        timeout = time.time() + 5
-        while time.time() < timeout:
-            recv_result = self.clove_client.recv_messages()
-            if recv_result.get("success") and recv_result.get("messages"):
-                response = recv_result.get("messages")[0]
-                break
-            time.sleep(0.01)
+        recv_result = self.clove_client.recv_messages(wait=True, timeout_ms=5000)
+        if recv_result.get("success") and recv_result.get("messages"):
+            response = recv_result.get("messages")[0]
 
         roundtrip_time = (time.perf_counter() - start) * 1000
 
@@ -151,21 +147,34 @@ with CloveClient() as client:
             "broadcast_time_ms": broadcast_time,
         }
 
-    def state_store_ops(self, key_count: int = 100) -> Dict[str, Any]:
-        """Benchmark state store operations"""
+    def state_store_ops(self, key_count: int = 100, batch: bool = True) -> Dict[str, Any]:
+        """Benchmark state store operations
+
+        With batch, writes, reads and deletes each use a single
+        SYS_MSTORE / SYS_MFETCH / SYS_MDELETE syscall instead of one
+        syscall per key.
+        """
         if not self.clove_client:
             return {"success": False, "error": "Clove client required"}
 
+        keys = [f"bench_key_{i}" for i in range(key_count)]
+
         # Write keys
         write_start = time.perf_counter()
-        for i in range(key_count):
-            self.clove_client.store(f"bench_key_{i}", {"value": i, "data": "x" * 100})
+        if batch:
+            self.clove_client.store_many({key: {"value": i, "data": "x" * 100} for i, key in enumerate(keys)})
+        else:
+            for i, key in enumerate(keys):
+                self.clove_client.store(key, {"value": i, "data": "x" * 100})
         write_time = (time.perf_counter() - write_start) * 1000
 
         # Read keys
         read_start = time.perf_counter()
-        for i in range(key_count):
-            self.clove_client.fetch(f"bench_key_{i}")
+        if batch:
+            self.clove_client.fetch_many(keys)
+        else:
+            for key in keys:
+                self.clove_client.fetch(key)
         read_time = (time.perf_counter() - read_start) * 1000
 
         # List keys
@@ -175,13 +184,17 @@ with CloveClient() as client:
 
         # Delete keys
         delete_start = time.perf_counter()
-        for i in range(key_count):
-            self.clove_client.delete_key(f"bench_key_{i}")
+        if batch:
+            self.clove_client.delete_many(keys)
+        else:
+            for key in keys:
+                self.clove_client.delete_key(key)
         delete_time = (time.perf_counter() - delete_start) * 1000
 
         return {
             "success": True,
             "key_count": key_count,
+            "batch": batch,
             "write_time_ms": write_time,
             "read_time_ms": read_time,
             "list_time_ms": list_time,
@@ -20,6 +20,7 @@ except ImportError:
     RICH_AVAILABLE = False
 
 from cli.relay_api import SyncRelayAPIClient, RelayAPIError
+from cli.commands.machines import stream_relay_logs
 
 
 console = Console() if RICH_AVAILABLE else None
@@ -47,8 +48,12 @@ def agent():
 @click.option('--args', '-a', multiple=True, help='Script arguments')
 @click.option('--relay', '-r', help='Relay server URL (for remote agents)')
 @click.option('--local', '-l', is_flag=True, help='Run locally via SDK')
+@click.option('--follow', '-f', is_flag=True, help='Stream agent output after deploying')
+@click.option('--level', type=click.Choice(['debug', 'info', 'warning', 'error', 'critical']),
+              help='Minimum log level to stream (with --follow)')
+@click.option('--grep', 'pattern', help='Only stream lines matching this regex (with --follow)')
 @click.pass_context
-def run_agent(ctx, script, machine, run_all, env, args, relay, local):
+def run_agent(ctx, script, machine, run_all, env, args, relay, local, follow, level, pattern):
     """Run an agent script on a machine."""
     cfg = ctx.obj['config']
 
@@ -91,7 +96,12 @@ def run_agent(ctx, script, machine, run_all, env, args, relay, local):
     else:
         # Deploy via relay API
         relay_url = relay or cfg.relay_api_url
-        _run_via_relay(cfg, relay_url, machines, script_path, list(args))
+        deployed = _run_via_relay(cfg, relay_url, machines, script_path, list(args))
+
+        if follow and deployed:
+            echo(f"\nFollowing output of {len(deployed)} agent(s) (Ctrl-C to stop)...", style="blue")
+            stream_relay_logs(cfg, relay_url, cfg.relay_url, deployed,
+                              level=level, pattern=pattern, tail=None, follow=True)
 
 
 def _run_local(cfg, machine_id, script_path, args, env_vars):
@@ -113,7 +123,8 @@ def _run_local(cfg, machine_id, script_path, args, env_vars):
 
 
 def _run_via_relay(cfg, relay_url, machines, script_path, args):
-    """Deploy agent via relay API."""
+    """Deploy agent via relay API; returns (machine_id, agent_id) of each deployed agent."""
+    deployed = []
     try:
         client = SyncRelayAPIClient(relay_url, cfg.api_token)
 
@@ -124,6 +135,8 @@ def _run_via_relay(cfg, relay_url, machines, script_path, args):
                 result = client.deploy_agent(str(script_path), mid, args)
                 agent_id = result.get('agent_id', 'unknown')
                 echo(f"  Agent deployed: {agent_id}", style="green")
+                if result.get('agent_id') is not None:
+                    deployed.append((mid, result['agent_id']))
 
                 # Show any output
                 if 'output' in result:
@@ -138,6 +151,8 @@ def _run_via_relay(cfg, relay_url, machines, script_path, args):
         echo(f"Error connecting to relay: {e}", style="bold red")
         sys.exit(1)
 
+    return deployed
+
 
 @agent.command('list')
 @click.option('--machine', '-m', help='Filter by machine ID')
@@ -259,9 +259,18 @@ def ssh_machine(ctx, machine_id):
 @click.argument('machine_id')
 @click.option('--follow', '-f', is_flag=True, help='Follow log output')
 @click.option('--tail', '-n', default=100, help='Number of lines to show')
+@click.option('--agent', 'agent_id', type=int, help='Only this agent\'s output (0: kernel log)')
+@click.option('--level', type=click.Choice(['debug', 'info', 'warning', 'error', 'critical']),
+              help='Minimum log level')
+@click.option('--grep', 'pattern', help='Only lines matching this regex')
+@click.option('--via-relay', is_flag=True, help='Stream through the relay even for Docker machines')
 @click.pass_context
-def logs_machine(ctx, machine_id, follow, tail):
-    """Show logs from a machine."""
+def logs_machine(ctx, machine_id, follow, tail, agent_id, level, pattern, via_relay):
+    """Show logs from a machine.
+
+    Docker machines show the container log; agent filters (or --via-relay,
+    and every other provider) stream agent output through the relay.
+    """
     cfg = ctx.obj['config']
 
     machine = cfg.get_machine(machine_id)
@@ -271,8 +280,14 @@ def logs_machine(ctx, machine_id, follow, tail):
         sys.exit(1)
 
     provider = machine.get('provider', 'unknown')
+    relay_filters = agent_id is not None or level or pattern
 
-    if provider == 'docker':
+    if provider != 'docker' or relay_filters or via_relay:
+        relay_url = machine.get('relay_url', cfg.relay_url)
+        stream_relay_logs(cfg, cfg.relay_api_url, relay_url, [(machine_id, agent_id)],
+                          level=level, pattern=pattern, tail=tail, follow=follow)
+
+    else:
         container_name = f"agentos-{machine.get('name', 'kernel')}"
         cmd = ['docker', 'logs', f'--tail={tail}']
         if follow:
@@ -280,6 +295,27 @@ def logs_machine(ctx, machine_id, follow, tail):
         cmd.append(container_name)
         subprocess.run(cmd)
 
-    else:
-        echo(f"Logs command not implemented for provider: {provider}", style="yellow")
-        echo("Use SSH to access logs directly")
+
+def stream_relay_logs(cfg, api_url, relay_url, targets, **filters):
+    """Print log lines streamed through the relay until done or Ctrl-C.
+
+    targets are (machine_id, agent_id) pairs; agent_id None follows every
+    log on the machine.
+    """
+    client = SyncRelayAPIClient(api_url, cfg.api_token)
+    prefix_machine = len(targets) > 1
+
+    try:
+        for chunk in client.stream_logs(relay_url, targets, **filters):
+            if 'error' in chunk:
+                echo(f"[{chunk['machine_id']}] {chunk['error']}", style="bold red")
+                continue
+            prefix = f"{chunk['machine_id']}/" if prefix_machine else ""
+            prefix += chunk.get('name') or str(chunk['agent_id'])
+            for line in chunk['lines']:
+                click.echo(f"[{prefix}] {line}")
+    except KeyboardInterrupt:
+        pass
+    except RelayAPIError as e:
+        echo(f"Log stream failed: {e}", style="bold red")
+        sys.exit(1)
@@ -2,15 +2,20 @@
 """
 AgentOS Relay REST API Client
 
-Provides a Python client for the Relay Server's REST API.
+Provides a Python client for the Relay Server's REST API, plus log
+streaming over the relay WebSocket (stream_logs).
 """
 
 import aiohttp
 import asyncio
+import hashlib
 import json
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, AsyncIterator, Iterator, Tuple
 from dataclasses import dataclass
 
+# Seconds before a dropped log stream reconnects (and resumes from its offsets)
+LOG_RECONNECT_DELAY = 2.0
+
 
 @dataclass
 class MachineInfo:
@@ -155,16 +160,29 @@ class RelayAPIClient:
 
     async def deploy_agent(self, script_path: str, machine_id: str,
                           args: List[str] = None) -> Dict[str, Any]:
-        """Deploy an agent to a machine."""
+        """Deploy an agent to a machine.
+
+        The script is named by its SHA-256 first; its content is only
+        uploaded if the relay answers 412 (not in its script cache).
+        """
         # Read the script content
         with open(script_path) as f:
             script_content = f.read()
 
-        return await self._request('POST', '/api/v1/agents/deploy', {
+        deploy = {
             'machine_id': machine_id,
-            'script_content': script_content,
             'script_name': script_path,
+            'script_sha256': hashlib.sha256(script_content.encode()).hexdigest(),
             'args': args or []
+        }
+        try:
+            return await self._request('POST', '/api/v1/agents/deploy', deploy)
+        except RelayAPIError as e:
+            if e.status_code != 412:
+                raise
+        return await self._request('POST', '/api/v1/agents/deploy', {
+            **deploy,
+            'script_content': script_content
         })
 
     async def stop_agent(self, machine_id: str, agent_id: int) -> bool:
@@ -188,12 +206,14 @@ class RelayAPIClient:
 
     async def create_agent_token(self, target_machine: str,
                                  name: str = "",
-                                 expires_hours: int = 24) -> Dict[str, Any]:
-        """Create a token for an agent."""
+                                 expires_hours: int = 24,
+                                 scope: str = "") -> Dict[str, Any]:
+        """Create a token for an agent ("operator" scope may follow logs)."""
         return await self._request('POST', '/api/v1/tokens/agent', {
             'target_machine': target_machine,
             'name': name,
-            'expires_hours': expires_hours
+            'expires_hours': expires_hours,
+            'scope': scope
         })
 
     async def list_tokens(self) -> List[Dict[str, Any]]:
@@ -206,6 +226,128 @@ class RelayAPIClient:
         await self._request('DELETE', f'/api/v1/tokens/{token_id}')
         return True
 
+    # =========================================================================
+    # Log Streaming
+    # =========================================================================
+
+    async def stream_logs(self, relay_url: str, machine_id: str,
+                          agent_id: int = None, level: str = None,
+                          pattern: str = None, tail: Optional[int] = 100,
+                          follow: bool = True) -> AsyncIterator[Dict[str, Any]]:
+        """Yield log chunks from a machine as the kernel pushes them.
+
+        Connects to the relay WebSocket as a remote agent (with a
+        short-lived operator-scoped agent token) and subscribes to one agent's log, or
+        every log on the machine when agent_id is None. `tail` lines of
+        backlog come first (None: the whole log); filtering by level and
+        regex happens on the machine. Each chunk is
+        {'agent_id', 'name', 'offset', 'next_offset', 'lines'}; a dropped
+        connection is reopened and resumes from the last offsets. Every
+        connection gets a fresh token and the previous one is revoked, so a
+        stream can outlive the token's one-hour expiry.
+        """
+        session = await self._get_session()
+        offsets: Dict[str, int] = {}
+        token = None
+
+        try:
+            while True:
+                try:
+                    fresh = await self.create_agent_token(machine_id, name='clove-logs',
+                                                          expires_hours=1, scope='operator')
+                except RelayAPIError as e:
+                    # Keep following through a relay restart; HTTP errors are final
+                    if not token or e.status_code:
+                        raise
+                    await asyncio.sleep(LOG_RECONNECT_DELAY)
+                    continue
+                if token:
+                    await self._revoke_quietly(token['id'])
+                token = fresh
+                try:
+                    async with session.ws_connect(relay_url, heartbeat=30) as ws:
+                        await ws.send_json({
+                            'type': 'agent_auth',
+                            'token': token['token'],
+                            'target_machine': machine_id,
+                            'name': 'clove-logs'
+                        })
+                        reply = await ws.receive_json()
+                        if reply.get('type') != 'auth_ok':
+                            raise RelayAPIError(reply.get('error', 'Relay authentication failed'))
+
+                        await ws.send_json({
+                            'type': 'log_subscribe',
+                            'subscription': 1,
+                            'agent_id': agent_id,
+                            'level': level,
+                            'pattern': pattern,
+                            'tail': 0 if offsets else tail,
+                            'offsets': offsets,
+                            'follow': follow
+                        })
+
+                        async for msg in ws:
+                            if msg.type != aiohttp.WSMsgType.TEXT:
+                                continue
+                            data = json.loads(msg.data)
+                            msg_type = data.get('type')
+                            if msg_type == 'log_chunk':
+                                offsets[str(data['agent_id'])] = data['next_offset']
+                                yield data
+                            elif msg_type == 'log_end':
+                                return
+                            elif msg_type == 'log_error':
+                                raise RelayAPIError(data.get('error', 'Log stream failed'))
+                except aiohttp.ClientError as e:
+                    if not follow:
+                        raise RelayAPIError(f"Connection error: {e}")
+
+                if not follow:
+                    return
+                await asyncio.sleep(LOG_RECONNECT_DELAY)
+        finally:
+            if token:
+                await self._revoke_quietly(token['id'])
+
+    async def _revoke_quietly(self, token_id: str) -> None:
+        try:
+            await self.revoke_token(token_id)
+        except RelayAPIError:
+            pass
+
+    async def stream_many(self, relay_url: str, targets: List[Tuple[str, Optional[int]]],
+                          **filters) -> AsyncIterator[Dict[str, Any]]:
+        """Merge the log streams of several (machine_id, agent_id) targets.
+
+        Chunks carry their 'machine_id'; a stream that fails yields
+        {'machine_id', 'error'} and the others carry on.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def pump(machine_id: str, agent_id: Optional[int]):
+            try:
+                async for chunk in self.stream_logs(relay_url, machine_id, agent_id, **filters):
+                    await queue.put({'machine_id': machine_id, **chunk})
+            except RelayAPIError as e:
+                await queue.put({'machine_id': machine_id, 'error': str(e)})
+            finally:
+                await queue.put(None)
+
+        tasks = [asyncio.ensure_future(pump(mid, aid)) for mid, aid in targets]
+        try:
+            running = len(tasks)
+            while running:
+                item = await queue.get()
+                if item is None:
+                    running -= 1
+                else:
+                    yield item
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
 
 def run_async(coro):
     """Helper to run async functions from sync code."""
@@ -262,9 +404,9 @@ class SyncRelayAPIClient:
         return self._run(lambda c: c.create_machine_token(machine_id, name))
 
     def create_agent_token(self, target_machine: str, name: str = "",
-                          expires_hours: int = 24) -> Dict:
+                          expires_hours: int = 24, scope: str = "") -> Dict:
         return self._run(lambda c: c.create_agent_token(
-            target_machine, name, expires_hours
+            target_machine, name, expires_hours, scope
         ))
 
     def list_tokens(self) -> List[Dict]:
@@ -272,3 +414,26 @@ class SyncRelayAPIClient:
 
     def revoke_token(self, token_id: str) -> bool:
         return self._run(lambda c: c.revoke_token(token_id))
+
+    def stream_logs(self, relay_url: str, targets: List[Tuple[str, Optional[int]]],
+                    **filters) -> Iterator[Dict[str, Any]]:
+        """Yield log chunks from every (machine_id, agent_id) target as they arrive"""
+        loop = asyncio.new_event_loop()
+        client = RelayAPIClient(self.api_url, self.api_token)
+        chunks = client.stream_many(relay_url, targets, **filters)
+        try:
+            while True:
+                step = loop.create_task(chunks.__anext__())
+                try:
+                    yield loop.run_until_complete(step)
+                except StopAsyncIteration:
+                    return
+                finally:
+                    # Interrupted (e.g. Ctrl-C): stop the stream before closing it
+                    if not step.done():
+                        step.cancel()
+                        loop.run_until_complete(asyncio.gather(step, return_exceptions=True))
+        finally:
+            loop.run_until_complete(chunks.aclose())
+            loop.run_until_complete(client.close())
+            loop.close()
@@ -49,14 +49,17 @@ def wait_for_name(client: CloveClient, name: str, timeout_s: int = 10) -> bool:
 
 def wait_for_stage(client: CloveClient, stage: str, timeout_s: int) -> Dict[str, Any] | None:
     deadline = time.time() + timeout_s
-    while time.time() < deadline:
-        result = client.recv_messages()
+    while True:
+        remaining_ms = int((deadline - time.time()) * 1000)
+        if remaining_ms <= 0:
+            return None
+        result = client.recv_messages(wait=True, timeout_ms=remaining_ms)
+        if not result.get("success"):
+            return None
         for msg in result.get("messages", []):
             payload = msg.get("message", {})
             if payload.get("type") == "stage_complete" and payload.get("stage") == stage:
                 return payload
-        time.sleep(0.2)
-    return None
 
 
 def build_stage_message(
@@ -93,18 +93,15 @@ def normalize_limits(limits: Dict[str, Any]) -> Dict[str, Any]:
 
 def wait_for_message(
     client,
-    poll_interval: float = 0.2,
     expected_type: str | None = None,
     expected_stage: str | None = None,
 ) -> Dict[str, Any]:
-    while True:
-        result = client.recv_messages()
-        for msg in result.get("messages", []):
-            payload = msg.get("message", {})
-            if payload:
-                if expected_type and payload.get("type") != expected_type:
-                    continue
-                if expected_stage and payload.get("stage") != expected_stage:
-                    continue
-                return payload
-        time.sleep(poll_interval)
+    for msg in client.messages():
+        payload = msg.get("message", {})
+        if payload:
+            if expected_type and payload.get("type") != expected_type:
+                continue
+            if expected_stage and payload.get("stage") != expected_stage:
+                continue
+            return payload
+    raise ConnectionError("Lost kernel connection while waiting for a message")
@@ -6,6 +6,19 @@ Provides HTTP API endpoints for:
 - Fleet management (machines list, status)
 - Token management (create, revoke)
 - Agent deployment and management
+
+With a sharded relay (relay_server.py --workers N) the API runs in the
+supervisor process and reaches the workers' routers through ShardControl:
+status and agent lists are aggregated across shards, kernel commands go to
+the shard that owns the machine, and token changes are pushed to every
+shard. A token request fails with 503 if a shard does not confirm the
+change (a new token is withdrawn again); the supervisor keeps replaying its
+auth state to that shard until it answers.
+
+Deploys are content-addressed (see script_cache.py): a request may carry
+script_sha256 alone, and is answered 412 if the relay does not have that
+script cached. Kernels are sent the hash first and only get the script
+bytes when the tunnel reports missing_script.
 """
 
 import asyncio
@@ -16,20 +29,28 @@ from datetime import datetime
 from typing import Dict, Any, Optional
 from aiohttp import web
 
-from auth import get_auth_manager
-from router import get_router
+from auth import get_auth_manager, OPERATOR_SCOPE
+from router import get_router, COMMAND_TIMEOUT
 from fleet import get_fleet_manager
 from tokens import get_token_store
+from shard import ShardControl, CONTROL_TIMEOUT
+from script_cache import ScriptCache, script_digest
 
 logger = logging.getLogger(__name__)
 
+# Machines a batch deploy sends to at once
+BATCH_DEPLOY_CONCURRENCY = 32
+
 
 class RelayAPI:
     """REST API for the AgentOS Relay Server."""
 
-    def __init__(self, host: str = "0.0.0.0", port: int = 8766):
+    def __init__(self, host: str = "0.0.0.0", port: int = 8766,
+                 shards: Optional[ShardControl] = None):
         self.host = host
         self.port = port
+        self.shards = shards  # None: the router lives in this process
+        self.scripts = ScriptCache()
         self.app = web.Application(middlewares=[self._error_middleware])
         self._setup_routes()
         self._runner = None
@@ -48,6 +69,7 @@ class RelayAPI:
         # Agent endpoints
         self.app.router.add_get('/api/v1/agents', self.list_agents)
         self.app.router.add_post('/api/v1/agents/deploy', self.deploy_agent)
+        self.app.router.add_post('/api/v1/agents/deploy/batch', self.deploy_batch)
         self.app.router.add_post('/api/v1/agents/{agent_id}/stop', self.stop_agent)
 
         # Token endpoints
@@ -73,6 +95,48 @@ class RelayAPI:
                 'status': 500
             }, status=500)
 
+    # =========================================================================
+    # Router Access (local or sharded)
+    # =========================================================================
+
+    async def _router_status(self) -> Dict[str, Any]:
+        if self.shards:
+            return await self.shards.status()
+        return get_router().get_status()
+
+    async def _is_kernel_connected(self, machine_id: str) -> bool:
+        if self.shards:
+            reply = await self.shards.request_owner(machine_id, 'kernel_connected')
+            return reply.get('connected', False)
+        return get_router().is_kernel_connected(machine_id)
+
+    async def _send_command(self, machine_id: str, message: Dict[str, Any],
+                            timeout: float = COMMAND_TIMEOUT) -> Dict[str, Any]:
+        """Run a command on a kernel and return its result ({'success': ..., ...})"""
+        if self.shards:
+            return await self.shards.request_owner(
+                machine_id, 'command', reply_timeout=timeout + CONTROL_TIMEOUT,
+                message=message, timeout=timeout
+            )
+        return await get_router().send_command(machine_id, message, timeout)
+
+    async def _sync_shards(self, op: str, **params):
+        """Push a token change to every shard; 503 if any does not confirm it"""
+        if not self.shards:
+            return
+        failed = await self.shards.sync(op, **params)
+        if failed:
+            raise web.HTTPServiceUnavailable(
+                reason=f"Relay shard(s) {', '.join(map(str, failed))} did not apply {op}"
+            )
+
+    @staticmethod
+    def _command_error(result: Dict[str, Any], action: str) -> web.HTTPException:
+        reason = f"Failed to {action}: {result.get('error', 'unknown error')}"
+        if result.get('timeout'):
+            return web.HTTPGatewayTimeout(reason=reason)
+        return web.HTTPBadGateway(reason=reason)
+
     # =========================================================================
     # Status Endpoints
     # =========================================================================
@@ -83,14 +147,14 @@ class RelayAPI:
 
     async def get_status(self, request: web.Request) -> web.Response:
         """Get overall relay server status."""
-        router = get_router()
         fleet = get_fleet_manager()
 
         status = {
             'server': 'running',
             'timestamp': datetime.now().isoformat(),
-            **router.get_status(),
-            'fleet': fleet.get_summary()
+            **(await self._router_status()),
+            'fleet': fleet.get_summary(),
+            'script_cache': self.scripts.stats()
         }
 
         return web.json_response(status)
@@ -102,12 +166,13 @@ class RelayAPI:
     async def list_machines(self, request: web.Request) -> web.Response:
         """List all registered machines."""
         fleet = get_fleet_manager()
-        router = get_router()
+        status = await self._router_status()
+        connected = {k['machine_id'] for k in status['kernels']}
 
         machines = []
         for mid, info in fleet.list_machines().items():
             # Check if machine is connected
-            is_connected = router.is_kernel_connected(mid)
+            is_connected = mid in connected
             machines.append({
                 'machine_id': mid,
                 'provider': info.get('provider', 'unknown'),
@@ -124,13 +189,12 @@ class RelayAPI:
         """Get details of a specific machine."""
         machine_id = request.match_info['machine_id']
         fleet = get_fleet_manager()
-        router = get_router()
 
         machine = fleet.get_machine(machine_id)
         if not machine:
             raise web.HTTPNotFound(reason=f'Machine not found: {machine_id}')
 
-        is_connected = router.is_kernel_connected(machine_id)
+        is_connected = await self._is_kernel_connected(machine_id)
 
         return web.json_response({
             'machine_id': machine_id,
@@ -187,73 +251,122 @@ class RelayAPI:
     async def list_agents(self, request: web.Request) -> web.Response:
         """List running agents."""
         machine_id = request.query.get('machine_id')
-        router = get_router()
 
-        if machine_id:
-            agents = router.list_remote_agents_for_kernel(machine_id)
+        if machine_id and self.shards:
+            reply = await self.shards.request_owner(machine_id, 'list_agents')
+            agents = reply.get('agents', [])
+        elif machine_id:
+            agents = get_router().list_remote_agents_for_kernel(machine_id)
         else:
             agents = [
-                {
-                    'agent_id': a.agent_id,
-                    'agent_name': a.agent_name,
-                    'target_machine': a.target_machine,
-                    'connected_at': a.connected_at.isoformat(),
-                    'syscalls_sent': a.syscalls_sent,
-                    'responses_received': a.responses_received,
-                    'status': 'running'
-                }
-                for a in router.remote_agents.values()
+                {**a, 'status': 'running'}
+                for a in (await self._router_status())['agents']
             ]
 
         return web.json_response({'agents': agents})
 
+    def _deploy_message(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        script_content = data.get('script_content')
+        script_sha256 = data.get('script_sha256')
+        if not script_content and not script_sha256:
+            raise web.HTTPBadRequest(reason='script_content or script_sha256 is required')
+
+        if script_content:
+            content = script_content.encode()
+            if script_sha256 and script_sha256 != script_digest(content):
+                raise web.HTTPBadRequest(reason='script_sha256 does not match script_content')
+            script_sha256 = self.scripts.put(content)
+        elif self.scripts.get(script_sha256) is None:
+            raise web.HTTPPreconditionFailed(reason=f'Script not cached: {script_sha256}')
+
+        return {
+            'type': 'deploy_agent',
+            'script_name': data.get('script_name', 'agent.py'),
+            'script_sha256': script_sha256,
+            'args': data.get('args', [])
+        }
+
+    async def _deploy(self, machine_id: str, deploy_msg: Dict[str, Any],
+                      timeout: float) -> Dict[str, Any]:
+        """Deploy to one machine; returns the kernel's result"""
+        if not await self._is_kernel_connected(machine_id):
+            return {'success': False, 'error': f'Kernel {machine_id} not connected',
+                    'not_connected': True}
+
+        # Hash only first; the script goes over the tunnel just once per machine
+        result = await self._send_command(machine_id, deploy_msg, timeout)
+        if not result.get('missing_script'):
+            return result
+
+        content = self.scripts.get(deploy_msg['script_sha256'])
+        if content is None:
+            return {'success': False, 'error': 'Script evicted from relay cache during deploy'}
+        return await self._send_command(machine_id, {
+            **deploy_msg,
+            'script_content': base64.b64encode(content).decode()
+        }, timeout)
+
     async def deploy_agent(self, request: web.Request) -> web.Response:
-        """Deploy an agent to a machine."""
+        """Deploy an agent to a machine and wait for the kernel to start it."""
         data = await request.json()
 
         machine_id = data.get('machine_id')
-        script_content = data.get('script_content')
-        script_name = data.get('script_name', 'agent.py')
-
         if not machine_id:
             raise web.HTTPBadRequest(reason='machine_id is required')
-        if not script_content:
-            raise web.HTTPBadRequest(reason='script_content is required')
-
-        router = get_router()
+        deploy_msg = self._deploy_message(data)
 
-        # Check if kernel is connected
-        if not router.is_kernel_connected(machine_id):
-            raise web.HTTPBadRequest(reason=f'Kernel {machine_id} not connected')
-
-        # Get kernel connection
-        kernel = router.get_kernel(machine_id)
-        if not kernel:
-            raise web.HTTPNotFound(reason=f'Kernel not found: {machine_id}')
-
-        # Send deploy command to kernel
-        deploy_msg = {
-            'type': 'deploy_agent',
-            'script_name': script_name,
-            'script_content': base64.b64encode(script_content.encode()).decode(),
-            'args': data.get('args', [])
-        }
+        result = await self._deploy(machine_id, deploy_msg, data.get('timeout', COMMAND_TIMEOUT))
+        if result.get('not_connected'):
+            raise web.HTTPBadRequest(reason=result['error'])
+        if not result.get('success'):
+            raise self._command_error(result, 'deploy')
 
-        try:
-            await kernel.ws.send(json.dumps(deploy_msg))
+        return web.json_response({
+            'status': 'running',
+            'machine_id': machine_id,
+            'script_name': deploy_msg['script_name'],
+            'agent_id': result.get('agent_id'),
+            'name': result.get('name'),
+            'pid': result.get('pid')
+        }, status=201)
 
-            # Wait for response (with timeout)
-            # Note: In production, this should use a proper request-response mechanism
-            await asyncio.sleep(0.5)
+    async def deploy_batch(self, request: web.Request) -> web.Response:
+        """Deploy one script to many machines concurrently."""
+        data = await request.json()
 
-            return web.json_response({
-                'status': 'deploying',
-                'machine_id': machine_id,
-                'script_name': script_name
-            }, status=202)
+        machine_ids = data.get('machine_ids')
+        if not machine_ids or not isinstance(machine_ids, list):
+            raise web.HTTPBadRequest(reason='machine_ids must be a non-empty list')
+        concurrency = data.get('concurrency', BATCH_DEPLOY_CONCURRENCY)
+        if not isinstance(concurrency, int) or isinstance(concurrency, bool) or concurrency < 1:
+            raise web.HTTPBadRequest(reason='concurrency must be an integer >= 1')
+        deploy_msg = self._deploy_message(data)
+        timeout = data.get('timeout', COMMAND_TIMEOUT)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def deploy_one(machine_id: str) -> Dict[str, Any]:
+            async with semaphore:
+                try:
+                    result = await self._deploy(machine_id, deploy_msg, timeout)
+                except Exception as e:
+                    result = {'success': False, 'error': str(e)}
+            entry = {'machine_id': machine_id, 'success': bool(result.get('success'))}
+            if entry['success']:
+                entry.update(agent_id=result.get('agent_id'), name=result.get('name'),
+                             pid=result.get('pid'))
+            else:
+                entry['error'] = result.get('error', 'unknown error')
+            return entry
+
+        results = await asyncio.gather(*(deploy_one(mid) for mid in machine_ids))
+        succeeded = sum(1 for r in results if r['success'])
 
-        except Exception as e:
-            raise web.HTTPInternalServerError(reason=f'Failed to deploy: {e}')
+        return web.json_response({
+            'script_name': deploy_msg['script_name'],
+            'results': results,
+            'succeeded': succeeded,
+            'failed': len(results) - succeeded
+        })
 
     async def stop_agent(self, request: web.Request) -> web.Response:
         """Stop a running agent."""
@@ -264,10 +377,7 @@ class RelayAPI:
         if not machine_id:
             raise web.HTTPBadRequest(reason='machine_id is required')
 
-        router = get_router()
-        kernel = router.get_kernel(machine_id)
-
-        if not kernel:
+        if not await self._is_kernel_connected(machine_id):
             raise web.HTTPNotFound(reason=f'Kernel not found: {machine_id}')
 
         # Send stop command to kernel
@@ -276,11 +386,12 @@ class RelayAPI:
             'agent_id': agent_id
         }
 
-        try:
-            await kernel.ws.send(json.dumps(stop_msg))
-            return web.json_response({'stopped': agent_id})
-        except Exception as e:
-            raise web.HTTPInternalServerError(reason=f'Failed to stop agent: {e}')
+        result = await self._send_command(machine_id, stop_msg, data.get('timeout', COMMAND_TIMEOUT))
+        if not result.get('success'):
+            if result.get('not_found'):
+                raise web.HTTPNotFound(reason=f'Agent not found: {agent_id}')
+            raise self._command_error(result, 'stop agent')
+        return web.json_response({'stopped': agent_id})
 
     # =========================================================================
     # Token Endpoints
@@ -309,7 +420,19 @@ class RelayAPI:
 
         # Also register in auth manager
         auth = get_auth_manager()
+        previous = auth.get_machine_info(machine_id)
         auth.register_machine(machine_id, token)
+        try:
+            await self._sync_shards('register_machine', machine_id=machine_id, token=token)
+        except web.HTTPServiceUnavailable:
+            # Withdraw the token; shards that took it get the old state replayed
+            if previous:
+                auth.machines[machine_id] = previous
+            else:
+                auth.machines.pop(machine_id, None)
+            token_store.delete_token(token_store.find_token_id(token))
+            self.shards.mark_stale()
+            raise
 
         return web.json_response({
             'token': token,
@@ -325,6 +448,10 @@ class RelayAPI:
         if not target_machine:
             raise web.HTTPBadRequest(reason='target_machine is required')
 
+        scope = data.get('scope') or ''
+        if scope not in ('', OPERATOR_SCOPE):
+            raise web.HTTPBadRequest(reason=f'Unknown token scope: {scope}')
+
         token_store = get_token_store()
         auth = get_auth_manager()
 
@@ -332,7 +459,8 @@ class RelayAPI:
         token = auth.create_agent_token(
             agent_name=data.get('name', 'api-agent'),
             target_machine=target_machine,
-            expires_in_hours=expires_hours
+            expires_in_hours=expires_hours,
+            scope=scope
         )
 
         # Store token metadata
@@ -340,14 +468,27 @@ class RelayAPI:
             token=token,
             target_machine=target_machine,
             name=data.get('name', ''),
-            expires_hours=expires_hours
+            expires_hours=expires_hours,
+            scope=scope
         )
 
+        try:
+            await self._sync_shards(
+                'add_agent_token', token=token, name=data.get('name', 'api-agent'),
+                target_machine=target_machine, expires_hours=expires_hours, scope=scope
+            )
+        except web.HTTPServiceUnavailable:
+            auth.revoke_agent_token(token)
+            token_store.delete_token(token_id)
+            self.shards.mark_stale()
+            raise
+
         return web.json_response({
             'token': token,
             'id': token_id,
             'target_machine': target_machine,
-            'type': 'agent'
+            'type': 'agent',
+            'scope': scope
         }, status=201)
 
     async def revoke_token(self, request: web.Request) -> web.Response:
@@ -355,9 +496,17 @@ class RelayAPI:
         token_id = request.match_info['token_id']
         token_store = get_token_store()
 
+        record = token_store.tokens.get(token_id)
         if not token_store.revoke_token(token_id):
             raise web.HTTPNotFound(reason=f'Token not found: {token_id}')
 
+        # Agent connections are authenticated by the AuthManager, so the
+        # token stops working only once it is gone there (and on every shard)
+        if record.type == 'agent':
+            # Stays revoked here; shards that miss it are replayed the state
+            get_auth_manager().revoke_agent_token_hash(record.token_hash)
+            await self._sync_shards('revoke_agent_token', token_hash=record.token_hash)
+
         return web.json_response({'revoked': token_id})
 
     # =========================================================================
@@ -385,9 +534,10 @@ class RelayAPI:
 _api: Optional[RelayAPI] = None
 
 
-def get_api(host: str = "0.0.0.0", port: int = 8766) -> RelayAPI:
+def get_api(host: str = "0.0.0.0", port: int = 8766,
+            shards: Optional[ShardControl] = None) -> RelayAPI:
     """Get or create the global API instance."""
     global _api
     if _api is None:
-        _api = RelayAPI(host, port)
+        _api = RelayAPI(host, port, shards)
     return _api
@@ -13,6 +13,10 @@ from dataclasses import dataclass, field
 from typing import Dict, Optional, Set
 from datetime import datetime
 
+# Agent token scope that may follow logs on its target machine (every
+# deployed agent's output and the kernel log)
+OPERATOR_SCOPE = "operator"
+
 
 @dataclass
 class MachineInfo:
@@ -35,6 +39,10 @@ class AgentToken:
     expires_at: Optional[datetime] = None
     permissions: Dict = field(default_factory=dict)
 
+    @property
+    def is_operator(self) -> bool:
+        return self.permissions.get("scope") == OPERATOR_SCOPE
+
 
 class AuthManager:
     """Manages authentication for kernels and remote agents"""
@@ -89,9 +97,15 @@ class AuthManager:
         return False
 
     def create_agent_token(self, agent_name: str, target_machine: str,
-                          expires_in_hours: int = 24) -> str:
+                          expires_in_hours: int = 24, scope: str = "") -> str:
         """Create a new agent token"""
         token = secrets.token_urlsafe(32)
+        self.add_agent_token(token, agent_name, target_machine, expires_in_hours, scope)
+        return token
+
+    def add_agent_token(self, token: str, agent_name: str, target_machine: str,
+                        expires_in_hours: int = 24, scope: str = ""):
+        """Accept an agent token issued elsewhere (e.g. by the sharded relay's API)"""
         token_hash = self._hash_token(token)
 
         expires_at = None
@@ -104,11 +118,10 @@ class AuthManager:
             token_hash=token_hash,
             agent_name=agent_name,
             target_machine=target_machine,
-            expires_at=expires_at
+            expires_at=expires_at,
+            permissions={"scope": scope} if scope else {}
         )
 
-        return token
-
     def validate_agent_token(self, token: str, target_machine: str) -> Optional[AgentToken]:
         """Validate an agent token and check if it can connect to target machine"""
         token_hash = self._hash_token(token)
@@ -119,7 +132,8 @@ class AuthManager:
                 return AgentToken(
                     token_hash=token_hash,
                     agent_name="dev-agent",
-                    target_machine=target_machine
+                    target_machine=target_machine,
+                    permissions={"scope": OPERATOR_SCOPE}
                 )
             return None
 
@@ -151,11 +165,47 @@ class AuthManager:
 
     def revoke_agent_token(self, token: str) -> bool:
         """Revoke an agent token"""
-        token_hash = self._hash_token(token)
-        if token_hash in self.agent_tokens:
-            del self.agent_tokens[token_hash]
-            return True
-        return False
+        return self.revoke_agent_token_hash(self._hash_token(token))
+
+    def revoke_agent_token_hash(self, token_hash: str) -> bool:
+        """Revoke an agent token by its SHA-256 hash (all the TokenStore keeps)"""
+        return self.agent_tokens.pop(token_hash, None) is not None
+
+    def export_state(self) -> Dict:
+        """Machine and agent token hashes, for replaying to relay shards"""
+        return {
+            "machines": {mid: m.token_hash for mid, m in self.machines.items()},
+            "agent_tokens": [
+                {
+                    "token_hash": t.token_hash,
+                    "agent_name": t.agent_name,
+                    "target_machine": t.target_machine,
+                    "expires_at": t.expires_at.timestamp() if t.expires_at else None,
+                    "permissions": t.permissions,
+                }
+                for t in self.agent_tokens.values()
+            ],
+        }
+
+    def load_state(self, state: Dict):
+        """Replace machine and agent tokens with an export_state() snapshot"""
+        machines = {}
+        for machine_id, token_hash in state.get("machines", {}).items():
+            machine = self.machines.get(machine_id) or MachineInfo(machine_id, token_hash)
+            machine.token_hash = token_hash
+            machines[machine_id] = machine
+        self.machines = machines
+
+        self.agent_tokens = {
+            t["token_hash"]: AgentToken(
+                token_hash=t["token_hash"],
+                agent_name=t["agent_name"],
+                target_machine=t["target_machine"],
+                expires_at=datetime.fromtimestamp(t["expires_at"]) if t.get("expires_at") else None,
+                permissions=t.get("permissions", {})
+            )
+            for t in state.get("agent_tokens", [])
+        }
 
     def get_machine_info(self, machine_id: str) -> Optional[MachineInfo]:
         """Get information about a machine"""
@@ -6,7 +6,6 @@ Manages the fleet of deployed AgentOS kernels.
 Tracks machine metadata, status, and deployment information.
 """
 
-import json
 import os
 import logging
 from datetime import datetime
@@ -14,6 +13,8 @@ from pathlib import Path
 from typing import Dict, Any, Optional, List
 from dataclasses import dataclass, field, asdict
 
+from persist import StateFile
+
 logger = logging.getLogger(__name__)
 
 
@@ -46,35 +47,28 @@ class FleetManager:
     def __init__(self, data_dir: Path = None):
         self.data_dir = data_dir or FLEET_DATA_DIR
         self.machines: Dict[str, MachineRecord] = {}
+        self._state = StateFile(self.data_dir / 'machines.json', 'machines', lambda: self.machines)
         self._load_state()
 
     def _load_state(self):
         """Load fleet state from disk."""
         self.data_dir.mkdir(parents=True, exist_ok=True)
-        state_file = self.data_dir / 'machines.json'
-
-        if state_file.exists():
-            try:
-                with open(state_file) as f:
-                    data = json.load(f)
-                    for mid, mdata in data.get('machines', {}).items():
-                        self.machines[mid] = MachineRecord.from_dict(mdata)
-                logger.info(f"Loaded {len(self.machines)} machines from state")
-            except Exception as e:
-                logger.error(f"Failed to load fleet state: {e}")
 
-    def _save_state(self):
-        """Save fleet state to disk."""
-        state_file = self.data_dir / 'machines.json'
         try:
-            data = {
-                'machines': {mid: m.to_dict() for mid, m in self.machines.items()},
-                'updated_at': datetime.now().isoformat()
-            }
-            with open(state_file, 'w') as f:
-                json.dump(data, f, indent=2)
+            for mid, mdata in self._state.load().items():
+                self.machines[mid] = MachineRecord.from_dict(mdata)
+            if self.machines:
+                logger.info(f"Loaded {len(self.machines)} machines from state")
         except Exception as e:
-            logger.error(f"Failed to save fleet state: {e}")
+            logger.error(f"Failed to load fleet state: {e}")
+
+    def _save_state(self, machine_id: str):
+        """Schedule a write of the changed machine (coalesced, see persist.py)."""
+        self._state.changed(machine_id)
+
+    def flush(self):
+        """Write pending fleet changes to disk now."""
+        self._state.flush()
 
     def register_machine(self, machine_id: str, provider: str,
                         ip_address: str = "", metadata: Dict = None) -> MachineRecord:
@@ -97,7 +91,7 @@ class FleetManager:
             )
             self.machines[machine_id] = machine
 
-        self._save_state()
+        self._save_state(machine_id)
         logger.info(f"Registered machine: {machine_id} ({provider})")
         return machine
 
@@ -107,7 +101,7 @@ class FleetManager:
             return False
 
         del self.machines[machine_id]
-        self._save_state()
+        self._save_state(machine_id)
         logger.info(f"Removed machine: {machine_id}")
         return True
 
@@ -125,7 +119,7 @@ class FleetManager:
         if machine_id in self.machines:
             self.machines[machine_id].status = status
             self.machines[machine_id].last_seen = datetime.now().isoformat()
-            self._save_state()
+            self._save_state(machine_id)
 
     def mark_connected(self, machine_id: str):
         """Mark a machine as connected."""
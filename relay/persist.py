@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+AgentOS Relay Server - State Persistence
+
+Write-behind storage for the relay's JSON state files (fleet, tokens).
+
+Stores report which record keys changed; writes are coalesced over a short
+window instead of rewriting the file on every mutation. The state file is
+replaced atomically (temp file + os.replace), so a crash leaves either the
+old or the new snapshot. In journal mode, changed records are appended to
+<file>.journal instead and the snapshot is only rewritten (compacted) once
+the journal grows past a threshold.
+
+Environment Variables:
+    RELAY_PERSIST_DELAY: Seconds to coalesce changes before writing (default: 0.5)
+    RELAY_PERSIST_JOURNAL: Append changes to a journal (default: false)
+    RELAY_PERSIST_COMPACT: Journal records before compacting (default: 1000)
+"""
+
+import asyncio
+import atexit
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+PERSIST_DELAY = float(os.environ.get('RELAY_PERSIST_DELAY', '0.5'))
+PERSIST_JOURNAL = os.environ.get('RELAY_PERSIST_JOURNAL', '').lower() == 'true'
+PERSIST_COMPACT = int(os.environ.get('RELAY_PERSIST_COMPACT', '1000'))
+
+
+class StateFile:
+    """
+    Write-behind persistence for one collection of records.
+
+    The file keeps the existing layout: {<collection>: {key: record},
+    'updated_at': ...}. `records` returns the live key -> record mapping;
+    records are serialized with their to_dict().
+    """
+
+    def __init__(self, path: Path, collection: str, records: Callable[[], Dict[str, Any]],
+                 mode: Optional[int] = None, delay: float = None,
+                 journal: bool = None, compact_every: int = None):
+        self.path = Path(path)
+        self.journal_path = self.path.with_name(self.path.name + '.journal')
+        self.collection = collection
+        self.mode = mode  # File permissions, e.g. 0o600 for secrets
+        self.delay = PERSIST_DELAY if delay is None else delay
+        self.journal = PERSIST_JOURNAL if journal is None else journal
+        self.compact_every = PERSIST_COMPACT if compact_every is None else compact_every
+
+        self._records = records
+        self._lock = threading.RLock()
+        self._dirty: Set[str] = set()
+        self._scheduled = None  # asyncio.TimerHandle or threading.Timer
+        self._journal_records = 0
+
+        # Metrics
+        self.snapshots_written = 0
+        self.journal_appends = 0
+
+        atexit.register(self.flush)
+
+    def load(self) -> Dict[str, dict]:
+        """Read the snapshot and replay the journal; returns key -> record dict"""
+        data: Dict[str, dict] = {}
+        if self.path.exists():
+            with open(self.path) as f:
+                data = json.load(f).get(self.collection, {})
+
+        if self.journal_path.exists():
+            with open(self.journal_path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        break  # Torn final write
+                    if entry.get('value') is None:
+                        data.pop(entry['key'], None)
+                    else:
+                        data[entry['key']] = entry['value']
+                    self._journal_records += 1
+        return data
+
+    def changed(self, *keys: str):
+        """Record that these keys were added, modified or deleted"""
+        with self._lock:
+            self._dirty.update(keys)
+            if self._scheduled is None:
+                self._schedule()
+
+    def _schedule(self):
+        # On the relay's event loop when there is one, so writes never race
+        # the coroutines mutating the records
+        try:
+            loop = asyncio.get_running_loop()
+            self._scheduled = loop.call_later(self.delay, self.flush)
+        except RuntimeError:
+            self._scheduled = threading.Timer(self.delay, self.flush)
+            self._scheduled.daemon = True
+            self._scheduled.start()
+
+    def flush(self):
+        """Write pending changes now"""
+        with self._lock:
+            if self._scheduled is not None:
+                self._scheduled.cancel()
+                self._scheduled = None
+            if not self._dirty:
+                return
+            dirty, self._dirty = self._dirty, set()
+
+            try:
+                if self.journal and self._journal_records + len(dirty) <= self.compact_every:
+                    self._append_journal(dirty)
+                else:
+                    self._write_snapshot()
+            except Exception as e:
+                self._dirty |= dirty  # Retry with the next change or flush
+                logger.error(f"Failed to save {self.path}: {e}")
+
+    def _append_journal(self, keys: Set[str]):
+        records = self._records()
+        lines = []
+        for key in sorted(keys):
+            record = records.get(key)
+            lines.append(json.dumps({'key': key, 'value': record.to_dict() if record else None}))
+
+        fd = os.open(self.journal_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, self.mode or 0o644)
+        with os.fdopen(fd, 'a') as f:
+            f.write('\n'.join(lines) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self._journal_records += len(lines)
+        self.journal_appends += 1
+
+    def _write_snapshot(self):
+        data = {
+            self.collection: {key: r.to_dict() for key, r in self._records().items()},
+            'updated_at': datetime.now().isoformat()
+        }
+        tmp_path = self.path.with_name(f'.{self.path.name}.{os.getpid()}.tmp')
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, self.mode or 0o644)
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f, separators=(',', ':'))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+        # The snapshot now includes everything the journal held
+        if self.journal_path.exists():
+            self.journal_path.unlink()
+        self._journal_records = 0
+        self.snapshots_written += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'pending': len(self._dirty),
+            'journal_records': self._journal_records,
+            'snapshots_written': self.snapshots_written,
+            'journal_appends': self.journal_appends,
+        }
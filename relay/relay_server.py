@@ -13,12 +13,27 @@ which routes messages between them.
 
 Usage:
     python relay_server.py --port 8765
+    python relay_server.py --port 8765 --workers 4   # sharded, see shard.py
 
 Environment Variables:
     RELAY_HOST: Host to bind to (default: 0.0.0.0)
     RELAY_PORT: Port to listen on (default: 8765)
+    RELAY_WORKERS: Relay worker processes (default: 1)
+    RELAY_SHARD_DIR: Directory for the workers' Unix sockets (default: new temp dir)
     RELAY_DEV_MODE: Enable development mode (auto-register machines)
     MACHINE_TOKEN_<id>: Pre-registered machine tokens
+    RELAY_KERNEL_QUEUE_MAX_MESSAGES: Per-kernel send queue depth (default: 4096)
+    RELAY_KERNEL_QUEUE_MAX_BYTES: Per-kernel send queue size (default: 64MB)
+    RELAY_KERNEL_QUEUE_POLICY: reject or drop_oldest when full (default: reject)
+    RELAY_AGENT_QUEUE_MAX_MESSAGES: Per-agent send queue depth (default: 1024)
+    RELAY_AGENT_QUEUE_MAX_BYTES: Per-agent send queue size (default: 16MB)
+    RELAY_AGENT_QUEUE_POLICY: reject or drop_oldest when full (default: reject)
+    RELAY_KERNEL_QUEUE_SEND_TIMEOUT / RELAY_AGENT_QUEUE_SEND_TIMEOUT: Seconds one
+        send may take before the connection is closed (default: 5)
+    RELAY_PERSIST_DELAY: Seconds to coalesce fleet/token writes (default: 0.5)
+    RELAY_PERSIST_JOURNAL: Journal fleet/token changes instead of rewriting (default: false)
+    RELAY_PERSIST_COMPACT: Journal records before compacting (default: 1000)
+    RELAY_SCRIPT_CACHE_BYTES: Deployed scripts kept for hash-only deploys (default: 64MB)
 """
 
 import asyncio
@@ -26,6 +41,8 @@ import json
 import base64
 import logging
 import argparse
+import functools
+import multiprocessing
 import os
 import signal
 from typing import Optional
@@ -33,14 +50,15 @@ from dotenv import load_dotenv
 
 try:
     import websockets
-    from websockets.server import WebSocketServerProtocol, serve
+    from websockets.server import WebSocketServerProtocol, serve, unix_serve
 except ImportError:
     print("Error: websockets library not installed.")
     print("Run: pip install websockets")
     exit(1)
 
 from auth import get_auth_manager, AuthManager
-from router import get_router, MessageRouter
+from router import get_router, MessageRouter, frame_request_id, COMMAND_TIMEOUT
+from shard import ShardConfig, ShardControl, bridge, make_run_dir
 
 # Try to import API module (optional)
 try:
@@ -56,21 +74,28 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Seconds between checks that sharded relay workers are still running
+WORKER_WATCH_INTERVAL = 1.0
+
 
 class RelayServer:
     """AgentOS Relay Server"""
 
-    def __init__(self, host: str = "0.0.0.0", port: int = 8765):
+    def __init__(self, host: str = "0.0.0.0", port: int = 8765,
+                 shard: Optional[ShardConfig] = None):
         self.host = host
         self.port = port
+        self.shard = shard  # Set when running as one worker of a sharded relay
         self.auth: AuthManager = get_auth_manager()
         self.router: MessageRouter = get_router()
         self._server = None
+        self._local_server = None  # Shard Unix socket: bridged connections + control
         self._running = False
 
-    async def handle_connection(self, websocket: WebSocketServerProtocol):
-        """Handle a new WebSocket connection"""
-        remote_addr = websocket.remote_address
+    async def handle_connection(self, websocket: WebSocketServerProtocol,
+                                local: bool = False):
+        """Handle a new WebSocket connection (local: arrived on the shard socket)"""
+        remote_addr = websocket.remote_address if not local else "shard socket"
         logger.info(f"New connection from {remote_addr}")
 
         connection_type = None  # "kernel" or "agent"
@@ -82,6 +107,16 @@ class RelayServer:
 
             msg_type = auth_data.get("type")
 
+            if local and msg_type == "shard_control":
+                await self._handle_shard_control(websocket, auth_data)
+                return
+
+            # Sharded: machines another worker owns are bridged to it
+            owner = self._owner_of(auth_data) if not local else None
+            if owner is not None:
+                await bridge(websocket, auth_msg, self.shard.socket_path(owner))
+                return
+
             if msg_type == "kernel_auth":
                 connection_type = "kernel"
                 await self._handle_kernel_auth(websocket, auth_data)
@@ -117,6 +152,56 @@ class RelayServer:
                 await self.router.unregister_remote_agent(websocket)
             logger.info(f"Connection closed: {remote_addr}")
 
+    def _owner_of(self, auth_data: dict) -> Optional[int]:
+        """Worker owning the machine an auth message is for, if not this one"""
+        if not self.shard:
+            return None
+        if auth_data.get("type") == "kernel_auth":
+            machine_id = auth_data.get("machine_id", "")
+        elif auth_data.get("type") == "agent_auth":
+            machine_id = auth_data.get("target_machine", "")
+        else:
+            return None
+        if not machine_id or self.shard.owns(machine_id):
+            return None
+        return self.shard.ring.owner(machine_id)
+
+    async def _handle_shard_control(self, websocket: WebSocketServerProtocol,
+                                    data: dict):
+        """Answer a request from the sharded relay's supervisor"""
+        op = data.get("op")
+        machine_id = data.get("machine_id", "")
+
+        if op == "status":
+            reply = {**self.get_status(), "pid": os.getpid()}
+        elif op == "kernel_connected":
+            reply = {"connected": self.router.is_kernel_connected(machine_id)}
+        elif op == "list_agents":
+            reply = {"agents": self.router.list_remote_agents_for_kernel(machine_id)}
+        elif op == "command":
+            reply = await self.router.send_command(
+                machine_id, data.get("message", {}), data.get("timeout", COMMAND_TIMEOUT)
+            )
+        elif op == "register_machine":
+            self.auth.register_machine(machine_id, data.get("token", ""))
+            reply = {"success": True}
+        elif op == "add_agent_token":
+            self.auth.add_agent_token(
+                data.get("token", ""), data.get("name", ""),
+                data.get("target_machine", ""), data.get("expires_hours", 24),
+                data.get("scope", "")
+            )
+            reply = {"success": True}
+        elif op == "revoke_agent_token":
+            reply = {"success": self.auth.revoke_agent_token_hash(data.get("token_hash", ""))}
+        elif op == "sync_auth":
+            self.auth.load_state(data.get("state", {}))
+            reply = {"success": True}
+        else:
+            reply = {"error": f"Unknown shard_control op: {op}"}
+
+        await websocket.send(json.dumps(reply))
+
     async def _handle_kernel_auth(self, websocket: WebSocketServerProtocol,
                                   auth_data: dict):
         """Handle kernel authentication and message loop"""
@@ -139,13 +224,15 @@ class RelayServer:
             }))
             return
 
-        # Register kernel
-        await self.router.register_kernel(websocket, machine_id)
+        # Register kernel; binary frames if it asked for them
+        binary = bool(auth_data.get("binary", False))
+        await self.router.register_kernel(websocket, machine_id, binary=binary)
 
         # Send auth success
         await websocket.send(json.dumps({
             "type": "auth_ok",
-            "machine_id": machine_id
+            "machine_id": machine_id,
+            "binary": binary
         }))
 
         logger.info(f"Kernel authenticated: {machine_id}")
@@ -153,6 +240,9 @@ class RelayServer:
         # Message loop for kernel
         async for message in websocket:
             try:
+                if isinstance(message, bytes):
+                    await self.router.route_response_frame(websocket, message)
+                    continue
                 data = json.loads(message)
                 await self._handle_kernel_message(websocket, machine_id, data)
             except json.JSONDecodeError:
@@ -173,9 +263,19 @@ class RelayServer:
             payload = base64.b64decode(payload_b64) if payload_b64 else b""
 
             await self.router.route_response_to_agent(
-                websocket, agent_id, opcode, payload
+                websocket, agent_id, opcode, payload,
+                request_id=data.get("request_id")
             )
 
+        elif msg_type == "command_result":
+            # Result of a deploy_agent/stop_agent command
+            if not self.router.resolve_command(machine_id, data):
+                logger.debug(f"Unmatched command_result from kernel {machine_id}")
+
+        elif msg_type in ("log_chunk", "log_end", "log_error"):
+            # Log stream output for a subscribed remote agent
+            await self.router.route_log_message(websocket, data)
+
         elif msg_type == "list_remotes":
             # List connected remote agents
             agents = self.router.list_remote_agents_for_kernel(machine_id)
@@ -222,9 +322,11 @@ class RelayServer:
             }))
             return
 
-        # Register remote agent
+        # Register remote agent; binary frames if it asked for them
+        binary = bool(auth_data.get("binary", False))
         agent_id = await self.router.register_remote_agent(
-            websocket, agent_name, target_machine
+            websocket, agent_name, target_machine, binary=binary,
+            operator=agent_token.is_operator
         )
 
         if agent_id is None:
@@ -238,7 +340,8 @@ class RelayServer:
         await websocket.send(json.dumps({
             "type": "auth_ok",
             "agent_id": agent_id,
-            "target_machine": target_machine
+            "target_machine": target_machine,
+            "binary": binary
         }))
 
         logger.info(f"Remote agent authenticated: {agent_name} (id={agent_id})")
@@ -246,6 +349,9 @@ class RelayServer:
         # Message loop for remote agent
         async for message in websocket:
             try:
+                if isinstance(message, bytes):
+                    await self._handle_agent_frame(websocket, message)
+                    continue
                 data = json.loads(message)
                 await self._handle_agent_message(websocket, agent_id, data)
             except json.JSONDecodeError:
@@ -253,6 +359,19 @@ class RelayServer:
             except Exception as e:
                 logger.error(f"Error handling agent message: {e}")
 
+    async def _handle_agent_frame(self, websocket: WebSocketServerProtocol,
+                                  frame: bytes):
+        """Forward a binary syscall frame from a remote agent"""
+        if not await self.router.route_syscall_frame(websocket, frame):
+            error = {
+                "type": "error",
+                "error": "Failed to route syscall to kernel"
+            }
+            request_id = frame_request_id(frame)
+            if request_id is not None:
+                error["request_id"] = request_id
+            self.router.send_to_agent(websocket, json.dumps(error))
+
     async def _handle_agent_message(self, websocket: WebSocketServerProtocol,
                                    agent_id: int, data: dict):
         """Handle a message from a remote agent"""
@@ -264,19 +383,32 @@ class RelayServer:
             payload_b64 = data.get("payload", "")
             payload = base64.b64decode(payload_b64) if payload_b64 else b""
 
+            request_id = data.get("request_id")
             success = await self.router.route_syscall_to_kernel(
-                websocket, opcode, payload
+                websocket, opcode, payload, request_id=request_id
             )
 
             if not success:
                 # Send error response back to agent
-                await websocket.send(json.dumps({
+                error = {
                     "type": "error",
                     "error": "Failed to route syscall to kernel"
+                }
+                if request_id is not None:
+                    error["request_id"] = request_id
+                self.router.send_to_agent(websocket, json.dumps(error))
+
+        elif msg_type in ("log_subscribe", "log_unsubscribe"):
+            # Follow agent/kernel logs on the target machine
+            if not await self.router.route_log_request(websocket, data):
+                self.router.send_to_agent(websocket, json.dumps({
+                    "type": "log_error",
+                    "subscription": data.get("subscription"),
+                    "error": "Failed to route log request to kernel"
                 }))
 
         elif msg_type == "ping":
-            await websocket.send(json.dumps({"type": "pong"}))
+            self.router.send_to_agent(websocket, json.dumps({"type": "pong"}))
 
         else:
             logger.warning(f"Unknown message type from agent: {msg_type}")
@@ -285,14 +417,25 @@ class RelayServer:
         """Start the relay server"""
         self._running = True
 
-        logger.info(f"Starting AgentOS Relay Server on {self.host}:{self.port}")
+        if self.shard:
+            logger.info(f"Starting relay shard {self.shard.index}/{self.shard.workers} "
+                        f"on {self.host}:{self.port}")
+            path = self.shard.socket_path()
+            if os.path.exists(path):
+                os.unlink(path)
+            self._local_server = await unix_serve(
+                functools.partial(self.handle_connection, local=True), path
+            )
+        else:
+            logger.info(f"Starting AgentOS Relay Server on {self.host}:{self.port}")
 
         self._server = await serve(
             self.handle_connection,
             self.host,
             self.port,
             ping_interval=30,
-            ping_timeout=10
+            ping_timeout=10,
+            reuse_port=self.shard is not None  # Workers share the public port
         )
 
         logger.info("Relay server started")
@@ -306,6 +449,9 @@ class RelayServer:
             self._running = False
             self._server.close()
             await self._server.wait_closed()
+            if self._local_server:
+                self._local_server.close()
+                await self._local_server.wait_closed()
             logger.info("Relay server stopped")
 
     def get_status(self) -> dict:
@@ -314,10 +460,58 @@ class RelayServer:
             "running": self._running,
             "host": self.host,
             "port": self.port,
+            **({"shard": self.shard.index} if self.shard else {}),
             **self.router.get_status()
         }
 
 
+def run_worker(shard: ShardConfig, host: str, port: int):
+    """Entry point of one sharded relay worker process"""
+    async def serve_shard():
+        server = RelayServer(host=host, port=port, shard=shard)
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, lambda: asyncio.ensure_future(server.stop()))
+        await server.start()
+
+    asyncio.run(serve_shard())
+
+
+def spawn_worker(run_dir: str, index: int, count: int, host: str, port: int):
+    """Start relay worker `index` of `count`"""
+    worker = multiprocessing.get_context("spawn").Process(
+        target=run_worker, args=(ShardConfig(index, count, run_dir), host, port),
+        name=f"relay-shard-{index}", daemon=True
+    )
+    worker.start()
+    return worker
+
+
+def start_workers(host: str, port: int, count: int) -> tuple:
+    """Spawn `count` relay workers; returns (processes, ShardControl)"""
+    run_dir = make_run_dir()
+    workers = [spawn_worker(run_dir, index, count, host, port) for index in range(count)]
+    logger.info(f"Started {count} relay workers (sockets in {run_dir})")
+    return workers, ShardControl(run_dir, count)
+
+
+async def supervise_workers(workers: list, shards: ShardControl, host: str, port: int):
+    """Restart workers that exit and replay auth state to stale ones.
+
+    A restarted worker keeps its index and socket, so the machines it owns
+    can reconnect to it as soon as it is listening again.
+    """
+    auth = get_auth_manager()
+    while True:
+        for index, worker in enumerate(workers):
+            if not worker.is_alive():
+                logger.error(f"Relay shard {index} exited (code {worker.exitcode}); restarting")
+                workers[index] = spawn_worker(shards.run_dir, index, len(workers), host, port)
+                shards.mark_stale(index)
+        await shards.replay(auth.export_state)
+        await asyncio.sleep(WORKER_WATCH_INTERVAL)
+
+
 async def main():
     """Main entry point"""
     # Load environment variables
@@ -334,6 +528,9 @@ async def main():
                        help="REST API port to listen on")
     parser.add_argument("--no-api", action="store_true",
                        help="Disable REST API server")
+    parser.add_argument("--workers", type=int,
+                       default=int(os.environ.get("RELAY_WORKERS", "1")),
+                       help="Relay worker processes (machines sharded by consistent hash)")
     parser.add_argument("--dev", action="store_true",
                        help="Enable development mode")
     args = parser.parse_args()
@@ -342,8 +539,6 @@ async def main():
         os.environ["RELAY_DEV_MODE"] = "true"
         logger.info("Development mode enabled - auto-registering machines")
 
-    server = RelayServer(host=args.host, port=args.port)
-
     # Handle shutdown gracefully
     loop = asyncio.get_event_loop()
     stop_event = asyncio.Event()
@@ -355,13 +550,21 @@ async def main():
     for sig in (signal.SIGINT, signal.SIGTERM):
         loop.add_signal_handler(sig, shutdown_handler)
 
-    # Start WebSocket server
-    server_task = asyncio.create_task(server.start())
+    # Start WebSocket server: in-process, or as sharded worker processes
+    server, workers, shards, supervisor = None, [], None, None
+    if args.workers > 1:
+        workers, shards = start_workers(args.host, args.port, args.workers)
+        supervisor = asyncio.create_task(
+            supervise_workers(workers, shards, args.host, args.port)
+        )
+    else:
+        server = RelayServer(host=args.host, port=args.port)
+        server_task = asyncio.create_task(server.start())
 
     # Start REST API server (if available and not disabled)
     api = None
     if API_AVAILABLE and not args.no_api:
-        api = get_api(args.host, args.api_port)
+        api = get_api(args.host, args.api_port, shards=shards)
         await api.start()
         logger.info(f"REST API available at http://{args.host}:{args.api_port}")
     elif not API_AVAILABLE and not args.no_api:
@@ -373,7 +576,14 @@ async def main():
     # Stop servers
     if api:
         await api.stop()
-    await server.stop()
+    if server:
+        await server.stop()
+    if supervisor:
+        supervisor.cancel()
+    for worker in workers:
+        worker.terminate()
+    for worker in workers:
+        worker.join(timeout=5)
 
 
 if __name__ == "__main__":
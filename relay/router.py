@@ -9,13 +9,68 @@ import asyncio
 import json
 import base64
 import logging
+import struct
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, Optional, Set, Tuple, Any
+from typing import Any, Dict, List, Optional, Set, Tuple
 from websockets.server import WebSocketServerProtocol
 
+from send_queue import QueueLimits, SendQueue
+
 logger = logging.getLogger(__name__)
 
+# Binary relay frames (negotiated with "binary": true at auth):
+#   request_id (u64) + kernel Message header (magic, agent_id, opcode, size) + payload
+# Protocol constants (must match kernel and SDK)
+ROUTE_PREFIX = struct.Struct('<Q')
+MESSAGE_HEADER = struct.Struct('<IIBQ')
+MAGIC_BYTES = 0x41474E54
+FRAME_HEADER_SIZE = ROUTE_PREFIX.size + MESSAGE_HEADER.size
+AGENT_ID = struct.Struct('<I')
+AGENT_ID_OFFSET = ROUTE_PREFIX.size + 4
+
+# Kernel commands (deploy_agent, stop_agent): how long to wait for command_result
+COMMAND_TIMEOUT = 30.0
+
+
+def pack_frame(request_id: Optional[int], agent_id: int, opcode: int, payload: bytes) -> bytes:
+    """Build a binary relay frame (request_id None is sent as 0)"""
+    return (ROUTE_PREFIX.pack(request_id or 0)
+            + MESSAGE_HEADER.pack(MAGIC_BYTES, agent_id, opcode, len(payload))
+            + payload)
+
+
+def check_frame(frame: bytes) -> bool:
+    """Validate a frame's header without touching the payload"""
+    if len(frame) < FRAME_HEADER_SIZE:
+        return False
+    magic, _, _, size = MESSAGE_HEADER.unpack_from(frame, ROUTE_PREFIX.size)
+    return magic == MAGIC_BYTES and size == len(frame) - FRAME_HEADER_SIZE
+
+
+def unpack_frame(frame: bytes) -> Tuple[Optional[int], int, int, bytes]:
+    """Split a checked frame into (request_id, agent_id, opcode, payload)"""
+    request_id, = ROUTE_PREFIX.unpack_from(frame)
+    _, agent_id, opcode, _ = MESSAGE_HEADER.unpack_from(frame, ROUTE_PREFIX.size)
+    return request_id or None, agent_id, opcode, frame[FRAME_HEADER_SIZE:]
+
+
+def frame_request_id(frame: bytes) -> Optional[int]:
+    if len(frame) < ROUTE_PREFIX.size:
+        return None
+    return ROUTE_PREFIX.unpack_from(frame)[0] or None
+
+
+def frame_agent_id(frame: bytes) -> int:
+    return AGENT_ID.unpack_from(frame, AGENT_ID_OFFSET)[0]
+
+
+def with_agent_id(frame: bytes, agent_id: int) -> bytearray:
+    """Copy of frame with the header's agent_id replaced; payload untouched"""
+    out = bytearray(frame)
+    AGENT_ID.pack_into(out, AGENT_ID_OFFSET, agent_id)
+    return out
+
 
 @dataclass
 class KernelConnection:
@@ -24,6 +79,8 @@ class KernelConnection:
     machine_id: str
     connected_at: datetime = field(default_factory=datetime.now)
     local_agent_ids: Set[int] = field(default_factory=set)
+    binary: bool = False  # Accepts binary relay frames
+    outbox: Optional[SendQueue] = None  # Everything routed to this kernel
     # Stats
     messages_received: int = 0
     messages_sent: int = 0
@@ -37,6 +94,9 @@ class RemoteAgentConnection:
     agent_name: str
     target_machine: str
     connected_at: datetime = field(default_factory=datetime.now)
+    binary: bool = False  # Accepts binary relay frames
+    operator: bool = False  # Token has the operator scope (may follow logs)
+    outbox: Optional[SendQueue] = None  # Everything routed to this agent
     # Stats
     syscalls_sent: int = 0
     responses_received: int = 0
@@ -45,13 +105,26 @@ class RemoteAgentConnection:
 class MessageRouter:
     """Routes messages between kernels and remote agents"""
 
-    def __init__(self):
+    def __init__(self, kernel_queue: Optional[QueueLimits] = None,
+                 agent_queue: Optional[QueueLimits] = None):
+        # Outbound queue limits; a kernel's queue carries all of its agents' syscalls
+        self.kernel_queue = kernel_queue or QueueLimits.from_env(
+            "RELAY_KERNEL_QUEUE", max_messages=4096, max_bytes=64 * 1024 * 1024)
+        self.agent_queue = agent_queue or QueueLimits.from_env("RELAY_AGENT_QUEUE")
+
         # machine_id -> KernelConnection
         self.kernels: Dict[str, KernelConnection] = {}
 
         # (machine_id, agent_id) -> RemoteAgentConnection
         self.remote_agents: Dict[Tuple[str, int], RemoteAgentConnection] = {}
 
+        # machine_id -> agent IDs targeting it (index over remote_agents)
+        self.agents_by_machine: Dict[str, Set[int]] = {}
+
+        # Totals for the status view, updated as messages are routed
+        self.syscalls_routed = 0
+        self.responses_routed = 0
+
         # WebSocket -> connection info (for reverse lookup on disconnect)
         self.ws_to_kernel: Dict[WebSocketServerProtocol, str] = {}
         self.ws_to_agent: Dict[WebSocketServerProtocol, Tuple[str, int]] = {}
@@ -60,6 +133,10 @@ class MessageRouter:
         self._next_agent_id = 1000
         self._agent_id_lock = asyncio.Lock()
 
+        # command_id -> (machine_id, future) for commands awaiting command_result
+        self._pending_commands: Dict[int, Tuple[str, asyncio.Future]] = {}
+        self._next_command_id = 1
+
     async def _get_next_agent_id(self) -> int:
         """Get the next available agent ID"""
         async with self._agent_id_lock:
@@ -72,16 +149,19 @@ class MessageRouter:
     # =========================================================================
 
     async def register_kernel(self, ws: WebSocketServerProtocol,
-                            machine_id: str) -> bool:
+                            machine_id: str, binary: bool = False) -> bool:
         """Register a kernel connection"""
         if machine_id in self.kernels:
             # Kernel already connected - replace connection
             old_conn = self.kernels[machine_id]
             if old_conn.ws in self.ws_to_kernel:
                 del self.ws_to_kernel[old_conn.ws]
+            old_conn.outbox.close()
+            self._fail_commands(machine_id, "Kernel connection replaced")
             logger.warning(f"Replacing existing kernel connection for {machine_id}")
 
-        conn = KernelConnection(ws=ws, machine_id=machine_id)
+        conn = KernelConnection(ws=ws, machine_id=machine_id, binary=binary,
+                                outbox=SendQueue(ws, self.kernel_queue, f"kernel {machine_id}"))
         self.kernels[machine_id] = conn
         self.ws_to_kernel[ws] = machine_id
 
@@ -96,26 +176,26 @@ class MessageRouter:
         machine_id = self.ws_to_kernel[ws]
         del self.ws_to_kernel[ws]
 
-        if machine_id in self.kernels:
-            del self.kernels[machine_id]
-
-        # Notify all remote agents connected to this kernel
-        agents_to_remove = [
-            key for key in self.remote_agents
-            if key[0] == machine_id
-        ]
-
-        for key in agents_to_remove:
-            agent_conn = self.remote_agents[key]
-            try:
-                await agent_conn.ws.send(json.dumps({
-                    "type": "kernel_disconnected",
-                    "machine_id": machine_id
-                }))
-            except Exception:
-                pass  # Agent might be disconnected too
-
-        logger.info(f"Kernel unregistered: {machine_id}")
+        kernel = self.kernels.pop(machine_id, None)
+        if kernel:
+            kernel.outbox.close()
+        self._fail_commands(machine_id, "Kernel disconnected")
+
+        # Drop the agents routed to this kernel and queue the notice behind
+        # whatever is already queued for them, which is still delivered.
+        # Each agent's writer task sends it, so none waits on another.
+        notice = json.dumps({"type": "kernel_disconnected", "machine_id": machine_id})
+        agents = self.agents_for_machine(machine_id)
+        notified = 0
+        for agent_conn in agents:
+            self.remote_agents.pop((machine_id, agent_conn.agent_id), None)
+            self.ws_to_agent.pop(agent_conn.ws, None)
+            notified += agent_conn.outbox.put(notice, force=True)
+            agent_conn.outbox.close(drain=True)
+        self.agents_by_machine.pop(machine_id, None)
+
+        logger.info(f"Kernel unregistered: {machine_id} "
+                    f"({notified}/{len(agents)} remote agents notified)")
 
     def get_kernel(self, machine_id: str) -> Optional[KernelConnection]:
         """Get a kernel connection by machine ID"""
@@ -131,7 +211,9 @@ class MessageRouter:
 
     async def register_remote_agent(self, ws: WebSocketServerProtocol,
                                    agent_name: str,
-                                   target_machine: str) -> Optional[int]:
+                                   target_machine: str,
+                                   binary: bool = False,
+                                   operator: bool = False) -> Optional[int]:
         """Register a remote agent and assign an ID"""
         if not self.is_kernel_connected(target_machine):
             logger.warning(f"Cannot register agent {agent_name}: "
@@ -145,22 +227,24 @@ class MessageRouter:
             ws=ws,
             agent_id=agent_id,
             agent_name=agent_name,
-            target_machine=target_machine
+            target_machine=target_machine,
+            binary=binary,
+            operator=operator,
+            outbox=SendQueue(ws, self.agent_queue, f"agent {agent_name} (id={agent_id})")
         )
 
         self.remote_agents[key] = conn
         self.ws_to_agent[ws] = key
+        self.agents_by_machine.setdefault(target_machine, set()).add(agent_id)
 
         # Notify kernel about new remote agent
         kernel = self.kernels[target_machine]
-        try:
-            await kernel.ws.send(json.dumps({
-                "type": "agent_connected",
-                "agent_id": agent_id,
-                "name": agent_name
-            }))
-        except Exception as e:
-            logger.error(f"Failed to notify kernel of agent connection: {e}")
+        if not kernel.outbox.put(json.dumps({
+            "type": "agent_connected",
+            "agent_id": agent_id,
+            "name": agent_name
+        })):
+            logger.error(f"Failed to notify kernel {target_machine} of agent connection")
 
         logger.info(f"Remote agent registered: {agent_name} (id={agent_id}) "
                    f"-> {target_machine}")
@@ -177,18 +261,21 @@ class MessageRouter:
         if key in self.remote_agents:
             conn = self.remote_agents[key]
             del self.remote_agents[key]
+            conn.outbox.close()
 
             # Notify kernel about agent disconnect
             machine_id, agent_id = key
+            machine_agents = self.agents_by_machine.get(machine_id)
+            if machine_agents is not None:
+                machine_agents.discard(agent_id)
+                if not machine_agents:
+                    del self.agents_by_machine[machine_id]
             if machine_id in self.kernels:
-                try:
-                    await self.kernels[machine_id].ws.send(json.dumps({
-                        "type": "agent_disconnected",
-                        "agent_id": agent_id,
-                        "name": conn.agent_name
-                    }))
-                except Exception:
-                    pass  # Kernel might be disconnected
+                self.kernels[machine_id].outbox.put(json.dumps({
+                    "type": "agent_disconnected",
+                    "agent_id": agent_id,
+                    "name": conn.agent_name
+                }))
 
             logger.info(f"Remote agent unregistered: {conn.agent_name} (id={agent_id})")
 
@@ -197,75 +284,237 @@ class MessageRouter:
         """Get a remote agent connection"""
         return self.remote_agents.get((machine_id, agent_id))
 
+    def agents_for_machine(self, machine_id: str) -> List[RemoteAgentConnection]:
+        """Remote agents targeting a kernel (snapshot; safe to await while iterating)"""
+        return [
+            self.remote_agents[(machine_id, agent_id)]
+            for agent_id in self.agents_by_machine.get(machine_id, ())
+        ]
+
     # =========================================================================
     # Message Routing
     # =========================================================================
 
-    async def route_syscall_to_kernel(self, agent_ws: WebSocketServerProtocol,
-                                     opcode: int, payload: bytes) -> bool:
-        """Route a syscall from remote agent to kernel"""
+    def _agent_route(self, agent_ws: WebSocketServerProtocol
+                     ) -> Tuple[Optional[RemoteAgentConnection], Optional[KernelConnection]]:
         if agent_ws not in self.ws_to_agent:
             logger.error("Syscall from unregistered agent")
-            return False
+            return None, None
 
         machine_id, agent_id = self.ws_to_agent[agent_ws]
         agent_conn = self.remote_agents.get((machine_id, agent_id))
-
         if not agent_conn:
-            return False
+            return None, None
 
         kernel = self.kernels.get(machine_id)
         if not kernel:
             logger.error(f"Kernel {machine_id} not connected")
+            return agent_conn, None
+        return agent_conn, kernel
+
+    def _kernel_route(self, kernel_ws: WebSocketServerProtocol,
+                      agent_id: int) -> Optional[RemoteAgentConnection]:
+        if kernel_ws not in self.ws_to_kernel:
+            logger.error("Response from unregistered kernel")
+            return None
+
+        machine_id = self.ws_to_kernel[kernel_ws]
+        agent_conn = self.remote_agents.get((machine_id, agent_id))
+        if not agent_conn:
+            logger.warning(f"Response for unknown agent {agent_id}")
+        return agent_conn
+
+    async def _send_syscall(self, agent_conn: RemoteAgentConnection,
+                            kernel: KernelConnection, data) -> bool:
+        # Queued for the kernel's writer task; never waits on its socket
+        if not kernel.outbox.put(data):
+            return False
+        kernel.messages_received += 1
+        agent_conn.syscalls_sent += 1
+        self.syscalls_routed += 1
+        return True
+
+    def send_to_agent(self, agent_ws: WebSocketServerProtocol, data) -> bool:
+        """Queue a relay-generated message (e.g. an error reply) for a remote agent"""
+        key = self.ws_to_agent.get(agent_ws)
+        agent_conn = self.remote_agents.get(key) if key else None
+        return agent_conn is not None and agent_conn.outbox.put(data)
+
+    async def _send_response(self, agent_conn: RemoteAgentConnection, data) -> bool:
+        if not agent_conn.outbox.put(data):
+            return False
+        agent_conn.responses_received += 1
+        self.responses_routed += 1
+        return True
+
+    async def route_syscall_to_kernel(self, agent_ws: WebSocketServerProtocol,
+                                     opcode: int, payload: bytes,
+                                     request_id: Optional[int] = None) -> bool:
+        """Route a syscall from remote agent to kernel
+
+        request_id is the agent's correlation ID; the kernel echoes it in the
+        response so many syscalls can be in flight on one connection.
+        """
+        agent_conn, kernel = self._agent_route(agent_ws)
+        if not kernel:
             return False
 
+        if kernel.binary:
+            return await self._send_syscall(
+                agent_conn, kernel, pack_frame(request_id, agent_conn.agent_id, opcode, payload))
+
         # Forward to kernel
         msg = {
             "type": "syscall",
-            "agent_id": agent_id,
+            "agent_id": agent_conn.agent_id,
             "opcode": opcode,
             "payload": base64.b64encode(payload).decode() if payload else ""
         }
+        if request_id is not None:
+            msg["request_id"] = request_id
 
-        try:
-            await kernel.ws.send(json.dumps(msg))
-            kernel.messages_received += 1
-            agent_conn.syscalls_sent += 1
-            return True
-        except Exception as e:
-            logger.error(f"Failed to forward syscall to kernel: {e}")
+        return await self._send_syscall(agent_conn, kernel, json.dumps(msg))
+
+    async def route_syscall_frame(self, agent_ws: WebSocketServerProtocol,
+                                  frame: bytes) -> bool:
+        """Route a binary syscall frame from remote agent to kernel
+
+        The payload is never decoded: the relay only stamps the agent's ID
+        into the header, unless the kernel has to be sent JSON.
+        """
+        if not check_frame(frame):
+            logger.warning("Malformed syscall frame from agent")
             return False
 
-    async def route_response_to_agent(self, kernel_ws: WebSocketServerProtocol,
-                                     agent_id: int, opcode: int,
-                                     payload: bytes) -> bool:
-        """Route a response from kernel to remote agent"""
-        if kernel_ws not in self.ws_to_kernel:
-            logger.error("Response from unregistered kernel")
+        agent_conn, kernel = self._agent_route(agent_ws)
+        if not kernel:
             return False
 
-        machine_id = self.ws_to_kernel[kernel_ws]
-        agent_conn = self.remote_agents.get((machine_id, agent_id))
+        if not kernel.binary:
+            request_id, _, opcode, payload = unpack_frame(frame)
+            return await self.route_syscall_to_kernel(agent_ws, opcode, payload, request_id)
+
+        return await self._send_syscall(agent_conn, kernel, with_agent_id(frame, agent_conn.agent_id))
 
+    async def route_response_to_agent(self, kernel_ws: WebSocketServerProtocol,
+                                     agent_id: int, opcode: int,
+                                     payload: bytes,
+                                     request_id: Optional[int] = None) -> bool:
+        """Route a response from kernel to remote agent"""
+        agent_conn = self._kernel_route(kernel_ws, agent_id)
         if not agent_conn:
-            logger.warning(f"Response for unknown agent {agent_id}")
             return False
 
+        if agent_conn.binary:
+            return await self._send_response(
+                agent_conn, pack_frame(request_id, agent_id, opcode, payload))
+
         # Forward to agent
         msg = {
             "type": "response",
             "opcode": opcode,
             "payload": base64.b64encode(payload).decode() if payload else ""
         }
+        if request_id is not None:
+            msg["request_id"] = request_id
+
+        return await self._send_response(agent_conn, json.dumps(msg))
+
+    async def route_response_frame(self, kernel_ws: WebSocketServerProtocol,
+                                   frame: bytes) -> bool:
+        """Route a binary response frame from kernel to the agent in its header"""
+        if not check_frame(frame):
+            logger.warning("Malformed response frame from kernel")
+            return False
+
+        agent_id = frame_agent_id(frame)
+        agent_conn = self._kernel_route(kernel_ws, agent_id)
+        if not agent_conn:
+            return False
+
+        if not agent_conn.binary:
+            request_id, _, opcode, payload = unpack_frame(frame)
+            return await self.route_response_to_agent(kernel_ws, agent_id, opcode, payload, request_id)
+
+        return await self._send_response(agent_conn, frame)
+
+    # =========================================================================
+    # Log Streams
+    # =========================================================================
+
+    async def route_log_request(self, agent_ws: WebSocketServerProtocol,
+                                data: Dict[str, Any]) -> bool:
+        """Forward a log_subscribe/log_unsubscribe from a remote agent to its kernel
+
+        The kernel tags every chunk of the stream with the agent's ID
+        ("subscriber"), which route_log_message uses to send it back.
+        "operator" is set from the agent's token, never from the request;
+        the tunnel refuses subscriptions without it.
+        """
+        agent_conn, kernel = self._agent_route(agent_ws)
+        if not kernel:
+            return False
+        return kernel.outbox.put(json.dumps({**data, "subscriber": agent_conn.agent_id,
+                                             "operator": agent_conn.operator}))
+
+    async def route_log_message(self, kernel_ws: WebSocketServerProtocol,
+                                data: Dict[str, Any]) -> bool:
+        """Route a log_chunk/log_end/log_error from a kernel to its subscriber"""
+        agent_conn = self._kernel_route(kernel_ws, data.get("subscriber"))
+        if not agent_conn:
+            return False
+        # A chunk refused by a full queue leaves a gap in the offsets, which
+        # the subscriber closes by resubscribing from its last offset
+        return agent_conn.outbox.put(json.dumps(
+            {k: v for k, v in data.items() if k != "subscriber"}))
+
+    # =========================================================================
+    # Kernel Commands
+    # =========================================================================
+
+    async def send_command(self, machine_id: str, command: Dict[str, Any],
+                           timeout: float = COMMAND_TIMEOUT) -> Dict[str, Any]:
+        """Send a command to a kernel and wait for its command_result.
+
+        Returns the result ({"success": ..., ...}); failures to deliver and
+        timeouts come back as {"success": False, "error": ...}.
+        """
+        kernel = self.kernels.get(machine_id)
+        if not kernel:
+            return {"success": False, "error": f"Kernel {machine_id} not connected"}
+
+        command_id = self._next_command_id
+        self._next_command_id += 1
+        future = asyncio.get_running_loop().create_future()
+        self._pending_commands[command_id] = (machine_id, future)
 
         try:
-            await agent_conn.ws.send(json.dumps(msg))
-            agent_conn.responses_received += 1
-            return True
-        except Exception as e:
-            logger.error(f"Failed to forward response to agent: {e}")
+            if not kernel.outbox.put(json.dumps({**command, "command_id": command_id})):
+                return {"success": False, "error": f"Kernel {machine_id} send queue full"}
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return {"success": False, "error": f"No response from kernel {machine_id} "
+                                               f"within {timeout:g}s", "timeout": True}
+        finally:
+            self._pending_commands.pop(command_id, None)
+
+    def resolve_command(self, machine_id: str, result: Dict[str, Any]) -> bool:
+        """Complete a pending command from a kernel's command_result message"""
+        pending = self._pending_commands.get(result.get("command_id"))
+        if not pending or pending[0] != machine_id:
             return False
 
+        _, future = pending
+        if not future.done():
+            result = {k: v for k, v in result.items() if k not in ("type", "command_id")}
+            future.set_result(result)
+        return True
+
+    def _fail_commands(self, machine_id: str, error: str):
+        for pending_machine, future in self._pending_commands.values():
+            if pending_machine == machine_id and not future.done():
+                future.set_result({"success": False, "error": error})
+
     # =========================================================================
     # Status & Stats
     # =========================================================================
@@ -275,16 +524,16 @@ class MessageRouter:
         return {
             "kernels_connected": len(self.kernels),
             "remote_agents_connected": len(self.remote_agents),
+            "syscalls_routed": self.syscalls_routed,
+            "responses_routed": self.responses_routed,
             "kernels": [
                 {
                     "machine_id": k.machine_id,
                     "connected_at": k.connected_at.isoformat(),
                     "messages_received": k.messages_received,
                     "messages_sent": k.messages_sent,
-                    "remote_agents": len([
-                        a for a in self.remote_agents.values()
-                        if a.target_machine == k.machine_id
-                    ])
+                    "remote_agents": len(self.agents_by_machine.get(k.machine_id, ())),
+                    "send_queue": k.outbox.stats()
                 }
                 for k in self.kernels.values()
             ],
@@ -295,7 +544,8 @@ class MessageRouter:
                     "target_machine": a.target_machine,
                     "connected_at": a.connected_at.isoformat(),
                     "syscalls_sent": a.syscalls_sent,
-                    "responses_received": a.responses_received
+                    "responses_received": a.responses_received,
+                    "send_queue": a.outbox.stats()
                 }
                 for a in self.remote_agents.values()
             ]
@@ -309,8 +559,7 @@ class MessageRouter:
                 "agent_name": conn.agent_name,
                 "connected_at": conn.connected_at.isoformat()
             }
-            for key, conn in self.remote_agents.items()
-            if key[0] == machine_id
+            for conn in self.agents_for_machine(machine_id)
         ]
 
 
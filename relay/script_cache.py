@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+AgentOS Relay Server - Script Cache
+
+Content-addressed cache of deployed agent scripts.
+
+Deploy requests may name a script by SHA-256 (script_sha256) instead of
+carrying script_content. The API keeps recently deployed scripts here, and
+the tunnel client keeps its own copy on the kernel's side, so a script
+crosses each link once: clients resend the content only when the API
+answers 412 (not cached), and the relay attaches it to the kernel command
+only when the tunnel reports missing_script.
+
+Environment Variables:
+    RELAY_SCRIPT_CACHE_BYTES: Cache size limit (default: 64MB)
+"""
+
+import hashlib
+import os
+from collections import OrderedDict
+from typing import Dict, Optional
+
+SCRIPT_CACHE_BYTES = int(os.environ.get('RELAY_SCRIPT_CACHE_BYTES', str(64 * 1024 * 1024)))
+
+
+def script_digest(content: bytes) -> str:
+    """Cache key of a script: hex SHA-256 of its bytes"""
+    return hashlib.sha256(content).hexdigest()
+
+
+class ScriptCache:
+    """LRU of script bytes keyed by SHA-256, bounded by total size"""
+
+    def __init__(self, max_bytes: int = None):
+        self.max_bytes = SCRIPT_CACHE_BYTES if max_bytes is None else max_bytes
+        self._scripts: 'OrderedDict[str, bytes]' = OrderedDict()
+        self._bytes = 0
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, digest: str) -> Optional[bytes]:
+        content = self._scripts.get(digest)
+        if content is None:
+            self.misses += 1
+            return None
+        self._scripts.move_to_end(digest)
+        self.hits += 1
+        return content
+
+    def put(self, content: bytes) -> str:
+        """Cache a script and return its digest"""
+        digest = script_digest(content)
+        if digest in self._scripts:
+            self._scripts.move_to_end(digest)
+            return digest
+        if len(content) > self.max_bytes:
+            return digest  # Never fits; callers still get the digest
+
+        self._scripts[digest] = content
+        self._bytes += len(content)
+        while self._bytes > self.max_bytes:
+            _, evicted = self._scripts.popitem(last=False)
+            self._bytes -= len(evicted)
+        return digest
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'scripts': len(self._scripts),
+            'bytes': self._bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
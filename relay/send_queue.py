@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+AgentOS Relay Server - Outbound Send Queues
+
+Every kernel and remote agent connection owns a bounded queue drained by
+its own writer task, so routing a message never waits on the receiving
+socket. A slow peer only fills its own queue; once a high-water mark is
+reached the queue's policy decides what gives. A single send that takes
+longer than send_timeout closes the connection, so a stalled peer cannot
+keep its writer task (e.g. one draining after close(drain=True)) alive.
+"""
+
+import asyncio
+import logging
+import os
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, Optional, Union
+
+from websockets.server import WebSocketServerProtocol
+
+logger = logging.getLogger(__name__)
+
+Frame = Union[str, bytes, bytearray]
+
+POLICY_REJECT = "reject"            # Refuse the new message
+POLICY_DROP_OLDEST = "drop_oldest"  # Evict queued messages to make room
+POLICIES = (POLICY_REJECT, POLICY_DROP_OLDEST)
+
+
+@dataclass
+class QueueLimits:
+    """High-water marks and overflow policy for a send queue"""
+    max_messages: int = 1024
+    max_bytes: int = 16 * 1024 * 1024
+    policy: str = POLICY_REJECT
+    send_timeout: float = 5.0  # Seconds one send may take
+
+    @classmethod
+    def from_env(cls, prefix: str, **defaults) -> "QueueLimits":
+        """Read <prefix>_MAX_MESSAGES, <prefix>_MAX_BYTES, <prefix>_POLICY and <prefix>_SEND_TIMEOUT"""
+        limits = cls(**defaults)
+        limits.max_messages = int(os.environ.get(f"{prefix}_MAX_MESSAGES", limits.max_messages))
+        limits.max_bytes = int(os.environ.get(f"{prefix}_MAX_BYTES", limits.max_bytes))
+        limits.policy = os.environ.get(f"{prefix}_POLICY", limits.policy)
+        limits.send_timeout = float(os.environ.get(f"{prefix}_SEND_TIMEOUT", limits.send_timeout))
+        if limits.policy not in POLICIES:
+            raise ValueError(f"{prefix}_POLICY must be one of {', '.join(POLICIES)}")
+        return limits
+
+
+class SendQueue:
+    """Bounded outbound queue for one WebSocket"""
+
+    def __init__(self, ws: WebSocketServerProtocol, limits: QueueLimits, name: str = ""):
+        self.ws = ws
+        self.limits = limits
+        self.name = name
+
+        self._items: Deque[Frame] = deque()
+        self._bytes = 0
+        self._wakeup = asyncio.Event()
+        self._closed = False
+        self._draining = False
+        self._writer: Optional[asyncio.Task] = asyncio.get_running_loop().create_task(self._run())
+
+        # Metrics
+        self.sent = 0
+        self.dropped = 0
+        self.rejected = 0
+        self.peak_depth = 0
+
+    @property
+    def depth(self) -> int:
+        return len(self._items)
+
+    def put(self, data: Frame, force: bool = False) -> bool:
+        """Queue a message without waiting. False if it was not accepted.
+
+        force queues it past the high-water marks, for a small final
+        message (e.g. kernel_disconnected) that must follow what is queued.
+        """
+        if self._closed:
+            return False
+
+        size = len(data)
+        if not force and not self._has_room(size):
+            if self.limits.policy == POLICY_DROP_OLDEST and size <= self.limits.max_bytes:
+                while self._items and not self._has_room(size):
+                    self._bytes -= len(self._items.popleft())
+                    self.dropped += 1
+            else:
+                self.rejected += 1
+                if self.rejected == 1 or self.rejected % 1000 == 0:
+                    logger.warning(f"Send queue full for {self.name} "
+                                   f"({self.depth} messages, {self._bytes} bytes); "
+                                   f"{self.rejected} rejected so far")
+                return False
+
+        self._items.append(data)
+        self._bytes += size
+        self.peak_depth = max(self.peak_depth, len(self._items))
+        self._wakeup.set()
+        return True
+
+    def _has_room(self, size: int) -> bool:
+        return (len(self._items) < self.limits.max_messages
+                and self._bytes + size <= self.limits.max_bytes)
+
+    async def _run(self):
+        """Writer task: send queued messages in order"""
+        try:
+            while True:
+                if not self._items:
+                    if self._draining:
+                        return
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                    continue
+
+                data = self._items.popleft()
+                self._bytes -= len(data)
+                await asyncio.wait_for(self.ws.send(data), self.limits.send_timeout)
+                self.sent += 1
+        except asyncio.CancelledError:
+            pass
+        except asyncio.TimeoutError:
+            logger.warning(f"Send to {self.name} took over {self.limits.send_timeout}s; closing")
+            asyncio.ensure_future(self.ws.close())
+        except Exception as e:
+            logger.debug(f"Send queue for {self.name} stopped: {e}")
+        finally:
+            # The connection is gone; its handler unregisters it
+            self._closed = True
+            self.dropped += len(self._items)
+            self._items.clear()
+            self._bytes = 0
+
+    def close(self, drain: bool = False):
+        """Stop accepting messages and stop the writer task.
+
+        With drain=True the writer first sends what is already queued;
+        otherwise queued messages are discarded.
+        """
+        self._closed = True
+        if drain:
+            self._draining = True
+            self._wakeup.set()
+        elif self._writer:
+            self._writer.cancel()
+        self._writer = None
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "depth": self.depth,
+            "bytes": self._bytes,
+            "peak_depth": self.peak_depth,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+AgentOS Relay Server - Sharding
+
+Runs the relay as N worker processes so routing is not capped by one core.
+
+Architecture:
+    [Kernel / Agent] --> any worker (SO_REUSEPORT) --(Unix socket)--> owning worker
+
+Every worker listens on the public port with SO_REUSEPORT, so the OS spreads
+new connections across workers. Each machine_id belongs to exactly one worker,
+chosen by consistent hash: its kernel and every agent targeting it are routed
+by that worker's MessageRouter. A worker that accepts a connection for a
+machine it does not own bridges it, frame for frame, to the owner over the
+owner's Unix socket; the owner then sees an ordinary connection.
+
+The Unix sockets also carry "shard_control" requests, which the REST API in
+the supervisor process uses to aggregate status and reach kernels.
+
+The supervisor restarts workers that exit; a restarted worker keeps its
+index and socket, so the ring never changes. Token changes made through the
+API must reach every worker: a worker that misses one (or was restarted) is
+marked stale and gets the supervisor's full auth state replayed with
+"sync_auth" until it answers.
+"""
+
+import asyncio
+import bisect
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set
+
+import websockets
+from websockets.server import WebSocketServerProtocol
+
+logger = logging.getLogger(__name__)
+
+RING_REPLICAS = 128          # Virtual nodes per worker
+CONTROL_TIMEOUT = 5.0        # Seconds to wait for a shard_control reply
+CONTROL_RETRIES = 3          # Attempts per shard for token changes
+RETRY_DELAY = 0.2            # Seconds before the first retry; doubles
+
+
+def _ring_hash(key: str) -> int:
+    return int.from_bytes(hashlib.sha1(key.encode()).digest()[:8], "big")
+
+
+class HashRing:
+    """Consistent hash of machine IDs onto worker indices"""
+
+    def __init__(self, workers: int, replicas: int = RING_REPLICAS):
+        if workers < 1:
+            raise ValueError("workers must be >= 1")
+        self.workers = workers
+        points = sorted(
+            (_ring_hash(f"shard-{index}:{replica}"), index)
+            for index in range(workers)
+            for replica in range(replicas)
+        )
+        self._hashes = [h for h, _ in points]
+        self._owners = [index for _, index in points]
+
+    def owner(self, machine_id: str) -> int:
+        """Worker index that routes machine_id"""
+        i = bisect.bisect(self._hashes, _ring_hash(machine_id)) % len(self._hashes)
+        return self._owners[i]
+
+
+@dataclass
+class ShardConfig:
+    """A worker's place in the sharded relay"""
+    index: int
+    workers: int
+    run_dir: str
+    ring: HashRing = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.ring = HashRing(self.workers)
+
+    def socket_path(self, index: Optional[int] = None) -> str:
+        """Unix socket of worker `index` (default: this worker)"""
+        return shard_socket_path(self.run_dir, self.index if index is None else index)
+
+    def owns(self, machine_id: str) -> bool:
+        return self.ring.owner(machine_id) == self.index
+
+
+def shard_socket_path(run_dir: str, index: int) -> str:
+    return os.path.join(run_dir, f"relay-{index}.sock")
+
+
+def make_run_dir() -> str:
+    """Directory for the workers' Unix sockets (RELAY_SHARD_DIR or a new temp dir)"""
+    run_dir = os.environ.get("RELAY_SHARD_DIR") or tempfile.mkdtemp(prefix="clove-relay-")
+    os.makedirs(run_dir, mode=0o700, exist_ok=True)
+    return run_dir
+
+
+async def bridge(websocket: WebSocketServerProtocol, first_message: str, path: str):
+    """Forward a connection to the worker listening on `path`.
+
+    `first_message` (the auth message already read from `websocket`) is
+    replayed to the owner, then frames are copied both ways until either
+    side closes.
+    """
+    async with websockets.unix_connect(path, max_size=None) as upstream:
+        await upstream.send(first_message)
+
+        async def pump(src, dst):
+            async for message in src:
+                await dst.send(message)
+
+        tasks = [asyncio.ensure_future(pump(websocket, upstream)),
+                 asyncio.ensure_future(pump(upstream, websocket))]
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+class ShardControl:
+    """Client for the workers' shard_control requests"""
+
+    def __init__(self, run_dir: str, workers: int):
+        self.run_dir = run_dir
+        self.ring = HashRing(workers)
+        # Shards whose auth state may be behind the supervisor's
+        self.stale: Set[int] = set()
+        # Keeps a replayed snapshot from overtaking a later change
+        self._sync_lock = asyncio.Lock()
+
+    @property
+    def workers(self) -> int:
+        return self.ring.workers
+
+    async def request(self, index: int, op: str, reply_timeout: float = CONTROL_TIMEOUT,
+                      **params) -> Dict[str, Any]:
+        """Send one request to worker `index` and return its reply"""
+        path = shard_socket_path(self.run_dir, index)
+        async with websockets.unix_connect(path, max_size=None) as ws:
+            await ws.send(json.dumps({"type": "shard_control", "op": op, **params}))
+            return json.loads(await asyncio.wait_for(ws.recv(), reply_timeout))
+
+    async def request_owner(self, machine_id: str, op: str, reply_timeout: float = CONTROL_TIMEOUT,
+                            **params) -> Dict[str, Any]:
+        """Send a request to the worker that owns machine_id"""
+        return await self.request(self.ring.owner(machine_id), op, reply_timeout,
+                                  machine_id=machine_id, **params)
+
+    async def broadcast(self, op: str, **params) -> List[Optional[Dict[str, Any]]]:
+        """Send a request to every worker; None for workers that did not answer"""
+        replies = await asyncio.gather(
+            *(self.request(index, op, **params) for index in range(self.workers)),
+            return_exceptions=True
+        )
+        results = []
+        for index, reply in enumerate(replies):
+            if isinstance(reply, Exception):
+                logger.warning(f"Shard {index} did not answer {op}: {reply}")
+                reply = None
+            results.append(reply)
+        return results
+
+    async def _request_retrying(self, index: int, op: str, **params) -> Optional[Dict[str, Any]]:
+        delay = RETRY_DELAY
+        for attempt in range(CONTROL_RETRIES):
+            try:
+                return await self.request(index, op, **params)
+            except Exception as e:
+                if attempt == CONTROL_RETRIES - 1:
+                    logger.warning(f"Shard {index} did not answer {op}: {e}")
+                    return None
+                await asyncio.sleep(delay)
+                delay *= 2
+
+    async def sync(self, op: str, **params) -> List[int]:
+        """Apply an auth change on every worker, retrying each.
+
+        Returns the shards that still did not answer; they are marked stale
+        so replay() brings them up to date once they do.
+        """
+        async with self._sync_lock:
+            replies = await asyncio.gather(
+                *(self._request_retrying(index, op, **params) for index in range(self.workers))
+            )
+        failed = [index for index, reply in enumerate(replies) if reply is None]
+        self.stale.update(failed)
+        return failed
+
+    def mark_stale(self, index: Optional[int] = None):
+        """Schedule a full auth replay to one worker (default: all)"""
+        self.stale.update(range(self.workers) if index is None else [index])
+
+    async def replay(self, state_fn: Callable[[], Dict[str, Any]]):
+        """Send the current auth state (state_fn()) to every stale worker"""
+        async with self._sync_lock:
+            if not self.stale:
+                return
+            state = state_fn()
+            for index in sorted(self.stale):
+                try:
+                    await self.request(index, "sync_auth", state=state)
+                except Exception as e:
+                    logger.debug(f"Shard {index} not ready for sync_auth: {e}")
+                    continue
+                self.stale.discard(index)
+                logger.info(f"Replayed auth state to shard {index}")
+
+    async def status(self) -> Dict[str, Any]:
+        """Router status summed across workers, with a per-shard breakdown"""
+        status = {
+            "kernels_connected": 0,
+            "remote_agents_connected": 0,
+            "syscalls_routed": 0,
+            "responses_routed": 0,
+            "kernels": [],
+            "agents": [],
+            "shards": [],
+        }
+        for index, reply in enumerate(await self.broadcast("status")):
+            if reply is None:
+                status["shards"].append({"index": index, "running": False})
+                continue
+            for key in ("kernels_connected", "remote_agents_connected",
+                        "syscalls_routed", "responses_routed"):
+                status[key] += reply.get(key, 0)
+            status["kernels"].extend(reply.get("kernels", []))
+            status["agents"].extend(reply.get("agents", []))
+            status["shards"].append({
+                "index": index,
+                "running": True,
+                "pid": reply.get("pid"),
+                "kernels_connected": reply.get("kernels_connected", 0),
+                "remote_agents_connected": reply.get("remote_agents_connected", 0),
+            })
+        return status
@@ -6,22 +6,30 @@ Manages persistent storage of authentication tokens.
 Provides secure token generation, storage, and validation.
 """
 
-import json
 import os
+import heapq
 import secrets
 import hashlib
 import logging
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from dataclasses import dataclass, field, asdict
 
+from persist import StateFile
+
 logger = logging.getLogger(__name__)
 
 
 # Default tokens data directory
 TOKENS_DATA_DIR = Path(os.environ.get('TOKENS_DATA_DIR', '/var/lib/agentos/tokens'))
 
+# Recently rejected token hashes are refused without a lookup
+NEGATIVE_CACHE_TTL = 30.0  # seconds
+NEGATIVE_CACHE_SIZE = 10000
+
 
 @dataclass
 class TokenRecord:
@@ -69,6 +77,15 @@ class TokenStore:
     def __init__(self, data_dir: Path = None):
         self.data_dir = data_dir or TOKENS_DATA_DIR
         self.tokens: Dict[str, TokenRecord] = {}
+        # token_hash -> token ID
+        self._by_hash: Dict[str, str] = {}
+        # token_hash -> monotonic time until which it stays rejected
+        self._rejected: 'OrderedDict[str, float]' = OrderedDict()
+        # (expires_at timestamp, token ID) min-heap; entries for deleted tokens are skipped
+        self._expiry: List[Tuple[float, str]] = []
+        # Secure file permissions (owner read/write only)
+        self._state = StateFile(self.data_dir / 'tokens.json', 'tokens', lambda: self.tokens,
+                                mode=0o600)
         self._load_state()
 
     def _hash_token(self, token: str) -> str:
@@ -86,32 +103,52 @@ class TokenStore:
     def _load_state(self):
         """Load tokens from disk."""
         self.data_dir.mkdir(parents=True, exist_ok=True)
-        state_file = self.data_dir / 'tokens.json'
-
-        if state_file.exists():
-            try:
-                with open(state_file) as f:
-                    data = json.load(f)
-                    for tid, tdata in data.get('tokens', {}).items():
-                        self.tokens[tid] = TokenRecord.from_dict(tdata)
-                logger.info(f"Loaded {len(self.tokens)} tokens from state")
-            except Exception as e:
-                logger.error(f"Failed to load token state: {e}")
 
-    def _save_state(self):
-        """Save tokens to disk."""
-        state_file = self.data_dir / 'tokens.json'
         try:
-            data = {
-                'tokens': {tid: t.to_dict() for tid, t in self.tokens.items()},
-                'updated_at': datetime.now().isoformat()
-            }
-            # Secure file permissions (owner read/write only)
-            with open(state_file, 'w') as f:
-                json.dump(data, f, indent=2)
-            os.chmod(state_file, 0o600)
+            for tid, tdata in self._state.load().items():
+                self._add(TokenRecord.from_dict(tdata))
+            if self.tokens:
+                logger.info(f"Loaded {len(self.tokens)} tokens from state")
         except Exception as e:
-            logger.error(f"Failed to save token state: {e}")
+            logger.error(f"Failed to load token state: {e}")
+
+    def _save_state(self, *token_ids: str):
+        """Schedule a write of the changed tokens (coalesced, see persist.py)."""
+        self._state.changed(*token_ids)
+
+    def flush(self):
+        """Write pending token changes to disk now."""
+        self._state.flush()
+
+    def _add(self, record: TokenRecord):
+        """Insert a record and index it."""
+        self.tokens[record.id] = record
+        self._by_hash[record.token_hash] = record.id
+        self._rejected.pop(record.token_hash, None)
+        if record.expires_at:
+            expires = datetime.fromisoformat(record.expires_at).timestamp()
+            heapq.heappush(self._expiry, (expires, record.id))
+
+    def _remove(self, token_id: str):
+        """Delete a record and its index entry."""
+        record = self.tokens.pop(token_id)
+        if self._by_hash.get(record.token_hash) == token_id:
+            del self._by_hash[record.token_hash]
+
+    def _reject(self, token_hash: str):
+        self._rejected[token_hash] = time.monotonic() + NEGATIVE_CACHE_TTL
+        self._rejected.move_to_end(token_hash)
+        if len(self._rejected) > NEGATIVE_CACHE_SIZE:
+            self._rejected.popitem(last=False)
+
+    def _recently_rejected(self, token_hash: str) -> bool:
+        until = self._rejected.get(token_hash)
+        if until is None:
+            return False
+        if time.monotonic() < until:
+            return True
+        del self._rejected[token_hash]
+        return False
 
     def create_machine_token(self, machine_id: str, name: str = "") -> str:
         """Create a new machine token."""
@@ -126,14 +163,16 @@ class TokenStore:
             machine_id=machine_id
         )
 
-        self.tokens[token_id] = record
-        self._save_state()
+        self._add(record)
+        self._save_state(token_id)
+        self.cleanup_expired()
 
         logger.info(f"Created machine token: {token_id} for {machine_id}")
         return token
 
     def store_agent_token(self, token: str, target_machine: str,
-                         name: str = "", expires_hours: int = 24) -> str:
+                         name: str = "", expires_hours: int = 24,
+                         scope: str = "") -> str:
         """Store an agent token (created by auth manager)."""
         token_id = self._generate_token_id()
 
@@ -147,11 +186,13 @@ class TokenStore:
             name=name or 'agent-token',
             token_hash=self._hash_token(token),
             target_machine=target_machine,
-            expires_at=expires_at
+            expires_at=expires_at,
+            metadata={'scope': scope} if scope else {}
         )
 
-        self.tokens[token_id] = record
-        self._save_state()
+        self._add(record)
+        self._save_state(token_id)
+        self.cleanup_expired()
 
         logger.info(f"Stored agent token: {token_id} for {target_machine}")
         return token_id
@@ -159,16 +200,21 @@ class TokenStore:
     def validate_token(self, token: str) -> Optional[TokenRecord]:
         """Validate a token and return its record if valid."""
         token_hash = self._hash_token(token)
+        if self._recently_rejected(token_hash):
+            return None
+
+        token_id = self._by_hash.get(token_hash)
+        record = self.tokens.get(token_id) if token_id else None
+        if record is None:
+            self._reject(token_hash)
+            return None
 
-        for record in self.tokens.values():
-            if record.token_hash == token_hash:
-                if record.is_valid():
-                    return record
-                else:
-                    logger.warning(f"Invalid token attempt: {record.id} "
-                                  f"(revoked={record.revoked}, expired={record.is_expired()})")
-                    return None
+        if record.is_valid():
+            return record
 
+        logger.warning(f"Invalid token attempt: {record.id} "
+                      f"(revoked={record.revoked}, expired={record.is_expired()})")
+        self._reject(token_hash)
         return None
 
     def revoke_token(self, token_id: str) -> bool:
@@ -177,7 +223,7 @@ class TokenStore:
             return False
 
         self.tokens[token_id].revoked = True
-        self._save_state()
+        self._save_state(token_id)
 
         logger.info(f"Revoked token: {token_id}")
         return True
@@ -187,12 +233,16 @@ class TokenStore:
         if token_id not in self.tokens:
             return False
 
-        del self.tokens[token_id]
-        self._save_state()
+        self._remove(token_id)
+        self._save_state(token_id)
 
         logger.info(f"Deleted token: {token_id}")
         return True
 
+    def find_token_id(self, token: str) -> Optional[str]:
+        """ID of the record for a token value, if stored."""
+        return self._by_hash.get(self._hash_token(token))
+
     def get_token(self, token_id: str) -> Optional[Dict[str, Any]]:
         """Get token info by ID (without the hash)."""
         record = self.tokens.get(token_id)
@@ -220,13 +270,18 @@ class TokenStore:
 
     def cleanup_expired(self) -> int:
         """Remove expired tokens. Returns count of removed tokens."""
-        expired = [tid for tid, t in self.tokens.items() if t.is_expired()]
-
-        for tid in expired:
-            del self.tokens[tid]
+        # Only tokens at the top of the expiry heap are looked at
+        now = time.time()
+        expired = []
+        while self._expiry and self._expiry[0][0] <= now:
+            _, tid = heapq.heappop(self._expiry)
+            record = self.tokens.get(tid)
+            if record and record.is_expired():
+                self._remove(tid)
+                expired.append(tid)
 
         if expired:
-            self._save_state()
+            self._save_state(*expired)
             logger.info(f"Cleaned up {len(expired)} expired tokens")
 
         return len(expired)
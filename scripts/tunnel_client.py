@@ -15,16 +15,41 @@ Protocol (stdin/stdout JSON lines):
     Async events (from relay):
     {"event": "agent_connected", "data": {...}}
     {"event": "syscall", "data": {...}}
+    {"event": "command", "data": {"command_id": 7, "type": "deploy_agent", ...}}
+
+    Commands (deploy_agent, stop_agent) carry a command_id; the kernel
+    answers each with the "command_result" method, which is sent back to
+    the relay so the API request that issued it can complete.
+
+    deploy_agent names its script by script_sha256. Scripts are kept on
+    disk under DEPLOY_DIR/<sha256>/; a deploy of a script that is not there
+    and carries no script_content is answered with missing_script, and the
+    relay resends it with the content.
+
+    Deployed agents write stdout/stderr to a log file (log_path in the
+    command event). Remote agents can follow those logs: log_subscribe from
+    the relay starts a tail of one agent's log (or all of them), filtered
+    here by level and regex, and pushes log_chunk messages tagged with byte
+    offsets so a subscriber can resume where it left off. The relay marks
+    subscriptions from operator-scoped tokens with "operator": true; any
+    other subscription is refused.
 """
 
 import asyncio
 import json
 import sys
 import os
+import re
 import signal
 import base64
+import hashlib
+import shutil
+import stat
 import struct
-from typing import Optional, Dict, Any, Callable
+import tempfile
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, Callable, List, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
 from dotenv import load_dotenv
@@ -40,6 +65,35 @@ except ImportError:
 MAGIC_BYTES = 0x41474E54  # "AGNT" in hex
 HEADER_SIZE = 17
 
+# Binary relay frames: request_id (u64) + kernel message header + payload
+ROUTE_PREFIX = struct.Struct('<Q')
+MESSAGE_HEADER = struct.Struct('<IIBQ')
+FRAME_HEADER_SIZE = ROUTE_PREFIX.size + HEADER_SIZE
+
+# Where deployed agent scripts are written before the kernel spawns them
+DEPLOY_DIR = os.environ.get("CLOVE_DEPLOY_DIR", os.path.join(tempfile.gettempdir(), "clove-deploy"))
+# Distinct scripts kept in DEPLOY_DIR
+SCRIPT_CACHE_SIZE = int(os.environ.get("CLOVE_SCRIPT_CACHE_SIZE", "64"))
+
+# Log streaming: deployed agents' output files, and the kernel's own log
+# (served as agent 0) when the kernel writes one
+LOG_DIR = os.path.join(DEPLOY_DIR, "logs")
+KERNEL_LOG = os.environ.get("CLOVE_KERNEL_LOG", "")
+LOG_POLL_INTERVAL = float(os.environ.get("CLOVE_LOG_POLL_INTERVAL", "0.25"))
+LOG_CHUNK_BYTES = 64 * 1024
+# Logs of exited deployed agents kept for late subscribers; older ones are deleted
+LOG_KEEP_EXITED = int(os.environ.get("CLOVE_LOG_KEEP_EXITED", "32"))
+# Streams one subscriber may hold, and the longest filter regex accepted.
+# Filtering runs on LOG_FILTER_THREADS worker threads, so a slow pattern
+# holds up log streams but never the syscalls sharing the event loop.
+LOG_MAX_STREAMS = int(os.environ.get("CLOVE_LOG_MAX_STREAMS", "8"))
+LOG_MAX_PATTERN = 256
+LOG_FILTER_THREADS = 2
+
+LOG_LEVELS = {"debug": 10, "info": 20, "warn": 30, "warning": 30,
+              "error": 40, "critical": 50, "fatal": 50}
+LEVEL_PATTERN = re.compile(r"\b(debug|info|warn(?:ing)?|error|critical|fatal)\b", re.IGNORECASE)
+
 
 @dataclass
 class TunnelConfig:
@@ -59,6 +113,334 @@ class RemoteAgent:
     connected_at: datetime = field(default_factory=datetime.now)
 
 
+class ScriptCache:
+    """On-disk LRU of deployed scripts, one directory per SHA-256
+
+    The kernel executes what lookup() returns, so the root must be a
+    directory only this user can write to, and every hit is re-hashed
+    against its digest before it is handed out.
+    """
+
+    def __init__(self, root: str = DEPLOY_DIR, max_entries: int = SCRIPT_CACHE_SIZE):
+        self.root = root
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, None]" = OrderedDict()
+        self._secure_root()
+
+        # Scripts deployed before a restart stay usable, oldest first
+        found = [name for name in os.listdir(root) if self._valid(name)]
+        for digest in sorted(found, key=lambda d: os.path.getmtime(os.path.join(root, d))):
+            self._entries[digest] = None
+
+    def _secure_root(self):
+        """Create the root 0700, refusing one that another user owns"""
+        os.makedirs(self.root, mode=0o700, exist_ok=True)
+        st = os.lstat(self.root)
+        if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid():
+            raise RuntimeError(f"Deploy directory {self.root} is not a directory owned by "
+                               f"this user; set CLOVE_DEPLOY_DIR to a private path")
+        if st.st_mode & 0o077:
+            os.chmod(self.root, 0o700)
+
+    @staticmethod
+    def _valid(digest: str) -> bool:
+        return len(digest) == 64 and all(c in "0123456789abcdef" for c in digest)
+
+    def lookup(self, digest: str, script_name: str) -> Optional[str]:
+        """Path of a cached script under script_name, or None if not cached"""
+        if digest not in self._entries:
+            return None
+        entry_dir = os.path.join(self.root, digest)
+        path = os.path.join(entry_dir, script_name)
+        try:
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    content = f.read()
+            else:
+                # Same script deployed under another name
+                cached = [n for n in os.listdir(entry_dir) if not n.endswith(".tmp")]
+                with open(os.path.join(entry_dir, cached[0]), "rb") as f:
+                    content = f.read()
+            if hashlib.sha256(content).hexdigest() != digest:
+                raise ValueError(f"cached script {digest} does not match its hash")
+            if not os.path.exists(path):
+                self._write(path, content)
+            os.utime(entry_dir)
+        except (OSError, IndexError, ValueError):
+            # The relay resends the content after a miss
+            self._entries.pop(digest, None)
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            return None
+        self._entries.move_to_end(digest)
+        return path
+
+    @staticmethod
+    def _write(path: str, content: bytes):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+    def store(self, content: bytes, script_name: str) -> str:
+        """Write a script into the cache and return its path"""
+        digest = hashlib.sha256(content).hexdigest()
+        entry_dir = os.path.join(self.root, digest)
+        os.makedirs(entry_dir, mode=0o700, exist_ok=True)
+        path = os.path.join(entry_dir, script_name)
+        self._write(path, content)
+
+        self._entries[digest] = None
+        self._entries.move_to_end(digest)
+        while len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            shutil.rmtree(os.path.join(self.root, evicted), ignore_errors=True)
+        return path
+
+
+def line_level(line: str) -> int:
+    """Severity named in a log line; lines without one count as info"""
+    match = LEVEL_PATTERN.search(line)
+    return LOG_LEVELS[match.group(1).lower()] if match else LOG_LEVELS["info"]
+
+
+def tail_offset(path: str, lines: int) -> int:
+    """Byte offset where the last `lines` lines of a file start"""
+    with open(path, "rb") as f:
+        end = f.seek(0, os.SEEK_END)
+        pos = end
+        newlines = 0
+        while pos > 0:
+            size = min(8192, pos)
+            pos -= size
+            f.seek(pos)
+            block = f.read(size)
+            if pos + size == end and block.endswith(b"\n"):
+                block = block[:-1]  # The final newline does not start a line
+            index = len(block)
+            while True:
+                index = block.rfind(b"\n", 0, index)
+                if index < 0:
+                    break
+                newlines += 1
+                if newlines == lines:
+                    return pos + index + 1
+        return 0
+
+
+def process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+@dataclass
+class LogSource:
+    """A log file that can be followed"""
+    agent_id: int
+    name: str
+    path: str
+    pid: int = 0  # Deployed agent's process (0 for the kernel log)
+
+
+@dataclass
+class LogSubscription:
+    """One subscriber's view of the logs"""
+    subscriber: int                  # Relay agent ID to send chunks to
+    subscription: Any                # Subscriber's own ID for this stream
+    agent_id: Optional[int] = None   # None: every agent's log
+    min_level: int = 0
+    pattern: Optional["re.Pattern"] = None
+    offsets: Dict[int, int] = field(default_factory=dict)  # Resume points
+    tail: Optional[int] = 0          # Backlog lines for sources with no offset (None: all)
+    follow: bool = True
+
+    def matches(self, line: str) -> bool:
+        if self.min_level and line_level(line) < self.min_level:
+            return False
+        return self.pattern is None or self.pattern.search(line) is not None
+
+
+class LogStreamer:
+    """Tails log files and pushes filtered chunks to subscribers"""
+
+    def __init__(self, send: Callable):
+        self._send = send  # async (message dict) -> bool
+        self.sources: Dict[int, LogSource] = {}
+        if KERNEL_LOG:
+            self.sources[0] = LogSource(0, "kernel", KERNEL_LOG)
+        self._streams: Dict[Tuple[int, Any], asyncio.Task] = {}
+        self._filters = ThreadPoolExecutor(max_workers=LOG_FILTER_THREADS,
+                                           thread_name_prefix="log-filter")
+
+    def new_log_path(self, name: str) -> str:
+        os.makedirs(LOG_DIR, mode=0o700, exist_ok=True)
+        fd, path = tempfile.mkstemp(prefix=f"{name}-", suffix=".log", dir=LOG_DIR)
+        os.close(fd)
+        return path
+
+    def add_source(self, agent_id: int, name: str, path: str, pid: int = 0):
+        self.sources[agent_id] = LogSource(agent_id, name, path, pid)
+        self._prune()
+
+    def _prune(self):
+        """Delete the logs of exited agents beyond the newest LOG_KEEP_EXITED"""
+        exited = [s for s in self.sources.values() if s.pid and not process_alive(s.pid)]
+        for source in exited[:max(0, len(exited) - LOG_KEEP_EXITED)]:
+            del self.sources[source.agent_id]
+            try:
+                os.unlink(source.path)
+            except OSError:
+                pass
+
+    async def subscribe(self, data: dict):
+        """Start (or restart) a stream from a log_subscribe message"""
+        subscriber = data.get("subscriber")
+        subscription = data.get("subscription")
+        key = (subscriber, subscription)
+        try:
+            if not data.get("operator"):
+                raise PermissionError("log streaming requires an operator-scoped token")
+            if sum(1 for k in self._streams if k[0] == subscriber and k != key) >= LOG_MAX_STREAMS:
+                raise PermissionError(f"too many log streams (max {LOG_MAX_STREAMS})")
+            level = data.get("level")
+            if level and level.lower() not in LOG_LEVELS:
+                raise ValueError(f"unknown level: {level}")
+            pattern = data.get("pattern")
+            if pattern and len(pattern) > LOG_MAX_PATTERN:
+                raise ValueError(f"pattern longer than {LOG_MAX_PATTERN} characters")
+            sub = LogSubscription(
+                subscriber=subscriber,
+                subscription=subscription,
+                agent_id=data.get("agent_id"),
+                min_level=LOG_LEVELS[level.lower()] if level else 0,
+                pattern=re.compile(pattern) if pattern else None,
+                offsets={int(k): int(v) for k, v in (data.get("offsets") or {}).items()},
+                tail=None if data.get("tail", 0) is None else int(data.get("tail", 0)),
+                follow=bool(data.get("follow", True))
+            )
+        except (re.error, ValueError, TypeError, PermissionError) as e:
+            await self._send({"type": "log_error", "subscriber": subscriber,
+                              "subscription": subscription, "error": str(e)})
+            return
+
+        self.unsubscribe(subscriber, subscription)
+        task = asyncio.create_task(self._stream(sub))
+        task.add_done_callback(lambda t: self._streams.pop(key, None)
+                               if self._streams.get(key) is t else None)
+        self._streams[key] = task
+
+    def unsubscribe(self, subscriber: int, subscription: Any = None):
+        """Stop one stream, or every stream of a subscriber"""
+        for key in list(self._streams):
+            if key[0] == subscriber and (subscription is None or key[1] == subscription):
+                self._streams.pop(key).cancel()
+
+    def cancel_all(self):
+        for task in self._streams.values():
+            task.cancel()
+        self._streams.clear()
+
+    async def _stream(self, sub: LogSubscription):
+        offsets: Dict[int, int] = {}
+        started = False
+        while True:
+            if sub.agent_id is None:
+                sources = list(self.sources.values())
+            else:
+                source = self.sources.get(sub.agent_id)
+                if source is None:
+                    await self._send({"type": "log_error", "subscriber": sub.subscriber,
+                                      "subscription": sub.subscription,
+                                      "error": f"no log for agent {sub.agent_id}"})
+                    return
+                sources = [source]
+
+            for source in sources:
+                if source.agent_id not in offsets:
+                    offsets[source.agent_id] = self._start_offset(sub, source, started)
+                offset = await self._read(sub, source, offsets[source.agent_id])
+                if offset is None:
+                    return  # Subscriber gone
+                offsets[source.agent_id] = offset
+
+            started = True
+            if not sub.follow:
+                await self._send({"type": "log_end", "subscriber": sub.subscriber,
+                                  "subscription": sub.subscription, "offsets": offsets})
+                return
+            await asyncio.sleep(LOG_POLL_INTERVAL)
+
+    @staticmethod
+    def _start_offset(sub: LogSubscription, source: LogSource, started: bool) -> int:
+        if source.agent_id in sub.offsets:
+            return sub.offsets[source.agent_id]
+        if started:
+            return 0  # Agent deployed while following: all of its output is new
+        try:
+            if sub.tail is None:
+                return 0
+            if sub.tail:
+                return tail_offset(source.path, sub.tail)
+            return os.path.getsize(source.path) if sub.follow else 0
+        except OSError:
+            return 0
+
+    async def _read(self, sub: LogSubscription, source: LogSource, offset: int) -> Optional[int]:
+        """Send what a source has past `offset`; returns the new offset"""
+        try:
+            size = os.path.getsize(source.path)
+        except OSError:
+            return offset
+        if size < offset:
+            offset = 0  # Truncated or replaced
+
+        loop = asyncio.get_running_loop()
+        while offset < size:
+            end, lines = await loop.run_in_executor(self._filters, self._read_chunk,
+                                                    sub, source.path, offset, size)
+            if end == 0:
+                break
+            if lines and not await self._send({
+                "type": "log_chunk",
+                "subscriber": sub.subscriber,
+                "subscription": sub.subscription,
+                "agent_id": source.agent_id,
+                "name": source.name,
+                "offset": offset,
+                "next_offset": offset + end,
+                "lines": lines
+            }):
+                return None
+            offset += end
+        return offset
+
+    @staticmethod
+    def _read_chunk(sub: LogSubscription, path: str, offset: int,
+                    size: int) -> Tuple[int, List[str]]:
+        """Read whole lines at offset and filter them (on a worker thread)
+
+        Returns (bytes consumed, matching lines); 0 bytes means only a
+        partial line is waiting.
+        """
+        with open(path, "rb") as f:
+            f.seek(offset)
+            data = f.read(min(size - offset, LOG_CHUNK_BYTES))
+        end = data.rfind(b"\n") + 1
+        if end == 0:
+            # A partial line waits for its newline unless it fills a chunk
+            # or nothing more is coming
+            if len(data) < LOG_CHUNK_BYTES and sub.follow:
+                return 0, []
+            end = len(data)
+        lines = [line for line in data[:end].decode("utf-8", "replace").splitlines()
+                 if sub.matches(line)]
+        return end, lines
+
+
 class TunnelClient:
     """WebSocket client that connects kernel to relay server"""
 
@@ -67,9 +449,13 @@ class TunnelClient:
         self._ws: Optional[WebSocketClientProtocol] = None
         self._connected = False
         self._running = False
+        self._binary = False  # Relay accepted binary frames
         self._reconnect_task: Optional[asyncio.Task] = None
         self._heartbeat_task: Optional[asyncio.Task] = None
         self._remote_agents: Dict[int, RemoteAgent] = {}
+        self._scripts = ScriptCache()
+        self._logs = LogStreamer(self._send_message)
+        self._deploy_logs: Dict[int, LogSource] = {}  # command_id -> log of the pending spawn
 
         # Callback for syscalls from remote agents
         self._syscall_handler: Optional[Callable] = None
@@ -106,7 +492,8 @@ class TunnelClient:
             auth_msg = {
                 "type": "kernel_auth",
                 "machine_id": self.config.machine_id,
-                "token": self.config.token
+                "token": self.config.token,
+                "binary": True
             }
             await self._ws.send(json.dumps(auth_msg))
 
@@ -117,6 +504,7 @@ class TunnelClient:
             if data.get("type") == "auth_ok":
                 self._connected = True
                 self._running = True
+                self._binary = bool(data.get("binary", False))
 
                 # Start message handler
                 asyncio.create_task(self._message_loop())
@@ -154,12 +542,16 @@ class TunnelClient:
             self._ws = None
 
         self._remote_agents.clear()
+        self._logs.cancel_all()
 
     async def _message_loop(self):
         """Handle incoming messages from relay"""
         try:
             async for message in self._ws:
                 try:
+                    if isinstance(message, bytes):
+                        self._handle_syscall_frame(message)
+                        continue
                     data = json.loads(message)
                     await self._handle_relay_message(data)
                 except json.JSONDecodeError:
@@ -195,6 +587,7 @@ class TunnelClient:
             agent_id = data.get("agent_id")
             if agent_id in self._remote_agents:
                 del self._remote_agents[agent_id]
+            self._logs.unsubscribe(agent_id)
             self._emit_event("agent_disconnected", {
                 "agent_id": agent_id
             })
@@ -206,12 +599,31 @@ class TunnelClient:
             payload_b64 = data.get("payload", "")
             payload = base64.b64decode(payload_b64) if payload_b64 else b""
 
-            self._emit_event("syscall", {
+            event = {
                 "agent_id": agent_id,
                 "opcode": opcode,
                 "payload": payload_b64
+            }
+            if "request_id" in data:
+                event["request_id"] = data["request_id"]
+            self._emit_event("syscall", event)
+
+        elif msg_type == "deploy_agent":
+            await self._handle_deploy(data)
+
+        elif msg_type == "stop_agent":
+            self._emit_event("command", {
+                "command_id": data.get("command_id"),
+                "type": "stop_agent",
+                "agent_id": data.get("agent_id")
             })
 
+        elif msg_type == "log_subscribe":
+            await self._logs.subscribe(data)
+
+        elif msg_type == "log_unsubscribe":
+            self._logs.unsubscribe(data.get("subscriber"), data.get("subscription"))
+
         elif msg_type == "remote_list":
             # Response to list_remotes request
             agents = data.get("agents", [])
@@ -220,6 +632,69 @@ class TunnelClient:
         elif msg_type == "pong":
             pass  # Heartbeat response
 
+    async def _handle_deploy(self, data: dict):
+        """Find or write a deployed script and ask the kernel to spawn it"""
+        command_id = data.get("command_id")
+        script_name = os.path.basename(data.get("script_name", "")) or "agent.py"
+        script_sha256 = data.get("script_sha256", "")
+        try:
+            if "script_content" in data:
+                content = base64.b64decode(data["script_content"])
+                if script_sha256 and hashlib.sha256(content).hexdigest() != script_sha256:
+                    raise ValueError("script_sha256 does not match script_content")
+                script_path = self._scripts.store(content, script_name)
+            else:
+                script_path = self._scripts.lookup(script_sha256, script_name)
+        except Exception as e:
+            await self.send_command_result(command_id, {
+                "success": False,
+                "error": f"Failed to write script: {e}"
+            })
+            return
+
+        if script_path is None:
+            await self.send_command_result(command_id, {
+                "success": False,
+                "error": "script not cached",
+                "missing_script": True
+            })
+            return
+
+        # The kernel rejects duplicate names, and a script may be deployed
+        # again while an earlier copy is still running
+        name = os.path.splitext(script_name)[0]
+        if command_id is not None:
+            name = f"{name}-{command_id}"
+        log_path = self._logs.new_log_path(name)
+        self._deploy_logs[command_id] = LogSource(0, name, log_path)
+        self._emit_event("command", {
+            "command_id": command_id,
+            "type": "deploy_agent",
+            "script_path": script_path,
+            "name": name,
+            "log_path": log_path,
+            "args": data.get("args", [])
+        })
+
+    def _handle_syscall_frame(self, frame: bytes):
+        """Handle a binary syscall frame from the relay"""
+        if len(frame) < FRAME_HEADER_SIZE:
+            return
+        request_id, = ROUTE_PREFIX.unpack_from(frame)
+        magic, agent_id, opcode, size = MESSAGE_HEADER.unpack_from(frame, ROUTE_PREFIX.size)
+        if magic != MAGIC_BYTES or size != len(frame) - FRAME_HEADER_SIZE:
+            return
+
+        # The kernel pipe is JSON lines, so the payload is base64'd only here
+        event = {
+            "agent_id": agent_id,
+            "opcode": opcode,
+            "payload": base64.b64encode(frame[FRAME_HEADER_SIZE:]).decode()
+        }
+        if request_id:
+            event["request_id"] = request_id
+        self._emit_event("syscall", event)
+
     async def _heartbeat_loop(self):
         """Send periodic heartbeats"""
         while self._running and self._connected:
@@ -241,17 +716,34 @@ class TunnelClient:
             except Exception as e:
                 self._emit_event("reconnect_failed", {"error": str(e)})
 
-    async def send_response(self, agent_id: int, opcode: int, payload: bytes):
-        """Send a syscall response back to a remote agent"""
+    async def send_response(self, agent_id: int, opcode: int, payload: bytes,
+                            request_id: Optional[int] = None):
+        """Send a syscall response back to a remote agent
+
+        request_id echoes the syscall's ID so the agent can match the
+        response while other calls are in flight.
+        """
         if not self.is_connected:
             return False
 
+        if self._binary:
+            frame = (ROUTE_PREFIX.pack(request_id or 0)
+                     + MESSAGE_HEADER.pack(MAGIC_BYTES, agent_id, opcode, len(payload))
+                     + payload)
+            try:
+                await self._ws.send(frame)
+                return True
+            except Exception:
+                return False
+
         msg = {
             "type": "response",
             "agent_id": agent_id,
             "opcode": opcode,
             "payload": base64.b64encode(payload).decode() if payload else ""
         }
+        if request_id is not None:
+            msg["request_id"] = request_id
 
         try:
             await self._ws.send(json.dumps(msg))
@@ -259,6 +751,35 @@ class TunnelClient:
         except Exception:
             return False
 
+    async def send_command_result(self, command_id: Optional[int], result: dict) -> bool:
+        """Send the outcome of a relay command (deploy_agent, stop_agent)"""
+        log = self._deploy_logs.pop(command_id, None)
+        if log and result.get("success") and result.get("agent_id") is not None:
+            self._logs.add_source(result["agent_id"], result.get("name") or log.name, log.path,
+                                  int(result.get("pid") or 0))
+        elif log:
+            try:
+                os.unlink(log.path)
+            except OSError:
+                pass
+
+        if not self.is_connected or command_id is None:
+            return False
+        return await self._send_message({
+            "type": "command_result",
+            "command_id": command_id,
+            **result
+        })
+
+    async def _send_message(self, message: dict) -> bool:
+        if not self.is_connected:
+            return False
+        try:
+            await self._ws.send(json.dumps(message))
+            return True
+        except Exception:
+            return False
+
     async def list_remote_agents(self) -> list:
         """Request list of connected remote agents"""
         if not self.is_connected:
@@ -331,7 +852,15 @@ class TunnelService:
                 success = await self.client.send_response(
                     agent_id=params.get("agent_id"),
                     opcode=params.get("opcode", 0),
-                    payload=base64.b64decode(params.get("payload", ""))
+                    payload=base64.b64decode(params.get("payload", "")),
+                    request_id=params.get("request_id")
+                )
+                return {"id": req_id, "result": {"success": success}}
+
+            elif method == "command_result":
+                # Kernel finished a relay command
+                success = await self.client.send_command_result(
+                    params.get("command_id"), params.get("result", {})
                 )
                 return {"id": req_id, "result": {"success": success}}
 
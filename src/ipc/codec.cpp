@@ -0,0 +1,165 @@
+#include "ipc/codec.hpp"
+#include <nlohmann/json.hpp>
+
+using json = nlohmann::json;
+
+namespace clove::ipc {
+
+namespace {
+
+constexpr char BASE64_CHARS[] =
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/";
+
+std::string base64_encode(const std::vector<uint8_t>& data) {
+    std::string out;
+    out.reserve(((data.size() + 2) / 3) * 4);
+    for (size_t i = 0; i < data.size(); i += 3) {
+        uint32_t n = static_cast<uint32_t>(data[i]) << 16;
+        if (i + 1 < data.size()) n |= static_cast<uint32_t>(data[i + 1]) << 8;
+        if (i + 2 < data.size()) n |= static_cast<uint32_t>(data[i + 2]);
+        out += BASE64_CHARS[(n >> 18) & 0x3F];
+        out += BASE64_CHARS[(n >> 12) & 0x3F];
+        out += (i + 1 < data.size()) ? BASE64_CHARS[(n >> 6) & 0x3F] : '=';
+        out += (i + 2 < data.size()) ? BASE64_CHARS[n & 0x3F] : '=';
+    }
+    return out;
+}
+
+std::optional<std::vector<uint8_t>> base64_decode(const std::string& in) {
+    if (in.size() % 4 != 0) {
+        return std::nullopt;
+    }
+
+    auto value_of = [](char c) -> int {
+        if (c >= 'A' && c <= 'Z') return c - 'A';
+        if (c >= 'a' && c <= 'z') return c - 'a' + 26;
+        if (c >= '0' && c <= '9') return c - '0' + 52;
+        if (c == '+') return 62;
+        if (c == '/') return 63;
+        return -1;
+    };
+
+    std::vector<uint8_t> out;
+    out.reserve((in.size() / 4) * 3);
+    for (size_t i = 0; i < in.size(); i += 4) {
+        int v[4];
+        int pad = 0;
+        for (int k = 0; k < 4; ++k) {
+            char c = in[i + k];
+            if (c == '=' && i + 4 == in.size() && k >= 2) {
+                v[k] = 0;
+                ++pad;
+                continue;
+            }
+            if (pad > 0 || (v[k] = value_of(c)) < 0) {
+                return std::nullopt;
+            }
+        }
+        uint32_t n = (v[0] << 18) | (v[1] << 12) | (v[2] << 6) | v[3];
+        out.push_back(static_cast<uint8_t>((n >> 16) & 0xFF));
+        if (pad < 2) out.push_back(static_cast<uint8_t>((n >> 8) & 0xFF));
+        if (pad < 1) out.push_back(static_cast<uint8_t>(n & 0xFF));
+    }
+    return out;
+}
+
+// JSON text has no binary type, so binary values cross the handler
+// boundary as {"$bin": "<base64>"}
+void binary_to_tagged(json& j) {
+    if (j.is_binary()) {
+        json tagged;
+        tagged["$bin"] = base64_encode(j.get_binary());
+        j = std::move(tagged);
+        return;
+    }
+    if (j.is_structured()) {
+        for (auto& element : j) {
+            binary_to_tagged(element);
+        }
+    }
+}
+
+void tagged_to_binary(json& j) {
+    if (j.is_object() && j.size() == 1) {
+        auto it = j.find("$bin");
+        if (it != j.end() && it->is_string()) {
+            auto bytes = base64_decode(it->get_ref<const std::string&>());
+            if (bytes) {
+                j = json::binary(std::move(*bytes));
+                return;
+            }
+        }
+    }
+    if (j.is_structured()) {
+        for (auto& element : j) {
+            tagged_to_binary(element);
+        }
+    }
+}
+
+} // namespace
+
+const char* codec_name(PayloadCodec codec) {
+    switch (codec) {
+        case PayloadCodec::JSON:    return "json";
+        case PayloadCodec::MSGPACK: return "msgpack";
+    }
+    return "json";
+}
+
+std::vector<std::string> supported_codecs() {
+    return {"json", "msgpack"};
+}
+
+std::optional<PayloadCodec> negotiate_codec(const std::string& hello_payload) {
+    json j = json::parse(hello_payload, nullptr, false);
+    if (j.is_discarded() || !j.is_object() || !j.contains("codecs") || !j["codecs"].is_array()) {
+        return std::nullopt;
+    }
+
+    for (const auto& name : j["codecs"]) {
+        if (!name.is_string()) continue;
+        if (name == "msgpack") return PayloadCodec::MSGPACK;
+        if (name == "json") return PayloadCodec::JSON;
+    }
+    return PayloadCodec::JSON;
+}
+
+bool opcode_uses_codec(SyscallOp op) {
+    return op != SyscallOp::SYS_NOOP &&
+           op != SyscallOp::SYS_EXIT &&
+           op != SyscallOp::SYS_HELLO;
+}
+
+bool decode_payload(PayloadCodec codec, std::vector<uint8_t>& payload) {
+    if (codec == PayloadCodec::JSON || payload.empty()) {
+        return true;
+    }
+
+    json j = json::from_msgpack(payload, true, false);
+    if (j.is_discarded()) {
+        return false;
+    }
+
+    binary_to_tagged(j);
+    std::string text = j.dump(-1, ' ', false, json::error_handler_t::replace);
+    payload.assign(text.begin(), text.end());
+    return true;
+}
+
+bool encode_payload(PayloadCodec codec, std::vector<uint8_t>& payload) {
+    if (codec == PayloadCodec::JSON || payload.empty()) {
+        return true;
+    }
+
+    json j = json::parse(payload.begin(), payload.end(), nullptr, false);
+    if (j.is_discarded()) {
+        return false;
+    }
+
+    tagged_to_binary(j);
+    payload = json::to_msgpack(j);
+    return true;
+}
+
+} // namespace clove::ipc
@@ -0,0 +1,42 @@
+#pragma once
+#include <cstdint>
+#include <optional>
+#include <string>
+#include <vector>
+#include "ipc/protocol.hpp"
+
+namespace clove::ipc {
+
+// Payload encoding for a client connection, negotiated via SYS_HELLO.
+// Syscall handlers always see JSON text; the transport converts payloads
+// to and from the connection's codec at the edge.
+enum class PayloadCodec : uint8_t {
+    JSON    = 0,
+    MSGPACK = 1,
+};
+
+const char* codec_name(PayloadCodec codec);
+
+// Codec names the kernel understands, in kernel preference order
+std::vector<std::string> supported_codecs();
+
+// Pick a codec from a SYS_HELLO request payload of the form
+// {"codecs": ["msgpack", "json"]} (client preference order).
+// Returns nullopt when the request does not ask for a codec, so a plain
+// hello never changes the connection's codec.
+std::optional<PayloadCodec> negotiate_codec(const std::string& hello_payload);
+
+// NOOP (raw echo), EXIT (raw reply) and HELLO (negotiation) are never transcoded
+bool opcode_uses_codec(SyscallOp op);
+
+// Convert an incoming payload from the codec to JSON text in place.
+// Binary values (msgpack bin) become {"$bin": "<base64>"} objects.
+// Returns false and leaves the payload untouched if it cannot be decoded.
+bool decode_payload(PayloadCodec codec, std::vector<uint8_t>& payload);
+
+// Convert an outgoing JSON text payload to the codec in place, turning
+// {"$bin": "<base64>"} objects back into binary values. Payloads that are
+// not JSON are left untouched (returns false).
+bool encode_payload(PayloadCodec codec, std::vector<uint8_t>& payload);
+
+} // namespace clove::ipc
@@ -43,6 +43,9 @@ enum class SyscallOp : uint8_t {
     SYS_FETCH     = 0x31,  // Retrieve value by key
     SYS_DELETE    = 0x32,  // Delete a key
     SYS_KEYS      = 0x33,  // List keys with optional prefix
+    SYS_MSTORE    = 0x34,  // Store many key-value pairs
+    SYS_MFETCH    = 0x35,  // Retrieve many values by key
+    SYS_MDELETE   = 0x36,  // Delete many keys
     // Permissions
     SYS_GET_PERMS = 0x40,  // Get own permissions
     SYS_SET_PERMS = 0x41,  // Set agent permissions (privileged)
@@ -116,6 +119,19 @@ struct Message {
     SyscallOp opcode;
     std::vector<uint8_t> payload;
 
+    // Set by a handler that cannot answer yet (e.g. a blocking receive with
+    // nothing queued). The transport parks the message and dispatches it
+    // again later; its payload is the request to retry. Never serialized.
+    bool pending = false;
+
+    // With pending: longest the transport may hold the request, in ms. The
+    // transport keeps the deadline itself, so a request cannot extend it.
+    int wait_ms = 0;
+
+    // Set by the transport when it dispatches a parked request whose wait
+    // is over: the handler must answer now. Never serialized.
+    bool wait_expired = false;
+
     Message() : agent_id(0), opcode(SyscallOp::SYS_NOOP) {}
 
     Message(uint32_t id, SyscallOp op, const std::vector<uint8_t>& data = {})
@@ -225,6 +241,9 @@ inline const char* opcode_to_string(SyscallOp op) {
         case SyscallOp::SYS_FETCH:     return "FETCH";
         case SyscallOp::SYS_DELETE:    return "DELETE";
         case SyscallOp::SYS_KEYS:      return "KEYS";
+        case SyscallOp::SYS_MSTORE:    return "MSTORE";
+        case SyscallOp::SYS_MFETCH:    return "MFETCH";
+        case SyscallOp::SYS_MDELETE:   return "MDELETE";
         case SyscallOp::SYS_GET_PERMS: return "GET_PERMS";
         case SyscallOp::SYS_SET_PERMS: return "SET_PERMS";
         case SyscallOp::SYS_HTTP:      return "HTTP";
@@ -5,6 +5,7 @@
 #include <unistd.h>
 #include <fcntl.h>
 #include <cerrno>
+#include <chrono>
 #include <cstring>
 
 namespace clove::ipc {
@@ -75,6 +76,23 @@ void SocketServer::set_handler(MessageHandler handler) {
     handler_ = std::move(handler);
 }
 
+void SocketServer::set_wake_source(WakeSource wake_source) {
+    wake_source_ = std::move(wake_source);
+}
+
+void SocketServer::set_disconnect_handler(DisconnectHandler handler) {
+    disconnect_handler_ = std::move(handler);
+}
+
+namespace {
+
+int64_t steady_now_ms() {
+    return std::chrono::duration_cast<std::chrono::milliseconds>(
+        std::chrono::steady_clock::now().time_since_epoch()).count();
+}
+
+} // namespace
+
 int SocketServer::accept_connection() {
     struct sockaddr_un client_addr;
     socklen_t client_len = sizeof(client_addr);
@@ -132,7 +150,7 @@ bool SocketServer::handle_client(int client_fd) {
 }
 
 void SocketServer::process_messages(ClientConnection& client) {
-    while (true) {
+    while (!client.parked) {
         // Check if we have a complete message
         auto msg_size = Message::get_message_size(
             client.recv_buffer.data(),
@@ -175,26 +193,106 @@ void SocketServer::process_messages(ClientConnection& client) {
         if (handler_) {
             // Override message agent_id with actual client ID (client may send 0 initially)
             msg->agent_id = client.agent_id;
-            Message response = handler_(*msg);
-            response.agent_id = client.agent_id;
-
-            auto serialized = response.serialize();
-            client.send_buffer.insert(
-                client.send_buffer.end(),
-                serialized.begin(),
-                serialized.end()
-            );
-            client.want_write = true;
 
-            spdlog::debug("Agent {} <- {} ({}B payload)",
-                client.agent_id,
-                opcode_to_string(response.opcode),
-                response.payload.size()
-            );
+            // Handlers speak JSON; transcode at the edge for other codecs.
+            // A payload that does not decode (e.g. raw JSON sent by call())
+            // is passed through as-is.
+            bool transcode = client.codec != PayloadCodec::JSON && opcode_uses_codec(msg->opcode);
+            if (transcode) {
+                decode_payload(client.codec, msg->payload);
+            } else if (msg->opcode == SyscallOp::SYS_HELLO) {
+                // The hello reply itself stays JSON; the codec applies from the next frame
+                if (auto codec = negotiate_codec(msg->payload_str())) {
+                    client.codec = *codec;
+                    spdlog::debug("Agent {} using {} payloads", client.agent_id, codec_name(*codec));
+                }
+            }
+
+            dispatch(client, std::move(*msg), transcode);
         }
     }
 }
 
+void SocketServer::dispatch(ClientConnection& client, Message msg, bool transcode) {
+    // Read before the handler runs, so anything arriving meanwhile wakes it
+    uint64_t wake_seq = wake_source_ ? wake_source_(client.agent_id) : 0;
+    bool retrying = client.parked_deadline_ms != 0;
+    Message response = handler_(msg);
+
+    if (response.pending) {
+        // The deadline is fixed when the request is first parked
+        if (!retrying) {
+            client.parked_deadline_ms = steady_now_ms() + response.wait_ms;
+        }
+        client.parked_wake_seq = wake_seq;
+        response.agent_id = client.agent_id;
+        client.parked = std::move(response);
+        client.parked_transcode = transcode;
+        parked_fds_.insert(client.fd);
+        return;
+    }
+    client.parked_deadline_ms = 0;
+
+    response.agent_id = client.agent_id;
+    if (transcode) {
+        encode_payload(client.codec, response.payload);
+    }
+
+    auto serialized = response.serialize();
+    client.send_buffer.insert(
+        client.send_buffer.end(),
+        serialized.begin(),
+        serialized.end()
+    );
+    client.want_write = true;
+
+    spdlog::debug("Agent {} <- {} ({}B payload)",
+        client.agent_id,
+        opcode_to_string(response.opcode),
+        response.payload.size()
+    );
+}
+
+std::vector<int> SocketServer::retry_parked() {
+    std::vector<int> ready;
+    if (parked_fds_.empty() || !handler_) {
+        return ready;
+    }
+
+    // Handlers may not touch parked_fds_, but iterate over a copy anyway
+    int64_t now = steady_now_ms();
+    std::vector<int> fds(parked_fds_.begin(), parked_fds_.end());
+    for (int fd : fds) {
+        auto it = clients_.find(fd);
+        if (it == clients_.end()) {
+            parked_fds_.erase(fd);
+            continue;
+        }
+
+        // Nothing new for this agent and time left: its handler would park again
+        auto& client = *it->second;
+        bool expired = now >= client.parked_deadline_ms;
+        if (!expired && wake_source_ && wake_source_(client.agent_id) == client.parked_wake_seq) {
+            continue;
+        }
+
+        Message msg = std::move(*client.parked);
+        msg.wait_expired = expired;
+        client.parked.reset();
+        parked_fds_.erase(fd);
+
+        dispatch(client, std::move(msg), client.parked_transcode);
+        if (client.parked) {
+            continue;  // Still waiting
+        }
+
+        // Answered: carry on with requests that queued up behind it
+        process_messages(client);
+        ready.push_back(fd);
+    }
+    return ready;
+}
+
 bool SocketServer::flush_client(int client_fd) {
     auto it = clients_.find(client_fd);
     if (it == clients_.end()) {
@@ -236,10 +334,16 @@ bool SocketServer::client_wants_write(int client_fd) const {
 }
 
 void SocketServer::remove_client(int client_fd) {
+    parked_fds_.erase(client_fd);
     auto it = clients_.find(client_fd);
-    if (it != clients_.end()) {
-        close(client_fd);
-        clients_.erase(it);
+    if (it == clients_.end()) {
+        return;
+    }
+    uint32_t agent_id = it->second->agent_id;
+    close(client_fd);
+    clients_.erase(it);
+    if (disconnect_handler_) {
+        disconnect_handler_(agent_id);
     }
 }
 
@@ -249,6 +353,7 @@ void SocketServer::stop() {
         close(fd);
     }
     clients_.clear();
+    parked_fds_.clear();
 
     // Close server socket
     if (server_fd_ >= 0) {
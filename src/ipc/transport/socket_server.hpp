@@ -4,7 +4,10 @@
 #include <vector>
 #include <unordered_map>
 #include <memory>
+#include <optional>
+#include <unordered_set>
 #include "ipc/protocol.hpp"
+#include "ipc/codec.hpp"
 
 namespace clove::ipc {
 
@@ -15,6 +18,14 @@ struct ClientConnection {
     std::vector<uint8_t> recv_buffer;
     std::vector<uint8_t> send_buffer;
     bool want_write = false;
+    PayloadCodec codec = PayloadCodec::JSON;  // Negotiated via SYS_HELLO
+
+    // Request waiting for a result (blocking recv/poll). Later messages from
+    // this client stay buffered until it completes, keeping responses in order.
+    std::optional<Message> parked;
+    bool parked_transcode = false;
+    int64_t parked_deadline_ms = 0;   // Steady clock; kept here, never in the payload
+    uint64_t parked_wake_seq = 0;     // WakeSource value when it was parked
 
     explicit ClientConnection(int fd, uint32_t id) : fd(fd), agent_id(id) {}
 };
@@ -22,6 +33,13 @@ struct ClientConnection {
 // Message handler callback type
 using MessageHandler = std::function<Message(const Message&)>;
 
+// Returns a value that changes whenever something that could complete an
+// agent's parked request arrives (e.g. a message or event for it)
+using WakeSource = std::function<uint64_t(uint32_t agent_id)>;
+
+// Called with the agent id of every client that is removed
+using DisconnectHandler = std::function<void(uint32_t agent_id)>;
+
 class SocketServer {
 public:
     explicit SocketServer(const std::string& socket_path);
@@ -37,6 +55,13 @@ public:
     // Set message handler
     void set_handler(MessageHandler handler);
 
+    // Set what retry_parked() checks before re-running a parked request.
+    // Without one, every parked request is retried on every call.
+    void set_wake_source(WakeSource wake_source);
+
+    // Set what remove_client() notifies once a client is gone
+    void set_disconnect_handler(DisconnectHandler handler);
+
     // Get server fd for event loop
     int get_server_fd() const { return server_fd_; }
 
@@ -53,6 +78,10 @@ public:
     // Check if client wants to write
     bool client_wants_write(int client_fd) const;
 
+    // Re-dispatch parked requests whose agent was woken or whose deadline
+    // has passed. Returns the fds of clients that now have responses to write.
+    std::vector<int> retry_parked();
+
     // Remove client
     void remove_client(int client_fd);
 
@@ -67,10 +96,16 @@ private:
     int server_fd_ = -1;
     uint32_t next_agent_id_ = 1;
     std::unordered_map<int, std::unique_ptr<ClientConnection>> clients_;
+    std::unordered_set<int> parked_fds_;
     MessageHandler handler_;
+    WakeSource wake_source_;
+    DisconnectHandler disconnect_handler_;
 
     // Process complete messages in client buffer
     void process_messages(ClientConnection& client);
+
+    // Run the handler for one message; parks it if the handler is not ready
+    void dispatch(ClientConnection& client, Message msg, bool transcode);
 };
 
 } // namespace clove::ipc
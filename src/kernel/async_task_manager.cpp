@@ -39,7 +39,8 @@ bool AsyncTaskManager::submit(uint32_t agent_id, ipc::SyscallOp opcode, uint64_t
     return true;
 }
 
-std::vector<AsyncTaskManager::AsyncResult> AsyncTaskManager::poll(uint32_t agent_id, int max_results) {
+std::vector<AsyncTaskManager::AsyncResult> AsyncTaskManager::poll(uint32_t agent_id, int max_results,
+                                                                   const std::unordered_set<uint64_t>* only) {
     std::vector<AsyncResult> results;
     if (max_results <= 0) {
         return results;
@@ -52,6 +53,18 @@ std::vector<AsyncTaskManager::AsyncResult> AsyncTaskManager::poll(uint32_t agent
     }
 
     auto& queue = it->second;
+    if (only) {
+        for (auto q = queue.begin(); q != queue.end() && static_cast<int>(results.size()) < max_results;) {
+            if (only->count(q->request_id)) {
+                results.push_back(std::move(*q));
+                q = queue.erase(q);
+            } else {
+                ++q;
+            }
+        }
+        return results;
+    }
+
     while (!queue.empty() && static_cast<int>(results.size()) < max_results) {
         results.push_back(queue.front());
         queue.pop_front();
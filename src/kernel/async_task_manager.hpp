@@ -7,6 +7,7 @@
 #include <mutex>
 #include <thread>
 #include <unordered_map>
+#include <unordered_set>
 #include <vector>
 #include "ipc/protocol.hpp"
 
@@ -27,7 +28,9 @@ public:
 
     uint64_t next_request_id();
     bool submit(uint32_t agent_id, ipc::SyscallOp opcode, uint64_t request_id, TaskFn task);
-    std::vector<AsyncResult> poll(uint32_t agent_id, int max_results);
+    // Oldest results first; with `only`, just those request IDs (the rest stay queued)
+    std::vector<AsyncResult> poll(uint32_t agent_id, int max_results,
+                                  const std::unordered_set<uint64_t>* only = nullptr);
 
 private:
     struct Task {
@@ -15,6 +15,7 @@ void EventBus::emit(KernelEventType type, const nlohmann::json& data, uint32_t s
     for (const auto& [agent_id, subscriptions] : subscriptions_) {
         if (subscriptions.count(type) > 0) {
             queues_[agent_id].push(event);
+            ++versions_[agent_id];
             spdlog::debug("Event {} queued for agent {}", kernel_event_type_to_string(type), agent_id);
         }
     }
@@ -77,4 +78,10 @@ nlohmann::json EventBus::poll(uint32_t agent_id, int max_events) {
     return events_array;
 }
 
+uint64_t EventBus::version(uint32_t agent_id) {
+    std::lock_guard<std::mutex> lock(mutex_);
+    auto it = versions_.find(agent_id);
+    return it == versions_.end() ? 0 : it->second;
+}
+
 } // namespace clove::kernel
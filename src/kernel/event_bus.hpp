@@ -74,9 +74,13 @@ public:
     void unsubscribe(uint32_t agent_id, const std::vector<KernelEventType>& types, bool unsubscribe_all);
     nlohmann::json poll(uint32_t agent_id, int max_events);
 
+    // Events ever queued for agent_id; changes whenever one arrives
+    uint64_t version(uint32_t agent_id);
+
 private:
     std::unordered_map<uint32_t, std::set<KernelEventType>> subscriptions_;
     std::unordered_map<uint32_t, std::queue<KernelEvent>> queues_;
+    std::unordered_map<uint32_t, uint64_t> versions_;
     std::mutex mutex_;
 };
 
@@ -43,6 +43,7 @@ std::string AgentMailboxRegistry::get_name(uint32_t agent_id) const {
 void AgentMailboxRegistry::enqueue(uint32_t target_id, const IPCMessage& message) {
     std::lock_guard<std::mutex> lock(mailbox_mutex_);
     mailboxes_[target_id].push(message);
+    ++versions_[target_id];
 }
 
 std::vector<IPCMessage> AgentMailboxRegistry::dequeue(uint32_t agent_id, int max_messages) {
@@ -75,10 +76,17 @@ int AgentMailboxRegistry::broadcast(const IPCMessage& message, bool include_self
         }
 
         mailboxes_[agent_id].push(message);
+        ++versions_[agent_id];
         delivered_count++;
     }
 
     return delivered_count;
 }
 
+uint64_t AgentMailboxRegistry::version(uint32_t agent_id) const {
+    std::lock_guard<std::mutex> lock(mailbox_mutex_);
+    auto it = versions_.find(agent_id);
+    return it == versions_.end() ? 0 : it->second;
+}
+
 } // namespace clove::kernel
@@ -34,6 +34,9 @@ public:
     std::vector<IPCMessage> dequeue(uint32_t agent_id, int max_messages);
     int broadcast(const IPCMessage& message, bool include_self);
 
+    // Messages ever queued for agent_id; changes whenever one arrives
+    uint64_t version(uint32_t agent_id) const;
+
 private:
     mutable std::mutex registry_mutex_;
     std::unordered_map<std::string, uint32_t> names_;
@@ -41,6 +44,7 @@ private:
 
     mutable std::mutex mailbox_mutex_;
     std::unordered_map<uint32_t, std::queue<IPCMessage>> mailboxes_;
+    std::unordered_map<uint32_t, uint64_t> versions_;
 };
 
 } // namespace clove::kernel
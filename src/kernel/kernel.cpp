@@ -11,6 +11,8 @@
 #include "kernel/permissions_store.hpp"
 #include "kernel/reactor.hpp"
 #include "kernel/state_store.hpp"
+#include "kernel/wait_helpers.hpp"
+#include "ipc/codec.hpp"
 #include "ipc/transport/socket_server.hpp"
 #include "metrics/metrics.hpp"
 #include "runtime/agent/manager.hpp"
@@ -169,8 +171,15 @@ Kernel::Kernel(const Config& config, Dependencies deps)
             response["features"] = {
                 {"llm_in_kernel", false},
                 {"sys_think_stub", true},
-                {"async_default_exec_http", true}
+                {"async_default_exec_http", true},
+                {"state_batch", true},
+                {"blocking_wait", true}
             };
+            response["codecs"] = ipc::supported_codecs();
+            // The socket server switches the connection to this codec
+            if (auto codec = ipc::negotiate_codec(msg.payload_str())) {
+                response["codec"] = ipc::codec_name(*codec);
+            }
             return ipc::Message(msg.agent_id, ipc::SyscallOp::SYS_HELLO, response.dump());
         });
 
@@ -198,6 +207,15 @@ bool Kernel::init() {
     socket_server_->set_handler([this](const ipc::Message& msg) {
         return handle_message(msg);
     });
+    // Parked recv/poll requests only re-run when a message or event arrives
+    socket_server_->set_wake_source([this](uint32_t agent_id) {
+        return wait_helpers::wake_seq(*context_, agent_id);
+    });
+    socket_server_->set_disconnect_handler([this](uint32_t agent_id) {
+        for (auto& module : modules_) {
+            module->on_agent_disconnect(agent_id);
+        }
+    });
 
     // Initialize socket server
     if (!socket_server_->init()) {
@@ -282,6 +300,9 @@ void Kernel::run() {
             module->on_tick();
         }
 
+        // Expire or complete blocking requests (timeouts, tunnel deliveries)
+        retry_parked_requests();
+
         // Reap dead agents and queue restarts if needed
         agent_manager_->reap_and_restart_agents();
 
@@ -350,6 +371,9 @@ void Kernel::on_client_event(int fd, uint32_t events) {
 
     // Update events based on write buffer
     update_client_events(fd);
+
+    // This client's requests may have unblocked others (e.g. SEND to a waiting RECV)
+    retry_parked_requests();
 }
 
 void Kernel::update_client_events(int fd) {
@@ -360,6 +384,12 @@ void Kernel::update_client_events(int fd) {
     reactor_->modify(fd, events);
 }
 
+void Kernel::retry_parked_requests() {
+    for (int fd : socket_server_->retry_parked()) {
+        update_client_events(fd);
+    }
+}
+
 ipc::Message Kernel::handle_message(const ipc::Message& msg) {
     return syscall_router_->handle(msg);
 }
@@ -133,6 +133,9 @@ private:
 
     // Update client in reactor (for write events)
     void update_client_events(int fd);
+
+    // Re-dispatch blocking requests (recv/poll with wait) that may now be answerable
+    void retry_parked_requests();
 };
 
 } // namespace clove::kernel
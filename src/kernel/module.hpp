@@ -1,4 +1,5 @@
 #pragma once
+#include <cstdint>
 
 namespace clove::kernel {
 
@@ -9,6 +10,8 @@ public:
     virtual ~KernelModule() = default;
     virtual void register_syscalls(SyscallRouter& router) = 0;
     virtual void on_tick() {}
+    // Called when an agent's connection closes; drop any per-agent state
+    virtual void on_agent_disconnect(uint32_t /*agent_id*/) {}
 };
 
 } // namespace clove::kernel
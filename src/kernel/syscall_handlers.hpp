@@ -1,6 +1,8 @@
 #pragma once
 #include <cstdint>
+#include <deque>
 #include <functional>
+#include <unordered_map>
 #include <utility>
 #include <vector>
 #include <nlohmann/json.hpp>
@@ -101,11 +103,15 @@ class LlmSyscalls final : public KernelModule {
 public:
     explicit LlmSyscalls(KernelContext& context) : context_(context) {}
     void register_syscalls(SyscallRouter& router) override;
+    void on_agent_disconnect(uint32_t agent_id) override { key_pools_.erase(agent_id); }
 private:
     static ipc::Message think_sync(KernelContext& context, const ipc::Message& msg);
     ipc::Message handle_think(const ipc::Message& msg);
     ipc::Message handle_report(const ipc::Message& msg);
     KernelContext& context_;
+    // Latest API key pool summary per connected reporting agent; each agent's
+    // LLM service keeps its own pool, so counters only compare within one agent
+    std::unordered_map<uint32_t, nlohmann::json> key_pools_;
 };
 
 class MetricsSyscalls final : public KernelModule {
@@ -164,6 +170,9 @@ private:
     ipc::Message handle_fetch(const ipc::Message& msg);
     ipc::Message handle_delete(const ipc::Message& msg);
     ipc::Message handle_keys(const ipc::Message& msg);
+    ipc::Message handle_mstore(const ipc::Message& msg);
+    ipc::Message handle_mfetch(const ipc::Message& msg);
+    ipc::Message handle_mdelete(const ipc::Message& msg);
     KernelContext& context_;
 };
 
@@ -180,10 +189,23 @@ private:
     ipc::Message handle_tunnel_status(const ipc::Message& msg);
     ipc::Message handle_tunnel_list_remotes(const ipc::Message& msg);
     ipc::Message handle_tunnel_config(const ipc::Message& msg);
+    struct RemoteRequest {
+        uint64_t request_id;  // Relay correlation ID, echoed in the response (0 = none)
+        ipc::Message msg;
+        int64_t deadline_ms = 0;  // Set once parked (steady clock)
+        uint64_t wake_seq = 0;    // wait_helpers::wake_seq() when parked
+    };
     void process_tunnel_events();
-    void handle_tunnel_syscall(uint32_t agent_id, uint8_t opcode, const std::vector<uint8_t>& payload);
+    void handle_tunnel_syscall(uint32_t agent_id, uint8_t opcode, const std::vector<uint8_t>& payload,
+                               uint64_t request_id);
+    void handle_tunnel_command(const nlohmann::json& command);
+    bool dispatch_remote(RemoteRequest request);
+    void retry_parked();
     KernelContext& context_;
     std::function<ipc::Message(const ipc::Message&)> dispatch_;
+    // Per remote agent: a blocking request waiting for a result, then the
+    // requests that arrived after it (answered in order)
+    std::unordered_map<uint32_t, std::deque<RemoteRequest>> parked_;
 };
 
 class WorldSyscalls final : public KernelModule {
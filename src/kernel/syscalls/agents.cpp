@@ -28,6 +28,12 @@ ipc::Message AgentSyscalls::handle_spawn(const ipc::Message& msg) {
         config.sandboxed = context_.config.enable_sandboxing && j.value("sandboxed", true);
         config.enable_network = j.value("network", false);
 
+        // Output capture is for the kernel's own spawns (relay deploys), so
+        // agents cannot have the kernel create files on their behalf
+        if (msg.agent_id == 0) {
+            config.log_path = j.value("log_path", "");
+        }
+
         if (j.contains("limits")) {
             auto& lim = j["limits"];
             config.limits.memory_limit_bytes = lim.value("memory", 256 * 1024 * 1024);
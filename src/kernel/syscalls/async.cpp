@@ -21,7 +21,18 @@ ipc::Message AsyncSyscalls::handle_async_poll(const ipc::Message& msg) {
     }
 
     int max_results = request.value("max", 10);
-    auto results = context_.async_tasks.poll(msg.agent_id, max_results);
+
+    // "request_ids" limits the poll to those calls, leaving other results for other pollers
+    std::unordered_set<uint64_t> only;
+    bool filtered = request.is_object() && request.contains("request_ids") && request["request_ids"].is_array();
+    if (filtered) {
+        for (const auto& id : request["request_ids"]) {
+            if (id.is_number_unsigned()) {
+                only.insert(id.get<uint64_t>());
+            }
+        }
+    }
+    auto results = context_.async_tasks.poll(msg.agent_id, max_results, filtered ? &only : nullptr);
 
     json response;
     response["success"] = true;
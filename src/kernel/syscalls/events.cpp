@@ -1,5 +1,6 @@
 #include "kernel/syscall_handlers.hpp"
 #include "kernel/syscall_router.hpp"
+#include "kernel/wait_helpers.hpp"
 #include <spdlog/spdlog.h>
 #include <nlohmann/json.hpp>
 
@@ -124,6 +125,12 @@ ipc::Message EventSyscalls::handle_poll_events(const ipc::Message& msg) {
 
         int max_events = j.value("max", 100);
         json events_array = context_.event_bus.poll(msg.agent_id, max_events);
+        if (events_array.empty() && wait_helpers::should_wait(j)) {
+            // Long-poll: the transport retries until an event arrives or timeout_ms passes
+            if (auto retry = wait_helpers::park_until_deadline(msg, j)) {
+                return *retry;
+            }
+        }
 
         json response;
         response["success"] = true;
@@ -1,6 +1,7 @@
 #include "kernel/syscall_handlers.hpp"
 #include "kernel/syscall_router.hpp"
 #include "kernel/ipc_mailbox.hpp"
+#include "kernel/wait_helpers.hpp"
 #include <spdlog/spdlog.h>
 #include <nlohmann/json.hpp>
 
@@ -112,10 +113,15 @@ ipc::Message IpcSyscalls::handle_recv(const ipc::Message& msg) {
     try {
         json j = json::parse(msg.payload_str());
         int max_messages = j.value("max", 10);
-        bool wait = j.value("wait", false);
-        (void)wait;
 
         auto messages = context_.mailbox_registry.dequeue(msg.agent_id, max_messages);
+        if (messages.empty() && wait_helpers::should_wait(j)) {
+            // Long-poll: the transport retries until a message arrives or timeout_ms passes
+            if (auto retry = wait_helpers::park_until_deadline(msg, j)) {
+                return *retry;
+            }
+        }
+
         json messages_array = json::array();
 
         for (const auto& ipc_msg : messages) {
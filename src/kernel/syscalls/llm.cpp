@@ -11,6 +11,16 @@ using json = nlohmann::json;
 
 namespace clove::kernel {
 
+namespace {
+
+// Integer field of an agent-supplied report, or fallback if missing or not an integer
+int report_int(const json& j, const char* field, int fallback) {
+    auto it = j.find(field);
+    return it != j.end() && it->is_number_integer() ? it->get<int>() : fallback;
+}
+
+} // namespace
+
 void LlmSyscalls::register_syscalls(SyscallRouter& router) {
     router.register_handler(ipc::SyscallOp::SYS_THINK,
         [this](const ipc::Message& msg) { return handle_think(msg); });
@@ -99,7 +109,7 @@ ipc::Message LlmSyscalls::handle_report(const ipc::Message& msg) {
     }
 
     uint32_t tokens = 0;
-    if (j.contains("tokens")) {
+    if (j.contains("tokens") && j["tokens"].is_number_unsigned()) {
         tokens = j["tokens"].get<uint32_t>();
     }
 
@@ -114,10 +124,31 @@ ipc::Message LlmSyscalls::handle_report(const ipc::Message& msg) {
         }
     }
 
+    if (j.contains("key_pool") && j["key_pool"].is_object()) {
+        const auto& pool = j["key_pool"];
+        int keys = report_int(pool, "keys", 0);
+        int healthy = report_int(pool, "healthy_keys", keys);
+        int rate_limited = report_int(pool, "rate_limited", 0);
+
+        auto prev = key_pools_.find(msg.agent_id);
+        int prev_rate_limited = prev != key_pools_.end() ? report_int(prev->second, "rate_limited", 0) : 0;
+        int prev_healthy = prev != key_pools_.end() ? report_int(prev->second, "healthy_keys", keys) : keys;
+        if (rate_limited > prev_rate_limited || healthy < prev_healthy) {
+            spdlog::warn("LLM key pool (agent {}): {}/{} keys healthy, {} in cooldown, {} rate limited",
+                         msg.agent_id, healthy, keys,
+                         report_int(pool, "keys_in_cooldown", 0), rate_limited);
+        }
+        key_pools_[msg.agent_id] = pool;
+    }
+
     json response;
     response["success"] = allowed;
     response["tokens"] = tokens;
     response["quota_exceeded"] = !allowed;
+    auto pool = key_pools_.find(msg.agent_id);
+    if (pool != key_pools_.end()) {
+        response["key_pool"] = pool->second;
+    }
     if (!allowed) {
         response["error"] = "LLM quota exceeded or permission denied";
     }
@@ -17,6 +17,12 @@ void StateSyscalls::register_syscalls(SyscallRouter& router) {
         [this](const ipc::Message& msg) { return handle_delete(msg); });
     router.register_handler(ipc::SyscallOp::SYS_KEYS,
         [this](const ipc::Message& msg) { return handle_keys(msg); });
+    router.register_handler(ipc::SyscallOp::SYS_MSTORE,
+        [this](const ipc::Message& msg) { return handle_mstore(msg); });
+    router.register_handler(ipc::SyscallOp::SYS_MFETCH,
+        [this](const ipc::Message& msg) { return handle_mfetch(msg); });
+    router.register_handler(ipc::SyscallOp::SYS_MDELETE,
+        [this](const ipc::Message& msg) { return handle_mdelete(msg); });
 }
 
 ipc::Message StateSyscalls::handle_store(const ipc::Message& msg) {
@@ -161,4 +167,180 @@ ipc::Message StateSyscalls::handle_keys(const ipc::Message& msg) {
     }
 }
 
+// Batch variants: one frame carries many keys. Per-key results are returned
+// in request order; a bad entry fails only itself, not the whole batch.
+
+ipc::Message StateSyscalls::handle_mstore(const ipc::Message& msg) {
+    try {
+        json j = json::parse(msg.payload_str());
+
+        if (!j.contains("items") || !j["items"].is_array()) {
+            json response;
+            response["success"] = false;
+            response["error"] = "items array is required";
+            return ipc::Message(msg.agent_id, ipc::SyscallOp::SYS_MSTORE, response.dump());
+        }
+
+        std::string default_scope = j.value("scope", "global");
+        std::optional<int> default_ttl;
+        if (j.contains("ttl") && j["ttl"].is_number()) {
+            default_ttl = j["ttl"].get<int>();
+        }
+
+        json results = json::array();
+        size_t stored = 0;
+        for (const auto& item : j["items"]) {
+            json entry;
+            entry["key"] = "";
+            // Malformed fields (e.g. a non-string scope) fail only this item
+            try {
+                std::string key = item.is_object() ? item.value("key", "") : "";
+                entry["key"] = key;
+                if (key.empty()) {
+                    entry["success"] = false;
+                    entry["error"] = "key is required";
+                    results.push_back(std::move(entry));
+                    continue;
+                }
+
+                std::string scope = item.value("scope", default_scope);
+                std::optional<int> ttl_secs = default_ttl;
+                if (item.contains("ttl") && item["ttl"].is_number()) {
+                    ttl_secs = item["ttl"].get<int>();
+                }
+
+                auto result = context_.state_store.store(msg.agent_id, key, item.value("value", json{}), scope, ttl_secs);
+                entry["success"] = result.success;
+                if (!result.success) {
+                    entry["error"] = "failed to store key";
+                    results.push_back(std::move(entry));
+                    continue;
+                }
+
+                ++stored;
+                if (result.scope == "global") {
+                    json event_data;
+                    event_data["key"] = key;
+                    event_data["action"] = "store";
+                    event_data["agent_id"] = msg.agent_id;
+                    context_.event_bus.emit(KernelEventType::STATE_CHANGED, event_data, msg.agent_id);
+                }
+            } catch (const std::exception& e) {
+                entry["success"] = false;
+                entry["error"] = std::string("invalid item: ") + e.what();
+            }
+            results.push_back(std::move(entry));
+        }
+
+        spdlog::debug("Agent {} stored {} of {} keys", msg.agent_id, stored, results.size());
+
+        json response;
+        response["success"] = true;
+        response["results"] = std::move(results);
+        response["stored"] = stored;
+        return ipc::Message(msg.agent_id, ipc::SyscallOp::SYS_MSTORE, response.dump());
+
+    } catch (const std::exception& e) {
+        json response;
+        response["success"] = false;
+        response["error"] = std::string("invalid request: ") + e.what();
+        return ipc::Message(msg.agent_id, ipc::SyscallOp::SYS_MSTORE, response.dump());
+    }
+}
+
+ipc::Message StateSyscalls::handle_mfetch(const ipc::Message& msg) {
+    try {
+        json j = json::parse(msg.payload_str());
+
+        if (!j.contains("keys") || !j["keys"].is_array()) {
+            json response;
+            response["success"] = false;
+            response["error"] = "keys array is required";
+            return ipc::Message(msg.agent_id, ipc::SyscallOp::SYS_MFETCH, response.dump());
+        }
+
+        json results = json::array();
+        size_t found = 0;
+        for (const auto& k : j["keys"]) {
+            json entry;
+            std::string key = k.is_string() ? k.get<std::string>() : "";
+            entry["key"] = key;
+
+            auto result = context_.state_store.fetch(msg.agent_id, key);
+            entry["success"] = result.success;
+            if (!result.success) {
+                entry["error"] = key.empty() ? "key is required" : "failed to fetch key";
+                results.push_back(std::move(entry));
+                continue;
+            }
+
+            entry["exists"] = result.exists;
+            entry["value"] = result.value;
+            if (result.exists) {
+                entry["scope"] = result.scope;
+                ++found;
+            }
+            results.push_back(std::move(entry));
+        }
+
+        json response;
+        response["success"] = true;
+        response["results"] = std::move(results);
+        response["found"] = found;
+        return ipc::Message(msg.agent_id, ipc::SyscallOp::SYS_MFETCH, response.dump());
+
+    } catch (const std::exception& e) {
+        json response;
+        response["success"] = false;
+        response["error"] = std::string("invalid request: ") + e.what();
+        return ipc::Message(msg.agent_id, ipc::SyscallOp::SYS_MFETCH, response.dump());
+    }
+}
+
+ipc::Message StateSyscalls::handle_mdelete(const ipc::Message& msg) {
+    try {
+        json j = json::parse(msg.payload_str());
+
+        if (!j.contains("keys") || !j["keys"].is_array()) {
+            json response;
+            response["success"] = false;
+            response["error"] = "keys array is required";
+            return ipc::Message(msg.agent_id, ipc::SyscallOp::SYS_MDELETE, response.dump());
+        }
+
+        json results = json::array();
+        size_t deleted = 0;
+        for (const auto& k : j["keys"]) {
+            json entry;
+            std::string key = k.is_string() ? k.get<std::string>() : "";
+            entry["key"] = key;
+
+            auto result = context_.state_store.erase(msg.agent_id, key);
+            entry["success"] = result.success;
+            entry["deleted"] = result.deleted;
+            if (!result.success) {
+                entry["error"] = "key is required";
+            }
+            if (result.deleted) {
+                ++deleted;
+            }
+            results.push_back(std::move(entry));
+        }
+
+        spdlog::debug("Agent {} deleted {} of {} keys", msg.agent_id, deleted, results.size());
+
+        json response;
+        response["success"] = true;
+        response["results"] = std::move(results);
+        response["deleted"] = deleted;
+        return ipc::Message(msg.agent_id, ipc::SyscallOp::SYS_MDELETE, response.dump());
+
+    } catch (const std::exception& e) {
+        json response;
+        response["success"] = false;
+        response["error"] = std::string("invalid request: ") + e.what();
+        return ipc::Message(msg.agent_id, ipc::SyscallOp::SYS_MDELETE, response.dump());
+    }
+}
+
 } // namespace clove::kernel
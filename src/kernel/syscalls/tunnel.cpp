@@ -1,5 +1,6 @@
 #include "kernel/syscall_handlers.hpp"
 #include "kernel/syscall_router.hpp"
+#include "kernel/wait_helpers.hpp"
 #include "services/tunnel/client.hpp"
 #include <spdlog/spdlog.h>
 #include <nlohmann/json.hpp>
@@ -23,6 +24,7 @@ void TunnelSyscalls::register_syscalls(SyscallRouter& router) {
 
 void TunnelSyscalls::on_tick() {
     process_tunnel_events();
+    retry_parked();
 }
 
 ipc::Message TunnelSyscalls::handle_tunnel_connect(const ipc::Message& msg) {
@@ -147,7 +149,8 @@ void TunnelSyscalls::process_tunnel_events() {
     for (const auto& event : events) {
         switch (event.type) {
             case clove::services::tunnel::TunnelEvent::Type::SYSCALL:
-                handle_tunnel_syscall(event.agent_id, event.opcode, event.payload);
+                handle_tunnel_syscall(event.agent_id, event.opcode, event.payload,
+                                      event.request_id);
                 break;
 
             case clove::services::tunnel::TunnelEvent::Type::AGENT_CONNECTED:
@@ -170,27 +173,137 @@ void TunnelSyscalls::process_tunnel_events() {
             case clove::services::tunnel::TunnelEvent::Type::ERROR:
                 spdlog::error("Tunnel error: {}", event.error);
                 break;
+
+            case clove::services::tunnel::TunnelEvent::Type::COMMAND:
+                handle_tunnel_command(event.command);
+                break;
         }
     }
 }
 
 void TunnelSyscalls::handle_tunnel_syscall(uint32_t agent_id, uint8_t opcode,
-                                          const std::vector<uint8_t>& payload) {
+                                          const std::vector<uint8_t>& payload,
+                                          uint64_t request_id) {
     ipc::Message msg;
     msg.agent_id = agent_id;
     msg.opcode = static_cast<ipc::SyscallOp>(opcode);
     msg.payload = payload;
 
-    spdlog::debug("Processing syscall from remote agent {}: opcode=0x{:02x}",
-                  agent_id, opcode);
+    spdlog::debug("Processing syscall from remote agent {}: opcode=0x{:02x} request_id={}",
+                  agent_id, opcode, request_id);
+
+    // Queue behind a blocking request from the same agent to keep responses in order
+    auto it = parked_.find(agent_id);
+    if (it != parked_.end()) {
+        it->second.push_back({request_id, std::move(msg)});
+        return;
+    }
+
+    dispatch_remote({request_id, std::move(msg)});
+}
+
+void TunnelSyscalls::handle_tunnel_command(const json& command) {
+    uint64_t command_id = command.value("command_id", uint64_t{0});
+    std::string type = command.value("type", "");
+    json result;
+
+    // Run through the syscall handlers as the kernel itself (agent 0)
+    if (type == "deploy_agent") {
+        json spawn;
+        spawn["script"] = command.value("script_path", "");
+        if (!command.value("name", "").empty()) {
+            spawn["name"] = command["name"];
+        }
+        if (!command.value("log_path", "").empty()) {
+            spawn["log_path"] = command["log_path"];
+        }
+        auto response = dispatch_(ipc::Message(0, ipc::SyscallOp::SYS_SPAWN, spawn.dump()));
+        json r = json::parse(response.payload_str(), nullptr, false);
+
+        if (r.is_object() && r.contains("id")) {
+            result["success"] = true;
+            result["agent_id"] = r["id"];
+            result["name"] = r.value("name", "");
+            result["pid"] = r.value("pid", 0);
+        } else {
+            result["success"] = false;
+            result["error"] = r.is_object() ? r.value("error", "spawn failed") : "spawn failed";
+        }
+    } else if (type == "stop_agent") {
+        json kill;
+        kill["id"] = command.value("agent_id", uint32_t{0});
+        auto response = dispatch_(ipc::Message(0, ipc::SyscallOp::SYS_KILL, kill.dump()));
+        json r = json::parse(response.payload_str(), nullptr, false);
+
+        result["success"] = r.is_object() && r.value("killed", false);
+        if (!result["success"]) {
+            result["error"] = "agent not found";
+            result["not_found"] = true;
+        }
+    } else {
+        result["success"] = false;
+        result["error"] = "unknown command: " + type;
+    }
+
+    spdlog::info("Relay command {} (id={}): {}", type, command_id,
+                 result["success"].get<bool>() ? "ok" : result.value("error", ""));
+    context_.tunnel_client.send_command_result(command_id, result);
+}
 
-    auto response = dispatch_(msg);
+bool TunnelSyscalls::dispatch_remote(RemoteRequest request) {
+    uint32_t agent_id = request.msg.agent_id;
+    uint64_t wake_seq = wait_helpers::wake_seq(context_, agent_id);
+    auto response = dispatch_(request.msg);
+
+    if (response.pending) {
+        // Keep the deadline of the first attempt
+        int64_t deadline_ms = request.deadline_ms
+            ? request.deadline_ms : wait_helpers::now_ms() + response.wait_ms;
+        parked_[agent_id].push_front({request.request_id, std::move(response), deadline_ms, wake_seq});
+        return false;
+    }
 
     context_.tunnel_client.send_response(
-        agent_id,
+        request.msg.agent_id,
         static_cast<uint8_t>(response.opcode),
-        response.payload
+        response.payload,
+        request.request_id
     );
+    return true;
+}
+
+void TunnelSyscalls::retry_parked() {
+    if (parked_.empty()) {
+        return;
+    }
+
+    auto parked = std::move(parked_);
+    parked_.clear();
+    int64_t now = wait_helpers::now_ms();
+
+    for (auto& [agent_id, queue] : parked) {
+        while (!queue.empty()) {
+            // Nothing new for this agent and time left: it would park again
+            auto& front = queue.front();
+            if (front.deadline_ms && now < front.deadline_ms
+                    && wait_helpers::wake_seq(context_, agent_id) == front.wake_seq) {
+                parked_[agent_id] = std::move(queue);
+                break;
+            }
+            front.msg.wait_expired = front.deadline_ms && now >= front.deadline_ms;
+
+            RemoteRequest request = std::move(queue.front());
+            queue.pop_front();
+            if (!dispatch_remote(std::move(request))) {
+                // Still blocked: the rest wait behind it again
+                auto& requeued = parked_[agent_id];
+                requeued.insert(requeued.end(),
+                    std::make_move_iterator(queue.begin()),
+                    std::make_move_iterator(queue.end()));
+                break;
+            }
+        }
+    }
 }
 
 } // namespace clove::kernel
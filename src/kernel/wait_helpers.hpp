@@ -0,0 +1,56 @@
+#pragma once
+#include <algorithm>
+#include <chrono>
+#include <cstdint>
+#include <optional>
+#include <nlohmann/json.hpp>
+#include "ipc/protocol.hpp"
+#include "kernel/context.hpp"
+#include "kernel/event_bus.hpp"
+#include "kernel/ipc_mailbox.hpp"
+
+namespace clove::kernel::wait_helpers {
+
+using json = nlohmann::json;
+
+constexpr int DEFAULT_WAIT_TIMEOUT_MS = 30000;
+constexpr int MAX_WAIT_TIMEOUT_MS = 300000;
+
+inline int64_t now_ms() {
+    return std::chrono::duration_cast<std::chrono::milliseconds>(
+        std::chrono::steady_clock::now().time_since_epoch()).count();
+}
+
+inline bool should_wait(const json& j) {
+    return j.value("wait", false);
+}
+
+// Changes whenever a message or event is queued for agent_id. A parked
+// request is only worth retrying once this differs from when it was parked.
+inline uint64_t wake_seq(const KernelContext& context, uint32_t agent_id) {
+    return context.mailbox_registry.version(agent_id) + context.event_bus.version(agent_id);
+}
+
+// Park a blocking request that has nothing to return yet.
+// The returned message asks the transport to hold the request for up to
+// "timeout_ms"; the transport tracks that deadline and re-dispatches the
+// request with wait_expired set once it passes. Returns nullopt when the
+// caller must answer now with its (empty) result.
+inline std::optional<ipc::Message> park_until_deadline(const ipc::Message& msg, const json& request) {
+    if (msg.wait_expired) {
+        return std::nullopt;
+    }
+
+    int timeout_ms = std::clamp(request.value("timeout_ms", DEFAULT_WAIT_TIMEOUT_MS),
+                                0, MAX_WAIT_TIMEOUT_MS);
+    if (timeout_ms == 0) {
+        return std::nullopt;
+    }
+
+    ipc::Message retry(msg.agent_id, msg.opcode, msg.payload);
+    retry.pending = true;
+    retry.wait_ms = timeout_ms;
+    return retry;
+}
+
+} // namespace clove::kernel::wait_helpers
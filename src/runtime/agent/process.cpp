@@ -52,6 +52,7 @@ bool AgentProcess::start() {
     sandbox_config.enable_pid_namespace = config_.sandboxed;
     sandbox_config.enable_mount_namespace = config_.sandboxed;
     sandbox_config.enable_uts_namespace = config_.sandboxed;
+    sandbox_config.output_path = config_.log_path;
 
     // Create sandbox
     sandbox_ = std::make_unique<Sandbox>(sandbox_config);
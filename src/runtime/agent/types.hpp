@@ -44,6 +44,7 @@ struct AgentConfig {
     std::string script_path;               // Path to Python script
     std::string python_path = "python3";   // Python interpreter
     std::string socket_path;               // Kernel socket to connect to
+    std::string log_path;                  // stdout/stderr file (empty: the kernel's)
 
     // Resource limits
     ResourceLimits limits;
@@ -251,6 +251,8 @@ int Sandbox::child_entry(void* arg) {
     }
     argv.push_back(nullptr);
 
+    sandbox->redirect_output();
+
     // Execute the command
     execvp(argv[0], argv.data());
 
@@ -259,6 +261,21 @@ int Sandbox::child_entry(void* arg) {
     _exit(127);
 }
 
+void Sandbox::redirect_output() const {
+    if (config_.output_path.empty()) {
+        return;
+    }
+
+    int fd = open(config_.output_path.c_str(), O_WRONLY | O_CREAT | O_APPEND | O_CLOEXEC, 0644);
+    if (fd < 0) {
+        spdlog::warn("Could not open output file {}: {}", config_.output_path, strerror(errno));
+        return;
+    }
+    dup2(fd, STDOUT_FILENO);
+    dup2(fd, STDERR_FILENO);
+    close(fd);
+}
+
 bool Sandbox::start(const std::string& command, const std::vector<std::string>& args) {
     if (state_ == SandboxState::RUNNING) {
         spdlog::error("Sandbox {} already running", config_.name);
@@ -336,6 +353,7 @@ bool Sandbox::start(const std::string& command, const std::vector<std::string>&
             }
             argv.push_back(nullptr);
 
+            redirect_output();
             execvp(argv[0], argv.data());
             _exit(127);
         }
@@ -37,6 +37,8 @@ struct SandboxConfig {
     bool enable_mount_namespace = true;  // Mount namespace isolation
     bool enable_uts_namespace = true;    // UTS (hostname) isolation
     bool enable_cgroups = true;          // cgroups resource limits
+
+    std::string output_path;             // File for stdout/stderr (empty: inherit)
 };
 
 // Sandbox state
@@ -131,6 +133,9 @@ private:
     // Child process entry point (runs in new namespaces)
     static int child_entry(void* arg);
 
+    // In the child: point stdout/stderr at config_.output_path, if set
+    void redirect_output() const;
+
     void set_state(SandboxState new_state);
 };
 
@@ -224,7 +224,8 @@ std::vector<RemoteAgentInfo> TunnelClient::list_remote_agents() const {
 }
 
 bool TunnelClient::send_response(uint32_t agent_id, uint8_t opcode,
-                                const std::vector<uint8_t>& payload) {
+                                const std::vector<uint8_t>& payload,
+                                uint64_t request_id) {
     if (!connected_) {
         return false;
     }
@@ -256,6 +257,26 @@ bool TunnelClient::send_response(uint32_t agent_id, uint8_t opcode,
         {"opcode", opcode},
         {"payload", payload_b64}
     };
+    if (request_id != 0) {
+        request["params"]["request_id"] = request_id;
+    }
+
+    auto response = send_request_and_wait(request);
+    return response && response->value("result", json{}).value("success", false);
+}
+
+bool TunnelClient::send_command_result(uint64_t command_id, const nlohmann::json& result) {
+    if (!connected_) {
+        return false;
+    }
+
+    json request;
+    request["id"] = next_request_id_++;
+    request["method"] = "command_result";
+    request["params"] = {
+        {"command_id", command_id},
+        {"result", result}
+    };
 
     auto response = send_request_and_wait(request);
     return response && response->value("result", json{}).value("success", false);
@@ -462,6 +483,7 @@ void TunnelClient::handle_event(const nlohmann::json& data) {
         event.type = TunnelEvent::Type::SYSCALL;
         event.agent_id = event_data.value("agent_id", 0);
         event.opcode = event_data.value("opcode", 0);
+        event.request_id = event_data.value("request_id", uint64_t{0});
 
         // Base64 decode payload
         std::string payload_b64 = event_data.value("payload", "");
@@ -491,6 +513,11 @@ void TunnelClient::handle_event(const nlohmann::json& data) {
         spdlog::debug("Syscall from remote agent {}: opcode=0x{:02x}",
                      event.agent_id, event.opcode);
 
+    } else if (event_type == "command") {
+        event.type = TunnelEvent::Type::COMMAND;
+        event.command = event_data;
+        spdlog::debug("Relay command: {}", event_data.value("type", ""));
+
     } else if (event_type == "disconnected") {
         event.type = TunnelEvent::Type::DISCONNECTED;
         connected_ = false;
@@ -52,7 +52,8 @@ struct TunnelEvent {
         SYSCALL,
         ERROR,
         DISCONNECTED,
-        RECONNECTED
+        RECONNECTED,
+        COMMAND
     };
 
     Type type;
@@ -60,7 +61,9 @@ struct TunnelEvent {
     std::string agent_name;
     uint8_t opcode = 0;
     std::vector<uint8_t> payload;
+    uint64_t request_id = 0;  // Set by the remote client to match the response (0 = none)
     std::string error;
+    nlohmann::json command;   // COMMAND: {"command_id", "type": "deploy_agent"/"stop_agent", ...}
 };
 
 class TunnelClient {
@@ -93,9 +96,13 @@ public:
     // Get list of connected remote agents
     std::vector<RemoteAgentInfo> list_remote_agents() const;
 
-    // Send response to a remote agent's syscall
+    // Send response to a remote agent's syscall, tagged with the syscall's request_id
     bool send_response(uint32_t agent_id, uint8_t opcode,
-                      const std::vector<uint8_t>& payload);
+                      const std::vector<uint8_t>& payload,
+                      uint64_t request_id = 0);
+
+    // Report the outcome of a relay command (COMMAND event) by its command_id
+    bool send_command_result(uint64_t command_id, const nlohmann::json& result);
 
     // Poll for pending events (non-blocking)
     std::vector<TunnelEvent> poll_events();
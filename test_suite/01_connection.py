@@ -1,9 +1,10 @@
 #!/usr/bin/env python3
 """Test 01: Basic Connection - Verify kernel connectivity and NOOP syscall"""
+import asyncio
 import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'agents', 'python_sdk'))
-from clove_sdk import CloveClient
+from clove_sdk import CloveClient, AsyncCloveClient
 
 def main():
     print("=== Test 01: Basic Connection ===\n")
@@ -68,6 +69,22 @@ def main():
         # Cleanup
         client.disconnect()
 
+        # Test 5: Concurrent calls over one asyncio connection
+        print("--- Test 1.5: AsyncCloveClient Concurrent NOOP ---")
+
+        async def concurrent_noops():
+            async with AsyncCloveClient() as async_client:
+                return await asyncio.gather(
+                    *(async_client.noop(f"async {i}") for i in range(50)))
+
+        responses = asyncio.run(concurrent_noops())
+        if responses == [f"async {i}" for i in range(50)]:
+            print("  50 concurrent NOOP calls resolved in order")
+            print("  PASSED\n")
+        else:
+            print("  FAILED - Responses out of order or missing")
+            return 1
+
         print("=== Test 01 PASSED ===")
         return 0
 
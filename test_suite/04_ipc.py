@@ -1,10 +1,13 @@
 #!/usr/bin/env python3
-"""Test 04: IPC - Verify SEND, RECV, BROADCAST, REGISTER syscalls"""
+"""Test 04: IPC - Verify SEND, RECV (incl. blocking), BROADCAST, REGISTER syscalls"""
 import sys
 import os
+import json
+import threading
 import time
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'agents', 'python_sdk'))
 from clove_sdk import CloveClient
+from clove_sdk.client import SyscallOp
 
 # Worker agent that receives and responds to messages
 WORKER_SCRIPT = """
@@ -28,6 +31,88 @@ with CloveClient() as client:
         time.sleep(0.5)
 """
 
+def send_later(delays, message, to):
+    """Send `message` to agent `to` from a second connection after each delay"""
+    def run():
+        with CloveClient() as sender:
+            for i, delay in enumerate(delays):
+                time.sleep(delay)
+                sender.send_message({**message, "seq": i}, to=to)
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+def drain(client):
+    while client.recv_messages(max_messages=100).get("messages"):
+        pass
+
+
+def test_blocking_recv(client) -> bool:
+    """Blocking receives are parked in the kernel until a message or timeout"""
+    print("--- Test 4.7: Blocking Receive Wakes on Arrival ---")
+    drain(client)
+    sender = send_later([0.5], {"wake": True}, client.agent_id)
+    started = time.monotonic()
+    result = client.recv_messages(max_messages=10, wait=True, timeout_ms=5000)
+    elapsed = time.monotonic() - started
+    sender.join()
+    messages = result.get("messages", [])
+    if not (messages and messages[0].get("message", {}).get("wake") and 0.3 < elapsed < 4.0):
+        print(f"  FAILED - Got {result} after {elapsed:.2f}s")
+        return False
+    print(f"  Woken after {elapsed:.2f}s")
+    print("  PASSED\n")
+
+    print("--- Test 4.8: Blocking Receive Times Out Empty ---")
+    started = time.monotonic()
+    result = client.recv_messages(max_messages=10, wait=True, timeout_ms=500)
+    elapsed = time.monotonic() - started
+    if not (result.get("success") and not result.get("messages") and 0.4 < elapsed < 2.5):
+        print(f"  FAILED - Got {result} after {elapsed:.2f}s")
+        return False
+    print(f"  Returned empty after {elapsed:.2f}s")
+    print("  PASSED\n")
+
+    print("--- Test 4.9: Later Calls Wait Behind a Blocking Receive ---")
+    # Both frames go out in one write; the NOOP must be answered second
+    started = time.monotonic()
+    recv, echo = client.call_many([
+        (SyscallOp.SYS_RECV, json.dumps({"max": 10, "wait": True, "timeout_ms": 500})),
+        (SyscallOp.SYS_NOOP, "after-recv"),
+    ])
+    elapsed = time.monotonic() - started
+    if not (recv and echo and recv.opcode == SyscallOp.SYS_RECV
+            and echo.opcode == SyscallOp.SYS_NOOP and echo.payload_str == "after-recv"
+            and elapsed > 0.4):
+        print(f"  FAILED - Responses {recv}, {echo} after {elapsed:.2f}s")
+        return False
+    print("  PASSED\n")
+
+    print("--- Test 4.10: Client-Supplied Deadline Is Ignored ---")
+    started = time.monotonic()
+    client.call(SyscallOp.SYS_RECV, json.dumps(
+        {"max": 10, "wait": True, "timeout_ms": 300, "_deadline_ms": 2 ** 62}))
+    elapsed = time.monotonic() - started
+    if elapsed > 2.5:
+        print(f"  FAILED - Waited {elapsed:.2f}s for a 300ms receive")
+        return False
+    print("  PASSED\n")
+
+    print("--- Test 4.11: messages() Iterator ---")
+    sender = send_later([0.2, 0.2, 0.2], {"stream": True}, client.agent_id)
+    started = time.monotonic()
+    received = [m for m in client.messages(timeout=5.0, idle_timeout=1.0)]
+    elapsed = time.monotonic() - started
+    sender.join()
+    if [m.get("message", {}).get("seq") for m in received] != [0, 1, 2] or elapsed > 4.0:
+        print(f"  FAILED - Got {received} after {elapsed:.2f}s")
+        return False
+    print(f"  Received 3 messages, stopped after {elapsed:.2f}s idle")
+    print("  PASSED\n")
+    return True
+
+
 def main():
     print("=== Test 04: IPC (Inter-Process Communication) ===\n")
 
@@ -149,6 +234,9 @@ def main():
             os.remove('/tmp/ipc_worker.py')
             print("  Worker killed and script removed\n")
 
+            if not test_blocking_recv(client):
+                return 1
+
             print("=== Test 04 PASSED ===")
             return 0
 
@@ -2,9 +2,22 @@
 """Test 9: Event System - Verify pub/sub events work correctly"""
 import sys
 import os
+import threading
+import time
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'agents', 'python_sdk'))
 from clove_sdk import CloveClient
 
+
+def emit_later(delay, data):
+    """Emit a CUSTOM event from a second connection after `delay` seconds"""
+    def run():
+        with CloveClient() as emitter:
+            time.sleep(delay)
+            emitter.emit_event("CUSTOM", data)
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
 def main():
     print("=== Test 9: Event System (Pub/Sub) ===\n")
 
@@ -70,6 +83,48 @@ def main():
                 print(f"  FAILED - {result.get('error')}\n")
                 return 1
 
+            # Test 5: Blocking poll wakes when an event is emitted
+            print("--- Test 9.5: Blocking Poll Wakes on Event ---")
+            client.unsubscribe(["AGENT_SPAWNED", "AGENT_EXITED"])
+            client.subscribe(["CUSTOM"])
+            client.poll_events(max_events=100)
+            emitter = emit_later(0.5, {"wake": True})
+            started = time.monotonic()
+            result = client.poll_events(max_events=10, wait=True, timeout_ms=5000)
+            elapsed = time.monotonic() - started
+            emitter.join()
+            events = result.get("events", [])
+            if events and events[0].get("data", {}).get("wake") and 0.3 < elapsed < 4.0:
+                print(f"  Woken after {elapsed:.2f}s")
+                print("  PASSED\n")
+            else:
+                print(f"  FAILED - Got {result} after {elapsed:.2f}s\n")
+                return 1
+
+            # Test 6: Blocking poll times out empty
+            print("--- Test 9.6: Blocking Poll Times Out Empty ---")
+            started = time.monotonic()
+            result = client.poll_events(max_events=10, wait=True, timeout_ms=500)
+            elapsed = time.monotonic() - started
+            if result.get("success") and not result.get("events") and 0.4 < elapsed < 2.5:
+                print(f"  Returned empty after {elapsed:.2f}s")
+                print("  PASSED\n")
+            else:
+                print(f"  FAILED - Got {result} after {elapsed:.2f}s\n")
+                return 1
+
+            # Test 7: The connection keeps working in order after a blocking poll
+            print("--- Test 9.7: Calls After a Blocking Poll ---")
+            result = client.emit_event("CUSTOM", {"after": True})
+            polled = client.poll_events(max_events=10)
+            if (result.get("success")
+                    and [e.get("data") for e in polled.get("events", [])] == [{"after": True}]):
+                print("  PASSED\n")
+            else:
+                print(f"  FAILED - emit={result}, poll={polled}\n")
+                return 1
+            client.unsubscribe(["CUSTOM"])
+
             print("=== Test 9 PASSED ===")
             return 0
 
@@ -4,6 +4,8 @@ import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'agents', 'python_sdk'))
 from clove_sdk import CloveClient
+from clove_sdk.client import SyscallOp
+from clove_sdk.codec import available_codecs
 
 def main():
     print("=== Test 10: State Store ===\n")
@@ -105,6 +107,75 @@ def main():
                 print("  FAILED - Key still exists after deletion\n")
                 return 1
 
+            # Test 7: Pipelined store/fetch/delete
+            print("--- Test 10.7: Pipeline ---")
+            with client.pipeline() as pipe:
+                for i in range(20):
+                    pipe.store(f"test:pipe:{i}", {"i": i})
+                for i in range(20):
+                    pipe.fetch(f"test:pipe:{i}")
+                for i in range(20):
+                    pipe.delete_key(f"test:pipe:{i}")
+                results = pipe.execute()
+            print(f"Got {len(results)} results")
+
+            stored, fetched, deleted = results[:20], results[20:40], results[40:]
+            if (len(results) == 60
+                    and all(r.get("success") for r in stored)
+                    and [r.get("value") for r in fetched] == [{"i": i} for i in range(20)]
+                    and all(r.get("deleted") for r in deleted)):
+                print("  Responses returned in order")
+                print("  PASSED\n")
+            else:
+                print("  FAILED - Pipeline results mismatch\n")
+                return 1
+
+            # Test 8: Batch store/fetch/delete
+            print("--- Test 10.8: Batch Operations ---")
+            keys = [f"test:batch:{i}" for i in range(50)]
+            stored = client.store_many({key: {"i": i} for i, key in enumerate(keys)})
+            fetched = client.fetch_many(keys + ["test:batch:missing"])
+            deleted = client.delete_many(keys)
+            print(f"Stored {stored.get('stored')}, found {fetched.get('found')}, deleted {deleted.get('deleted')}")
+
+            # A malformed item fails alone; the rest of the batch is stored
+            mixed = client._request(SyscallOp.SYS_MSTORE, {"items": [
+                {"key": "test:batch:bad", "value": 1, "scope": 5},
+                {"key": "test:batch:good", "value": 2},
+            ]})
+            mixed_ok = ([r.get("success") for r in mixed.get("results", [])] == [False, True]
+                        and mixed.get("stored") == 1)
+            client.delete_many(["test:batch:good"])
+
+            if (stored.get("stored") == 50 and mixed_ok
+                    and [r.get("key") for r in fetched.get("results", [])] == keys + ["test:batch:missing"]
+                    and fetched.get("values") == {key: {"i": i} for i, key in enumerate(keys)}
+                    and deleted.get("deleted") == 50):
+                print("  PASSED\n")
+            else:
+                print("  FAILED - Batch results mismatch\n")
+                return 1
+
+            # Test 9: msgpack codec with a binary value
+            print("--- Test 10.9: msgpack Codec ---")
+            if "msgpack" not in available_codecs():
+                print("  SKIP - msgpack not installed\n")
+            else:
+                blob = bytes(range(256))
+                with CloveClient(codec="msgpack") as mp_client:
+                    stored = mp_client.store("test:codec:blob", {"data": blob})
+                    fetched = mp_client.fetch("test:codec:blob")
+                    mp_client.delete_key("test:codec:blob")
+                print(f"Codec: {mp_client.codec.name}")
+
+                if (mp_client.codec.name == "msgpack" and stored.get("success")
+                        and fetched.get("value") == {"data": blob}):
+                    print("  Binary value round-tripped without base64")
+                    print("  PASSED\n")
+                else:
+                    print(f"  FAILED - {fetched}\n")
+                    return 1
+
             # Cleanup: Delete TTL key
             client.delete_key("test:ttl:key")
 
@@ -1,11 +1,9 @@
 #!/usr/bin/env python3
-"""Test 15: Async Syscalls - Verify async exec and poll"""
+"""Test 15: Async Syscalls - Verify async exec futures"""
 import sys
 import os
-import time
-import json
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'agents', 'python_sdk'))
-from clove_sdk import CloveClient
+from clove_sdk import CloveClient, as_completed, gather
 
 
 def main():
@@ -20,41 +18,12 @@ def main():
         with CloveClient() as client:
             print("Connected to kernel\n")
 
-            print("--- Test 15.1: Async EXEC ---")
-            result = client.exec("echo async-ok", async_=True)
-            if not result or not result.get("success"):
-                print(f"  FAILED - {result}")
-                return 1
-
-            request_id = result.get("request_id")
-            if not request_id:
-                print("  FAILED - Missing request_id")
-                return 1
-
-            print(f"  Accepted async request_id={request_id}")
-
-            print("--- Test 15.2: Poll Async Results ---")
-            deadline = time.time() + 5.0
-            found = None
-            while time.time() < deadline:
-                poll = client.poll_async(max_results=10)
-                if poll.get("success"):
-                    for entry in poll.get("results", []):
-                        if entry.get("request_id") == request_id:
-                            found = entry
-                            break
-                if found:
-                    break
-                time.sleep(0.1)
-
-            if not found:
-                print("  FAILED - No async result within timeout")
-                return 1
-
+            print("--- Test 15.1: Async EXEC Future ---")
+            future = client.exec("echo async-ok", async_=True)
             try:
-                payload = json.loads(found.get("payload", "{}"))
-            except json.JSONDecodeError:
-                print("  FAILED - Invalid payload JSON")
+                payload = future.result(timeout=5.0)
+            except Exception as e:
+                print(f"  FAILED - No async result: {e}")
                 return 1
 
             if payload.get("success") and "async-ok" in payload.get("stdout", ""):
@@ -63,6 +32,20 @@ def main():
                 print(f"  FAILED - Unexpected payload: {payload}")
                 return 1
 
+            print("--- Test 15.2: Parallel Futures ---")
+            futures = [client.exec(f"sleep 0.$((RANDOM % 5)); echo job-{i}", async_=True)
+                       for i in range(20)]
+            completed = [f.result() for f in as_completed(futures, timeout=10.0)]
+            results = gather(futures, timeout=1.0)
+
+            if (len(completed) == 20
+                    and [r.get("stdout", "").strip() for r in results] == [f"job-{i}" for i in range(20)]):
+                print("  All 20 results matched to their request")
+                print("  PASSED\n")
+            else:
+                print(f"  FAILED - Unexpected results: {results}")
+                return 1
+
             print("=== Test 15 PASSED ===")
             return 0
 
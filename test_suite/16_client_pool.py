@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""Test 16: Connection Pool - Verify CloveClientPool reuse, blocking and eviction"""
+import sys
+import os
+import threading
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'agents', 'python_sdk'))
+from clove_sdk import CloveClientPool
+
+
+def main():
+    print("=== Test 16: Connection Pool ===\n")
+
+    if not os.path.exists('/tmp/clove.sock'):
+        print("SKIP - Kernel not running (/tmp/clove.sock not found)")
+        print("   Start kernel with: ./build/clove_kernel")
+        return 0
+
+    pool = None
+    try:
+        pool = CloveClientPool(min_size=0, max_size=2, idle_timeout=0.5,
+                               health_check_interval=0.0)
+        print("Pool created (max_size=2)\n")
+
+        print("--- Test 16.1: Checkout Beyond max_size Blocks ---")
+        first = pool.acquire()
+        second = pool.acquire()
+        try:
+            pool.acquire(timeout=0.2)
+            print("  FAILED - Third checkout did not block")
+            return 1
+        except TimeoutError:
+            pass
+        if pool.size != 2:
+            print(f"  FAILED - Pool opened {pool.size} connections, expected 2")
+            return 1
+        print("  PASSED\n")
+
+        print("--- Test 16.2: Released Connection Is Reused ---")
+        got = []
+        waiter = threading.Thread(target=lambda: got.append(pool.acquire(timeout=5.0)))
+        waiter.start()
+        time.sleep(0.1)
+        pool.release(first)
+        waiter.join(timeout=5.0)
+
+        if not got or got[0] is not first or pool.size != 2:
+            print(f"  FAILED - Blocked checkout did not get the released connection (size={pool.size})")
+            return 1
+
+        # More concurrent calls than connections all succeed on the same two
+        pool.release(got[0])
+        pool.release(second)
+        results = []
+        workers = [threading.Thread(target=lambda: results.append(pool.hello()))
+                   for _ in range(8)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(timeout=10.0)
+
+        stats = pool.stats()
+        with pool.connection() as client:
+            reused = client is first or client is second
+        if (len(results) == 8 and all(r.get("success") for r in results)
+                and stats["size"] <= 2 and reused):
+            print(f"  8 calls served by {stats['size']} connection(s)")
+            print("  PASSED\n")
+        else:
+            print(f"  FAILED - results={results}, stats={stats}, reused={reused}")
+            return 1
+
+        print("--- Test 16.3: Dead Connection Is Replaced ---")
+        with pool.connection() as client:
+            dead_id = client.agent_id
+            client._sock.close()  # Health check (hello) now fails on this one
+        with pool.connection() as client:
+            healthy = client.hello().get("success", False)
+        if healthy:
+            print(f"  Connection of agent {dead_id} replaced")
+            print("  PASSED\n")
+        else:
+            print("  FAILED - Pool handed out a dead connection")
+            return 1
+
+        print("--- Test 16.4: Idle Connections Are Evicted ---")
+        time.sleep(0.7)
+        with pool.connection():
+            size = pool.size
+        if size == 1:
+            print("  PASSED\n")
+        else:
+            print(f"  FAILED - Expected 1 connection after eviction, got {size}")
+            return 1
+
+        print("--- Test 16.5: Per-Agent Calls Require a Held Connection ---")
+        for call in (lambda: pool.register_name("pooled"), pool.recv_messages,
+                     lambda: pool.subscribe(["AGENT_SPAWNED"])):
+            try:
+                call()
+                print("  FAILED - Per-agent call ran on a per-call connection")
+                return 1
+            except RuntimeError:
+                pass
+        with pool.connection() as client:
+            registered = client.register_name("pooled").get("success", False)
+        if registered:
+            print("  PASSED\n")
+        else:
+            print("  FAILED - register_name failed on a held connection")
+            return 1
+
+        print("=== Test 16 PASSED ===")
+        return 0
+
+    except ConnectionError:
+        print("SKIP - Cannot connect to kernel")
+        return 0
+    except Exception as e:
+        print(f"ERROR - {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+    finally:
+        if pool:
+            pool.close()
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Test 17: Relay Sharding - Verify hash ring placement and shard control (no kernel needed)"""
+import sys
+import os
+import asyncio
+from collections import Counter
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'relay'))
+
+
+def fake_shards(shard, replies):
+    """ShardControl whose workers answer from `replies` instead of Unix sockets"""
+    class FakeShardControl(shard.ShardControl):
+        def __init__(self):
+            super().__init__("/nonexistent", len(replies))
+            self.replies = replies
+            self.sent = []
+
+        async def request(self, index, op, reply_timeout=shard.CONTROL_TIMEOUT, **params):
+            self.sent.append((index, op, params))
+            reply = self.replies[index]
+            if isinstance(reply, Exception):
+                raise reply
+            return reply
+
+    return FakeShardControl()
+
+
+def main():
+    print("=== Test 17: Relay Sharding ===\n")
+
+    try:
+        import shard
+    except ImportError as e:
+        print(f"SKIP - Relay dependencies not installed ({e})")
+        return 0
+    shard.RETRY_DELAY = 0
+
+    try:
+        machines = [f"machine-{i}" for i in range(10000)]
+
+        print("--- Test 17.1: Hash Ring Placement ---")
+        ring = shard.HashRing(4)
+        owners = [ring.owner(m) for m in machines]
+        counts = Counter(owners)
+        if (owners != [shard.HashRing(4).owner(m) for m in machines]
+                or set(counts) != {0, 1, 2, 3}
+                or not all(1250 < n < 3750 for n in counts.values())):
+            print(f"  FAILED - Unstable or unbalanced placement: {dict(counts)}")
+            return 1
+        config = shard.ShardConfig(2, 4, "/nonexistent")
+        if any(config.owns(m) != (owner == 2) for m, owner in zip(machines, owners)):
+            print("  FAILED - ShardConfig.owns disagrees with the ring")
+            return 1
+        print(f"  Machines per worker: {dict(sorted(counts.items()))}")
+        print("  PASSED\n")
+
+        print("--- Test 17.2: Adding a Worker Moves Few Machines ---")
+        grown = shard.HashRing(5)
+        moved = [m for m, owner in zip(machines, owners) if grown.owner(m) != owner]
+        if len(moved) > len(machines) * 0.3 or any(grown.owner(m) != 4 for m in moved):
+            print(f"  FAILED - {len(moved)} machines moved, not all to the new worker")
+            return 1
+        print(f"  {len(moved)} of {len(machines)} machines moved to the new worker")
+        print("  PASSED\n")
+
+        print("--- Test 17.3: Status Aggregation ---")
+        shards = fake_shards(shard, [
+            {"pid": 10, "kernels_connected": 2, "remote_agents_connected": 1,
+             "syscalls_routed": 5, "responses_routed": 4,
+             "kernels": [{"machine_id": "a"}, {"machine_id": "b"}], "agents": [{"agent_id": 1}]},
+            ConnectionRefusedError("worker down"),
+            {"pid": 12, "kernels_connected": 1, "remote_agents_connected": 0,
+             "syscalls_routed": 3, "responses_routed": 3,
+             "kernels": [{"machine_id": "c"}], "agents": []},
+        ])
+        status = asyncio.run(shards.status())
+        expected = {"kernels_connected": 3, "remote_agents_connected": 1,
+                    "syscalls_routed": 8, "responses_routed": 7}
+        if ({k: status[k] for k in expected} != expected
+                or [k["machine_id"] for k in status["kernels"]] != ["a", "b", "c"]
+                or [s["running"] for s in status["shards"]] != [True, False, True]
+                or status["shards"][2]["pid"] != 12):
+            print(f"  FAILED - Unexpected status: {status}")
+            return 1
+        print("  PASSED\n")
+
+        print("--- Test 17.4: Token Sync Marks and Replays Stale Shards ---")
+        ok = {"success": True}
+        shards = fake_shards(shard, [ok, ConnectionRefusedError("worker down"), ok])
+        failed = asyncio.run(shards.sync("revoke_agent_token", token_hash="abc"))
+        attempts = [i for i, op, _ in shards.sent if op == "revoke_agent_token"]
+        if failed != [1] or shards.stale != {1} or attempts.count(1) != shard.CONTROL_RETRIES:
+            print(f"  FAILED - failed={failed}, stale={shards.stale}, attempts={attempts}")
+            return 1
+
+        shards.replies[1] = ok
+        asyncio.run(shards.replay(lambda: {"machines": {}, "agent_tokens": []}))
+        replayed = [(i, op) for i, op, _ in shards.sent if op == "sync_auth"]
+        if shards.stale or replayed != [(1, "sync_auth")]:
+            print(f"  FAILED - stale={shards.stale}, replayed={replayed}")
+            return 1
+        print("  PASSED\n")
+
+        print("=== Test 17 PASSED ===")
+        return 0
+
+    except Exception as e:
+        print(f"ERROR - {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -27,6 +27,8 @@ TESTS = [
     ("13_audit_logging.py", "Audit Logging"),
     ("14_execution_replay.py", "Execution Recording & Replay"),
     ("15_async.py", "Async Syscalls"),
+    ("16_client_pool.py", "Connection Pool"),
+    ("17_relay_shards.py", "Relay Sharding"),
 ]
 
 def run_test(test_file: str, description: str) -> bool:
@@ -44,35 +44,27 @@ def main():
     # Register as researcher
     client.register_name("{agent_name}")
 
-    import time as t
-    # Wait for research requests
-    while True:
-        result = client.recv_messages(max_messages=1)
-        messages = result.get("messages", []) if result else []
-        if not messages:
-            t.sleep(0.5)
-            continue
-
-        for msg in messages:
-            data = msg.get("message", {{}})
-            if data.get("type") == "research_request":
-                topic = data.get("topic", "")
-                existing = data.get("existing_notes", "")
-
-                prompt = f"""You are a research assistant. Provide 3-5 key facts about: {{topic}}
+    # Wait for research requests (blocks in the kernel until one arrives)
+    for msg in client.messages(max_messages=1):
+        data = msg.get("message", {{}})
+        if data.get("type") == "research_request":
+            topic = data.get("topic", "")
+            existing = data.get("existing_notes", "")
+
+            prompt = f"""You are a research assistant. Provide 3-5 key facts about: {{topic}}
 Existing notes: {{existing}}
 Provide new research findings as bullet points:"""
 
-                result = client.think(prompt, temperature=0.3)
+            result = client.think(prompt, temperature=0.3)
 
-                # Send back to coordinator
-                client.send_message(
-                    {{"type": "research_result", "notes": result.get("content", "")}},
-                    to_name="{coordinator_name}"
-                )
+            # Send back to coordinator
+            client.send_message(
+                {{"type": "research_result", "notes": result.get("content", "")}},
+                to_name="{coordinator_name}"
+            )
 
-            elif data.get("type") == "shutdown":
-                break
+        elif data.get("type") == "shutdown":
+            break
 
     client.disconnect()
 
@@ -97,38 +89,30 @@ def main():
     # Register as writer
     client.register_name("{agent_name}")
 
-    import time as t
-    # Wait for write requests
-    while True:
-        result = client.recv_messages(max_messages=1)
-        messages = result.get("messages", []) if result else []
-        if not messages:
-            t.sleep(0.5)
-            continue
-
-        for msg in messages:
-            data = msg.get("message", {{}})
-            if data.get("type") == "write_request":
-                topic = data.get("topic", "")
-                notes = data.get("research_notes", [])
-                all_notes = "\\n\\n".join(notes)
-
-                prompt = f"""You are a technical writer. Synthesize into a clear report (200-300 words).
+    # Wait for write requests (blocks in the kernel until one arrives)
+    for msg in client.messages(max_messages=1):
+        data = msg.get("message", {{}})
+        if data.get("type") == "write_request":
+            topic = data.get("topic", "")
+            notes = data.get("research_notes", [])
+            all_notes = "\\n\\n".join(notes)
+
+            prompt = f"""You are a technical writer. Synthesize into a clear report (200-300 words).
 Topic: {{topic}}
 Research Notes:
 {{all_notes}}
 Write the report:"""
 
-                result = client.think(prompt, temperature=0.7)
+            result = client.think(prompt, temperature=0.7)
 
-                # Send back to coordinator
-                client.send_message(
-                    {{"type": "write_result", "report": result.get("content", "")}},
-                    to_name="{coordinator_name}"
-                )
+            # Send back to coordinator
+            client.send_message(
+                {{"type": "write_result", "report": result.get("content", "")}},
+                to_name="{coordinator_name}"
+            )
 
-            elif data.get("type") == "shutdown":
-                break
+        elif data.get("type") == "shutdown":
+            break
 
     client.disconnect()
 
@@ -270,14 +254,10 @@ class MultiProcessResearchTeam:
         )
 
         # Wait for response
-        for _ in range(120):  # 60 second timeout (120 * 0.5s)
-            result = self.client.recv_messages(max_messages=10)
-            messages = result.get("messages", []) if result else []
-            for msg in messages:
-                content = msg.get("message", {})
-                if content.get("type") == "research_result":
-                    return content.get("notes", "")
-            time.sleep(0.5)
+        for msg in self.client.messages(timeout=60):
+            content = msg.get("message", {})
+            if content.get("type") == "research_result":
+                return content.get("notes", "")
 
         return ""
 
@@ -294,14 +274,10 @@ class MultiProcessResearchTeam:
         )
 
         # Wait for response
-        for _ in range(120):  # 60 second timeout (120 * 0.5s)
-            result = self.client.recv_messages(max_messages=10)
-            messages = result.get("messages", []) if result else []
-            for msg in messages:
-                content = msg.get("message", {})
-                if content.get("type") == "write_result":
-                    return content.get("report", "")
-            time.sleep(0.5)
+        for msg in self.client.messages(timeout=60):
+            content = msg.get("message", {})
+            if content.get("type") == "write_result":
+                return content.get("report", "")
 
         return ""
 